@@ -16,11 +16,81 @@ from alarm_backends.core.cache.cmdb.dynamic_group import DynamicGroupManager
 from bkmonitor.models.fta.assign import AlertAssignGroup, AlertAssignRule
 from bkmonitor.utils import extended_json
 from bkmonitor.utils.local import local
+from bkmonitor.utils.range import DIMENSION_FIELD_CLASS_MAP, load_field_instance
+from bkmonitor.utils.range.fields import BkTargetIpDimensionField, IpDimensionField
 from bkmonitor.utils.tenant import bk_biz_id_to_bk_tenant_id
 from constants.action import GLOBAL_BIZ_ID
 
 setattr(local, "assign_cache", {})
 
+# 取值逻辑依赖条件值格式的维度字段，无法建立索引
+UNINDEXABLE_FIELD_CLASSES = (IpDimensionField, BkTargetIpDimensionField)
+
+
+def get_rule_index_key(rule: dict) -> dict | None:
+    """
+    计算分派规则的索引维度
+    仅当规则条件为单个 AND 组且包含等值条件时可建立索引，取值最少的等值条件作为索引维度
+    :return: {"field": 维度, "values": [维度值]}，无法建立索引时返回 None
+    """
+    index_key = None
+    for position, condition in enumerate(rule.get("conditions") or []):
+        # 与 AssignRuleMatch.parse_dimension_conditions 保持一致，首个条件的 or 不产生分组
+        if position and condition.get("condition") == "or":
+            return None
+        field, value = condition.get("field"), condition.get("value")
+        if condition.get("method") != "eq" or not field or not value:
+            continue
+        if issubclass(DIMENSION_FIELD_CLASS_MAP.get(field, object), UNINDEXABLE_FIELD_CLASSES):
+            continue
+        values = sorted(set(load_field_instance(field, value).to_str_list()))
+        if index_key is None or len(values) < len(index_key["values"]):
+            index_key = {"field": field, "values": values}
+    return index_key
+
+
+class AssignRuleIndex:
+    """
+    同一优先级下分派规则的等值维度索引
+    匹配时仅需检查维度值命中索引的规则，以及无法建立索引的规则
+    """
+
+    def __init__(self, rules: list):
+        self.rules = rules
+        self.positions_by_id = {}
+        # field -> value -> [规则下标]
+        self.index = defaultdict(lambda: defaultdict(list))
+        self.unindexed = []
+        for position, rule in enumerate(rules):
+            self.positions_by_id[str(rule.get("id", ""))] = position
+            # 缓存刷新时已计算索引维度，兼容旧缓存数据时实时计算
+            index_key = rule["index_key"] if "index_key" in rule else get_rule_index_key(rule)
+            if not index_key:
+                self.unindexed.append(position)
+                continue
+            for value in index_key["values"]:
+                self.index[index_key["field"]][value].append(position)
+
+    def get_candidates(self, dimensions: dict, rule_snaps: dict = None) -> list:
+        """
+        获取候选分派规则，保持规则原有顺序
+        :param dimensions: 告警维度
+        :param rule_snaps: 告警的分派规则快照，快照未变化的规则直接视为命中，需要始终作为候选
+        """
+        positions = set(self.unindexed)
+        for rule_id in rule_snaps or {}:
+            if rule_id in self.positions_by_id:
+                positions.add(self.positions_by_id[rule_id])
+
+        for field, value_index in self.index.items():
+            # 与 EqualCondition 保持一致的取值及字符串转换逻辑
+            is_exists, value = load_field_instance(field, None).get_value_from_data(dimensions)
+            if not is_exists:
+                continue
+            for str_value in load_field_instance(field, value).to_str_list():
+                positions.update(value_index.get(str_value, ()))
+        return [self.rules[position] for position in sorted(positions)]
+
 
 class AssignCacheManager(CacheManager):
     """
@@ -31,6 +101,9 @@ class AssignCacheManager(CacheManager):
     BIZ_CACHE_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".assign.biz_{bk_biz_id}"
     PRIORITY_CACHE_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".assign.biz_priority_{bk_biz_id}_{priority}"
     GROUP_CACHE_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".assign.biz_group_{bk_biz_id}_{group_id}"
+    # 以下仅为进程内(单批次)缓存的key，不写入redis
+    RULE_INDEX_CACHE_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".assign.rule_index_{bk_biz_id}_{priority}"
+    CMDB_ATTRS_CACHE_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".assign.cmdb_attrs_{target_key}"
 
     @classmethod
     def clear(cls):
@@ -88,6 +161,31 @@ class AssignCacheManager(CacheManager):
 
         return local.assign_cache[cache_key]
 
+    @classmethod
+    def get_assign_rule_index(cls, bk_biz_id, priority) -> AssignRuleIndex:
+        """
+        获取优先级下所有分派规则的索引，单批次内复用
+        """
+        cache_key = cls.RULE_INDEX_CACHE_KEY_TEMPLATE.format(bk_biz_id=bk_biz_id, priority=priority)
+        if cache_key not in local.assign_cache:
+            rules = []
+            for group_id in cls.get_assign_groups_by_priority(bk_biz_id, priority):
+                rules.extend(cls.get_assign_rules_by_group(bk_biz_id, group_id))
+            local.assign_cache[cache_key] = AssignRuleIndex(rules)
+        return local.assign_cache[cache_key]
+
+    @classmethod
+    def get_cmdb_attrs(cls, target_key: str, loader):
+        """
+        获取目标的CMDB属性，单批次内同一目标只查询一次
+        :param target_key: 目标标识(租户/业务/主机)
+        :param loader: 未命中时的加载函数
+        """
+        cache_key = cls.CMDB_ATTRS_CACHE_KEY_TEMPLATE.format(target_key=target_key)
+        if cache_key not in local.assign_cache:
+            local.assign_cache[cache_key] = loader()
+        return local.assign_cache[cache_key]
+
     @classmethod
     def get_global_config(cls, key_template, **kwargs):
         kwargs.update({"bk_biz_id": GLOBAL_BIZ_ID})
@@ -156,6 +254,8 @@ class AssignCacheManager(CacheManager):
             conditions = []
             for condition in rule["conditions"]:
                 conditions.append(cls.parse_dynamic_group(bk_tenant_id=bk_tenant_id, condition=condition))
+            # 预先计算规则的索引维度，匹配时按维度值筛选候选规则
+            rule["index_key"] = get_rule_index_key(rule)
 
             group_rules[rule["assign_group_id"]].append(rule)
 
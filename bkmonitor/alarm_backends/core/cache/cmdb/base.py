@@ -8,14 +8,22 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any, cast
 
 from django.conf import settings
 
 from alarm_backends.core.cache.key import PUBLIC_KEY_PREFIX
 from alarm_backends.core.storage.redis import Cache
 from constants.common import DEFAULT_TENANT_ID
+from core.prometheus import metrics
+
+logger = logging.getLogger("cache")
 
 
 class CMDBCacheManager(ABC):
@@ -43,6 +51,38 @@ class CMDBCacheManager(ABC):
         """
         return f"{cls._get_cache_key_prefix(bk_tenant_id)}.{cls.cache_type}"
 
+    @classmethod
+    def get_generation_key(cls, bk_tenant_id: str) -> str:
+        """
+        获取缓存版本key，hash 结构，field 为缓存类型
+        :param bk_tenant_id: 租户ID
+        """
+        return f"{cls._get_cache_key_prefix(bk_tenant_id)}.generation"
+
+    @classmethod
+    def bump_generation(cls, bk_tenant_id: str) -> int:
+        """
+        缓存刷新后递增缓存版本，通知各进程内缓存失效
+        :param bk_tenant_id: 租户ID
+        """
+        return cast(int, cls.cache.hincrby(cls.get_generation_key(bk_tenant_id), cls.cache_type, 1))
+
+    @classmethod
+    def get_generation(cls, bk_tenant_id: str, now: float | None = None) -> tuple[int, int]:
+        """
+        获取缓存版本
+        缓存刷新任务每次全量写入后都会重置缓存的过期时间，未递增缓存版本时，通过过期时间推算最近一次刷新的时间
+        :param bk_tenant_id: 租户ID
+        :return: (缓存版本, 最近一次刷新的时间)
+        """
+        now = now or time.time()
+        pipeline = cls.cache.pipeline()
+        pipeline.hget(cls.get_generation_key(bk_tenant_id), cls.cache_type)
+        pipeline.ttl(cls.get_cache_key(bk_tenant_id))
+        generation, ttl = pipeline.execute()
+        refresh_time = int(now - (cls.CACHE_TIMEOUT - ttl)) if ttl and ttl > 0 else 0
+        return int(generation or 0), refresh_time
+
     @classmethod
     @abstractmethod
     def get(cls, *args, **kwargs) -> Any:
@@ -53,3 +93,120 @@ class CMDBCacheManager(ABC):
         :return: 缓存
         """
         raise NotImplementedError
+
+
+class CMDBLocalCache:
+    """
+    进程内 CMDB 缓存
+
+    主机、拓扑节点等 CMDB 对象在数据接入、告警丰富时被频繁读取，原先的线程内缓存在每次接入任务结束后清空，
+    每个任务都需要重新从 redis 读取并解析相同的对象。进程内缓存按 LRU 保存已解析的对象，按租户跟踪缓存版本：
+    - 每隔 CMDB_LOCAL_CACHE_SYNC_INTERVAL 秒检查一次缓存版本，缓存刷新后清空该租户的对象
+    - 超过 CMDB_LOCAL_CACHE_MAX_AGE 秒未清空时强制清空，兜底不重置过期时间的增量更新
+    - redis 中不存在的对象同样缓存，避免未知主机的数据反复穿透
+    缓存的对象在进程内共享，调用方不能修改
+    """
+
+    # 判断刷新时间变化的容差(秒)，推算的刷新时间存在取整误差
+    REFRESH_TIME_TOLERANCE = 2
+
+    def __init__(self, manager: type[CMDBCacheManager]):
+        self.manager = manager
+        self._lock = threading.RLock()
+        # (租户ID, 对象key) -> 对象，对象不存在时为 None
+        self._items: OrderedDict[tuple[str, str], Any] = OrderedDict()
+        # 租户ID -> [缓存版本, 检查时间, 清空时间]
+        self._generations: dict[str, list] = {}
+
+    @property
+    def cache_type(self) -> str:
+        return self.manager.cache_type
+
+    @property
+    def max_size(self) -> int:
+        return settings.CMDB_LOCAL_CACHE_MAX_SIZE
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._generations.clear()
+
+    def is_changed(self, old: tuple[int, int], new: tuple[int, int]) -> bool:
+        return old[0] != new[0] or abs(old[1] - new[1]) > self.REFRESH_TIME_TOLERANCE
+
+    def sync(self, bk_tenant_id: str, now: float | None = None):
+        """
+        检查租户的缓存版本，缓存刷新后清空该租户的对象
+        """
+        now = now or time.time()
+        state = self._generations.get(bk_tenant_id)
+        if state and now - state[1] < settings.CMDB_LOCAL_CACHE_SYNC_INTERVAL:
+            return
+
+        generation = self.manager.get_generation(bk_tenant_id, now)
+        with self._lock:
+            state = self._generations.get(bk_tenant_id)
+            if (
+                state
+                and not self.is_changed(state[0], generation)
+                and now - state[2] < settings.CMDB_LOCAL_CACHE_MAX_AGE
+            ):
+                state[0], state[1] = generation, now
+                return
+
+            if state:
+                logger.info(
+                    "[cmdb_local_cache] reset %s cache of tenant(%s), generation: %s -> %s",
+                    self.cache_type,
+                    bk_tenant_id,
+                    state[0],
+                    generation,
+                )
+                for key in [key for key in self._items if key[0] == bk_tenant_id]:
+                    del self._items[key]
+                metrics.CMDB_LOCAL_CACHE_RESET_COUNT.labels(cache_type=self.cache_type).inc()
+            self._generations[bk_tenant_id] = [generation, now, now]
+
+    def mget(self, bk_tenant_id: str, keys: list[str], loader: Callable[[list[str]], dict[str, Any]]) -> dict[str, Any]:
+        """
+        批量获取对象，未缓存的对象通过 loader 一次性加载
+        :param loader: 参数为未缓存的对象key列表，返回对象key到对象的映射，不存在的对象不返回
+        :return: 对象key到对象的映射，不存在的对象不返回
+        """
+        self.sync(bk_tenant_id)
+
+        result = {}
+        missing_keys = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                cache_key = (bk_tenant_id, key)
+                if cache_key in self._items:
+                    self._items.move_to_end(cache_key)
+                    result[key] = self._items[cache_key]
+                else:
+                    missing_keys.append(key)
+
+        metrics.CMDB_LOCAL_CACHE_REQUEST_COUNT.labels(cache_type=self.cache_type, status="hit").inc(len(result))
+        if not missing_keys:
+            return {key: obj for key, obj in result.items() if obj is not None}
+
+        metrics.CMDB_LOCAL_CACHE_REQUEST_COUNT.labels(cache_type=self.cache_type, status="miss").inc(len(missing_keys))
+        loaded = loader(missing_keys)
+        with self._lock:
+            for key in missing_keys:
+                obj = loaded.get(key)
+                self._items[(bk_tenant_id, key)] = obj
+                result[key] = obj
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return {key: obj for key, obj in result.items() if obj is not None}
+
+    def get(self, bk_tenant_id: str, key: str, loader: Callable[[list[str]], dict[str, Any]]) -> Any:
+        return self.mget(bk_tenant_id, [key], loader).get(key)
+
+    def set(self, bk_tenant_id: str, key: str, obj: Any):
+        with self._lock:
+            self._items[(bk_tenant_id, key)] = obj
+            self._items.move_to_end((bk_tenant_id, key))
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
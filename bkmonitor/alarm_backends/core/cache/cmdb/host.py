@@ -13,11 +13,13 @@ import logging
 from collections import defaultdict
 from typing import cast
 
+from django.conf import settings
+
 from api.cmdb.define import Host, Set, TopoTree
 from bkmonitor.utils.local import local
 from core.drf_resource import api
 
-from .base import CMDBCacheManager
+from .base import CMDBCacheManager, CMDBLocalCache
 
 setattr(local, "host_cache", {})
 
@@ -168,13 +170,20 @@ class HostManager(CMDBCacheManager):
 
         host_key = cls.get_host_key(ip, bk_cloud_id)
         cache_key = f"{cls.get_cache_key(bk_tenant_id=bk_tenant_id)}.{host_key}"
-        if using_mem:
+        use_local_cache = using_mem and settings.CMDB_LOCAL_CACHE_ENABLED
+        if use_local_cache:
+            # 进程内缓存由缓存版本控制失效，不需要在逻辑结束后清理
+            host = host_local_cache.get(bk_tenant_id, host_key, lambda keys: cls.load(bk_tenant_id, keys))
+            if host is not None or not using_api:
+                return host
+        elif using_mem:
             # 如果使用本地内存，那么在逻辑结束后，需要调用clear_mem_cache函数清理
             host = local.host_cache.get(cache_key, None)
             if host is not None:
                 return host
 
-        host = cls._get(bk_tenant_id=bk_tenant_id, ip=ip, bk_cloud_id=bk_cloud_id)
+        if not use_local_cache:
+            host = cls._get(bk_tenant_id=bk_tenant_id, ip=ip, bk_cloud_id=bk_cloud_id)
         if host is None and using_api:
             # 打印日志以便查看穿透请求情况
             logger.info("[HostManager] get host(%s) by api start", host_key)
@@ -189,7 +198,9 @@ class HostManager(CMDBCacheManager):
             except Exception as e:  # noqa
                 logger.info("[HostManager] get host(%s) by api failed: err -> %s", host_key, str(e))
 
-        if using_mem and host:
+        if use_local_cache and host:
+            host_local_cache.set(bk_tenant_id, host_key, host)
+        elif using_mem and host:
             local.host_cache[cache_key] = host
         return host
 
@@ -205,6 +216,31 @@ class HostManager(CMDBCacheManager):
         result: list[str | None] = cast(list[str | None], cls.cache.hmget(cache_key, host_keys))
         return {host_key: Host(**json.loads(r)) for host_key, r in zip(host_keys, result) if r}
 
+    @classmethod
+    def load(cls, bk_tenant_id: str, keys: list[str]) -> dict[str, Host]:
+        """
+        批量加载主机信息到进程内缓存，key 为主机key或主机ID
+        """
+        cache_key = cls.get_cache_key(bk_tenant_id)
+        result: list[str | None] = cast(list[str | None], cls.cache.hmget(cache_key, keys))
+        hosts = {}
+        for key, r in zip(keys, result):
+            if not r:
+                continue
+            host_dict: dict = json.loads(r)
+            host_dict["bk_tenant_id"] = bk_tenant_id
+            hosts[key] = Host(**host_dict)
+        return hosts
+
+    @classmethod
+    def prefetch(cls, *, bk_tenant_id: str, keys: list[str]):
+        """
+        预加载一批数据涉及的主机到进程内缓存，key 为主机key或主机ID，未开启进程内缓存时不处理
+        """
+        if not keys or not settings.CMDB_LOCAL_CACHE_ENABLED:
+            return
+        host_local_cache.mget(bk_tenant_id, keys, lambda missing_keys: cls.load(bk_tenant_id, missing_keys))
+
     @classmethod
     def get_by_agent_id(cls, *, bk_tenant_id: str, bk_agent_id: str) -> Host | None:
         if not bk_agent_id:
@@ -230,6 +266,9 @@ class HostManager(CMDBCacheManager):
 
         bk_host_id = str(bk_host_id)
 
+        if using_mem and settings.CMDB_LOCAL_CACHE_ENABLED:
+            return host_local_cache.get(bk_tenant_id, bk_host_id, lambda keys: cls.load(bk_tenant_id, keys))
+
         # 尝试从本地缓存中获取
         if using_mem:
             host: Host | None = local.host_cache.get(bk_host_id, None)
@@ -290,3 +329,6 @@ class HostManager(CMDBCacheManager):
         cls.fill_attr_to_hosts(bk_biz_id, hosts, with_world_ids=True)
         # 返回主机key到主机对象的映射
         return {HostManager.get_host_key(host.bk_host_innerip, host.bk_cloud_id): host for host in hosts}
+
+
+host_local_cache = CMDBLocalCache(HostManager)
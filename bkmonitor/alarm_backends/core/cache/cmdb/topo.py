@@ -11,9 +11,11 @@ specific language governing permissions and limitations under the License.
 import json
 from typing import cast
 
+from django.conf import settings
+
 from api.cmdb.define import TopoNode
 
-from .base import CMDBCacheManager
+from .base import CMDBCacheManager, CMDBLocalCache
 
 
 class TopoManager(CMDBCacheManager):
@@ -24,15 +26,38 @@ class TopoManager(CMDBCacheManager):
     cache_type = "topo"
 
     @classmethod
-    def mget(cls, *, bk_tenant_id: str, topo_nodes: list[tuple[str, int]]) -> dict[tuple[str, int], TopoNode]:
+    def load(cls, bk_tenant_id: str, topo_keys: list[str]) -> dict[str, TopoNode]:
+        """
+        批量加载拓扑节点到进程内缓存
+        """
+        result: list[str | None] = cast(list[str | None], cls.cache.hmget(cls.get_cache_key(bk_tenant_id), topo_keys))
+        return {topo_key: TopoNode(**json.loads(r)) for topo_key, r in zip(topo_keys, result) if r}
+
+    @classmethod
+    def mget(
+        cls, *, bk_tenant_id: str, topo_nodes: list[tuple[str, int]], using_mem: bool = False
+    ) -> dict[tuple[str, int], TopoNode]:
         """
         批量获取拓扑节点
         :param bk_tenant_id: 租户ID
         :param topo_nodes: 拓扑节点列表
+        :param using_mem: 是否使用进程内缓存(需开启 CMDB_LOCAL_CACHE_ENABLED)，返回的节点不能修改
         """
         if not topo_nodes:
             return {}
 
+        if using_mem and settings.CMDB_LOCAL_CACHE_ENABLED:
+            nodes = topo_local_cache.mget(
+                bk_tenant_id,
+                [f"{bk_obj_id}|{bk_inst_id}" for bk_obj_id, bk_inst_id in topo_nodes],
+                lambda topo_keys: cls.load(bk_tenant_id, topo_keys),
+            )
+            return {
+                (bk_obj_id, bk_inst_id): nodes[f"{bk_obj_id}|{bk_inst_id}"]
+                for bk_obj_id, bk_inst_id in topo_nodes
+                if f"{bk_obj_id}|{bk_inst_id}" in nodes
+            }
+
         cache_key = cls.get_cache_key(bk_tenant_id)
         topo_keys: list[str] = [f"{bk_obj_id}|{bk_inst_id}" for bk_obj_id, bk_inst_id in topo_nodes]
         result: list[str | None] = cast(list[str | None], cls.cache.hmget(cache_key, topo_keys))
@@ -43,15 +68,26 @@ class TopoManager(CMDBCacheManager):
         }
 
     @classmethod
-    def get(cls, *, bk_tenant_id: str, bk_obj_id: str, bk_inst_id: int, **kwargs) -> TopoNode | None:
+    def get(
+        cls, *, bk_tenant_id: str, bk_obj_id: str, bk_inst_id: int, using_mem: bool = False, **kwargs
+    ) -> TopoNode | None:
         """
         获取单个拓扑节点
         :param bk_tenant_id: 租户ID
         :param bk_obj_id: 对象ID
         :param bk_inst_id: 实例ID
+        :param using_mem: 是否使用进程内缓存(需开启 CMDB_LOCAL_CACHE_ENABLED)，返回的节点不能修改
         """
+        if using_mem and settings.CMDB_LOCAL_CACHE_ENABLED:
+            return topo_local_cache.get(
+                bk_tenant_id, f"{bk_obj_id}|{bk_inst_id}", lambda topo_keys: cls.load(bk_tenant_id, topo_keys)
+            )
+
         cache_key = cls.get_cache_key(bk_tenant_id)
         result = cast(str | None, cls.cache.hget(cache_key, f"{bk_obj_id}|{bk_inst_id}"))
         if not result:
             return None
         return TopoNode(**json.loads(result))
+
+
+topo_local_cache = CMDBLocalCache(TopoManager)
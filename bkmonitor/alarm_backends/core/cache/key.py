@@ -685,6 +685,48 @@ ALERT_UPDATE_LOCK = register_key_with_config(
     }
 )
 
+ALERT_BUILDER_PARTITION_KEY = register_key_with_config(
+    {
+        "label": "[alert]告警生成分区事件队列",
+        "key_type": "list",
+        "key_tpl": "alert.builder.partition.{partition}",
+        "ttl": CONST_ONE_HOUR,
+        "backend": "queue",
+    }
+)
+
+ALERT_BUILDER_PARTITION_OWNER_KEY = register_key_with_config(
+    {
+        "label": "[alert]告警生成分区租约",
+        "key_type": "string",
+        "key_tpl": "alert.builder.partition.owner.{partition}",
+        "ttl": CONST_MINUTES,
+        # 与分区队列位于同一后端，确认消息时在同一脚本内校验租约
+        "backend": "queue",
+    }
+)
+
+ALERT_BUILDER_PARTITION_DEAD_LETTER_KEY = register_key_with_config(
+    {
+        "label": "[alert]告警生成分区死信队列",
+        "key_type": "list",
+        "key_tpl": "alert.builder.partition.dead_letter",
+        "ttl": CONST_ONE_DAY,
+        "backend": "queue",
+    }
+)
+
+ALERT_BUILDER_PARTITION_WORKER_KEY = register_key_with_config(
+    {
+        "label": "[alert]告警生成分区消费者心跳",
+        "key_type": "hash",
+        "key_tpl": "alert.builder.partition.workers",
+        "ttl": CONST_MINUTES,
+        "backend": "queue",
+        "field_tpl": "{worker_id}",
+    }
+)
+
 ALERT_UUID_SEQUENCE = register_key_with_config(
     {
         "label": "[alert]告警的UUID自增序列",
@@ -1028,6 +1070,16 @@ ALERT_HOST_DATA_ID_KEY = register_key_with_config(
     }
 )
 
+ALERT_CHECK_WHEEL_KEY = register_key_with_config(
+    {
+        "label": "[alert]告警检测调度时间轮",
+        "key_type": "sorted_set",
+        "key_tpl": "alert.manager.check.wheel.{shard}",
+        "ttl": CONST_ONE_HOUR,
+        "backend": "service",
+    }
+)
+
 APM_TOPO_DISCOVER_LOCK = register_key_with_config(
     {
         "label": "[apm]TOPO自动发现周期锁",
@@ -1088,6 +1140,16 @@ ACCESS_BATCH_DATA_RESULT_KEY = register_key_with_config(
     }
 )
 
+ACCESS_BATCH_STAT_KEY = register_key_with_config(
+    {
+        "label": "[access]分批任务处理耗时统计",
+        "key_type": "string",
+        "key_tpl": "access.batch.stat.{strategy_group_key}",
+        "ttl": CONST_ONE_DAY,
+        "backend": "service",
+    }
+)
+
 ISSUE_ACTIVE_CONTENT_KEY = register_key_with_config(
     {
         "label": "[issue]活跃Issue热缓存",
@@ -15,6 +15,7 @@ import time
 """
 
 
+import hashlib
 from collections import defaultdict
 from datetime import timedelta
 
@@ -34,6 +35,9 @@ class ShieldCacheManager(CacheManager):
     # 策略详情的缓存key
     CACHE_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".shield.biz_{}"
 
+    # 屏蔽配置版本号(配置内容的md5)，用于进程内屏蔽索引失效判断
+    VERSION_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".shield.version.biz_{}"
+
     FAILURE_KEY_TEMPLATE = CacheManager.CACHE_KEY_PREFIX + ".shield.failure.{}"
 
     @classmethod
@@ -111,6 +115,13 @@ class ShieldCacheManager(CacheManager):
         else:
             return []
 
+    @classmethod
+    def get_shield_version(cls, bk_biz_id) -> str:
+        """
+        获取业务屏蔽配置版本号，未设置时返回空字符串
+        """
+        return cls.cache.get(cls.VERSION_KEY_TEMPLATE.format(bk_biz_id)) or ""
+
     @classmethod
     def refresh(cls):
         now = time_tools.now()
@@ -135,13 +146,16 @@ class ShieldCacheManager(CacheManager):
         for biz in biz_list:
             bk_biz_id = biz.bk_biz_id
             if bk_biz_id in shield_configs:
+                data = extended_json.dumps(shield_configs[bk_biz_id])
+                pipeline.set(cls.CACHE_KEY_TEMPLATE.format(bk_biz_id), data, cls.CACHE_TIMEOUT)
                 pipeline.set(
-                    cls.CACHE_KEY_TEMPLATE.format(bk_biz_id),
-                    extended_json.dumps(shield_configs[bk_biz_id]),
+                    cls.VERSION_KEY_TEMPLATE.format(bk_biz_id),
+                    hashlib.md5(data.encode("utf-8")).hexdigest(),
                     cls.CACHE_TIMEOUT,
                 )
             else:
                 pipeline.delete(cls.CACHE_KEY_TEMPLATE.format(bk_biz_id))
+                pipeline.delete(cls.VERSION_KEY_TEMPLATE.format(bk_biz_id))
         pipeline.execute()
 
 
@@ -9,10 +9,12 @@ specific language governing permissions and limitations under the License.
 """
 
 import copy
+import hashlib
 import json
 import logging
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from collections.abc import Callable, Iterable
 from datetime import datetime, timedelta
 from functools import reduce
@@ -85,6 +87,14 @@ class StrategyCacheManager(CacheManager):
     STRATEGY_GROUP_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".strategy_group"
     # 最近增量更新时间
     LAST_UPDATED_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".last_updated"
+    # 策略变更版本(hash)，version: 最新变更版本，reset_version: 早于该版本的进程内镜像需要全部失效
+    CHANGE_FEED_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".strategy_change_feed"
+    # 策略变更记录(sorted set)，member 为策略ID，score 为最近一次变更的版本
+    CHANGED_IDS_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".strategy_changed_ids"
+    # 策略内容摘要(hash)，用于判断刷新时策略内容是否发生变化
+    DIGEST_CACHE_KEY = CacheManager.CACHE_KEY_PREFIX + ".strategy_digest"
+    # 保留的策略变更记录数
+    MAX_CHANGED_IDS = 10000
     # 事件型时序检测周期(默认60s)
     fake_event_agg_interval = 60
     # 实例维度
@@ -598,12 +608,16 @@ class StrategyCacheManager(CacheManager):
         return json.loads(cls.cache.get(cls.IDS_CACHE_KEY) or "[]")
 
     @classmethod
-    def get_strategy_by_ids(cls, strategy_ids: list[int]) -> list[dict]:
+    def get_strategy_by_ids(cls, strategy_ids: list[int], readonly: bool = False) -> list[dict]:
         """
         从缓存中获取策略详情
+        :param readonly: 调用方不会修改返回的策略时，开启进程内镜像后直接返回镜像中已解析的策略，避免重复反序列化
         """
         if not strategy_ids:
             return []
+        if settings.STRATEGY_LOCAL_MIRROR_ENABLED:
+            return strategy_mirror.get_strategies(cls, strategy_ids, readonly=readonly)
+
         keys = [cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id) for strategy_id in strategy_ids]
         strategies = []
         for sub_keys in chunks(keys, 1000):
@@ -611,10 +625,14 @@ class StrategyCacheManager(CacheManager):
         return [json.loads(strategy) for strategy in strategies if strategy]
 
     @classmethod
-    def get_strategy_by_id(cls, strategy_id: int) -> dict:
+    def get_strategy_by_id(cls, strategy_id: int, readonly: bool = False) -> dict:
         """
         从缓存中获取策略详情
         """
+        if settings.STRATEGY_LOCAL_MIRROR_ENABLED:
+            strategies = strategy_mirror.get_strategies(cls, [strategy_id], readonly=readonly)
+            return strategies[0] if strategies else None
+
         strategy = json.loads(cls.cache.get(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id)) or "null")
         return strategy
 
@@ -763,12 +781,15 @@ class StrategyCacheManager(CacheManager):
         cls.cache.set(cls.IDS_CACHE_KEY, json.dumps(list(updated_strategy_ids)), cls.CACHE_TIMEOUT)
 
         # 遍历旧的策略ID列表，检查是否有不在新策略列表中的ID。
+        deleted_strategy_ids = []
         for strategy_id in old_strategy_ids:
             # 如果旧列表中的ID在新列表中找不到，则说明该策略已被删除或更改。
             if strategy_id not in updated_strategy_ids:
                 logger.info(f"[smart_strategy_cache]: refresh_strategy_ids delete strategy: {strategy_id}")
                 # 从缓存中删除该策略的相关信息。
                 cls.cache.delete(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id))
+                deleted_strategy_ids.append(strategy_id)
+        cls.publish_strategy_changes(deleted_strategy_ids, deleted=True)
 
     @classmethod
     def refresh_bk_biz_ids(cls, strategies: list[dict], partial=None):
@@ -925,13 +946,22 @@ class StrategyCacheManager(CacheManager):
         # 初始化策略分组缓存结构
         strategy_groups = defaultdict(lambda: defaultdict(list))
 
+        # 对比策略内容摘要，仅内容变化的策略写入变更记录
+        old_digests = {}
+        strategy_ids = [str(strategy["id"]) for strategy in strategies]
+        for sub_ids in chunks(strategy_ids, 1000):
+            old_digests.update(zip(sub_ids, cls.cache.hmget(cls.DIGEST_CACHE_KEY, sub_ids)))
+        new_digests = {}
+
         # 开启缓存pipeline以优化写入性能
         pipeline = cls.cache.pipeline()
         for strategy in strategies:
             # 将策略信息存储到缓存中
-            pipeline.set(
-                cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy["id"]), json.dumps(strategy), cls.CACHE_TIMEOUT
-            )
+            strategy_content = json.dumps(strategy)
+            pipeline.set(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy["id"]), strategy_content, cls.CACHE_TIMEOUT)
+            digest = hashlib.md5(strategy_content.encode("utf-8")).hexdigest()
+            if old_digests.get(str(strategy["id"])) != digest:
+                new_digests[str(strategy["id"])] = digest
             # 默认周期 50s
             for item in strategy["items"]:
                 if item.get("query_md5"):
@@ -978,10 +1008,54 @@ class StrategyCacheManager(CacheManager):
             pipeline.hset(cls.STRATEGY_GROUP_CACHE_KEY, query_md5, json.dumps(strategy_groups[query_md5]))
         # 设置缓存过期时间
         pipeline.expire(cls.STRATEGY_GROUP_CACHE_KEY, cls.CACHE_TIMEOUT)
+        if new_digests:
+            pipeline.hset(cls.DIGEST_CACHE_KEY, mapping=new_digests)
+        pipeline.expire(cls.DIGEST_CACHE_KEY, cls.CACHE_TIMEOUT)
 
         # 执行pipeline中的所有操作
         pipeline.execute()
 
+        # 策略详情写入后再发布变更，保证进程内镜像拉取到的是新内容
+        cls.publish_strategy_changes([int(strategy_id) for strategy_id in new_digests])
+
+    @classmethod
+    def publish_strategy_changes(cls, strategy_ids: list[int], deleted: bool = False):
+        """
+        写入策略变更记录，供进程内策略镜像增量同步
+        :param strategy_ids: 变更的策略ID列表
+        :param deleted: 是否为删除的策略，删除时同时清理内容摘要
+        """
+        if not strategy_ids:
+            return
+
+        def publish(pipeline):
+            version = int(pipeline.hget(cls.CHANGE_FEED_CACHE_KEY, "version") or 0) + 1
+            pipeline.multi()
+            pipeline.hset(cls.CHANGE_FEED_CACHE_KEY, "version", version)
+            pipeline.zadd(cls.CHANGED_IDS_CACHE_KEY, {strategy_id: version for strategy_id in strategy_ids})
+            if deleted:
+                pipeline.hdel(cls.DIGEST_CACHE_KEY, *strategy_ids)
+            pipeline.expire(cls.CHANGE_FEED_CACHE_KEY, cls.CACHE_TIMEOUT)
+            pipeline.expire(cls.CHANGED_IDS_CACHE_KEY, cls.CACHE_TIMEOUT)
+            return version
+
+        # 版本号与变更记录在同一事务内写入(WATCH 版本号，并发发布时重试)，
+        # 避免镜像读取到新版本时，较早版本的变更记录尚未写入而被跳过
+        version = cls.cache.transaction(publish, cls.CHANGE_FEED_CACHE_KEY, value_from_callable=True)
+        changed_count = cls.cache.zcard(cls.CHANGED_IDS_CACHE_KEY)
+
+        # 清理过早的变更记录，早于被清理版本的镜像需要全部失效
+        if changed_count > cls.MAX_CHANGED_IDS:
+            trim_index = changed_count - cls.MAX_CHANGED_IDS - 1
+            trimmed = cls.cache.zrange(cls.CHANGED_IDS_CACHE_KEY, trim_index, trim_index, withscores=True)
+            if trimmed:
+                trimmed_version = int(trimmed[0][1])
+                cls.cache.zremrangebyscore(cls.CHANGED_IDS_CACHE_KEY, "-inf", trimmed_version)
+                reset_version = int(cls.cache.hget(cls.CHANGE_FEED_CACHE_KEY, "reset_version") or 0)
+                if trimmed_version > reset_version:
+                    cls.cache.hset(cls.CHANGE_FEED_CACHE_KEY, "reset_version", trimmed_version)
+        logger.info(f"[strategy_change_feed]: publish version({version}) strategy_ids: {strategy_ids}")
+
     @classmethod
     def add_enabled_cluster_condition(cls, strategy_configs: list[dict]):
         """
@@ -1157,6 +1231,7 @@ class StrategyCacheManager(CacheManager):
             target_biz_set, to_be_deleted_strategy_ids = cls.handle_history_strategies(histories, with_group_key=False)
             for strategy_id, _ in to_be_deleted_strategy_ids:
                 cls.cache.delete(cls.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id))
+            cls.publish_strategy_changes([strategy_id for strategy_id, _ in to_be_deleted_strategy_ids], deleted=True)
 
         duration = time.time() - start_time
         metrics.ALARM_CACHE_TASK_TIME.labels("0", "strategy", str(exc)).observe(duration)
@@ -1343,6 +1418,127 @@ class StrategyCacheManager(CacheManager):
                     sync_aiops_strategy_signal("modify", change_record["strategy_id"], changed_time)
 
 
+class StrategyLocalMirror:
+    """
+    进程内策略镜像
+
+    策略详情在各后台服务中被频繁读取，每次读取都需要访问 redis 并反序列化完整的策略配置。
+    镜像在进程内按 LRU 保存已读取的策略，通过策略变更记录增量同步：
+    - 每隔 STRATEGY_LOCAL_MIRROR_SYNC_INTERVAL 秒读取一次变更版本，有新版本时拉取变更的策略ID
+    - 镜像中已有的变更策略就地更新，已删除的策略移除
+    - 镜像版本早于 reset_version (变更记录被清理)或变更版本回退(缓存被重建)时，清空镜像
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # 策略ID -> [策略内容, 解析后的策略]，策略不存在时内容为 None
+        self._strategies: OrderedDict[int, list] = OrderedDict()
+        # 已同步的变更版本
+        self.version = None
+        self.last_sync_time = 0
+
+    @property
+    def max_size(self) -> int:
+        return settings.STRATEGY_LOCAL_MIRROR_MAX_SIZE
+
+    def clear(self):
+        with self._lock:
+            self._strategies.clear()
+            self.version = None
+            self.last_sync_time = 0
+
+    def sync(self, manager: type[StrategyCacheManager], now: float = None):
+        """
+        同步策略变更
+        """
+        now = now or time.time()
+        if now - self.last_sync_time < settings.STRATEGY_LOCAL_MIRROR_SYNC_INTERVAL:
+            return
+
+        with self._lock:
+            if now - self.last_sync_time < settings.STRATEGY_LOCAL_MIRROR_SYNC_INTERVAL:
+                return
+            self.last_sync_time = now
+
+            feed = manager.cache.hgetall(manager.CHANGE_FEED_CACHE_KEY) or {}
+            version = int(feed.get("version") or 0)
+            reset_version = int(feed.get("reset_version") or 0)
+            if self.version is None or self.version < reset_version or version < self.version:
+                if self._strategies:
+                    logger.info(f"[strategy_mirror]: reset mirror from version({self.version}) to ({version})")
+                self._strategies.clear()
+                self.version = version
+                metrics.STRATEGY_MIRROR_SYNC_COUNT.labels(status="reset").inc()
+                return
+            if version == self.version:
+                return
+
+            changes = manager.cache.zrangebyscore(
+                manager.CHANGED_IDS_CACHE_KEY, f"({self.version}", "+inf", withscores=True
+            )
+            changed_ids = [int(strategy_id) for strategy_id, _ in changes]
+            # 仅更新镜像中已有的策略，其余策略在读取时再加载
+            self.load([strategy_id for strategy_id in changed_ids if strategy_id in self._strategies], manager)
+            if changes:
+                self.version = max(int(score) for _, score in changes)
+            metrics.STRATEGY_MIRROR_SYNC_COUNT.labels(status="delta").inc()
+
+    def load(self, strategy_ids: list[int], manager: type[StrategyCacheManager]):
+        """
+        从 redis 加载策略到镜像
+        """
+        for sub_ids in chunks(strategy_ids, 1000):
+            keys = [manager.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id) for strategy_id in sub_ids]
+            for strategy_id, content in zip(sub_ids, manager.cache.mget(keys)):
+                self._strategies[strategy_id] = [content, None]
+                self._strategies.move_to_end(strategy_id)
+
+        while len(self._strategies) > self.max_size:
+            self._strategies.popitem(last=False)
+
+    def get_strategies(
+        self, manager: type[StrategyCacheManager], strategy_ids: list[int], readonly: bool = False
+    ) -> list[dict]:
+        """
+        获取策略详情
+        :param readonly: 为 True 时返回镜像中共享的解析结果，调用方不能修改
+        """
+        self.sync(manager)
+
+        strategies = []
+        with self._lock:
+            strategy_ids = [int(strategy_id) for strategy_id in strategy_ids]
+            missing_ids = []
+            for strategy_id in strategy_ids:
+                if strategy_id in self._strategies:
+                    self._strategies.move_to_end(strategy_id)
+                else:
+                    missing_ids.append(strategy_id)
+            if missing_ids:
+                self.load(list(dict.fromkeys(missing_ids)), manager)
+            metrics.STRATEGY_MIRROR_REQUEST_COUNT.labels(status="hit").inc(len(strategy_ids) - len(missing_ids))
+            metrics.STRATEGY_MIRROR_REQUEST_COUNT.labels(status="miss").inc(len(missing_ids))
+
+            for strategy_id in strategy_ids:
+                entry = self._strategies.get(strategy_id)
+                if entry is None:
+                    # 单次请求超出镜像容量时，已被淘汰的策略直接从 redis 读取
+                    entry = [manager.cache.get(manager.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id)), None]
+                content = entry[0]
+                if not content:
+                    continue
+                if not readonly:
+                    strategies.append(json.loads(content))
+                    continue
+                if entry[1] is None:
+                    entry[1] = json.loads(content)
+                strategies.append(entry[1])
+        return strategies
+
+
+strategy_mirror = StrategyLocalMirror()
+
+
 class TargetShieldProcessor:
     """
     策略目标抑制处理器
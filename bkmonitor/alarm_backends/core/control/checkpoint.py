@@ -16,6 +16,7 @@ from django.conf import settings
 from django.utils.functional import cached_property
 
 from alarm_backends.core.cache import key
+from alarm_backends.core.storage.write_buffer import get_write_buffer
 
 
 class Checkpoint(object):
@@ -23,6 +24,8 @@ class Checkpoint(object):
         self.strategy_group_key = strategy_group_key
 
         self.client = client or key.STRATEGY_CHECKPOINT_KEY.client
+        # 仅默认客户端使用进程级写缓冲
+        self.write_buffer = get_write_buffer() if client is None and settings.ACCESS_WRITE_BEHIND_ENABLED else None
 
     @cached_property
     def _key(self):
@@ -32,8 +35,18 @@ class Checkpoint(object):
         """
         缓存策略监控项最后一个处理时间
         """
+        if self.write_buffer is not None:
+            self.write_buffer.set(self.client, self._key, checkpoint, key.STRATEGY_CHECKPOINT_KEY.ttl)
+            return
         self.client.set(self._key, checkpoint, key.STRATEGY_CHECKPOINT_KEY.ttl)
 
+    def _get_checkpoint(self):
+        if self.write_buffer is not None:
+            checkpoint = self.write_buffer.get(self.client, self._key)
+            if checkpoint is not None:
+                return checkpoint
+        return self.client.get(self._key)
+
     def get(self, min_last_checkpoint=0, interval=60):
         """
         获取监控最后一个处理时间
@@ -43,7 +56,7 @@ class Checkpoint(object):
             - 其他情况则以缓存中的checkpoint为准
         """
         now = int(time.time())
-        last_check_point = int(self.client.get(self._key) or 0)
+        last_check_point = int(self._get_checkpoint() or 0)
         # 长时间没数据，我们需要一个数据拉取的起点
         time_shift = settings.MIN_DATA_ACCESS_CHECKPOINT
         if interval > 300:
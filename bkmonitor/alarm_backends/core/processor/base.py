@@ -8,6 +8,7 @@ Unless required by applicable law or agreed to in writing, software distributed
 an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
+
 import json
 from abc import ABCMeta
 
@@ -22,12 +23,18 @@ class BaseAbnormalPushProcessor(six.with_metaclass(ABCMeta, object)):
     """
 
     @staticmethod
-    def push_abnormal_data(outputs, strategy_id, anomaly_signal_list=None):
+    def push_abnormal_data(outputs, strategy_id, anomaly_signal_list=None, pipeline=None):
+        """
+        :param pipeline: 外部传入的 pipeline，传入时需同时传入 anomaly_signal_list，只写入异常数据命令并追加信号，
+                         由调用方执行 pipeline 后再调用 push_anomaly_signal 推送信号
+        """
         # detect.anomaly.signal: 异常信号队列
         # detect.anomaly.list.{strategy_id}.{item_id}.{level}: 异常结果信息队列
         anomaly_count = 0
-        anomaly_signal_list = anomaly_signal_list or []
-        pipeline = key.ANOMALY_LIST_KEY.client.pipeline(transaction=False)
+        deferred = pipeline is not None
+        if not deferred:
+            anomaly_signal_list = anomaly_signal_list or []
+            pipeline = key.ANOMALY_LIST_KEY.client.pipeline(transaction=False)
 
         for item_id, outputs in six.iteritems(outputs):
             if outputs:
@@ -39,15 +46,21 @@ class BaseAbnormalPushProcessor(six.with_metaclass(ABCMeta, object)):
                 pipeline.lpush(anomaly_queue_key, *outputs_data)
                 pipeline.expire(anomaly_queue_key, key.ANOMALY_LIST_KEY.ttl)
 
-        if not anomaly_signal_list:
+        if deferred or not anomaly_signal_list:
             return anomaly_count
         # 先推送anomaly list的数据
         pipeline.execute()
 
         # 再进行一次信号的推送，保证数据ready了之后再推送信号
+        BaseAbnormalPushProcessor.push_anomaly_signal(anomaly_signal_list)
+        return anomaly_count
+
+    @staticmethod
+    def push_anomaly_signal(anomaly_signal_list):
+        if not anomaly_signal_list:
+            return
         signal_pipeline = key.ANOMALY_SIGNAL_KEY.client.pipeline(transaction=False)
         anomaly_signal_key = key.ANOMALY_SIGNAL_KEY.get_key()
         signal_pipeline.lpush(anomaly_signal_key, *anomaly_signal_list)
         signal_pipeline.expire(anomaly_signal_key, key.ANOMALY_SIGNAL_KEY.ttl)
         signal_pipeline.execute()
-        return anomaly_count
@@ -0,0 +1,247 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+ES 批量写入
+
+告警/事件/处理记录原先直接调用 Document.bulk_create，整批文档由 elasticsearch helpers 按固定 500 条串行切分写入，
+不区分文档大小，且限流时整批串行退避。写入器在进程内共享，按文档类型维护写入状态：
+- 按条数和字节数切分请求，多个请求通过线程池并发写入，进程内同时进行的请求数受线程池大小限制
+- 请求被 ES 限流(429)时，仅对被限流的文档退避重试，并缩小该文档类型的单次请求条数
+- 请求耗时低于目标值时逐步增大单次请求条数，高于目标值时缩小
+- 上报待写入文档数、写入文档数及请求耗时指标
+
+写入为同步调用，失败的文档以 BulkIndexError 抛出，与 Document.bulk_create 保持一致。
+未开启 ES_BULK_WRITER_ENABLED 时直接调用 Document.bulk_create。
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from elasticsearch.exceptions import TransportError
+from elasticsearch.helpers import BulkIndexError
+
+from bkmonitor.documents.base import BulkActionType
+from core.prometheus import metrics
+
+logger = logging.getLogger("core.storage")
+
+
+class _BulkState:
+    """
+    单个文档类型的写入状态
+    """
+
+    def __init__(self, chunk_size: int):
+        self.chunk_size = chunk_size
+        # 待写入的文档数
+        self.pending = 0
+
+
+class BulkWriter:
+    """
+    进程级 ES 批量写入器
+    """
+
+    # 单次请求条数的下限
+    MIN_CHUNK_SIZE = 50
+    # 单次请求的目标耗时(秒)
+    TARGET_LATENCY = 1
+    # 限流重试的初始等待时间(秒)及最大等待时间(秒)
+    INITIAL_BACKOFF = 0.5
+    MAX_BACKOFF = 10
+    # 估算文档大小时抽样的文档数
+    SAMPLE_SIZE = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: dict[str, _BulkState] = {}
+        self._executor = None
+        self._executor_pid = None
+
+    @property
+    def max_chunk_size(self) -> int:
+        return settings.ES_BULK_MAX_CHUNK_SIZE
+
+    @property
+    def max_chunk_bytes(self) -> int:
+        return settings.ES_BULK_MAX_CHUNK_BYTES
+
+    def get_executor(self) -> ThreadPoolExecutor | None:
+        """
+        获取并发写入的线程池，未开启时返回 None
+        线程不会随 fork 复制到子进程，进程号变化时重新创建
+        """
+        max_workers = settings.ES_BULK_MAX_WORKERS
+        if max_workers <= 1:
+            return None
+
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="es-bulk")
+                    self._executor_pid = pid
+        return self._executor
+
+    def get_state(self, name: str) -> _BulkState:
+        state = self._states.get(name)
+        if state is None:
+            with self._lock:
+                state = self._states.setdefault(name, _BulkState(settings.ES_BULK_CHUNK_SIZE))
+        return state
+
+    def split_chunks(self, documents: list, chunk_size: int, skip_empty: bool = True) -> list[list]:
+        """
+        按条数和字节数切分请求，文档大小按抽样的平均值估算，避免对全部文档重复序列化
+        """
+        samples = documents[: self.SAMPLE_SIZE]
+        average_bytes = sum(
+            len(json.dumps(document.to_dict(skip_empty=skip_empty), default=str).encode("utf-8"))
+            for document in samples
+        ) / len(samples)
+        chunk_size = max(1, min(chunk_size, int(self.max_chunk_bytes // max(average_bytes, 1))))
+        return [documents[index : index + chunk_size] for index in range(0, len(documents), chunk_size)]
+
+    def adjust_chunk_size(self, state: _BulkState, chunk_length: int, latency: float, throttled: bool):
+        """
+        根据请求结果调整单次请求条数
+        """
+        with self._lock:
+            if throttled:
+                state.chunk_size = max(self.MIN_CHUNK_SIZE, state.chunk_size // 2)
+            elif latency > self.TARGET_LATENCY * 2:
+                state.chunk_size = max(self.MIN_CHUNK_SIZE, int(state.chunk_size * 0.75))
+            elif latency < self.TARGET_LATENCY and chunk_length >= state.chunk_size:
+                # 只有满批的请求才能说明当前条数偏小
+                state.chunk_size = min(self.max_chunk_size, int(state.chunk_size * 1.25))
+
+    def send_chunk(self, document_cls, state: _BulkState, chunk: list, action: str, skip_empty: bool) -> list[dict]:
+        """
+        写入单个请求，被限流的文档退避重试
+        :return: 写入失败的文档错误信息，格式与 BulkIndexError.errors 一致
+        """
+        name = document_cls.__name__
+        errors = []
+        # 文档ID -> 文档，未指定ID的文档由 ES 生成ID，被限流时无法对应到文档，不重试
+        documents_by_id = {}
+        for document in chunk:
+            if hasattr(document, "id"):
+                documents_by_id.setdefault(str(document.id), []).append(document)
+
+        for attempt in range(settings.ES_BULK_MAX_RETRIES + 1):
+            if attempt:
+                time.sleep(min(self.INITIAL_BACKOFF * 2 ** (attempt - 1), self.MAX_BACKOFF))
+
+            start_time = time.time()
+            to_retry = []
+            can_retry = attempt < settings.ES_BULK_MAX_RETRIES
+            try:
+                # 限流重试由写入器处理，请求不再由 elasticsearch helpers 重试及切分
+                document_cls.bulk_create(
+                    chunk,
+                    action=action,
+                    skip_empty=skip_empty,
+                    max_retries=0,
+                    chunk_size=len(chunk),
+                    max_chunk_bytes=self.max_chunk_bytes * 2,
+                )
+            except BulkIndexError as e:
+                throttled_ids = set()
+                for item in e.errors:
+                    info = next(iter(item.values()), {})
+                    doc_id = str(info.get("_id"))
+                    if can_retry and info.get("status") == 429 and doc_id in documents_by_id:
+                        if doc_id not in throttled_ids:
+                            throttled_ids.add(doc_id)
+                            to_retry.extend(documents_by_id[doc_id])
+                    else:
+                        errors.append(item)
+            except TransportError as e:
+                # 整个请求被限流
+                if not can_retry or e.status_code != 429:
+                    raise
+                to_retry = chunk
+
+            latency = time.time() - start_time
+            metrics.ES_BULK_REQUEST_LATENCY.labels(document=name).observe(latency)
+            self.adjust_chunk_size(state, len(chunk), latency, bool(to_retry))
+            metrics.ES_BULK_CHUNK_SIZE.labels(document=name).set(state.chunk_size)
+
+            if not to_retry:
+                break
+            logger.warning("[es bulk] document(%s) %s actions throttled, retry(%s)", name, len(to_retry), attempt + 1)
+            chunk = to_retry
+        return errors
+
+    def update_pending(self, name: str, state: _BulkState, count: int):
+        with self._lock:
+            state.pending += count
+        metrics.ES_BULK_PENDING_COUNT.labels(document=name).set(state.pending)
+
+    def send_chunks(self, document_cls, state: _BulkState, chunks: list[list], action: str, skip_empty: bool):
+        """
+        并发写入多个请求，线程池已满时请求排队等待，调用方同步等待全部请求完成
+        """
+        errors = []
+        executor = self.get_executor()
+        if executor is None or len(chunks) == 1:
+            for chunk in chunks:
+                errors.extend(self.send_chunk(document_cls, state, chunk, action, skip_empty))
+            return errors
+
+        futures = [executor.submit(self.send_chunk, document_cls, state, chunk, action, skip_empty) for chunk in chunks]
+        # 等待全部请求完成后再处理异常，避免部分请求仍在写入时返回
+        exc = None
+        for future in futures:
+            try:
+                errors.extend(future.result())
+            except Exception as e:  # noqa
+                exc = exc or e
+        if exc:
+            raise exc
+        return errors
+
+    def write(self, document_cls, documents: list, action: str = BulkActionType.CREATE, skip_empty: bool = True):
+        """
+        批量写入文档，用法与 Document.bulk_create 一致
+        :return: 写入成功的文档数
+        """
+        # 未开启时与原有逻辑一致，直接调用 Document.bulk_create
+        if not settings.ES_BULK_WRITER_ENABLED:
+            document_cls.bulk_create(documents, action=action, skip_empty=skip_empty)
+            return len(documents)
+
+        if not documents:
+            return 0
+
+        name = document_cls.__name__
+        state = self.get_state(name)
+        chunks = self.split_chunks(documents, state.chunk_size, skip_empty)
+
+        self.update_pending(name, state, len(documents))
+        try:
+            errors = self.send_chunks(document_cls, state, chunks, action, skip_empty)
+        finally:
+            self.update_pending(name, state, -len(documents))
+
+        metrics.ES_BULK_DOCUMENT_COUNT.labels(document=name, status="success").inc(len(documents) - len(errors))
+        if errors:
+            metrics.ES_BULK_DOCUMENT_COUNT.labels(document=name, status="failed").inc(len(errors))
+            raise BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+        return len(documents)
+
+
+bulk_writer = BulkWriter()
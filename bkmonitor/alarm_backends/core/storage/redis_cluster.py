@@ -8,6 +8,13 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import bisect
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from redis.exceptions import RedisError
 
 from alarm_backends.core.cluster import get_cluster
@@ -177,12 +184,29 @@ class PipelineProxy(KeyRouterMixin):
         p_result = {}
         result = []
         try:
-            for node_id, pipeline_instance in self._pipeline_pool.items():
-                p_result[node_id] = list(reversed(getattr(pipeline_instance, "execute")()))
+            command_count = Counter(self.command_stack)
+            # 仅执行本批有命令的节点
+            pipelines = [(node_id, p) for node_id, p in self._pipeline_pool.items() if command_count[node_id]]
+            executor = get_pipeline_executor() if len(pipelines) > 1 else None
+            if executor is None:
+                for node_id, pipeline_instance in pipelines:
+                    p_result[node_id] = list(reversed(pipeline_instance.execute()))
+            else:
+                # 多节点并发执行，耗时取决于最慢的节点而非各节点耗时之和
+                futures = [(node_id, executor.submit(p.execute)) for node_id, p in pipelines]
+                exception = None
+                # 等待全部节点执行结束后再抛出异常，避免 finally 中 reset 与仍在执行的 pipeline 并发
+                for node_id, future in futures:
+                    try:
+                        p_result[node_id] = list(reversed(future.result()))
+                    except Exception as e:
+                        exception = exception or e
+                if exception is not None:
+                    raise exception
             # 每个节点返回的响应数必须与入队到该节点的命令数一致，否则按 command_stack
             # 顺序回填会与命令错位（历史上会导致下游按下标取值越界 IndexError）
             for node_id, responses in p_result.items():
-                expected = self.command_stack.count(node_id)
+                expected = command_count[node_id]
                 if len(responses) != expected:
                     raise PipelineResultMismatch(
                         f"pipeline result mismatch on node({node_id}): got {len(responses)}, expected {expected}"
@@ -219,15 +243,44 @@ class PipelineProxy(KeyRouterMixin):
         return handle
 
 
+_PIPELINE_EXECUTOR = None
+# 线程池所属的 (进程号, 线程数)
+_PIPELINE_EXECUTOR_KEY = None
+_PIPELINE_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_pipeline_executor():
+    """
+    获取 pipeline 跨节点并发执行的线程池，未开启时返回 None
+    线程不会随 fork 复制到子进程，进程号或线程数配置变化时重新创建
+    """
+    global _PIPELINE_EXECUTOR, _PIPELINE_EXECUTOR_KEY
+
+    max_workers = getattr(settings, "REDIS_PIPELINE_EXECUTE_MAX_WORKERS", 1)
+    if max_workers <= 1:
+        return None
+
+    executor_key = (os.getpid(), max_workers)
+    if _PIPELINE_EXECUTOR is None or _PIPELINE_EXECUTOR_KEY != executor_key:
+        with _PIPELINE_EXECUTOR_LOCK:
+            if _PIPELINE_EXECUTOR is None or _PIPELINE_EXECUTOR_KEY != executor_key:
+                if _PIPELINE_EXECUTOR is not None and _PIPELINE_EXECUTOR_KEY[0] == executor_key[0]:
+                    _PIPELINE_EXECUTOR.shutdown(wait=False)
+                _PIPELINE_EXECUTOR = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="redis-pipeline")
+                _PIPELINE_EXECUTOR_KEY = executor_key
+    return _PIPELINE_EXECUTOR
+
+
 STRATEGY_ROUTER_CACHE = None
 STRATEGY_NODE_MAP = {}
 DEFAULT_NODE = None
+# 路由表各区间的上界，与当前 STRATEGY_ROUTER_CACHE 一一对应
+_ROUTER_SCORES = []
+_ROUTER_SOURCE = None
 
 
 def get_node_by_strategy_id(strategy_id: int):
-    from django.utils.translation import gettext as _
-
-    global STRATEGY_ROUTER_CACHE, DEFAULT_NODE, STRATEGY_NODE_MAP
+    global STRATEGY_ROUTER_CACHE, DEFAULT_NODE, STRATEGY_NODE_MAP, _ROUTER_SCORES, _ROUTER_SOURCE
 
     # 获取路由表
     if not STRATEGY_ROUTER_CACHE:
@@ -237,9 +290,16 @@ def get_node_by_strategy_id(strategy_id: int):
             .order_by("strategy_score")
         )
 
+    # 路由表变化(首次加载或被替换)时重建区间上界，并清空策略路由缓存
+    if STRATEGY_ROUTER_CACHE is not _ROUTER_SOURCE:
+        _ROUTER_SCORES = [router.strategy_score for router in STRATEGY_ROUTER_CACHE]
+        _ROUTER_SOURCE = STRATEGY_ROUTER_CACHE
+        STRATEGY_NODE_MAP = {}
+
     # 优先从缓存中获取
-    if STRATEGY_NODE_MAP.get(strategy_id):
-        return STRATEGY_NODE_MAP[strategy_id]
+    node = STRATEGY_NODE_MAP.get(strategy_id)
+    if node:
+        return node
 
     # 如果策略ID为0，则返回默认节点
     if strategy_id == 0:
@@ -247,11 +307,14 @@ def get_node_by_strategy_id(strategy_id: int):
             DEFAULT_NODE = CacheNode.default_node()
         return DEFAULT_NODE
 
-    # 根据策略ID获取对应的节点
-    for router in STRATEGY_ROUTER_CACHE:
-        if router.strategy_score > strategy_id:
-            STRATEGY_NODE_MAP[strategy_id] = router.node
-            return router.node
+    # 根据策略ID获取对应的节点：第一个上界大于策略ID的区间
+    index = bisect.bisect_right(_ROUTER_SCORES, strategy_id)
+    if index < len(_ROUTER_SCORES):
+        node = STRATEGY_ROUTER_CACHE[index].node
+        STRATEGY_NODE_MAP[strategy_id] = node
+        return node
 
     # 如果策略ID超过了设置的默认上限，则抛出异常
+    from django.utils.translation import gettext as _
+
     raise Exception(_("策略ID超过设置的默认上限"))
@@ -0,0 +1,282 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+进程级 redis 写缓冲(write-behind)
+
+access 每个策略组每次执行都会单独写入 checkpoint 及去重集合，策略组数量较多时大量小请求成为瓶颈。
+写缓冲将这些写操作在进程内合并：
+- set: 同一 key 只保留最后一次写入
+- sadd: 同一 key 的成员合并
+- expire: 同一 key 只保留最后一次设置
+由后台线程定时 flush，待写入数据超过阈值时提前唤醒，多个任务的写入合并后按 redis 客户端生成一个 pipeline，
+PipelineProxy 再按节点拆分执行。flush 时仅在锁内交换缓冲，redis 写入在锁外进行，不阻塞写入方。
+
+读取方需要通过 get / smembers 合并缓冲(包括正在写入的数据)中尚未落地的数据，保证进程内读写一致。
+access 任务结束时会主动 flush；celery 子进程回收时通过 os._exit 退出，atexit 不会执行，
+因此同时监听 worker_process_shutdown 信号写入剩余数据。
+"""
+
+import atexit
+import logging
+import threading
+
+from celery.signals import worker_process_shutdown
+from django.conf import settings
+
+from alarm_backends.core.storage.redis_cluster import PipelineProxy, RedisProxy
+
+logger = logging.getLogger("core.storage")
+
+
+class _ClientBuffer:
+    """
+    单个 redis 客户端的待写入数据
+    """
+
+    def __init__(self):
+        # key -> (value, ex)
+        self.sets = {}
+        # key -> set(members)
+        self.sadds = {}
+        # key -> ttl
+        self.expires = {}
+
+    def __bool__(self):
+        return bool(self.sets or self.sadds or self.expires)
+
+    def __len__(self):
+        return len(self.sets) + len(self.sadds) + len(self.expires)
+
+    def merge_older(self, older: "_ClientBuffer"):
+        """
+        合并更早的待写入数据(flush 失败回退时使用)，已有的新数据优先
+        """
+        for key, value in older.sets.items():
+            self.sets.setdefault(key, value)
+        for key, members in older.sadds.items():
+            self.sadds.setdefault(key, set()).update(members)
+        for key, ttl in older.expires.items():
+            self.expires.setdefault(key, ttl)
+
+
+class WriteBehindBuffer:
+    """
+    进程级 redis 写缓冲
+    """
+
+    def __init__(self, flush_interval: float = 1, max_pending: int = 10000, max_retry: int = 3):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_retry = max_retry
+        self._lock = threading.RLock()
+        # 保证同一时刻只有一次 flush，避免同一 key 的新旧数据乱序写入
+        self._flush_lock = threading.Lock()
+        # id(client) -> (client, _ClientBuffer)
+        self._buffers = {}
+        # 正在写入 redis 的数据，id(client) -> (client, _ClientBuffer)
+        self._flushing = {}
+        # id(client) -> 连续写入失败次数
+        self._retry_counts = {}
+        self._pending = 0
+        self._flush_thread = None
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def _get_buffer(self, client) -> _ClientBuffer:
+        client_id = id(client)
+        if client_id not in self._buffers:
+            self._buffers[client_id] = (client, _ClientBuffer())
+        self._ensure_flush_thread()
+        return self._buffers[client_id][1]
+
+    def _added(self, count: int = 1):
+        """
+        待写入数据超过阈值时唤醒后台线程提前写入
+        """
+        self._pending += count
+        if self._pending >= self.max_pending:
+            self._wakeup.set()
+
+    def set(self, client, key, value, ex=None):
+        with self._lock:
+            sets = self._get_buffer(client).sets
+            if key not in sets:
+                self._added()
+            sets[key] = (value, ex)
+
+    def sadd(self, client, key, *members):
+        if not members:
+            return
+        with self._lock:
+            sadds = self._get_buffer(client).sadds
+            if key not in sadds:
+                self._added()
+            sadds.setdefault(key, set()).update(members)
+
+    def expire(self, client, key, ttl):
+        with self._lock:
+            expires = self._get_buffer(client).expires
+            if key not in expires:
+                self._added()
+            expires[key] = ttl
+
+    def get(self, client, key, default=None):
+        """
+        获取缓冲中尚未落地的 set 值，新写入的数据优先
+        """
+        with self._lock:
+            for buffers in (self._buffers, self._flushing):
+                buffer = buffers.get(id(client))
+                if buffer and key in buffer[1].sets:
+                    return buffer[1].sets[key][0]
+        return default
+
+    def smembers(self, client, key) -> set:
+        """
+        获取缓冲中尚未落地的集合成员
+        """
+        members = set()
+        with self._lock:
+            for buffers in (self._buffers, self._flushing):
+                buffer = buffers.get(id(client))
+                if buffer and key in buffer[1].sadds:
+                    members.update(buffer[1].sadds[key])
+        return members
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def flush(self):
+        """
+        将缓冲数据写入 redis，每个客户端一个 pipeline(按节点拆分执行)
+        写入失败时数据回退到缓冲中，同一客户端连续失败超过最大重试次数后丢弃该客户端的数据
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._buffers = self._buffers, {}
+                self._pending = 0
+                self._wakeup.clear()
+
+            for client_id, (client, buffer) in list(self._flushing.items()):
+                if not buffer:
+                    continue
+                try:
+                    self._execute(client, buffer)
+                except Exception as e:
+                    retry_count = self._retry_counts.get(client_id, 0) + 1
+                    if retry_count > self.max_retry:
+                        logger.exception(f"[write buffer] flush failed after {self.max_retry} retries, drop: {e}")
+                        self._retry_counts.pop(client_id, None)
+                        continue
+                    logger.warning(f"[write buffer] flush failed, retry later: {e}")
+                    self._retry_counts[client_id] = retry_count
+                    with self._lock:
+                        if client_id in self._buffers:
+                            newer = self._buffers[client_id][1]
+                            self._pending -= len(newer)
+                            newer.merge_older(buffer)
+                        else:
+                            newer = buffer
+                            self._buffers[client_id] = (client, buffer)
+                        self._pending += len(newer)
+                else:
+                    self._retry_counts.pop(client_id, None)
+
+            with self._lock:
+                self._flushing = {}
+
+    @staticmethod
+    def _execute(client, buffer: _ClientBuffer):
+        # RedisProxy.pipeline 返回的是共享实例，后台线程 flush 时需要使用独立的 pipeline
+        if isinstance(client, RedisProxy):
+            pipeline = PipelineProxy(client, transaction=False)
+        else:
+            pipeline = client.pipeline(transaction=False)
+
+        for key, (value, ex) in buffer.sets.items():
+            pipeline.set(key, value, ex)
+        for key, members in buffer.sadds.items():
+            pipeline.sadd(key, *members)
+        for key, ttl in buffer.expires.items():
+            pipeline.expire(key, ttl)
+        pipeline.execute()
+
+    def _ensure_flush_thread(self):
+        if self._flush_thread is not None and self._flush_thread.is_alive():
+            return
+        self._stopped.clear()
+        self._flush_thread = threading.Thread(target=self._flush_loop, name="redis-write-buffer", daemon=True)
+        self._flush_thread.start()
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            if self._stopped.is_set():
+                return
+            try:
+                self.flush()
+            except Exception as e:
+                logger.exception(f"[write buffer] flush loop error: {e}")
+            with self._lock:
+                if not self._buffers:
+                    # 无待写入数据时退出，下次写入时重新拉起
+                    self._flush_thread = None
+                    return
+
+    def shutdown(self):
+        """
+        停止后台线程并写入剩余数据
+        """
+        self._stopped.set()
+        self._wakeup.set()
+        self.flush()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    """
+    获取进程级写缓冲单例，进程退出时自动写入剩余数据
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = WriteBehindBuffer(
+                    flush_interval=settings.ACCESS_WRITE_BEHIND_FLUSH_INTERVAL,
+                    max_pending=settings.ACCESS_WRITE_BEHIND_MAX_PENDING,
+                )
+                atexit.register(_buffer.shutdown)
+    return _buffer
+
+
+@worker_process_shutdown.connect
+def shutdown_write_buffer(signal=None, sender=None, **kwargs):
+    """
+    celery 子进程退出时写入剩余数据
+    """
+    if _buffer is not None:
+        _buffer.shutdown()
+
+
+def flush_write_buffer():
+    """
+    写入进程级写缓冲中的数据，未初始化时忽略
+    """
+    if _buffer is not None:
+        _buffer.flush()
+
+
+def is_write_behind_enabled() -> bool:
+    return settings.ACCESS_WRITE_BEHIND_ENABLED
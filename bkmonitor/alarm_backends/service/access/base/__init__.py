@@ -30,6 +30,9 @@ class Filter(object):
 
 
 class Filterer(object):
+    # 记录类按数据点大量创建，子类可通过 __slots__ 去掉实例 __dict__
+    __slots__ = ("filters",)
+
     def __init__(self):
         super(Filterer, self).__init__()
         self.filters = []
@@ -86,6 +89,8 @@ class BaseRecord(Filterer):
     A Record instance represents an data record being handled.
     """
 
+    __slots__ = ("raw_data", "data")
+
     def __init__(self, raw_data: Dict):
         super(BaseRecord, self).__init__()
         self.raw_data = raw_data
@@ -0,0 +1,328 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+access 分批子任务数据编解码
+
+支持两种格式：
+- json: base64(gzip(json.dumps(points)))，历史格式，无头部
+- columnar: "bkac:{version}:{compression}:" + base64(compress(列式二进制))
+  - 数值列(int/float/None)：float64 数组 + 类型标记数组
+  - 其他列：字典编码，去重值列表(JSON) + 下标数组
+
+解码时根据头部自动识别格式，因此新版本 worker 可以同时处理新旧两种格式。
+灰度时需先升级所有 worker，再切换 ACCESS_BATCH_DATA_CODEC 配置。
+"""
+
+import base64
+import copy
+import gzip
+import json
+import struct
+import sys
+import zlib
+from array import array
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+CODEC_JSON = "json"
+CODEC_COLUMNAR = "columnar"
+
+COLUMNAR_HEADER_PREFIX = "bkac"
+COLUMNAR_VERSION = 1
+
+COMPRESSION_NONE = "none"
+COMPRESSION_ZLIB = "zlib"
+COMPRESSION_ZSTD = "zstd"
+COMPRESSION_LZ4 = "lz4"
+
+# 列类型
+COLUMN_NUMERIC = b"n"
+COLUMN_DICT = b"k"
+
+# 数值列类型标记
+FLAG_FLOAT = 0
+FLAG_INT = 1
+FLAG_NONE = 2
+FLAG_MISSING = 3
+
+# float64 能精确表示的整数范围
+MAX_SAFE_INTEGER = 2**53
+
+_MISSING = object()
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.compress(data, 1)
+    if compression == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor(level=1).compress(data)
+    if compression == COMPRESSION_LZ4:
+        return lz4_frame.compress(data)
+    return data
+
+
+def _decompress(data: bytes, compression: str) -> bytes:
+    if compression == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise ValueError("zstandard is not installed, can not decode zstd payload")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compression == COMPRESSION_LZ4:
+        if lz4_frame is None:
+            raise ValueError("lz4 is not installed, can not decode lz4 payload")
+        return lz4_frame.decompress(data)
+    if compression == COMPRESSION_NONE:
+        return data
+    raise ValueError(f"unknown compression: {compression}")
+
+
+def get_available_compression(compression: str) -> str:
+    """
+    可选压缩依赖未安装时，回退为 zlib
+    """
+    if compression == COMPRESSION_ZSTD and zstandard is None:
+        return COMPRESSION_ZLIB
+    if compression == COMPRESSION_LZ4 and lz4_frame is None:
+        return COMPRESSION_ZLIB
+    if compression not in (COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_ZSTD, COMPRESSION_LZ4):
+        return COMPRESSION_ZLIB
+    return compression
+
+
+def _to_little_endian(arr: array) -> bytes:
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _from_little_endian(typecode: str, data: bytes) -> array:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _index_typecode(size: int) -> str:
+    if size <= 0xFF:
+        return "B"
+    if size <= 0xFFFF:
+        return "H"
+    return "I"
+
+
+def _pack_bytes(data: bytes) -> bytes:
+    return struct.pack("<I", len(data)) + data
+
+
+def _encode_numeric_column(values: list) -> bytes | None:
+    """
+    数值列编码，列中存在非数值时返回 None
+    """
+    numbers = array("d")
+    flags = array("B")
+    for value in values:
+        value_type = type(value)
+        if value_type is float:
+            numbers.append(value)
+            flags.append(FLAG_FLOAT)
+        elif value_type is int and -MAX_SAFE_INTEGER <= value <= MAX_SAFE_INTEGER:
+            numbers.append(value)
+            flags.append(FLAG_INT)
+        elif value is None:
+            numbers.append(0)
+            flags.append(FLAG_NONE)
+        elif value is _MISSING:
+            numbers.append(0)
+            flags.append(FLAG_MISSING)
+        else:
+            return None
+    return COLUMN_NUMERIC + _pack_bytes(_to_little_endian(numbers)) + _pack_bytes(flags.tobytes())
+
+
+def _encode_dict_column(values: list) -> bytes:
+    # 下标 0 保留给缺失值
+    value_indexes = {}
+    unique_values = [None]
+    indexes = []
+    for value in values:
+        if value is _MISSING:
+            indexes.append(0)
+            continue
+        # 使用 (类型, 值) 作为去重键，避免 1/1.0/True 被合并
+        try:
+            dedupe_key = (type(value), value)
+            index = value_indexes.get(dedupe_key)
+        except TypeError:
+            dedupe_key = (type(value), json.dumps(value, sort_keys=True))
+            index = value_indexes.get(dedupe_key)
+        if index is None:
+            index = value_indexes[dedupe_key] = len(unique_values)
+            unique_values.append(value)
+        indexes.append(index)
+
+    typecode = _index_typecode(len(unique_values))
+    return (
+        COLUMN_DICT
+        + _pack_bytes(json.dumps(unique_values).encode("utf-8"))
+        + typecode.encode("ascii")
+        + _pack_bytes(_to_little_endian(array(typecode, indexes)))
+    )
+
+
+def encode_columnar(points: list[dict]) -> bytes:
+    """
+    将数据点列表编码为列式二进制
+    """
+    columns = {}
+    for point in points:
+        for field in point:
+            if field not in columns:
+                columns[field] = None
+    column_names = list(columns)
+
+    body = [struct.pack("<II", len(points), len(column_names))]
+    for name in column_names:
+        values = [point.get(name, _MISSING) for point in points]
+        column = _encode_numeric_column(values)
+        if column is None:
+            column = _encode_dict_column(values)
+        body.append(_pack_bytes(name.encode("utf-8")))
+        body.append(column)
+    return b"".join(body)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def read(self, size: int) -> bytes:
+        chunk = self.data[self.offset : self.offset + size]
+        self.offset += size
+        return chunk.tobytes()
+
+    def read_struct(self, fmt: str):
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def read_bytes(self) -> bytes:
+        (size,) = self.read_struct("<I")
+        return self.read(size)
+
+
+def _decode_column(reader: _Reader) -> tuple[list, list[bool] | None]:
+    """
+    解码单列，返回 (值列表, 缺失标记列表)，无缺失值时缺失标记为 None
+    """
+    column_type = reader.read(1)
+    if column_type == COLUMN_NUMERIC:
+        numbers = _from_little_endian("d", reader.read_bytes())
+        flags = reader.read_bytes()
+        flag_set = set(flags)
+        # 常见的纯浮点/纯整数列走快速路径
+        if flag_set <= {FLAG_FLOAT}:
+            values = numbers.tolist()
+        elif flag_set == {FLAG_INT}:
+            values = [int(number) for number in numbers]
+        else:
+            values = [
+                int(number) if flag == FLAG_INT else (None if flag >= FLAG_NONE else number)
+                for number, flag in zip(numbers, flags)
+            ]
+        missing = [flag == FLAG_MISSING for flag in flags] if FLAG_MISSING in flag_set else None
+        return values, missing
+
+    if column_type == COLUMN_DICT:
+        unique_values = json.loads(reader.read_bytes().decode("utf-8"))
+        typecode = reader.read(1).decode("ascii")
+        indexes = _from_little_endian(typecode, reader.read_bytes())
+        # 嵌套结构按行复制，避免多个数据点共享同一对象
+        if any(isinstance(value, (dict, list)) for value in unique_values):
+            values = [
+                copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+                for value in (unique_values[index] for index in indexes)
+            ]
+        else:
+            values = [unique_values[index] for index in indexes]
+        missing = [not index for index in indexes] if 0 in indexes else None
+        return values, missing
+
+    raise ValueError(f"unknown column type: {column_type}")
+
+
+def decode_columnar(data: bytes) -> list[dict]:
+    """
+    将列式二进制解码为数据点列表
+    """
+    reader = _Reader(data)
+    row_count, column_count = reader.read_struct("<II")
+
+    names, columns, missing_columns = [], [], []
+    for _ in range(column_count):
+        names.append(reader.read_bytes().decode("utf-8"))
+        values, missing = _decode_column(reader)
+        columns.append(values)
+        missing_columns.append(missing)
+
+    if not columns:
+        return [{} for _ in range(row_count)]
+
+    # 所有列均无缺失值时，按行整体构造字典
+    points = [dict(zip(names, row)) for row in zip(*columns)]
+    for name, missing in zip(names, missing_columns):
+        if missing is None:
+            continue
+        for point, is_missing in zip(points, missing):
+            if is_missing:
+                del point[name]
+    return points
+
+
+def encode_batch_points(points: list[dict], codec: str = CODEC_JSON, compression: str = COMPRESSION_ZLIB) -> str:
+    """
+    编码分批子任务数据，返回可直接写入 redis 的字符串
+    :param points: 数据点列表
+    :param codec: 编码格式 json/columnar
+    :param compression: columnar 格式的压缩算法 none/zlib/zstd/lz4，可选依赖未安装时回退为 zlib
+    """
+    if codec != CODEC_COLUMNAR:
+        return base64.b64encode(gzip.compress(json.dumps(points).encode("utf-8"))).decode("ascii")
+
+    compression = get_available_compression(compression)
+    payload = base64.b64encode(_compress(encode_columnar(points), compression)).decode("ascii")
+    return f"{COLUMNAR_HEADER_PREFIX}:{COLUMNAR_VERSION}:{compression}:{payload}"
+
+
+def decode_batch_points(data: str | bytes) -> list[dict]:
+    """
+    解码分批子任务数据，根据头部自动识别格式
+    """
+    if isinstance(data, bytes):
+        data = data.decode("ascii")
+
+    if not data.startswith(f"{COLUMNAR_HEADER_PREFIX}:"):
+        return json.loads(gzip.decompress(base64.b64decode(data)).decode("utf-8"))
+
+    _, version, compression, payload = data.split(":", 3)
+    if int(version) != COLUMNAR_VERSION:
+        raise ValueError(f"unsupported access batch data version: {version}")
+    return decode_columnar(_decompress(base64.b64decode(payload), compression))
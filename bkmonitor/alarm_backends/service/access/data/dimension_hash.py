@@ -0,0 +1,124 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+access 维度哈希
+
+记录ID(维度md5.时间)及降噪维度均通过 count_md5 计算，count_md5 对字典的每个键值递归计算 md5 并将中间结果序列化，
+单条记录需要 4n+1 次 md5，高基数策略下是 access 的主要 CPU 开销之一。
+哈希器缓存键值对的摘要，同一批数据中重复出现的维度值不再重复计算，支持两种算法：
+- md5: 结果与 count_md5 完全一致，记录ID、告警事件ID、优先级等依赖维度 md5 的逻辑不受影响
+- xxh3: 维度按键排序后规范化编码，计算 xxh3_128，结果带 "x3:" 版本前缀，不会与 md5 结果混淆。
+  仅用于 access 内部计数的哈希(降噪维度)，依赖未安装时回退为 md5
+"""
+
+import json
+
+from bkmonitor.utils.common_utils import _count_md5, count_md5
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+HASH_MD5 = "md5"
+HASH_XXH3 = "xxh3"
+
+XXH3_PREFIX = "x3:"
+
+# 规范化编码的分隔符
+KEY_SEPARATOR = "\x1e"
+ITEM_SEPARATOR = "\x1f"
+
+
+def get_available_method(method: str) -> str:
+    if method == HASH_XXH3 and xxhash is None:
+        return HASH_MD5
+    return method
+
+
+def _is_scalar(value) -> bool:
+    return not (isinstance(value, dict | list | tuple) or callable(value))
+
+
+class DimensionHasher:
+    """
+    维度哈希器，缓存键值对的摘要，可在多批数据间复用
+    """
+
+    # 摘要缓存的最大数量，超出后清空
+    MAX_CACHE_SIZE = 200000
+
+    def __init__(self):
+        self._digests: dict[str, str] = {}
+        self._pair_digests: dict[tuple[str, str], str] = {}
+
+    def clear(self):
+        self._digests.clear()
+        self._pair_digests.clear()
+
+    def _md5(self, content: str) -> str:
+        digest = self._digests.get(content)
+        if digest is None:
+            if len(self._digests) >= self.MAX_CACHE_SIZE:
+                self._digests.clear()
+            digest = self._digests[content] = _count_md5(content)
+        return digest
+
+    def _pair_md5(self, key: str, value) -> str:
+        """
+        键值对的摘要，等价于 count_md5((key, count_md5(value)))
+        """
+        if not _is_scalar(value):
+            return self._md5(str(sorted([self._md5(key), self._md5(count_md5(value))])))
+
+        value_str = str(value)
+        digest = self._pair_digests.get((key, value_str))
+        if digest is None:
+            if len(self._pair_digests) >= self.MAX_CACHE_SIZE:
+                self._pair_digests.clear()
+            digest = self._md5(str(sorted([self._md5(key), self._md5(self._md5(value_str))])))
+            self._pair_digests[(key, value_str)] = digest
+        return digest
+
+    def md5(self, dimensions: dict) -> str:
+        """
+        计算维度的 md5，结果与 count_md5(dimensions) 一致
+        """
+        if not isinstance(dimensions, dict):
+            return count_md5(dimensions)
+        return _count_md5(str(sorted(self._pair_md5(str(key), dimensions[key]) for key in sorted(dimensions))))
+
+    @staticmethod
+    def xxh3(dimensions: dict) -> str:
+        """
+        计算维度的 xxh3 哈希，维度值与 count_md5 一样按字符串处理，非标量值按排序后的 json 编码
+        """
+        items = []
+        for key in sorted(dimensions):
+            value = dimensions[key]
+            value_str = str(value) if _is_scalar(value) else json.dumps(value, sort_keys=True, default=str)
+            items.append(f"{key}{KEY_SEPARATOR}{value_str}")
+        return XXH3_PREFIX + xxhash.xxh3_128_hexdigest(ITEM_SEPARATOR.join(items))
+
+    def hash_many(self, dimensions_list: list[dict], method: str = HASH_MD5) -> list[str]:
+        """
+        批量计算维度哈希
+        """
+        method = get_available_method(method)
+        if method == HASH_XXH3:
+            return [
+                self.xxh3(dimensions) if isinstance(dimensions, dict) else self.md5(dimensions)
+                for dimensions in dimensions_list
+            ]
+        return [self.md5(dimensions) for dimensions in dimensions_list]
+
+
+dimension_hasher = DimensionHasher()
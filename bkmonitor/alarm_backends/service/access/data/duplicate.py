@@ -10,7 +10,10 @@ specific language governing permissions and limitations under the License.
 
 from collections import defaultdict
 
+from django.conf import settings
+
 from alarm_backends.core.cache import key
+from alarm_backends.core.storage.write_buffer import get_write_buffer
 
 
 class Duplicate:
@@ -22,6 +25,18 @@ class Duplicate:
         self.ttl = ttl if ttl is not None else key.ACCESS_DUPLICATE_KEY.ttl
 
         self.client = key.ACCESS_DUPLICATE_KEY.client
+        self.write_buffer = get_write_buffer() if settings.ACCESS_WRITE_BEHIND_ENABLED else None
+
+    def _merge_pending_record_ids(self, dup_key, record_ids: set) -> set:
+        """
+        合并写缓冲中尚未写入redis的 record_id
+        """
+        if self.write_buffer is None:
+            return record_ids
+        pending_record_ids = self.write_buffer.smembers(self.client, dup_key)
+        if pending_record_ids:
+            record_ids = set(record_ids) | pending_record_ids
+        return record_ids
 
     def get_record_ids(self, time):
         # 保证每个时间点仅调用一次redis， 即使无数据也缓存下来。
@@ -31,7 +46,7 @@ class Duplicate:
                 # Q：strategy_id setter 的作用是？
                 # A:Redis 路由分片 - alarm_backends/core/storage/redis_cluster.py
                 dup_key.strategy_id = self.strategy_id
-            self.record_ids_cache[dup_key] = self.client.smembers(dup_key)
+            self.record_ids_cache[dup_key] = self._merge_pending_record_ids(dup_key, self.client.smembers(dup_key))
 
         return self.record_ids_cache[dup_key]
 
@@ -86,7 +101,7 @@ class Duplicate:
         # 3. 执行并缓存结果
         results = pipeline.execute()
         for dup_key, record_ids in zip(dup_keys, results):
-            self.record_ids_cache[dup_key] = record_ids
+            self.record_ids_cache[dup_key] = self._merge_pending_record_ids(dup_key, record_ids)
 
     def is_duplicate_by_id(self, record_id: str, time: int) -> bool:
         """
@@ -143,6 +158,10 @@ class Duplicate:
         # Q2：CheckPoint 已经控制了一个滑动窗口，按理说应该不会有重复？这里的业务背景是？
         # A1：是为了防止数据拉取周期之间数据点重复
         # A2：由于存在入库延迟，每次拉取是基于 last_check_point 往前一个周期拉数据，这里的去重逻辑可以过滤掉重叠窗口的重复数据点
+        if self.write_buffer is not None:
+            self._refresh_cache_to_buffer()
+            return
+
         pipeline = self.client.pipeline(transaction=False)
         for dup_key, record_ids in self.pending_to_add.items():
             if self.strategy_id is not None:
@@ -154,3 +173,17 @@ class Duplicate:
             ttl_dup_key.strategy_id = self.strategy_id
             pipeline.expire(ttl_dup_key, self.ttl)
         pipeline.execute()
+
+    def _refresh_cache_to_buffer(self):
+        """
+        写入进程级写缓冲，由写缓冲合并后按节点批量写入redis
+        """
+        for dup_key, record_ids in self.pending_to_add.items():
+            if self.strategy_id is not None:
+                dup_key.strategy_id = self.strategy_id
+            # redis 中存储的是字符串，这里保持一致，保证读取缓冲时去重判断正确
+            self.write_buffer.sadd(self.client, dup_key, *[str(record_id) for record_id in record_ids])
+
+        for ttl_dup_key in self.record_ids_cache:
+            ttl_dup_key.strategy_id = self.strategy_id
+            self.write_buffer.expire(self.client, ttl_dup_key, self.ttl)
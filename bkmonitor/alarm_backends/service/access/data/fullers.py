@@ -32,6 +32,28 @@ class TopoNodeFuller(Fuller):
         """
         return scenario in ("os", "host_process")
 
+    @classmethod
+    def prefetch(cls, records: list[DataRecord]):
+        """
+        批量预加载一批数据涉及的主机到进程内缓存，补充维度及过滤时不再逐条读取 redis
+        """
+        host_keys_by_tenant: dict[str, set[str]] = {}
+        for record in records:
+            dimensions = record.dimensions
+            bk_host_id = dimensions.get("bk_host_id")
+            if bk_host_id:
+                key = str(bk_host_id)
+            else:
+                ip = dimensions.get("bk_target_ip") or dimensions.get("ip")
+                if not ip:
+                    continue
+                bk_cloud_id = dimensions.get("bk_target_cloud_id") or dimensions.get("bk_cloud_id") or "0"
+                key = HostManager.get_host_key(ip, bk_cloud_id)
+            host_keys_by_tenant.setdefault(record.bk_tenant_id, set()).add(key)
+
+        for bk_tenant_id, host_keys in host_keys_by_tenant.items():
+            HostManager.prefetch(bk_tenant_id=bk_tenant_id, keys=list(host_keys))
+
     def full(self, record: DataRecord):
         """
         维度补充(当策略目标是CMDB节点时，需要在数据的维度中补充CMDB节点的信息)
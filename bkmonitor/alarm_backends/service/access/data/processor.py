@@ -8,10 +8,9 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-import base64
-import gzip
 import json
 import logging
+import math
 import queue
 import signal
 import threading
@@ -39,6 +38,8 @@ from alarm_backends.core.storage.redis import Cache
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
 from alarm_backends.management.hashring import HashRing
 from alarm_backends.service.access import base
+from alarm_backends.service.access.data.codec import decode_batch_points, encode_batch_points
+from alarm_backends.service.access.data.dimension_hash import dimension_hasher
 from alarm_backends.service.access.data.duplicate import Duplicate
 from alarm_backends.service.access.data.filters import (
     ExpireFilter,
@@ -60,6 +61,11 @@ from core.errors.api import BKAPIError
 from core.prometheus import metrics
 
 IP = get_local_ip()
+
+# 分批任务耗时统计的指数平滑系数
+BATCH_STAT_SMOOTHING = 0.3
+# 队列积压时单批数据量的最大放大倍数
+MAX_BATCH_BACKLOG_SCALE = 4
 logger = logging.getLogger("access.data")
 
 
@@ -76,9 +82,21 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
         self.batch_count = 1
         self.process_counts = {}
 
+    def prefetch(self, records: list[DataRecord]):
+        """
+        批量预加载数据涉及的主机，仅在开启进程内 CMDB 缓存时生效
+        """
+        if settings.CMDB_LOCAL_CACHE_ENABLED and records:
+            TopoNodeFuller.prefetch(records)
+
+    def handle(self):
+        self.prefetch(self.record_list)
+        super().handle()
+
     def post_handle(self):
-        # 释放主机信息本地内存
-        clear_mem_cache("host_cache")
+        # 释放主机信息本地内存，进程内 CMDB 缓存由缓存版本控制失效，不需要清理
+        if not settings.CMDB_LOCAL_CACHE_ENABLED:
+            clear_mem_cache("host_cache")
         # 释放服务实例信息本地内存
         clear_mem_cache("service_instance_cache")
 
@@ -160,14 +178,18 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
         record_key = key.NOISE_REDUCE_TOTAL_KEY.get_key(
             strategy_id=item.strategy.strategy_id, noise_dimension_hash=dimension_hash
         )
-        noise_data = defaultdict()
+        dimension_values = []
         for record in record_list:
             dimensions = record.data["dimensions"]
             dimension_value = {
                 dimension_key: dimensions.get(dimension_key) for dimension_key in noise_reduce_config["dimensions"]
             }
             logger.debug("strategy(%s) noise reduce dimension_value(%s)", item.strategy.strategy_id, dimension_value)
-            dimension_value_hash = count_md5(dimension_value)
+            dimension_values.append(dimension_value)
+        # 降噪维度哈希仅用于计数，可使用更快的哈希算法
+        dimension_value_hashes = dimension_hasher.hash_many(dimension_values, settings.ACCESS_NOISE_DIMENSION_HASH)
+        noise_data = defaultdict()
+        for record, dimension_value_hash in zip(record_list, dimension_value_hashes):
             noise_data[dimension_value_hash] = record.data["time"]
         client.zadd(record_key, noise_data)
         client.expire(record_key, key.NOISE_REDUCE_TOTAL_KEY.ttl)
@@ -188,11 +210,16 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
             )
         else:
             self.process_counts.setdefault("push_noise_data", {})
-            self.process_counts["push_noise_data"][str(item.id)] = {
-                "record_key": record_key,
-                "dimension_key": "|".join(noise_reduce_config["dimensions"]),
-                "count": len(noise_data.keys()),
-            }
+            noise_counts = self.process_counts["push_noise_data"].get(str(item.id))
+            # 流式处理时同一个 item 会分块推送多次，需要累加计数
+            if noise_counts and noise_counts["record_key"] == record_key:
+                noise_counts["count"] += len(noise_data.keys())
+            else:
+                self.process_counts["push_noise_data"][str(item.id)] = {
+                    "record_key": record_key,
+                    "dimension_key": "|".join(noise_reduce_config["dimensions"]),
+                    "count": len(noise_data.keys()),
+                }
 
     def _push(self, item, record_list, output_client=None, data_list_key=None):
         """
@@ -237,10 +264,15 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
             )
         else:
             self.process_counts.setdefault("push_data", {})
-            self.process_counts["push_data"][str(item.id)] = {
-                "output_key": output_key,
-                "count": len(record_list),
-            }
+            push_counts = self.process_counts["push_data"].get(str(item.id))
+            # 流式处理时同一个 item 会分块推送多次，需要累加计数
+            if push_counts and push_counts["output_key"] == output_key:
+                push_counts["count"] += len(record_list)
+            else:
+                self.process_counts["push_data"][str(item.id)] = {
+                    "output_key": output_key,
+                    "count": len(record_list),
+                }
 
     def push(self, records: list | None = None, output_client=None):
         """
@@ -249,6 +281,16 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
         if records is None:
             records = self.record_list
 
+        strategy_ids = self.push_records(records, output_client)
+
+        # 推送数据处理信号
+        if any(not record.is_duplicate for record in records):
+            self.push_signal(strategy_ids, output_client)
+
+    def push_records(self, records: list, output_client=None) -> set[int]:
+        """
+        推送数据到检测队列及无数据检测队列，返回有数据推送的策略ID
+        """
         # 去除重复数据
         records: list[DataRecord] = [record for record in records if not record.is_duplicate]
 
@@ -292,12 +334,16 @@ class BaseAccessDataProcess(base.BaseAccessProcess):
             if item.no_data_config["is_enabled"]:
                 self._push(item, records, output_client, key.NO_DATA_LIST_KEY)
 
-        # 推送数据处理信号
-        if records:
-            client = output_client or key.DATA_SIGNAL_KEY.client
-            if strategy_ids:
-                client.lpush(key.DATA_SIGNAL_KEY.get_key(), *list(strategy_ids))
-            client.expire(key.DATA_SIGNAL_KEY.get_key(), key.DATA_SIGNAL_KEY.ttl)
+        return strategy_ids
+
+    def push_signal(self, strategy_ids: set[int], output_client=None):
+        """
+        推送数据处理信号
+        """
+        client = output_client or key.DATA_SIGNAL_KEY.client
+        if strategy_ids:
+            client.lpush(key.DATA_SIGNAL_KEY.get_key(), *list(strategy_ids))
+        client.expire(key.DATA_SIGNAL_KEY.get_key(), key.DATA_SIGNAL_KEY.ttl)
 
 
 class AccessDataProcess(BaseAccessDataProcess):
@@ -306,6 +352,10 @@ class AccessDataProcess(BaseAccessDataProcess):
         self.strategy_group_key = strategy_group_key
         self.from_timestamp = None
         self.until_timestamp = None
+        # 流式处理模式下待处理的原始数据，在 push 阶段分块消费
+        self.stream_points = None
+        # 流式处理模式下已处理数据的最大时间点（流式处理不保留 record_list）
+        self.max_record_time = None
 
         if sub_task_id:
             self.batch_timestamp = int(sub_task_id.split(".")[0])
@@ -420,10 +470,14 @@ class AccessDataProcess(BaseAccessDataProcess):
                     redis_node=redis_node,
                 ).inc(point_total)
             if settings.ACCESS_DATA_BATCH_PROCESS_THRESHOLD > 0:
-                points = self.send_batch_data(points, settings.ACCESS_DATA_BATCH_PROCESS_SIZE)
+                points = self.send_batch_data(points, self.get_batch_threshold(point_total))
 
         # 过滤重复数据并实例化
-        self.filter_duplicates(points)
+        if self.is_stream_mode():
+            # 流式处理：去重、过滤、补充维度及推送在 push 阶段分块完成
+            self.stream_points = points
+        else:
+            self.filter_duplicates(points)
 
     def query_data(self, now_timestamp: int) -> list[dict]:
         """
@@ -540,6 +594,84 @@ class AccessDataProcess(BaseAccessDataProcess):
 
         self.until_timestamp = until_timestamp
 
+    def get_batch_stat(self) -> dict:
+        """
+        获取策略组分批子任务的历史处理统计
+        :return: {"cost_per_point": 单个数据点单个item的平均处理耗时(秒), "queue_lag": 子任务排队延迟(秒)}
+        """
+        stat_key = key.ACCESS_BATCH_STAT_KEY.get_key(strategy_group_key=self.strategy_group_key)
+        stat_key.strategy_id = self.items[0].strategy.id
+        try:
+            stat = key.ACCESS_BATCH_STAT_KEY.client.get(stat_key)
+            return json.loads(stat) if stat else {}
+        except Exception as e:
+            logger.warning(f"strategy_group_key({self.strategy_group_key}) get batch stat error: {e}")
+            return {}
+
+    def update_batch_stat(self, batch_results: list[dict]):
+        """
+        根据子任务的处理结果更新分批处理统计，使用指数平滑降低单次波动的影响
+        """
+        process_time, point_count, queue_lags = 0, 0, []
+        for result in batch_results:
+            if "queue_lag" in result:
+                queue_lags.append(result["queue_lag"])
+                metrics.ACCESS_DATA_BATCH_QUEUE_LAG.labels(strategy_group_key=metrics.TOTAL_TAG).observe(
+                    result["queue_lag"]
+                )
+            if result.get("result") and result.get("point_count"):
+                process_time += result["process_time"]
+                point_count += result["point_count"]
+
+        if not point_count or not settings.ACCESS_DATA_BATCH_ADAPTIVE_ENABLED:
+            return
+
+        cost_per_point = process_time / point_count / max(len(self.items), 1)
+        queue_lag = max(queue_lags) if queue_lags else 0
+        stat = self.get_batch_stat()
+        if stat.get("cost_per_point"):
+            cost_per_point = BATCH_STAT_SMOOTHING * cost_per_point + (1 - BATCH_STAT_SMOOTHING) * stat["cost_per_point"]
+            queue_lag = BATCH_STAT_SMOOTHING * queue_lag + (1 - BATCH_STAT_SMOOTHING) * stat.get("queue_lag", 0)
+
+        stat_key = key.ACCESS_BATCH_STAT_KEY.get_key(strategy_group_key=self.strategy_group_key)
+        stat_key.strategy_id = self.items[0].strategy.id
+        key.ACCESS_BATCH_STAT_KEY.client.set(
+            stat_key,
+            json.dumps({"cost_per_point": cost_per_point, "queue_lag": queue_lag}),
+            ex=key.ACCESS_BATCH_STAT_KEY.ttl,
+        )
+
+    def get_batch_threshold(self, point_total: int) -> int:
+        """
+        计算分批处理的单批数据量
+
+        自适应模式下：
+        - 根据历史子任务的单点处理耗时及当前 item 数量，计算满足目标耗时的单批数据量
+        - 子任务排队延迟超过目标耗时时，说明 celery_service_batch 队列积压，拆分更多子任务只会增加排队开销，
+          按积压程度放大单批数据量
+        - 按批次数均分数据量，避免尾部出现过小的批次
+        无历史统计或未开启自适应时，使用 ACCESS_DATA_BATCH_PROCESS_SIZE
+        """
+        batch_threshold = settings.ACCESS_DATA_BATCH_PROCESS_SIZE
+        if settings.ACCESS_DATA_BATCH_ADAPTIVE_ENABLED and point_total > 0:
+            stat = self.get_batch_stat()
+            cost_per_point = stat.get("cost_per_point")
+            target_latency = settings.ACCESS_DATA_BATCH_TARGET_LATENCY
+            if cost_per_point:
+                batch_threshold = target_latency / (cost_per_point * max(len(self.items), 1))
+                queue_lag = stat.get("queue_lag", 0)
+                if queue_lag > target_latency:
+                    batch_threshold *= min(queue_lag / target_latency, MAX_BATCH_BACKLOG_SCALE)
+
+            batch_threshold = int(
+                min(max(batch_threshold, settings.ACCESS_DATA_BATCH_MIN_SIZE, 1), settings.ACCESS_DATA_BATCH_MAX_SIZE)
+            )
+            batch_count = math.ceil(point_total / batch_threshold)
+            batch_threshold = math.ceil(point_total / batch_count)
+
+        metrics.ACCESS_DATA_BATCH_SIZE.labels(strategy_group_key=metrics.TOTAL_TAG).observe(batch_threshold)
+        return batch_threshold
+
     def send_batch_data(self, points: list[dict], batch_threshold: int = 50000) -> list[dict]:
         """
         批量数据处理：当数据量超过阈值时，将数据拆分为多个批量任务异步处理。
@@ -548,6 +680,7 @@ class AccessDataProcess(BaseAccessDataProcess):
         - 按数据量拆分：每批数据量不超过 batch_threshold（默认5万）
         - 拆分触发条件：当累积数据量达到阈值且遇到新时间点时，触发拆分
         - 时间点完整性保障：当数据点数不足阈值或当前记录与前一个记录属于同一时间点时，继续累积，不触发拆分
+        - 尾部合并：剩余数据量小于 batch_threshold * ACCESS_DATA_BATCH_MIN_TAIL_RATIO 时，合并到当前批次
         - 数据排序：数据点按 series 优先排序（保持 Prometheus matrix 响应的原生顺序），
           每个 series 内部的数据点按时间从旧到新排序
         - 实际分布：每个批次包含部分 series 的完整时间范围（所有时间点），批次数据量控制在阈值左右
@@ -577,6 +710,8 @@ class AccessDataProcess(BaseAccessDataProcess):
         first_batch_points = []  # 第一批数据，原地处理
         latest_record_timestamp = None  # 上一个记录的时间戳，用于判断是否遇到新时间点
         last_batch_index, batch_count = 0, 0  # last_batch_index: 上一批次的结束位置，batch_count: 批次计数
+        # 尾部批次的最小数据量，剩余数据不足时合并到当前批次
+        min_tail_size = int(batch_threshold * settings.ACCESS_DATA_BATCH_MIN_TAIL_RATIO)
 
         # 遍历数据点（从前往后），按数据量拆分（保障时间点完整性）
         for index, record in enumerate(points):
@@ -585,11 +720,14 @@ class AccessDataProcess(BaseAccessDataProcess):
             # 拆分条件判断：
             # 1. index - last_batch_index < batch_threshold: 数据量未达到阈值，继续累积
             # 2. latest_record_timestamp == timestamp: 当前记录与前一个记录属于同一时间点，继续累积（时间点完整性保障）
-            # 3. index < len(points) - 1: 不是最后一条记录（最后一条记录会强制触发拆分）
-            # 满足任一条件时，继续累积，不触发拆分
-            if (index - last_batch_index < batch_threshold or latest_record_timestamp == timestamp) and index < len(
-                points
-            ) - 1:
+            # 3. len(points) - index < min_tail_size: 剩余数据量过小，合并到当前批次
+            # 4. index < len(points) - 1: 不是最后一条记录（最后一条记录会强制触发拆分）
+            # 满足 1/2/3 任一条件且满足 4 时，继续累积，不触发拆分
+            if (
+                index - last_batch_index < batch_threshold
+                or latest_record_timestamp == timestamp
+                or len(points) - index < min_tail_size
+            ) and index < len(points) - 1:
                 latest_record_timestamp = timestamp
                 continue  # 继续累积
 
@@ -618,13 +756,22 @@ class AccessDataProcess(BaseAccessDataProcess):
                 )
                 data_key.strategy_id = self.items[0].strategy.id
 
-                # 数据压缩：使用 gzip + base64 压缩数据，减少 Redis 存储空间
-                compress_batch_points = base64.b64encode(gzip.compress(json.dumps(batch_points).encode("utf-8")))
+                # 数据编码：支持 json(gzip + base64) 和 columnar(列式二进制) 两种格式，减少 Redis 存储空间及编解码耗时
+                compress_batch_points = encode_batch_points(
+                    batch_points,
+                    codec=settings.ACCESS_BATCH_DATA_CODEC,
+                    compression=settings.ACCESS_BATCH_DATA_COMPRESSION,
+                )
                 client.set(data_key, compress_batch_points, ex=key.ACCESS_BATCH_DATA_KEY.ttl)
 
                 # 发起异步任务：将批量数据写入 Redis 后，发起异步处理任务
                 # 任务队列：celery_service_batch（批量数据处理任务队列）
-                run_access_batch_data.delay(self.strategy_group_key, sub_task_id)
+                # dispatch_time: 子任务下发时间，用于自适应分批计算排队延迟，不包含前序批次的编码及写入耗时
+                # 旧版本 worker 不支持该参数，仅在开启自适应分批时传递，开启前需先升级所有 worker
+                task_kwargs = {}
+                if settings.ACCESS_DATA_BATCH_ADAPTIVE_ENABLED:
+                    task_kwargs["dispatch_time"] = time.time()
+                run_access_batch_data.delay(self.strategy_group_key, sub_task_id, **task_kwargs)
 
             # 记录下一轮的起始位置
             last_batch_index = index
@@ -685,11 +832,13 @@ class AccessDataProcess(BaseAccessDataProcess):
                 # 有优先级的策略，重复数据需要保留，后续再过滤
                 if have_priority:
                     point = DataRecord(self.items, record)
+                    point.record_id = record_id
                     point.is_duplicate = True
                     records.append(point)
             else:
-                # 非重复数据创建 DataRecord
+                # 非重复数据创建 DataRecord，复用已计算的 record_id
                 point = DataRecord(self.items, record)
+                point.record_id = record_id
                 records.append(point)
                 non_duplicate_records.append(point)
 
@@ -718,7 +867,12 @@ class AccessDataProcess(BaseAccessDataProcess):
         # dup_obj.refresh_cache()
 
         self.record_list = records
-        point_count = len(records)
+        self._log_pull_counts(len(points), len(records), duplicate_counts, none_point_counts)
+
+    def _log_pull_counts(self, total_count: int, point_count: int, duplicate_counts: int, none_point_counts: int):
+        """
+        记录数据拉取及去重统计
+        """
         if point_count:
             metrics.ACCESS_DATA_PROCESS_PULL_DATA_COUNT.labels(strategy_group_key=metrics.TOTAL_TAG).inc(point_count)
 
@@ -727,7 +881,7 @@ class AccessDataProcess(BaseAccessDataProcess):
             if not self.sub_task_id:
                 logger.info(
                     f"strategy({item.strategy.id}),item({item.id}),"
-                    f"total_records({len(points)}),"
+                    f"total_records({total_count}),"
                     f"access records({point_count}),"
                     f"duplicate({duplicate_counts}),"
                     f"none_point_counts({none_point_counts}),"
@@ -737,7 +891,7 @@ class AccessDataProcess(BaseAccessDataProcess):
             else:
                 self.process_counts.setdefault("pull_data", {})
                 self.process_counts["pull_data"][str(item.id)] = {
-                    "total_count": len(points),
+                    "total_count": total_count,
                     "access_count": point_count,
                     "duplicate_count": duplicate_counts,
                     "none_point_count": none_point_counts,
@@ -765,13 +919,39 @@ class AccessDataProcess(BaseAccessDataProcess):
         if not records:
             return records, None, None
 
+        allowed_times, last_time_point, discarded_times = self._limit_time_points({r.time for r in records})
+        if allowed_times is None:
+            return records, None, None
+
+        # 过滤：只保留允许时间点内的所有序列数据
+        limited_records = [r for r in records if r.time in allowed_times]
+
+        logger.info(
+            f"strategy_group_key({self.strategy_group_key}) time points limited: "
+            f"total={len(allowed_times) + len(discarded_times)}, processed={len(allowed_times)}, "
+            f"last_time_point={last_time_point}, "
+            f"records: {len(records)} -> {len(limited_records)}"
+        )
+
+        return limited_records, last_time_point, discarded_times
+
+    def _limit_time_points(self, unique_times: set) -> tuple[set | None, int | None, set | None]:
+        """
+        根据唯一时间点计算允许处理的时间点
+
+        Args:
+            unique_times: 数据中的唯一时间点集合
+
+        Returns:
+            tuple: (允许处理的时间点集合, 最后处理的时间点, 被丢弃的时间点集合)，未触发限制时均为 None
+        """
         # 检查是否为时序数据类型
         first_item = self.items[0]
         is_time_series = DataTypeLabel.TIME_SERIES in first_item.data_type_labels
 
         if not is_time_series:
             # 非时序数据，不做限制
-            return records, None, None
+            return None, None, None
 
         # 当 access-detect 合并处理时（所有算法都是静态阈值），不限制时间点数量
         # 原因：静态阈值检测不依赖历史数据，可以一次性处理所有时间点
@@ -780,33 +960,19 @@ class AccessDataProcess(BaseAccessDataProcess):
                 f"strategy_group_key({self.strategy_group_key}) access-detect merge enabled, "
                 f"skip time points limitation"
             )
-            return records, None, None
+            return None, None, None
 
         max_time_points = settings.ACCESS_DATA_MAX_TIME_POINTS
 
-        # 提取所有唯一时间点并排序
-        unique_times = sorted(set(r.time for r in records))
-
         if len(unique_times) <= max_time_points:
             # 时间点数量未超限，不做限制
-            return records, None, None
+            return None, None, None
 
         # 取前 N 个时间点
-        allowed_times = set(unique_times[:max_time_points])
-        discarded_times = set(unique_times[max_time_points:])
-        last_time_point = max(allowed_times)
-
-        # 过滤：只保留允许时间点内的所有序列数据
-        limited_records = [r for r in records if r.time in allowed_times]
-
-        logger.info(
-            f"strategy_group_key({self.strategy_group_key}) time points limited: "
-            f"total={len(unique_times)}, processed={max_time_points}, "
-            f"last_time_point={last_time_point}, "
-            f"records: {len(records)} -> {len(limited_records)}"
-        )
-
-        return limited_records, last_time_point, discarded_times
+        sorted_times = sorted(unique_times)
+        allowed_times = set(sorted_times[:max_time_points])
+        discarded_times = set(sorted_times[max_time_points:])
+        return allowed_times, max(allowed_times), discarded_times
 
     def _is_all_static_threshold(self, item: Item) -> bool:
         """
@@ -871,24 +1037,25 @@ class AccessDataProcess(BaseAccessDataProcess):
         优化方案：复用 DetectProcess，避免重复实现检测逻辑。
         通过 pull_data(item, inputs=data_points) 直接传入数据，
         自动获得所有监控指标（延迟统计、大延迟告警、double_check 等）。
+        策略组内的 item 由 GroupDetectProcess 统一执行，数据记录只遍历一次，
+        同一策略只生成一次快照，所有 item 的异常数据通过一个 pipeline 推送。
 
         流程：
         1. 去重和优先级检查（复用 access 原有逻辑）
-        2. 创建 DetectProcess 实例
-        3. gen_strategy_snapshot 生成策略快照
+        2. 遍历一次数据记录，将 DataRecord 转换为各 item 的 DataPoint
+        3. 按策略创建 DetectProcess 并生成策略快照
         4. pull_data(item, inputs=data_points) 直接传入数据
         5. handle_data 执行检测
         6. double_check 二次确认（自动获得）
-        7. push_data 推送异常数据（自动获得所有监控指标）
-        8. 推送无数据检测数据
-        9. 推送降噪数据
+        7. 推送无数据检测数据
+        8. 推送降噪数据
+        9. push_data 统一推送所有策略的异常数据（自动获得所有监控指标）
         10. 上报 detect 模块指标（DETECT_PROCESS_TIME/COUNT）
 
         Args:
             output_client: Redis 客户端（可选）
         """
-        from alarm_backends.service.detect import DataPoint
-        from alarm_backends.service.detect.process import DetectProcess
+        from alarm_backends.service.detect.process import GroupDetectProcess
 
         # 记录检测开始时间，用于上报 DETECT_PROCESS_TIME
         detect_start_time = time.time()
@@ -899,58 +1066,32 @@ class AccessDataProcess(BaseAccessDataProcess):
 
         # 优先级检查（复用原有逻辑）
         PriorityChecker.check_records(records)
-        for item in self.items:
-            strategy_id = item.strategy.id
-            # 创建 DetectProcess 实例，复用成熟的检测逻辑
-            detect_process = DetectProcess(strategy_id)
-
-            # 生成策略快照（与 detect 模块保持一致）
-            detect_process.strategy.gen_strategy_snapshot()
-            # 转换数据格式：将 DataRecord 转换为 DataPoint
-            # 过滤条件与原有 push 逻辑一致：is_retains 且非 inhibitions
-            data_points = []
-            valid_records = []
-            for record in records:
-                if record.is_retains.get(item.id) and not record.inhibitions.get(item.id):
-                    try:
-                        data_point = DataPoint(record.data, item)
-                        data_points.append(data_point)
-                        valid_records.append(record)
-                    except ValueError as e:
-                        logger.warning(
-                            f"[access-detect-merge] strategy({strategy_id}) item({item.id}) "
-                            f"failed to create DataPoint: {e}"
-                        )
 
-            # 使用 DetectProcess 复用检测逻辑
-            # pull_data 支持直接传入数据，不需要从 Redis 拉取
-            detect_process.pull_data(item, inputs=data_points)
-            detect_process.handle_data(item)
-
-            # 二次确认（自动获得）
-            try:
-                detect_process.double_check(item)
-            except Exception:
-                logger.exception("[access-detect-merge] strategy(%s) 二次确认时发生异常，不影响告警主流程", strategy_id)
+        group_detect_process = GroupDetectProcess(self.items)
+        item_data_points = group_detect_process.detect(records)
 
+        for item in self.items:
+            strategy_id = item.strategy.id
             # 推送无数据检测数据（如果启用）
             # 无数据检测需要知道有哪些维度有数据上报，用于判断哪些维度无数据
             if item.no_data_config.get("is_enabled"):
                 self._push(item, records, output_client, key.NO_DATA_LIST_KEY)
 
             # 推送降噪数据
+            valid_records = group_detect_process.item_records[item.id]
             if valid_records:
                 try:
                     self._push_noise_data(item, valid_records)
                 except Exception as e:
                     logger.exception(f"[access-detect-merge] push noise data of strategy({strategy_id}) error: {e}")
 
-            # 推送异常数据（自动获得所有监控指标：延迟统计、大延迟告警、PROCESS_OVER_FLOW 等）
-            detect_process.push_data()
-            # 上报 detect 模块指标，保持监控连续性
-            # 即使合并处理跳过了 detect 异步任务，也需要上报这些指标
-            detect_end_time = time.time()
+        # 推送异常数据（自动获得所有监控指标：延迟统计、大延迟告警、PROCESS_OVER_FLOW 等）
+        group_detect_process.push_data()
 
+        # 上报 detect 模块指标，保持监控连续性
+        # 即使合并处理跳过了 detect 异步任务，也需要上报这些指标
+        detect_end_time = time.time()
+        for strategy_id in group_detect_process.detect_processes:
             # DETECT_PROCESS_TIME: 检测处理耗时
             metrics.DETECT_PROCESS_TIME.labels(strategy_id=metrics.TOTAL_TAG).observe(
                 detect_end_time - detect_start_time
@@ -963,19 +1104,22 @@ class AccessDataProcess(BaseAccessDataProcess):
                 exception=exc,
             ).inc()
 
-            # 日志记录
+        processed_count = 0
+        for item in self.items:
+            data_point_count = len(item_data_points[item.id])
+            processed_count += data_point_count
             logger.info(
                 f"[access-detect-merge] strategy_group_key({self.strategy_group_key}) "
-                f"strategy({strategy_id}) merged processing completed, "
-                f"processed: {len(data_points)}, detect_time: {detect_end_time - detect_start_time:.3f}s"
+                f"strategy({item.strategy.id}) item({item.id}) merged processing completed, "
+                f"processed: {data_point_count}, detect_time: {detect_end_time - detect_start_time:.3f}s"
             )
 
-            # 指标上报：数据处理计数
-            # 复用 ACCESS_PROCESS_PUSH_DATA_COUNT 指标，与原有 push 流程保持一致
-            metrics.ACCESS_PROCESS_PUSH_DATA_COUNT.labels(
-                strategy_id=metrics.TOTAL_TAG,
-                type="data",
-            ).inc(len(data_points))
+        # 指标上报：数据处理计数
+        # 复用 ACCESS_PROCESS_PUSH_DATA_COUNT 指标，与原有 push 流程保持一致
+        metrics.ACCESS_PROCESS_PUSH_DATA_COUNT.labels(
+            strategy_id=metrics.TOTAL_TAG,
+            type="data",
+        ).inc(processed_count)
 
     def _update_checkpoint(self, last_time_point: int | None = None) -> int:
         """
@@ -987,15 +1131,15 @@ class AccessDataProcess(BaseAccessDataProcess):
         checkpoint = Checkpoint(self.strategy_group_key)
         checkpoint_timestamp = checkpoint.get()
 
-        if self.record_list:
+        max_record_time = self.get_max_record_time()
+        if max_record_time:
             if last_time_point:
                 # 触发了时间点限制，使用最后处理的时间点作为 checkpoint
                 # 这样下次会从这个时间点继续处理，逐步补齐历史数据
                 last_checkpoint = last_time_point
             else:
                 # 未触发限制，正常计算 checkpoint
-                # 使用生成器表达式优化内存，避免创建临时列表
-                last_checkpoint = max(checkpoint_timestamp, max(r.time for r in self.record_list))
+                last_checkpoint = max(checkpoint_timestamp, max_record_time)
         else:
             # 无数据（去重后）：检查是否查询到了数据
             # 如果查询到了数据但全部被去重，应该基于查询到的数据的最大时间点更新 checkpoint
@@ -1021,34 +1165,61 @@ class AccessDataProcess(BaseAccessDataProcess):
 
         return last_checkpoint
 
+    def get_max_record_time(self) -> int:
+        """
+        获取已处理数据的最大时间点
+        """
+        if self.max_record_time is not None:
+            return self.max_record_time
+        # 使用生成器表达式优化内存，避免创建临时列表
+        return max((r.time for r in self.record_list), default=0)
+
+    def _clean_discarded_duplicate_cache(self, dup_obj: Duplicate | None, discarded_times: set | None):
+        """
+        清理被时间点限制丢弃的数据的去重缓存
+        确保只有被处理的数据才会被标记为"已见过"
+        """
+        if not (dup_obj and discarded_times):
+            return
+
+        # 提前获取 strategy_id，避免循环内重复检查
+        strategy_id = dup_obj.strategy_id
+
+        # 从 record_ids_cache 和 pending_to_add 中移除被丢弃时间点的 key
+        for discarded_time in discarded_times:
+            dup_key = key.ACCESS_DUPLICATE_KEY.get_key(
+                strategy_group_key=self.strategy_group_key, dt_event_time=discarded_time
+            )
+            if strategy_id is not None:
+                dup_key.strategy_id = strategy_id
+
+            # 使用 pop 方法更安全，避免 KeyError 和并发问题
+            dup_obj.record_ids_cache.pop(dup_key, None)
+            dup_obj.pending_to_add.pop(dup_key, None)
+
+        logger.info(
+            f"strategy_group_key({self.strategy_group_key}) "
+            f"cleaned duplicate cache for {len(discarded_times)} discarded time points"
+        )
+
+    def handle(self):
+        # 流式处理模式下，过滤及补充维度在 push 阶段分块完成
+        if self.stream_points is not None:
+            return
+        super().handle()
+
     def push(self, records: list = None, output_client=None):
+        if self.stream_points is not None:
+            self.stream_push(output_client=output_client)
+            return
+
         # 限制处理的时间点数量（在处理阶段限制，不影响查询）
         # 这样可以控制推送到下游 detect 模块的数据量
         limited_records, last_time_point, discarded_times = self._limit_records_by_time_points(self.record_list)
 
         # 清理被时间点限制丢弃的数据的去重缓存
-        # 确保只有被处理的数据才会被标记为"已见过"
         dup_obj = getattr(self, "dup_obj", None)
-        if dup_obj and discarded_times:
-            # 提前获取 strategy_id，避免循环内重复检查
-            strategy_id = dup_obj.strategy_id
-
-            # 从 record_ids_cache 和 pending_to_add 中移除被丢弃时间点的 key
-            for discarded_time in discarded_times:
-                dup_key = key.ACCESS_DUPLICATE_KEY.get_key(
-                    strategy_group_key=self.strategy_group_key, dt_event_time=discarded_time
-                )
-                if strategy_id is not None:
-                    dup_key.strategy_id = strategy_id
-
-                # 使用 pop 方法更安全，避免 KeyError 和并发问题
-                dup_obj.record_ids_cache.pop(dup_key, None)
-                dup_obj.pending_to_add.pop(dup_key, None)
-
-            logger.info(
-                f"strategy_group_key({self.strategy_group_key}) "
-                f"cleaned duplicate cache for {len(discarded_times)} discarded time points"
-            )
+        self._clean_discarded_duplicate_cache(dup_obj, discarded_times)
 
         # 刷新去重缓存，将保留的数据写入 Redis
         if dup_obj:
@@ -1071,12 +1242,18 @@ class AccessDataProcess(BaseAccessDataProcess):
             # 走原有流程：推送到 Redis 队列，由 detect 异步任务处理
             super().push(records=records, output_client=output_client)
 
+        self._post_push(last_time_point, len(self.record_list))
+
+    def _post_push(self, last_time_point: int | None, push_count: int):
+        """
+        推送完成后更新 checkpoint 及统计信息
+        """
         if self.sub_task_id is None:
             # 主任务 需要额外做一些事情
             # 更新checkpoint
             last_checkpoint = self._update_checkpoint(last_time_point)
             logger.info(
-                f"strategy_group_key({self.strategy_group_key}), process records({len(self.record_list)}), last_checkpoint({arrow.get(last_checkpoint).strftime(constants.STD_LOG_DT_FORMAT)})"
+                f"strategy_group_key({self.strategy_group_key}), process records({push_count}), last_checkpoint({arrow.get(last_checkpoint).strftime(constants.STD_LOG_DT_FORMAT)})"
             )
             # 记录access最后一次数据拉取时间
             access_run_timestamp_key = key.ACCESS_RUN_TIMESTAMP_KEY.get_key(strategy_group_key=self.strategy_group_key)
@@ -1085,10 +1262,150 @@ class AccessDataProcess(BaseAccessDataProcess):
         # 非批量任务，记录日志
         if self.sub_task_id:
             self.process_counts["total_push_data"] = {
-                "count": len(self.record_list),
+                "count": push_count,
                 "last_checkpoint": 0,
             }
 
+    def is_stream_mode(self) -> bool:
+        """
+        是否使用流式处理模式
+        access-detect 合并处理需要完整的数据集做检测，不使用流式处理
+        """
+        return settings.ACCESS_DATA_STREAM_ENABLED and not self._can_merge_access_detect()
+
+    @staticmethod
+    def iter_points(points: list[dict]):
+        """
+        从尾部逐条弹出原始数据，已消费的数据可被及时回收
+        与 filter_duplicates 中 reversed(points) 的遍历顺序一致，优先处理最新数据
+        """
+        while points:
+            yield points.pop()
+
+    def stream_push(self, output_client=None):
+        """
+        流式处理：原始数据逐条去重、实例化，按 ACCESS_DATA_STREAM_CHUNK_SIZE 分块执行过滤、补充维度及推送，
+        内存峰值与分块大小成正比，而不是与数据总量成正比。
+        处理结果与 filter_duplicates -> handle -> push 保持一致，数据处理信号在所有分块推送完成后统一发送。
+        """
+        points, self.stream_points = self.stream_points, None
+        total_count = len(points)
+        chunk_size = max(settings.ACCESS_DATA_STREAM_CHUNK_SIZE, 1)
+
+        first_item = self.items[0]
+        max_agg_interval = max(query_config["agg_interval"] for query_config in first_item.query_configs)
+        dup_obj = Duplicate(self.strategy_group_key, strategy_id=first_item.strategy.id, ttl=max_agg_interval * 10)
+        self.dup_obj = dup_obj
+
+        # 预加载去重缓存
+        dup_obj.preload_duplicate_cache(points)
+
+        # 限制处理的时间点数量，基于原始数据的时间点预先计算
+        unique_times = set()
+        for point in points:
+            if get_value_from_raw_data(point, first_item) is not None:
+                unique_times.add(point.get("_time_") or point.get("time"))
+        allowed_times, last_time_point, discarded_times = self._limit_time_points(unique_times)
+        del unique_times
+
+        # 是否有优先级
+        have_priority = any(
+            item.strategy.priority is not None and item.strategy.priority_group_key for item in self.items
+        )
+
+        duplicate_counts = none_point_counts = access_count = push_count = 0
+        has_valid_records = False
+        max_data_time = max_queried_data_time = 0
+        strategy_ids = set()
+        chunk = []
+        for record in self.iter_points(points):
+            # 先进行轻量级 value 检查
+            if get_value_from_raw_data(record, first_item) is None:
+                none_point_counts += 1
+                continue
+
+            # 计算 record_id 用于去重判断
+            record_id, record_time = calculate_record_id(record, first_item)
+
+            # 记录所有数据的最大时间点（不管是否重复）
+            if record_time > max_queried_data_time:
+                max_queried_data_time = record_time
+
+            # 被时间点限制丢弃的数据不做处理，下个周期继续拉取
+            if allowed_times is not None and record_time not in allowed_times:
+                continue
+
+            if dup_obj.is_duplicate_by_id(record_id, record_time):
+                duplicate_counts += 1
+                # 有优先级的策略，重复数据需要保留，后续再过滤
+                if not have_priority:
+                    continue
+                point = DataRecord(self.items, record)
+                point.record_id = record_id
+                point.is_duplicate = True
+            else:
+                point = DataRecord(self.items, record)
+                point.record_id = record_id
+                dup_obj.add_record_by_id(record_id, record_time)
+                if record_time > max_data_time:
+                    max_data_time = record_time
+
+            access_count += 1
+            chunk.append(point)
+            if len(chunk) >= chunk_size:
+                chunk_push_count, chunk_has_valid_records = self._stream_push_chunk(chunk, strategy_ids, output_client)
+                push_count += chunk_push_count
+                has_valid_records = has_valid_records or chunk_has_valid_records
+                chunk = []
+
+        if chunk:
+            chunk_push_count, chunk_has_valid_records = self._stream_push_chunk(chunk, strategy_ids, output_client)
+            push_count += chunk_push_count
+            has_valid_records = has_valid_records or chunk_has_valid_records
+        self.post_handle()
+
+        # 所有分块推送完成后统一推送数据处理信号
+        if has_valid_records:
+            self.push_signal(strategy_ids, output_client)
+
+        # 清理被时间点限制丢弃的数据的去重缓存，并将保留的数据写入 Redis
+        self._clean_discarded_duplicate_cache(dup_obj, discarded_times)
+        dup_obj.refresh_cache()
+
+        self.max_queried_data_time = max_queried_data_time
+        if max_data_time > 0 and not self.batch_timestamp and self.until_timestamp:
+            self.observe_big_latency_datasource(first_item, max_data_time)
+        self._log_pull_counts(total_count, access_count, duplicate_counts, none_point_counts)
+
+        self._post_push(last_time_point, push_count)
+
+    def _stream_push_chunk(
+        self, chunk: list[DataRecord], strategy_ids: set[int], output_client=None
+    ) -> tuple[int, bool]:
+        """
+        对单个分块执行补充维度、过滤、格式化（与 handle 的处理逻辑一致）及推送
+        :return: (推送的数据量, 是否包含非重复数据)
+        """
+        self.prefetch(chunk)
+        records = []
+        for r in chunk:
+            # 补充维度：比如：业务、集群、模块等信息
+            self.full(r)
+            for new_r in r.full() or []:
+                # 过滤数据
+                if self.filter(new_r) or new_r.filter(new_r):
+                    continue
+                # 格式化数据
+                new_r.clean()
+                records.append(new_r)
+
+        if not records:
+            return 0, False
+
+        self.max_record_time = max(self.max_record_time or 0, max(r.time for r in records))
+        strategy_ids.update(self.push_records(records, output_client))
+        return len(records), any(not r.is_duplicate for r in records)
+
     def process(self):
         start_time = time.time()
 
@@ -1140,6 +1457,11 @@ class AccessDataProcess(BaseAccessDataProcess):
 
         # 记录日志
         self.batch_log(batch_results)
+        # 更新分批处理统计，用于计算下次的单批数据量
+        try:
+            self.update_batch_stat(batch_results)
+        except Exception as e:
+            logger.warning(f"strategy_group_key({self.strategy_group_key}) update batch stat error: {e}")
 
         metrics.ACCESS_DATA_PROCESS_TIME.labels(strategy_group_key=metrics.TOTAL_TAG).observe(time.time() - start_time)
         metrics.ACCESS_DATA_PROCESS_COUNT.labels(
@@ -1228,8 +1550,7 @@ class AccessDataProcess(BaseAccessDataProcess):
 
             # 记录最后检测点，避免子任务并发导致checkpoint数据不准确
             checkpoint = Checkpoint(self.strategy_group_key)
-            # 使用生成器表达式优化内存，避免创建临时列表
-            last_checkpoint = max(checkpoint.get(), max((r.time for r in self.record_list), default=0))
+            last_checkpoint = max(checkpoint.get(), self.get_max_record_time())
             if last_checkpoint > 0:
                 # 记录检测点 下次从检测点开始重新检查
                 checkpoint.set(last_checkpoint)
@@ -1267,10 +1588,13 @@ class AccessBatchDataProcess(AccessDataProcess):
     - 去重机制：filter_duplicates() 使用 reversed(points) 从新到旧遍历，优先处理最新数据
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, dispatch_time: float = None, **kwargs):
         super().__init__(*args, **kwargs)
         if self.sub_task_id is None:
             raise ValueError("sub_task_id is required")
+        self.batch_point_count = 0
+        # 子任务下发时间，旧版本下发的任务没有该参数，使用批量处理时间戳代替
+        self.dispatch_time = dispatch_time or self.batch_timestamp
 
     def pull(self):
         """
@@ -1278,7 +1602,7 @@ class AccessBatchDataProcess(AccessDataProcess):
 
         流程：
         1. 从 Redis 读取压缩的批量数据
-        2. 解压数据（base64 解码 → gzip 解压 → JSON 解析）
+        2. 解码数据（根据头部自动识别 json/columnar 格式）
         3. 删除 Redis 缓存（避免数据残留）
         4. 调用 filter_duplicates() 去重处理
         """
@@ -1290,12 +1614,17 @@ class AccessBatchDataProcess(AccessDataProcess):
         cache_key.strategy_id = self.items[0].strategy.id
         data = client.get(cache_key)
         if data:
-            # 解压数据：base64 解码 → gzip 解压 → JSON 解析
-            points = json.loads(gzip.decompress(base64.b64decode(data)).decode("utf-8"))
+            # 解码数据：根据头部自动识别 json/columnar 格式
+            points = decode_batch_points(data)
         else:
             points = []
         # 删除缓存数据（避免数据残留）
         client.delete(cache_key)
+        self.batch_point_count = len(points)
+        if self.is_stream_mode():
+            # 流式处理：去重、过滤、补充维度及推送在 push 阶段分块完成
+            self.stream_points = points
+            return
         # 去重处理：使用 reversed(points) 从新到旧遍历，优先处理最新数据
         self.filter_duplicates(points)
 
@@ -1308,6 +1637,10 @@ class AccessBatchDataProcess(AccessDataProcess):
         2. 记录处理结果到 Redis（供主任务汇总）
         3. 设置过期时间
         """
+        # 排队延迟：子任务开始执行时间与子任务下发时间的差值
+        start_time = time.time()
+        queue_lag = max(start_time - self.dispatch_time, 0)
+
         # 执行父类的 process 方法
         # 调用链：super().process() -> BaseAccessProcess.process()
         # 执行流程：pull() -> handle() -> push()
@@ -1328,6 +1661,9 @@ class AccessBatchDataProcess(AccessDataProcess):
                     "result": not exc,  # True 表示成功，False 表示失败
                     "error": str(exc) if exc else "",
                     "process_counts": self.process_counts,  # 处理统计信息
+                    "point_count": self.batch_point_count,  # 子任务数据量
+                    "process_time": time.time() - start_time,  # 子任务处理耗时
+                    "queue_lag": queue_lag,  # 子任务排队延迟
                 }
             ),
         )
@@ -1722,6 +2058,7 @@ class AccessRealTimeDataProcess(BaseAccessDataProcess):
                     except Exception as e:
                         logger.warning("%s loads alarm(%s) failed: %s", record.topic, record.value, e)
 
+                self.prefetch(records)
                 record_list = []
                 for r in records:
                     # 补充维度：比如：业务、集群、模块等信息
@@ -9,16 +9,17 @@ specific language governing permissions and limitations under the License.
 """
 
 import logging
+import sys
 import time
 from collections import defaultdict
 from typing import TYPE_CHECKING
 
 from django.conf import settings
-from django.utils.functional import cached_property
 
 from alarm_backends import constants
 from alarm_backends.service.access import base
-from bkmonitor.utils.common_utils import count_md5, number_format
+from alarm_backends.service.access.data.dimension_hash import dimension_hasher
+from bkmonitor.utils.common_utils import number_format
 from constants.strategy import (
     SYSTEM_PROC_PORT_DYNAMIC_DIMENSIONS,
     SYSTEM_PROC_PORT_METRIC_ID,
@@ -40,6 +41,37 @@ def _is_proc_port_value_exist(value) -> bool:
     return True
 
 
+def _default_retain() -> bool:
+    """
+    记录默认保留；使用模块级函数代替 lambda，避免每条记录创建一个函数对象
+    """
+    return True
+
+
+class _slot_cached_property:
+    """
+    基于 __slots__ 的 cached_property：计算结果保存在同名加 "_" 前缀的 slot 中，支持直接赋值覆盖
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.slot_name = f"_{func.__name__}"
+        self.__doc__ = func.__doc__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.slot_name)
+        except AttributeError:
+            value = self.func(instance)
+            setattr(instance, self.slot_name, value)
+            return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot_name, value)
+
+
 def calculate_record_id(raw_data: dict, item: "Item") -> tuple[str, int]:
     """
     根据原始数据计算 record_id
@@ -76,8 +108,8 @@ def calculate_record_id(raw_data: dict, item: "Item") -> tuple[str, int]:
             if field not in SYSTEM_PROC_PORT_DYNAMIC_DIMENSIONS
         }
 
-    # 计算 MD5
-    md5_dimension = count_md5(dimensions)
+    # 计算 MD5，哈希器缓存维度值的摘要，结果与 count_md5 一致
+    md5_dimension = dimension_hasher.md5(dimensions)
     record_id = f"{md5_dimension}.{record_time}"
 
     return record_id, record_time
@@ -126,6 +158,22 @@ class DataRecord(base.BaseRecord):
     }
     """
 
+    # 每个数据点都会创建一个 DataRecord，使用 __slots__ 去掉实例 __dict__；
+    # 惰性字段的计算结果保存在 "_" 前缀的 slot 中，record_id 可由调用方预先计算后直接赋值
+    __slots__ = (
+        "items",
+        "_item",
+        "scenario",
+        "is_retains",
+        "is_duplicate",
+        "inhibitions",
+        "_time",
+        "_value",
+        "_values",
+        "_dimensions",
+        "_record_id",
+    )
+
     items: list["Item"]
     _item: "Item"
 
@@ -147,20 +195,23 @@ class DataRecord(base.BaseRecord):
             self._item.strategy.scenario
         )  # 监控对象，相同查询条件的items，监控场景一定是相同的，由rt的label决定
 
-        self.is_retains = defaultdict(lambda: True)  # 保留记录，记录当前record经过filter之后是否仍然保留下来
+        self.is_retains = defaultdict(_default_retain)  # 保留记录，记录当前record经过filter之后是否仍然保留下来
         self.is_duplicate = False  # 是否重复记录，记录当前record是否是重复记录
         self.inhibitions = defaultdict(bool)  # 抑制记录，记录当前record是否被抑制
 
-    @cached_property
+    def __str__(self):
+        return f"{self.record_id}:{self.value}"
+
+    @property
     def bk_tenant_id(self) -> str:
         return self._item.bk_tenant_id
 
-    @cached_property
+    @_slot_cached_property
     def time(self):
         # DataSource的时间字段标准为_time_，time为了兼容实时监控
         return self.raw_data.get("_time_") or self.raw_data["time"]
 
-    @cached_property
+    @_slot_cached_property
     def value(self):
         """
         1. 单位转换
@@ -175,7 +226,7 @@ class DataRecord(base.BaseRecord):
             return
         return self._convert(value)
 
-    @cached_property
+    @_slot_cached_property
     def values(self):
         values = {}
         for metric in self._item.query.metrics:
@@ -196,14 +247,14 @@ class DataRecord(base.BaseRecord):
 
         return values
 
-    @cached_property
+    @_slot_cached_property
     def dimensions(self):
         """
         第一次返回原始维度，经过维度补充后，有可能获取到补充的维度数据。
         """
         return self._origin_dimension()
 
-    @cached_property
+    @_slot_cached_property
     def record_id(self):
         """
         记录ID=维度+时间(使用原始数据维度，计算MD5)
@@ -275,7 +326,8 @@ class DataRecord(base.BaseRecord):
         if self._item.query.dimensions is None:
             for key, value in self.raw_data.items():
                 if key not in ["_time_", "_result_"] and not key.startswith("bk_task_index_"):
-                    dimensions[key] = value
+                    # 维度名在同一策略组的数据点间共享同一字符串对象
+                    dimensions[sys.intern(key)] = value
         else:
             for field in self._item.query.dimensions:
                 field_value = self.raw_data.get(field)
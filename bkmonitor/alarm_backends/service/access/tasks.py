@@ -12,6 +12,7 @@ import logging
 
 from alarm_backends.core.cache import key
 from alarm_backends.core.lock.service_lock import service_lock
+from alarm_backends.core.storage.write_buffer import flush_write_buffer
 from alarm_backends.service.access import ACCESS_TYPE_TO_CLASS
 from alarm_backends.service.access.data import AccessBatchDataProcess, AccessDataProcess
 from alarm_backends.service.access.data.token import TokenBucket
@@ -63,7 +64,11 @@ def run_access_data(strategy_group_key, interval=60):
         if task_tb.acquire():
             # 执行数据处理：调用 AccessDataProcess.process() 执行完整的数据处理流程
             processor = AccessDataProcess(strategy_group_key)
-            processor.process()
+            try:
+                processor.process()
+            finally:
+                # 释放服务锁前写入缓冲的检测点及去重缓存，避免其他worker读取到旧数据
+                flush_write_buffer()
             metrics.report_all()
 
             # 快速任务优化：500ms 内的请求不计令牌消耗
@@ -77,19 +82,20 @@ def run_access_data(strategy_group_key, interval=60):
 
 
 @app.task(queue="celery_service_batch", ignore_result=True)
-def run_access_batch_data(strategy_group_key: str, sub_task_id: str):
+def run_access_batch_data(strategy_group_key: str, sub_task_id: str, dispatch_time: float = None):
     """
     批量数据处理任务：处理批量数据的子任务。
 
     功能说明：
     - 从 Redis 读取压缩的批量数据
-    - 解压数据（base64 解码 → gzip 解压 → JSON 解析）
+    - 解码数据（根据头部自动识别 json/columnar 格式）
     - 执行完整的数据处理流程（pull → handle → push）
     - 记录处理结果到 Redis，供主任务汇总
 
     参数：
         strategy_group_key: 策略组键
         sub_task_id: 子任务ID，格式为 {batch_timestamp}.{batch_count}
+        dispatch_time: 子任务下发时间，用于计算排队延迟
 
     处理流程：
         1. 创建批量处理器 AccessBatchDataProcess
@@ -102,8 +108,13 @@ def run_access_batch_data(strategy_group_key: str, sub_task_id: str):
     任务队列：
         celery_service_batch - 批量数据处理任务队列
     """
-    processor = AccessBatchDataProcess(strategy_group_key=strategy_group_key, sub_task_id=sub_task_id)
-    return processor.process()
+    processor = AccessBatchDataProcess(
+        strategy_group_key=strategy_group_key, sub_task_id=sub_task_id, dispatch_time=dispatch_time
+    )
+    try:
+        return processor.process()
+    finally:
+        flush_write_buffer()
 
 
 @app.task(ignore_result=True, queue="celery_service")
@@ -0,0 +1,299 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+告警生成分区
+
+默认模式下，多个 celery worker 并发处理同一告警的事件，需要先抢占 ALERT_UPDATE_LOCK，加锁失败的事件会被序列化后
+以 countdown=5 重新投递，告警风暴时大量事件反复排队，延迟明显增大。
+开启 ALERT_BUILDER_PARTITION_ENABLED 后：
+- 事件在落库后按 dedupe_md5 路由到固定分区(redis list)，同一告警的事件总在同一分区内按顺序排队
+- alert_builder 服务进程通过租约独占分区，同一时刻一个分区只有一个进程在消费，builder 之间不再互相争锁
+- 进程按存活数量均分分区，新进程加入或进程退出后，在下一次 rebalance 时重新分配
+- 告警锁仍需获取(alert.manager 及告警操作接口同样会更新告警)，加锁失败的事件放回分区队首，下一轮优先处理
+- 确认消息时在同一脚本内校验租约，租约已被其他进程抢占时不移除消息，由新的持有者重新处理
+- 处理失败的批次按退避时间重试，超过 ALERT_BUILDER_PARTITION_MAX_RETRIES 次后移入死信队列，避免阻塞分区
+"""
+
+import json
+import logging
+import math
+import os
+import socket
+import time
+import zlib
+
+from django.conf import settings
+
+from alarm_backends.core.alert import Event
+from alarm_backends.core.cache.key import (
+    ALERT_BUILDER_PARTITION_DEAD_LETTER_KEY,
+    ALERT_BUILDER_PARTITION_KEY,
+    ALERT_BUILDER_PARTITION_OWNER_KEY,
+    ALERT_BUILDER_PARTITION_WORKER_KEY,
+)
+from core.prometheus import metrics
+
+logger = logging.getLogger("alert.builder")
+
+
+def get_partition(dedupe_md5: str, partition_count: int = None) -> int:
+    """
+    获取告警所在分区
+    """
+    partition_count = partition_count or settings.ALERT_BUILDER_PARTITION_COUNT
+    return zlib.crc32(dedupe_md5.encode("utf-8")) % partition_count
+
+
+def dispatch_events(events: list[Event], partition_count: int = None) -> list[Event]:
+    """
+    将事件按 dedupe_md5 写入分区队列
+    :return: 无法写入分区的事件，由调用方直接处理
+    """
+    partition_count = partition_count or settings.ALERT_BUILDER_PARTITION_COUNT
+    values_by_partition = {}
+    undispatched_events = []
+    for event in events:
+        if event.is_dropped():
+            continue
+        try:
+            value = json.dumps(event.data)
+        except (TypeError, ValueError):
+            undispatched_events.append(event)
+            continue
+        partition = get_partition(event.dedupe_md5, partition_count)
+        values_by_partition.setdefault(partition, []).append(value)
+
+    if not values_by_partition:
+        return undispatched_events
+
+    client = ALERT_BUILDER_PARTITION_KEY.client
+    pipeline = client.pipeline(transaction=False)
+    for partition, values in values_by_partition.items():
+        key = ALERT_BUILDER_PARTITION_KEY.get_key(partition=partition)
+        pipeline.rpush(key, *values)
+        pipeline.expire(key, ALERT_BUILDER_PARTITION_KEY.ttl)
+    pipeline.execute()
+
+    for partition, values in values_by_partition.items():
+        metrics.ALERT_BUILDER_PARTITION_EVENT_COUNT.labels(partition=partition).inc(len(values))
+    return undispatched_events
+
+
+class AlertBuilderPartitionWorker:
+    """
+    分区消费者，负责分区租约的获取与续约，以及分区队列的读取与确认
+    """
+
+    # 单个分区单次读取的事件数
+    FETCH_SIZE = 500
+    # 重新分配分区的间隔(秒)
+    REBALANCE_INTERVAL = 10
+    # 处理失败后重试的初始等待时间(秒)及最大等待时间(秒)
+    RETRY_BACKOFF = 1
+    MAX_RETRY_BACKOFF = 30
+
+    # 仅续约自己持有的租约
+    RENEW_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("expire", KEYS[1], ARGV[2])
+    else
+        return 0
+    end
+    """
+
+    # 仅释放自己持有的租约
+    RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    else
+        return 0
+    end
+    """
+
+    # 仍持有租约时才移除已处理的消息，并将需要重试的事件放回队首，返回分区剩余消息数，租约已丢失时返回 -1
+    ACK_SCRIPT = """
+    if redis.call("get", KEYS[1]) ~= ARGV[1] then
+        return -1
+    end
+    redis.call("ltrim", KEYS[2], ARGV[2], -1)
+    if #ARGV > 3 then
+        redis.call("lpush", KEYS[2], unpack(ARGV, 4))
+        redis.call("expire", KEYS[2], ARGV[3])
+    end
+    return redis.call("llen", KEYS[2])
+    """
+
+    def __init__(self, partition_count: int = None, worker_id: str = None):
+        self.partition_count = partition_count or settings.ALERT_BUILDER_PARTITION_COUNT
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.client = ALERT_BUILDER_PARTITION_KEY.client
+        self.lease_client = ALERT_BUILDER_PARTITION_OWNER_KEY.client
+        self.partitions: list[int] = []
+        self.last_rebalance_time = 0
+        # 分区 -> (连续失败次数, 下次重试时间)
+        self.failures: dict[int, tuple[int, float]] = {}
+
+    @staticmethod
+    def get_partition_key(partition: int):
+        return ALERT_BUILDER_PARTITION_KEY.get_key(partition=partition)
+
+    @staticmethod
+    def get_owner_key(partition: int):
+        return ALERT_BUILDER_PARTITION_OWNER_KEY.get_key(partition=partition)
+
+    def heartbeat(self, now: float) -> int:
+        """
+        上报心跳，并返回当前存活的消费者数量
+        """
+        key = ALERT_BUILDER_PARTITION_WORKER_KEY.get_key()
+        self.lease_client.hset(key, self.worker_id, int(now))
+        self.lease_client.expire(key, ALERT_BUILDER_PARTITION_WORKER_KEY.ttl)
+
+        alive_count = 0
+        dead_workers = []
+        for worker_id, last_heartbeat in self.lease_client.hgetall(key).items():
+            if now - float(last_heartbeat) <= ALERT_BUILDER_PARTITION_OWNER_KEY.ttl:
+                alive_count += 1
+            else:
+                dead_workers.append(worker_id)
+        if dead_workers:
+            self.lease_client.hdel(key, *dead_workers)
+        return max(alive_count, 1)
+
+    def renew(self, partition: int) -> bool:
+        return bool(
+            self.lease_client.eval(
+                self.RENEW_SCRIPT,
+                1,
+                self.get_owner_key(partition),
+                self.worker_id,
+                ALERT_BUILDER_PARTITION_OWNER_KEY.ttl,
+            )
+        )
+
+    def release(self, partition: int):
+        self.lease_client.eval(self.RELEASE_SCRIPT, 1, self.get_owner_key(partition), self.worker_id)
+
+    def claim(self, partition: int) -> bool:
+        return bool(
+            self.lease_client.set(
+                self.get_owner_key(partition), self.worker_id, nx=True, ex=ALERT_BUILDER_PARTITION_OWNER_KEY.ttl
+            )
+        )
+
+    def rebalance(self, now: float = None, force: bool = False) -> list[int]:
+        """
+        续约已持有的分区，按存活消费者数量释放超出配额的分区或抢占空闲分区
+        """
+        now = now or time.time()
+        if not force and now - self.last_rebalance_time < self.REBALANCE_INTERVAL:
+            return self.partitions
+        self.last_rebalance_time = now
+
+        quota = math.ceil(self.partition_count / self.heartbeat(now))
+        owned = [partition for partition in self.partitions if self.renew(partition)]
+        while len(owned) > quota:
+            self.release(owned.pop())
+
+        # 不同消费者从不同分区开始抢占，减少冲突
+        start = zlib.crc32(self.worker_id.encode("utf-8")) % self.partition_count
+        for index in range(self.partition_count):
+            if len(owned) >= quota:
+                break
+            partition = (start + index) % self.partition_count
+            if partition not in owned and self.claim(partition):
+                owned.append(partition)
+
+        if set(owned) != set(self.partitions):
+            logger.info("[alert.builder partition] worker(%s) partitions: %s", self.worker_id, sorted(owned))
+        self.partitions = sorted(owned)
+        self.failures = {partition: value for partition, value in self.failures.items() if partition in owned}
+        return self.partitions
+
+    def release_all(self):
+        for partition in self.partitions:
+            self.release(partition)
+        self.partitions = []
+        self.failures = {}
+
+    def drop(self, partition: int):
+        """
+        租约已丢失，不再处理该分区，等待下一次 rebalance 重新分配
+        """
+        logger.warning("[alert.builder partition] worker(%s) lost lease of partition(%s)", self.worker_id, partition)
+        # 重新生成列表，不影响调用方对原分区列表的遍历
+        self.partitions = [p for p in self.partitions if p != partition]
+        self.failures.pop(partition, None)
+
+    def can_process(self, partition: int, now: float) -> bool:
+        """
+        分区处理失败后，在退避时间内不再处理
+        """
+        return now >= self.failures.get(partition, (0, 0))[1]
+
+    def record_failure(self, partition: int, now: float) -> int:
+        """
+        记录分区处理失败，返回连续失败次数
+        """
+        count = self.failures.get(partition, (0, 0))[0] + 1
+        self.failures[partition] = (count, now + min(self.RETRY_BACKOFF * 2 ** (count - 1), self.MAX_RETRY_BACKOFF))
+        return count
+
+    def reset_failure(self, partition: int):
+        self.failures.pop(partition, None)
+
+    def fetch(self, partition: int) -> tuple[list[Event], int]:
+        """
+        读取分区队首的事件，事件处理完成前不会从队列中移除
+        :return: (事件列表, 读取的消息数)
+        """
+        values = self.client.lrange(self.get_partition_key(partition), 0, self.FETCH_SIZE - 1)
+        events = []
+        for value in values:
+            try:
+                events.append(Event(json.loads(value), do_clean=False))
+            except Exception as e:  # noqa
+                logger.warning("[alert.builder partition] ignore invalid event in partition(%s): %s", partition, e)
+        return events, len(values)
+
+    def ack(self, partition: int, count: int, retry_events: list[Event] = None) -> int | None:
+        """
+        确认已处理的消息，需要重试的事件按原顺序放回队首
+        :return: 分区剩余消息数，租约已丢失时返回 None
+        """
+        values = [json.dumps(event.data) for event in reversed(retry_events or [])]
+        backlog = self.client.eval(
+            self.ACK_SCRIPT,
+            2,
+            self.get_owner_key(partition),
+            self.get_partition_key(partition),
+            self.worker_id,
+            count,
+            ALERT_BUILDER_PARTITION_KEY.ttl,
+            *values,
+        )
+        if backlog < 0:
+            self.drop(partition)
+            return None
+        metrics.ALERT_BUILDER_PARTITION_BACKLOG.labels(partition=partition).set(backlog)
+        return backlog
+
+    def dead_letter(self, partition: int, events: list[Event]):
+        """
+        多次处理失败的事件移入死信队列，保留一天用于排查及重新投递
+        """
+        if events:
+            key = ALERT_BUILDER_PARTITION_DEAD_LETTER_KEY.get_key()
+            pipeline = self.client.pipeline(transaction=False)
+            pipeline.rpush(key, *[json.dumps(event.data) for event in events])
+            pipeline.expire(key, ALERT_BUILDER_PARTITION_DEAD_LETTER_KEY.ttl)
+            pipeline.execute()
+        metrics.ALERT_BUILDER_PARTITION_DEAD_LETTER_COUNT.labels(partition=partition).inc(len(events))
@@ -11,6 +11,7 @@ specific language governing permissions and limitations under the License.
 import logging
 import time
 
+from django.conf import settings
 from django.utils.translation import gettext as _
 from elasticsearch.helpers import BulkIndexError
 
@@ -21,6 +22,8 @@ from alarm_backends.core.cache.assign import AssignCacheManager
 from alarm_backends.core.cache.key import ALERT_UPDATE_LOCK
 from alarm_backends.core.circuit_breaking.manager import AlertBuilderCircuitBreakingManager
 from alarm_backends.core.lock.service_lock import multi_service_lock
+from alarm_backends.core.storage.es_bulk import bulk_writer
+from alarm_backends.service.alert.builder.partition import dispatch_events
 from alarm_backends.service.alert.enricher import AlertEnrichFactory, EventEnrichFactory
 from alarm_backends.service.alert.manager.tasks import send_check_task
 from alarm_backends.service.alert.processor import BaseAlertProcessor
@@ -135,22 +138,7 @@ class AlertBuilder(BaseAlertProcessor):
             self.logger.info("[alert.builder update alert snapshot]: %s", snapshot_count)
 
             if fail_locked_events:
-                from alarm_backends.service.alert.builder.tasks import (
-                    dedupe_events_to_alerts,
-                )
-
-                # 对加锁失败的告警，丢到队列中，延后5s操作
-                dedupe_events_to_alerts.apply_async(
-                    kwargs={
-                        "events": fail_locked_events,
-                    },
-                    countdown=5,
-                )
-                self.logger.info(
-                    "[alert.builder locked] %s alerts is locked, retry in 5s: %s",
-                    len(fail_locked_events),
-                    ",".join([event.dedupe_md5 for event in fail_locked_events]),
-                )
+                self.retry_locked_events(fail_locked_events)
 
             alerts = self.save_alerts(alerts, action=BulkActionType.UPSERT, force_save=True)
 
@@ -171,14 +159,38 @@ class AlertBuilder(BaseAlertProcessor):
 
         return alerts
 
+    def retry_locked_events(self, events: list[Event]):
+        """
+        对加锁失败的告警，丢到队列中，延后5s操作
+        """
+        from alarm_backends.service.alert.builder.tasks import (
+            dedupe_events_to_alerts,
+        )
+
+        dedupe_events_to_alerts.apply_async(
+            kwargs={
+                "events": events,
+            },
+            countdown=5,
+        )
+        self.logger.info(
+            "[alert.builder locked] %s alerts is locked, retry in 5s: %s",
+            len(events),
+            ",".join([event.dedupe_md5 for event in events]),
+        )
+
     def handle(self, events: list[Event]):
         """
         事件处理逻辑
         1. 保存事件数据到 ES
-        2. 更新告警 Redis 缓存
+        2. 更新告警 Redis 缓存，分区模式下交由 alert_builder 服务按分区处理
         """
         events = self.enrich_events(events)
         events = self.save_events(events)
+        if settings.ALERT_BUILDER_PARTITION_ENABLED:
+            events = dispatch_events(events)
+            if not events:
+                return []
         alerts = self.dedupe_events_to_alerts(events)
         return alerts
 
@@ -264,7 +276,7 @@ class AlertBuilder(BaseAlertProcessor):
 
         start_time = time.time()
         try:
-            EventDocument.bulk_create(event_documents)
+            bulk_writer.write(EventDocument, event_documents)
         except BulkIndexError as e:
             for err in e.errors:
                 # 记录保存失败的事件ID
@@ -431,3 +443,21 @@ class AlertBuilder(BaseAlertProcessor):
         if not events:
             return
         self.handle(events)
+
+
+class PartitionedAlertBuilder(AlertBuilder):
+    """
+    分区模式下的告警生成，加锁失败的事件由分区消费者放回分区队列，不再创建延时任务
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.locked_events: list[Event] = []
+
+    def retry_locked_events(self, events: list[Event]):
+        self.locked_events.extend(events)
+        self.logger.info(
+            "[alert.builder locked] %s alerts is locked, retry in partition: %s",
+            len(events),
+            ",".join([event.dedupe_md5 for event in events]),
+        )
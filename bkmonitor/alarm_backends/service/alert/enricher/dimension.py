@@ -251,7 +251,9 @@ class StandardTranslateEnricher(BaseAlertEnricher):
 
     def enrich_topo(self, alert: Alert):
         bk_obj_id, bk_inst_id = alert.top_event["target"].split("|")
-        node_info = TopoManager.get(bk_tenant_id=alert.bk_tenant_id, bk_obj_id=bk_obj_id, bk_inst_id=int(bk_inst_id))
+        node_info = TopoManager.get(
+            bk_tenant_id=alert.bk_tenant_id, bk_obj_id=bk_obj_id, bk_inst_id=int(bk_inst_id), using_mem=True
+        )
         if not node_info:
             alert.add_dimension(key="bk_topo_node", value=alert.top_event["target"], display_key=_("拓扑节点"))
         else:
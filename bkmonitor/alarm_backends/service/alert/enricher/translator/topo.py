@@ -82,7 +82,7 @@ class TopoNodeTranslator(BaseTranslator):
             field.display_value = []
             return data
 
-        node_infos = TopoManager.mget(bk_tenant_id=self.bk_tenant_id, topo_nodes=keys)
+        node_infos = TopoManager.mget(bk_tenant_id=self.bk_tenant_id, topo_nodes=keys, using_mem=True)
 
         for bk_obj_id, bk_inst_id in keys:
             node_info = node_infos.get((bk_obj_id, bk_inst_id))
@@ -110,7 +110,10 @@ class TopoNodeTranslator(BaseTranslator):
         bk_inst_id = data["bk_inst_id"]
 
         node = TopoManager.get(
-            bk_tenant_id=self.bk_tenant_id, bk_obj_id=bk_obj_id.value, bk_inst_id=int(bk_inst_id.value)
+            bk_tenant_id=self.bk_tenant_id,
+            bk_obj_id=bk_obj_id.value,
+            bk_inst_id=int(bk_inst_id.value),
+            using_mem=True,
         )
 
         bk_obj_id.display_name = _("模型名称")
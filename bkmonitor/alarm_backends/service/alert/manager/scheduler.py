@@ -0,0 +1,150 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+告警检测调度时间轮
+
+send_check_task 原先为每批告警按检测周期创建多个 countdown 延时任务，异常告警量大时 broker 中会堆积大量延时消息。
+开启 ALERT_CHECK_SCHEDULER_ENABLED 后，检测计划改为写入 redis 时间轮：
+- 时间轮按告警ID分片，每个分片为一个 sorted set，score 为计划检测时间(秒)，即以秒为刻度的时间轮槽位
+- 每次调度写入未来一个默认检测周期(60s)内的全部检测点，检测频率与原 countdown 方式一致
+- alert_check 服务轮询各分片，批量取出到期的检测点后立即下发检测任务
+
+同一告警在同一时刻的检测点会被合并(member 相同)；多个 alert_check 进程同时取出时以 zrem 成功的一方为准。
+"""
+
+import logging
+import random
+import time
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+
+from alarm_backends.core.alert.alert import AlertKey
+from alarm_backends.core.cache.key import ALERT_CHECK_WHEEL_KEY
+from core.prometheus import metrics
+
+logger = logging.getLogger("alert.manager")
+
+
+class AlertCheckScheduler:
+    """
+    告警检测时间轮
+    """
+
+    # 单次写入的检测点数
+    SCHEDULE_CHUNK_SIZE = 5000
+    # 单个分片单次最多取出的检测点数
+    DRAIN_SIZE = 5000
+    # 检测计划覆盖的时间范围(秒)，与周期任务 check_abnormal_alert 的执行周期一致
+    SCHEDULE_HORIZON = 60
+
+    def __init__(self, shard_count: int = None):
+        self.shard_count = shard_count or settings.ALERT_CHECK_WHEEL_SHARD_COUNT
+        self.client = ALERT_CHECK_WHEEL_KEY.client
+
+    def get_shard(self, alert_id) -> int:
+        return zlib.crc32(str(alert_id).encode("utf-8")) % self.shard_count
+
+    @staticmethod
+    def get_wheel_key(shard: int):
+        return ALERT_CHECK_WHEEL_KEY.get_key(shard=shard)
+
+    @staticmethod
+    def encode_member(alert_key: AlertKey, check_interval: int, check_time: int) -> str:
+        return f"{alert_key}|{check_interval}|{check_time}"
+
+    @staticmethod
+    def decode_member(member: str) -> tuple[AlertKey, int, int]:
+        alert_id, strategy_id, check_interval, check_time = member.split("|")
+        return AlertKey(alert_id=alert_id, strategy_id=int(strategy_id)), int(check_interval), int(check_time)
+
+    def schedule(self, alerts_with_interval: dict[int, list[dict]], run_immediately: bool = True, now: int = None):
+        """
+        写入检测计划
+        :param alerts_with_interval: 按检测周期分组的告警 {check_interval: [{"id": xx, "strategy_id": xx}]}
+        :param run_immediately: 是否立即执行一次检测
+        :return: 写入的检测点数
+        """
+        now = int(now or time.time())
+        members_by_shard = defaultdict(dict)
+        for check_interval, alerts in alerts_with_interval.items():
+            if not alerts:
+                continue
+            offsets = list(range(0 if run_immediately else check_interval, self.SCHEDULE_HORIZON, check_interval))
+            for alert in alerts:
+                alert_key = AlertKey(alert_id=alert["id"], strategy_id=alert.get("strategy_id"))
+                members = members_by_shard[self.get_shard(alert_key.alert_id)]
+                for offset in offsets:
+                    members[self.encode_member(alert_key, check_interval, now + offset)] = now + offset
+            metrics.ALERT_CHECK_SCHEDULE_COUNT.labels(check_interval=check_interval).inc(len(alerts) * len(offsets))
+
+        if not members_by_shard:
+            return 0
+
+        pipeline = self.client.pipeline(transaction=False)
+        total = 0
+        for shard, members in members_by_shard.items():
+            key = self.get_wheel_key(shard)
+            items = list(members.items())
+            for index in range(0, len(items), self.SCHEDULE_CHUNK_SIZE):
+                pipeline.zadd(key, dict(items[index : index + self.SCHEDULE_CHUNK_SIZE]))
+            pipeline.expire(key, ALERT_CHECK_WHEEL_KEY.ttl)
+            total += len(items)
+        pipeline.execute()
+        return total
+
+    def drain(self, shard: int, now: float = None) -> tuple[list[tuple[AlertKey, int, int]], bool]:
+        """
+        取出分片中到期的检测点
+        :return: ([(alert_key, check_interval, check_time)], 是否还有未取完的到期检测点)
+        """
+        now = now or time.time()
+        key = self.get_wheel_key(shard)
+        members = self.client.zrangebyscore(key, "-inf", now, start=0, num=self.DRAIN_SIZE)
+        if not members:
+            return [], False
+
+        pipeline = self.client.pipeline(transaction=False)
+        for member in members:
+            pipeline.zrem(key, member)
+        results = pipeline.execute()
+
+        checks = []
+        for member, removed in zip(members, results):
+            # 已被其他进程取出
+            if not removed:
+                continue
+            try:
+                checks.append(self.decode_member(member))
+            except ValueError:
+                logger.warning("[alert check scheduler] invalid member(%s) in shard(%s), skip", member, shard)
+        return checks, len(members) >= self.DRAIN_SIZE
+
+    def poll(self, now: float = None) -> tuple[list[AlertKey], bool]:
+        """
+        轮询全部分片，取出到期的检测点并上报检测延迟
+        :return: (去重后的告警列表, 是否存在未取完的分片)
+        """
+        now = now or time.time()
+        alert_keys = {}
+        has_more = False
+        # 多个进程从不同分片开始轮询，减少 zrem 冲突
+        start = random.randint(0, self.shard_count - 1)
+        for index in range(self.shard_count):
+            shard = (start + index) % self.shard_count
+            checks, shard_has_more = self.drain(shard, now)
+            has_more = has_more or shard_has_more
+            for alert_key, check_interval, check_time in checks:
+                metrics.ALERT_CHECK_LAG.labels(check_interval=check_interval).observe(max(now - check_time, 0))
+                # 同一告警在本轮只检测一次
+                alert_keys.setdefault(str(alert_key), alert_key)
+        return list(alert_keys.values()), has_more
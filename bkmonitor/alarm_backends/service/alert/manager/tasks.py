@@ -11,6 +11,7 @@ specific language governing permissions and limitations under the License.
 import logging
 import time
 
+from django.conf import settings
 from elasticsearch.exceptions import ConnectionError as ESConnectionError
 from elasticsearch.exceptions import TransportError
 from elasticsearch.helpers import BulkIndexError
@@ -25,8 +26,10 @@ from alarm_backends.constants import CONST_ONE_DAY, CONST_ONE_HOUR
 from alarm_backends.core.alert.alert import Alert, AlertCache, AlertKey
 from alarm_backends.core.cache.strategy import StrategyCacheManager
 from alarm_backends.core.cluster import get_cluster_bk_biz_ids
+from alarm_backends.core.storage.es_bulk import bulk_writer
 from alarm_backends.core.storage.redis_cluster import PipelineResultMismatch
 from alarm_backends.service.alert.manager.processor import AlertManager
+from alarm_backends.service.alert.manager.scheduler import AlertCheckScheduler
 from alarm_backends.service.scheduler.app import app
 from bkmonitor.documents import AlertDocument, AlertLog
 from bkmonitor.documents.base import BulkActionType
@@ -41,6 +44,11 @@ BATCH_SIZE = 200
 DEFAULT_CHECK_INTERVAL = 60
 # ES 深分页每页大小
 SCAN_PAGE_SIZE = 5000
+# 策略聚合周期进程内缓存时间(秒)
+AGG_INTERVAL_CACHE_TTL = 60
+
+# 策略聚合周期进程内缓存 {strategy_id: (agg_interval, expire_time)}，agg_interval 为 None 表示策略无周期配置
+_agg_interval_cache = {}
 
 # 瞬态基础设施异常(计 deferred 而非 failed): 仅纳入"本批未 finalize、下一周期重跑可自愈"的类型，
 # 其余一律计 failed。收口原则——基于已知可恢复类型显式纳入，不用基类宽松匹配：否则会把代码 / 数据 /
@@ -159,6 +167,7 @@ def check_abnormal_alert():
 
     if alerts:
         send_check_task(alerts)
+        metrics.report_all()
 
 
 def check_blocked_alert():
@@ -222,7 +231,7 @@ def check_blocked_alert_finished(alert_keys):
             closed_alerts.append(alert.id)
     if alert_documents:
         try:
-            AlertDocument.bulk_create(alert_documents, action=BulkActionType.UPSERT)
+            bulk_writer.write(AlertDocument, alert_documents, action=BulkActionType.UPSERT)
         except BulkIndexError as e:
             logger.error(
                 "[check_blocked_alert_finished] save blocked alert document failed, total count(%s), "
@@ -238,7 +247,7 @@ def check_blocked_alert_finished(alert_keys):
 
     if alert_logs:
         try:
-            AlertLog.bulk_create(alert_logs)
+            bulk_writer.write(AlertLog, alert_logs)
         except BulkIndexError as e:
             logger.error(
                 "[check_blocked_alert_finished] save alert log document total count(%s) error: %s",
@@ -265,6 +274,17 @@ def send_check_task(alerts: list[dict], run_immediately=True):
 
     alert_ids_with_interval = cal_alerts_check_interval(alerts)
 
+    if settings.ALERT_CHECK_SCHEDULER_ENABLED:
+        # 检测计划写入时间轮，由 alert_check 服务到期后下发检测任务
+        AlertCheckScheduler().schedule(alert_ids_with_interval, run_immediately=run_immediately)
+        logger.info(
+            "[check_abnormal_alert] alerts(%s/60s, %s/30s, %s/15s) scheduled to alert check wheel",
+            len(alert_ids_with_interval[60]),
+            len(alert_ids_with_interval[30]),
+            len(alert_ids_with_interval[15]),
+        )
+        return
+
     for check_interval, alerts in alert_ids_with_interval.items():
         countdown = 0 if run_immediately else check_interval
         while countdown < DEFAULT_CHECK_INTERVAL:
@@ -332,13 +352,21 @@ def handle_alerts(alert_keys: list[AlertKey]):
     metrics.report_all()
 
 
+def dispatch_check_tasks(alert_keys: list[AlertKey]):
+    """
+    按批下发告警检测任务
+    """
+    for index in range(0, len(alert_keys), BATCH_SIZE):
+        handle_alerts.apply_async(expires=120, kwargs={"alert_keys": alert_keys[index : index + BATCH_SIZE]})
+
+
 def fetch_agg_interval(strategy_ids: list[int]):
     """
     根据策略ID获取每个策略的聚合周期
     """
     agg_interval_by_strategy = {}
 
-    strategies = StrategyCacheManager.get_strategy_by_ids(strategy_ids)
+    strategies = StrategyCacheManager.get_strategy_by_ids(strategy_ids, readonly=True)
 
     for strategy in strategies:
         for item in strategy["items"]:
@@ -359,6 +387,29 @@ def fetch_agg_interval(strategy_ids: list[int]):
     return agg_interval_by_strategy
 
 
+def fetch_agg_interval_with_cache(strategy_ids: list[int]):
+    """
+    根据策略ID获取每个策略的聚合周期，结果在进程内缓存，避免每批告警都重复读取策略缓存
+    """
+    now = time.time()
+    agg_interval_by_strategy = {}
+    missing_strategy_ids = []
+    for strategy_id in strategy_ids:
+        cache = _agg_interval_cache.get(strategy_id)
+        if cache is None or cache[1] < now:
+            missing_strategy_ids.append(strategy_id)
+        elif cache[0] is not None:
+            agg_interval_by_strategy[strategy_id] = cache[0]
+
+    if missing_strategy_ids:
+        fetched = fetch_agg_interval(strategy_ids=missing_strategy_ids)
+        expire_time = now + AGG_INTERVAL_CACHE_TTL
+        for strategy_id in missing_strategy_ids:
+            _agg_interval_cache[strategy_id] = (fetched.get(strategy_id), expire_time)
+        agg_interval_by_strategy.update(fetched)
+    return agg_interval_by_strategy
+
+
 def cal_alerts_check_interval(alerts: list[dict]):
     """
     计算告警的检查周期
@@ -379,7 +430,7 @@ def cal_alerts_check_interval(alerts: list[dict]):
         if strategy_id:
             strategy_ids.add(strategy_id)
 
-    agg_interval_config = fetch_agg_interval(strategy_ids=list(strategy_ids))
+    agg_interval_config = fetch_agg_interval_with_cache(strategy_ids=list(strategy_ids))
 
     for alert in alerts:
         strategy_id = alert.get("strategy_id")
@@ -18,6 +18,7 @@ from elasticsearch.helpers import BulkIndexError
 from alarm_backends.core.alert import Alert, Event
 from alarm_backends.core.alert.alert import AlertCache
 from alarm_backends.core.cache.key import ALERT_DEDUPE_CONTENT_KEY
+from alarm_backends.core.storage.es_bulk import bulk_writer
 from alarm_backends.service.composite.tasks import check_action_and_composite
 from bkmonitor.documents import AlertDocument, AlertLog
 from bkmonitor.documents.base import BulkActionType
@@ -108,7 +109,7 @@ class BaseAlertProcessor:
         start_time = time.time()
         errors = []
         try:
-            AlertDocument.bulk_create(alert_documents, action=action)
+            bulk_writer.write(AlertDocument, alert_documents, action=action)
         except BulkIndexError as e:
             logger.error("save alert document error: %s", e.errors)
             errors = e.errors
@@ -140,7 +141,7 @@ class BaseAlertProcessor:
         start_time = time.time()
         errors = []
         try:
-            AlertLog.bulk_create(log_documents)
+            bulk_writer.write(AlertLog, log_documents)
         except BulkIndexError as e:
             logger.error("[save alert log document] error: %s", e.errors)
             errors = e.errors
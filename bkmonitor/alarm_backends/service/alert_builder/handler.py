@@ -0,0 +1,117 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import atexit
+import logging
+import time
+
+from django.conf import settings
+
+from alarm_backends.core.handlers import base
+from alarm_backends.service.alert.builder.partition import AlertBuilderPartitionWorker
+from alarm_backends.service.alert.builder.processor import PartitionedAlertBuilder
+from core.prometheus import metrics
+
+logger = logging.getLogger("alert.builder")
+
+# 处理器每轮都会重新实例化，分区租约需要在进程内保持
+_worker: AlertBuilderPartitionWorker | None = None
+
+
+def get_partition_worker() -> AlertBuilderPartitionWorker:
+    global _worker
+    if _worker is None:
+        _worker = AlertBuilderPartitionWorker()
+        # 正常退出时释放租约，便于其他进程尽快接管
+        atexit.register(_worker.release_all)
+    return _worker
+
+
+class AlertBuilderHandler(base.BaseHandler):
+    """
+    告警生成分区消费服务：按租约独占分区，顺序处理分区内的事件生成告警
+    """
+
+    # 无待处理事件时的等待时间(秒)
+    IDLE_INTERVAL = 0.5
+    # 分区模式未开启时的等待时间(秒)
+    DISABLED_INTERVAL = 10
+
+    def handle(self):
+        worker = get_partition_worker()
+        if not settings.ALERT_BUILDER_PARTITION_ENABLED:
+            worker.release_all()
+            time.sleep(self.DISABLED_INTERVAL)
+            return
+
+        processed_count = 0
+        for partition in worker.rebalance():
+            processed_count += self.process_partition(worker, partition)
+        metrics.report_all()
+
+        if not processed_count:
+            time.sleep(self.IDLE_INTERVAL)
+
+    @staticmethod
+    def process_partition(worker: AlertBuilderPartitionWorker, partition: int) -> int:
+        """
+        处理分区队首的一批事件
+        :return: 成功处理的事件数
+        """
+        if not worker.can_process(partition, time.time()):
+            return 0
+
+        # 分区逐个顺序处理，处理前续约，避免单轮耗时超过租约时间后分区被其他进程抢占
+        if not worker.renew(partition):
+            worker.drop(partition)
+            return 0
+
+        events, fetch_count = worker.fetch(partition)
+        if not fetch_count:
+            return 0
+
+        builder = PartitionedAlertBuilder()
+        try:
+            builder.dedupe_events_to_alerts(events)
+        except Exception as e:  # noqa
+            retries = worker.record_failure(partition, time.time())
+            if retries < settings.ALERT_BUILDER_PARTITION_MAX_RETRIES:
+                # 处理失败时不确认消息，退避后重新处理
+                logger.exception(
+                    "[alert.builder partition] process partition(%s) failed, retry(%s): %s", partition, retries, e
+                )
+                return 0
+
+            # 多次失败后移入死信队列，避免阻塞分区
+            logger.exception(
+                "[alert.builder partition] process partition(%s) failed %s times, move %s events to dead letter: %s",
+                partition,
+                retries,
+                len(events),
+                e,
+            )
+            worker.dead_letter(partition, events)
+            worker.reset_failure(partition)
+            worker.ack(partition, fetch_count)
+            return 0
+
+        worker.reset_failure(partition)
+        if worker.ack(partition, fetch_count, builder.locked_events) is None:
+            # 租约已丢失，消息由新的持有者重新处理
+            return 0
+
+        now = time.time()
+        locked_event_ids = {id(event) for event in builder.locked_events}
+        for event in events:
+            create_time = event.data.get("create_time")
+            if id(event) in locked_event_ids or not create_time:
+                continue
+            metrics.ALERT_BUILDER_EVENT_TO_ALERT_LATENCY.labels(partition=partition).observe(max(now - create_time, 0))
+        return fetch_count - len(builder.locked_events)
@@ -0,0 +1,50 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+
+from alarm_backends.core.handlers import base
+from alarm_backends.service.alert.manager.scheduler import AlertCheckScheduler
+from alarm_backends.service.alert.manager.tasks import dispatch_check_tasks
+from core.prometheus import metrics
+
+logger = logging.getLogger("alert.manager")
+
+
+class AlertCheckHandler(base.BaseHandler):
+    """
+    告警检测调度服务：从检测时间轮中批量取出到期的检测点，下发告警检测任务
+    """
+
+    # 无到期检测点时的等待时间(秒)
+    IDLE_INTERVAL = 1
+    # 调度未开启时的等待时间(秒)
+    DISABLED_INTERVAL = 10
+
+    def handle(self):
+        if not settings.ALERT_CHECK_SCHEDULER_ENABLED:
+            time.sleep(self.DISABLED_INTERVAL)
+            return
+
+        start_time = time.time()
+        alert_keys, has_more = AlertCheckScheduler().poll(start_time)
+        if alert_keys:
+            dispatch_check_tasks(alert_keys)
+            logger.info(
+                "[alert check scheduler] dispatch alerts(%s) cost: %.3fs", len(alert_keys), time.time() - start_time
+            )
+            metrics.report_all()
+
+        # 仍有未取完的到期检测点时立即进入下一轮
+        if not has_more:
+            time.sleep(self.IDLE_INTERVAL)
@@ -0,0 +1,217 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+告警屏蔽配置索引
+
+业务下的屏蔽配置在进程内编译一次(AlertShieldObj)，并按等值维度建立倒排索引：
+- 屏蔽配置的顶层维度条件中，若存在 strategy_id/bk_host_id/service_instance_id/bk_topo_node 的等值条件，
+  则该配置只可能命中对应维度值的告警，按其中一个维度(值最少的)建立索引
+- 其余配置(如纯维度条件屏蔽、动态条件)作为通用候选，每条告警都需要检查
+
+匹配时先根据告警维度取出候选配置，再逐条执行完整的 is_match，结果与全量线性匹配一致。
+索引以屏蔽缓存的版本号为准，缓存刷新后自动重建。
+单条屏蔽配置编译失败时只跳过该配置；重建失败时沿用上一次构建成功的索引，并按退避时间重试。
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from alarm_backends.core.cache.shield import ShieldCacheManager
+from alarm_backends.service.converge.shield.shield_obj import AlertShieldObj
+from bkmonitor.utils.range import load_field_instance
+from bkmonitor.utils.range.conditions import AndCondition, EqualCondition
+
+logger = logging.getLogger("fta_action.shield")
+
+# 参与索引的维度，按优先级排列
+INDEX_FIELDS = ("strategy_id", "bk_host_id", "service_instance_id", "bk_topo_node")
+
+
+class ShieldIndex:
+    """
+    单个业务的屏蔽配置索引
+    """
+
+    def __init__(self, shield_objs: list, version: str = ""):
+        self.version = version
+        self.create_time = time.time()
+        self.shield_objs = shield_objs
+        self.shield_objs_by_id = {str(shield_obj.id): shield_obj for shield_obj in shield_objs}
+        # field -> value -> [shield_obj 下标]
+        self.index = {field: {} for field in INDEX_FIELDS}
+        # 无法建立索引的屏蔽配置下标
+        self.unindexed = []
+
+        for position, shield_obj in enumerate(shield_objs):
+            index_key = self.get_index_key(shield_obj)
+            if index_key is None:
+                self.unindexed.append(position)
+                continue
+            field, values = index_key
+            for value in values:
+                self.index[field].setdefault(value, []).append(position)
+
+    @property
+    def configs(self):
+        return [shield_obj.config for shield_obj in self.shield_objs]
+
+    @staticmethod
+    def get_index_key(shield_obj):
+        """
+        获取屏蔽配置的索引维度及维度值，无法建立索引时返回 None
+        仅处理顶层 AND 中的等值条件，此类条件在维度不存在或不相交时必然不命中
+        """
+        dimension_check = getattr(shield_obj, "dimension_check", None)
+        if not isinstance(dimension_check, AndCondition):
+            return None
+
+        candidates = {}
+        for condition in dimension_check.conditions:
+            if type(condition) is not EqualCondition or condition.default_value_if_not_exists:
+                continue
+            field = condition.cond_field.name
+            if field not in INDEX_FIELDS:
+                continue
+            values = set(condition.cond_field.to_str_list())
+            # 同一维度存在多个等值条件时取交集
+            candidates[field] = candidates[field] & values if field in candidates else values
+
+        if not candidates:
+            return None
+
+        field = min(candidates, key=lambda f: (len(candidates[f]), INDEX_FIELDS.index(f)))
+        return field, candidates[field]
+
+    def get_candidates(self, dimension: dict) -> list:
+        """
+        根据告警维度获取候选屏蔽配置，保持配置原有顺序
+        """
+        positions = set(self.unindexed)
+        for field, value_index in self.index.items():
+            if not value_index:
+                continue
+            # 与 EqualCondition 保持一致的取值及字符串转换逻辑
+            is_exists, value = load_field_instance(field, None).get_value_from_data(dimension)
+            if not is_exists:
+                continue
+            for str_value in load_field_instance(field, value).to_str_list():
+                positions.update(value_index.get(str_value, ()))
+        return [self.shield_objs[position] for position in sorted(positions)]
+
+    def match(self, alert) -> list:
+        """
+        获取命中告警的屏蔽配置
+        """
+        if not self.shield_objs:
+            return []
+        dimension = AlertShieldObj._get_cached_alert_dimension(alert)
+        return [shield_obj for shield_obj in self.get_candidates(dimension) if shield_obj.is_match(alert)]
+
+
+class ShieldIndexManager:
+    """
+    进程级屏蔽索引缓存，按业务缓存，版本号变化时重建
+    """
+
+    # 索引最长复用时间(秒)，动态分组等外部数据变化时依赖该时间兜底刷新
+    INDEX_TTL = 60
+    # 最多缓存的业务数
+    MAX_SIZE = 1000
+    # 重建失败后重试的初始等待时间(秒)及最大等待时间(秒)，等待期间沿用上一次构建成功的索引
+    RETRY_BACKOFF = 1
+    MAX_RETRY_BACKOFF = 30
+
+    _indexes = OrderedDict()
+    # 业务ID -> (连续失败次数, 下次重试时间)
+    _failures = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def build(cls, bk_biz_id, version: str = "") -> ShieldIndex:
+        """
+        编译业务下的屏蔽配置并建立索引，单条配置编译失败时仅跳过该配置
+        """
+        shield_objs = []
+        for config in ShieldCacheManager.get_shields_by_biz_id(bk_biz_id):
+            try:
+                shield_objs.append(AlertShieldObj(config))
+            except Exception as error:  # noqa
+                logger.exception(
+                    "[shield index] biz(%s) shield(%s) compile failed: %s", bk_biz_id, config.get("id"), error
+                )
+        return ShieldIndex(shield_objs, version)
+
+    @classmethod
+    def get(cls, bk_biz_id) -> ShieldIndex:
+        with cls._lock:
+            last_index = cls._indexes.get(bk_biz_id)
+            failure_count, retry_time = cls._failures.get(bk_biz_id, (0, 0))
+        if last_index is not None and time.time() < retry_time:
+            return last_index
+
+        try:
+            version = ShieldCacheManager.get_shield_version(bk_biz_id)
+            if (
+                version
+                and last_index is not None
+                and last_index.version == version
+                and time.time() - last_index.create_time < cls.INDEX_TTL
+            ):
+                with cls._lock:
+                    if bk_biz_id in cls._indexes:
+                        cls._indexes.move_to_end(bk_biz_id)
+                return last_index
+
+            shield_index = cls.build(bk_biz_id, version)
+        except Exception as error:  # noqa
+            # 无可用索引时由调用方处理异常
+            if last_index is None:
+                raise
+            failure_count += 1
+            backoff = min(cls.RETRY_BACKOFF * 2 ** (failure_count - 1), cls.MAX_RETRY_BACKOFF)
+            with cls._lock:
+                cls._failures[bk_biz_id] = (failure_count, time.time() + backoff)
+            logger.exception(
+                "[shield index] biz(%s) rebuild failed(%s), use last index version(%s), retry after %ss: %s",
+                bk_biz_id,
+                failure_count,
+                last_index.version,
+                backoff,
+                error,
+            )
+            return last_index
+
+        logger.debug(
+            "[shield index] biz(%s) version(%s) rebuild, shields(%s) unindexed(%s)",
+            bk_biz_id,
+            version,
+            len(shield_index.shield_objs),
+            len(shield_index.unindexed),
+        )
+
+        with cls._lock:
+            cls._failures.pop(bk_biz_id, None)
+            # 无版本号(缓存刷新前的旧数据)时不缓存索引
+            if version:
+                cls._indexes[bk_biz_id] = shield_index
+                cls._indexes.move_to_end(bk_biz_id)
+                while len(cls._indexes) > cls.MAX_SIZE:
+                    evicted_biz_id, _ = cls._indexes.popitem(last=False)
+                    cls._failures.pop(evicted_biz_id, None)
+        return shield_index
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._indexes.clear()
+            cls._failures.clear()
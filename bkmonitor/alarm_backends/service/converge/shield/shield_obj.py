@@ -57,12 +57,22 @@ class ShieldObj:
         self.id = config["id"]
 
         self.dimension_check = None
+        self._dimension_matcher = None
         self.time_check = None
         self.notice_lock_key = NOTICE_SHIELD_KEY_LOCK.get_key(shield_id=self.config["id"])
         self.display_manager = DisplayManager()
         self._parse_dimension_config()
         self._parse_cycle_config()
 
+    @property
+    def dimension_matcher(self):
+        """
+        编译后的维度匹配函数，屏蔽配置会被多条告警复用，只需编译一次
+        """
+        if self._dimension_matcher is None:
+            self._dimension_matcher = self.dimension_check.compile()
+        return self._dimension_matcher
+
     @property
     def is_dimension_scope(self):
         return self.config["category"] == ShieldCategory.DIMENSION
@@ -260,7 +270,7 @@ class ShieldObj:
         if "bk_target_cloud_id" in dimension and "bk_cloud_id" not in dimension:
             dimension["bk_cloud_id"] = dimension["bk_target_cloud_id"]
 
-        return self.time_check.is_match(source_time) and self.dimension_check.is_match(dimension)
+        return self.time_check.is_match(source_time) and self.dimension_matcher(dimension)
 
     def get_now_datetime(self):
         """
@@ -532,4 +542,4 @@ class AlertShieldObj(ShieldObj):
 
     def is_match(self, alert: AlertDocument):
         source_time = arrow.now()
-        return self.time_check.is_match(source_time) and self.dimension_check.is_match(self.get_dimension(alert))
+        return self.time_check.is_match(source_time) and self.dimension_matcher(self.get_dimension(alert))
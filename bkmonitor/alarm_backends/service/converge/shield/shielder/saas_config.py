@@ -18,10 +18,10 @@ from django.utils.translation import gettext as _
 
 from alarm_backends.core.cache.cmdb import HostManager
 from alarm_backends.core.cache.key import ALERT_SHIELD_SNAPSHOT
-from alarm_backends.core.cache.shield import ShieldCacheManager
 from alarm_backends.core.control.strategy import Strategy
 from alarm_backends.core.i18n import i18n
 from alarm_backends.service.alert.qos.influence import get_failure_scope_config
+from alarm_backends.service.converge.shield.shield_index import ShieldIndex, ShieldIndexManager
 from alarm_backends.service.converge.shield.shield_obj import AlertShieldObj
 from bkmonitor.documents.alert import AlertDocument
 from bkmonitor.models import ActionInstance, time_tools
@@ -52,7 +52,8 @@ class AlertShieldConfigShielder(BaseShielder):
         if config_ids:
             # 已经进行过屏蔽匹配了， 这里直接返回
             config_ids: list[str] = json.loads(config_ids)
-            return [AlertShieldObj(config) for config in self.configs if str(config["id"]) in config_ids]
+            shield_objs_by_id = self.shield_index.shield_objs_by_id
+            return [shield_objs_by_id[config_id] for config_id in config_ids if config_id in shield_objs_by_id]
         return None
 
     def set_shield_objs_cache(self):
@@ -68,7 +69,9 @@ class AlertShieldConfigShielder(BaseShielder):
     def __init__(self, alert: AlertDocument):
         self.alert = alert
         try:
-            self.configs = ShieldCacheManager.get_shields_by_biz_id(self.alert.event.bk_biz_id)
+            # 屏蔽配置在进程内编译并建立索引，缓存刷新后自动重建
+            self.shield_index = ShieldIndexManager.get(self.alert.event.bk_biz_id)
+            self.configs = self.shield_index.configs
             config_ids: list[str] = ",".join([str(config["id"]) for config in self.configs])
             logger.debug(
                 "[load shield] alert(%s) strategy(%s) ids:(%s)",
@@ -77,6 +80,7 @@ class AlertShieldConfigShielder(BaseShielder):
                 config_ids,
             )
         except BaseException as error:
+            self.shield_index = ShieldIndex([])
             self.configs = []
             logger.exception(
                 "[load shield failed] alert(%s) strategy(%s) detail:(%s)", self.alert.id, self.alert.strategy_id, error
@@ -85,11 +89,7 @@ class AlertShieldConfigShielder(BaseShielder):
         shield_objs_cache = self.get_shield_objs_from_cache()
         from_cache = True
         if shield_objs_cache is None:
-            self.shield_objs = []
-            for config in self.configs:
-                shield_obj = AlertShieldObj(config)
-                if shield_obj.is_match(alert):
-                    self.shield_objs.append(shield_obj)
+            self.shield_objs = self.shield_index.match(alert)
             self.set_shield_objs_cache()
             from_cache = False
         else:
@@ -9,6 +9,7 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import json
 
 import arrow
 import six
@@ -19,18 +20,64 @@ class DataPoint(object):
     access 拉取的数据，在detect模块的一层封装
     """
 
+    # 标准字段使用 slots 存储，不保留原始数据 dict，减少大批量数据点的内存占用；
+    # 非标准字段(包括 "__" 开头的调试字段)保存在 _extra 中，as_dict() 时还原
+    __slots__ = (
+        "item",
+        "record_id",
+        "value",
+        "values",
+        "dimensions",
+        "time",
+        "dimension_fields",
+        "access_time",
+        "is_partial",
+        "_extra",
+    )
+
+    # access 推送的标准字段
+    standard_fields = frozenset(__slots__[1:-1])
+
     # 定义DataPoint必须拥有的属性
     context_field = ["value", "timestamp", "unit", "item"]
 
     def __init__(self, accessed_data, item):
         self.item = item
-        self._raw_input = accessed_data
+        self._extra = None
         for k, v in six.iteritems(accessed_data):
-            if not k.startswith("__"):
+            if k in self.standard_fields:
                 setattr(self, k, v)
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[k] = v
+
+    def __getattr__(self, name):
+        # 仅在标准字段中找不到时调用，非标准字段从 _extra 中获取
+        if name.startswith("_"):
+            raise AttributeError(name)
+        extra = self._extra
+        if extra is not None and name in extra:
+            return extra[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def as_dict(self):
-        return self._raw_input
+        data = {}
+        for field in self.__slots__[1:-1]:
+            if hasattr(self, field):
+                data[field] = getattr(self, field)
+        if isinstance(data.get("dimension_fields"), tuple):
+            data["dimension_fields"] = list(data["dimension_fields"])
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    @property
+    def is_debug(self):
+        """
+        调试数据(携带 __debug__ 字段)
+        """
+        return bool(self._extra) and "__debug__" in self._extra
 
     # data_point attribute
     @property
@@ -51,6 +98,49 @@ class DataPoint(object):
     def __repr__(self):
         return str(self.as_dict())
 
+    @classmethod
+    def load_records(cls, records, item):
+        """
+        批量反序列化 access 推送的数据记录
+        - 整批一次性解析，同批记录的字段名及维度名在解析时共享同一字符串对象，减少内存占用及解析耗时
+        - 同一策略的数据点维度字段基本相同，相同的 dimension_fields 共享同一个 tuple
+        :return: (数据点列表, 非期望格式的记录列表)
+        """
+        if not records:
+            return [], []
+
+        try:
+            accessed_data_list = json.loads("[" + ",".join(records) + "]")
+        except ValueError:
+            accessed_data_list = None
+
+        if accessed_data_list is None or len(accessed_data_list) != len(records):
+            # 存在非法记录时，逐条解析
+            accessed_data_list = []
+            for record in records:
+                try:
+                    accessed_data_list.append(json.loads(record))
+                except ValueError:
+                    accessed_data_list.append(None)
+
+        data_points, unexpected_records = [], []
+        shared_dimension_fields = {}
+        for record, accessed_data in zip(records, accessed_data_list):
+            if accessed_data is None:
+                unexpected_records.append(record)
+                continue
+            try:
+                data_point = cls(accessed_data, item)
+            except ValueError:
+                unexpected_records.append(record)
+                continue
+            dimension_fields = getattr(data_point, "dimension_fields", None)
+            if isinstance(dimension_fields, list):
+                dimension_fields = tuple(dimension_fields)
+                data_point.dimension_fields = shared_dimension_fields.setdefault(dimension_fields, dimension_fields)
+            data_points.append(data_point)
+        return data_points, unexpected_records
+
 
 class AnomalyDataPoint(object):
     """
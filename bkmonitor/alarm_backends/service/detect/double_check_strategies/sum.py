@@ -262,7 +262,7 @@ class DoubleCheckSumStrategy(DoubleCheckStrategy):
                         CHECK_RESULT_CACHE_KEY.client.zrem(check_cache_key, f"{_point_timestamp}|{ANOMALY_LABEL}")
                     if "__debug__" in anomaly_point["data"]:
                         for point in origin_points:
-                            logger.info(f"[二次检测] new point: {point.__dict__}")
+                            logger.info(f"[二次检测] new point: {point.data}")
                             point.data.update({"__debug__": True})
                     return self.push_to_detect(origin_points)
 
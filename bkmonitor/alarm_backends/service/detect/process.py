@@ -8,7 +8,6 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-import json
 import logging
 import time
 
@@ -27,12 +26,13 @@ logger = logging.getLogger("detect")
 
 
 class DetectProcess(BaseAbnormalPushProcessor):
-    def __init__(self, strategy_id: str):
+    def __init__(self, strategy_id: str, strategy: Strategy | None = None):
         # note: 这里有个坑，进来的策略id是字符串
         self.strategy_id = strategy_id
         self.inputs = {}
         self.outputs = {}
-        self.strategy = Strategy(strategy_id)
+        # 调用方已持有策略对象时直接复用，避免重复加载策略配置
+        self.strategy = strategy or Strategy(strategy_id)
         i18n.set_biz(self.strategy.bk_biz_id)
         self.is_busy = False
 
@@ -78,23 +78,16 @@ class DetectProcess(BaseAbnormalPushProcessor):
         # 上报detect拉取数据量
         metrics.DETECT_PROCESS_DATA_COUNT.labels(strategy_id=metrics.TOTAL_TAG, type="pull").inc(len(records))
 
-        unexpected_record_count = 0
-        last_unexpected_record = None
         if records:
             client.ltrim(data_channel, 0, -offset - 1)
             # 队列左进右出，lrange 取出时需要做一次倒序才能保证先进先出
-            for record in reversed(records):
-                try:
-                    data_point = DataPoint(json.loads(record), item)
-                    # fill data point into inputs list
-                    self.inputs[item.id].append(data_point)
-                except ValueError:
-                    unexpected_record_count += 1
-                    last_unexpected_record = record
-            if unexpected_record_count > 0:
+            data_points, unexpected_records = DataPoint.load_records(records[::-1], item)
+            # fill data point into inputs list
+            self.inputs[item.id].extend(data_points)
+            if unexpected_records:
                 logger.error(
-                    f"[detect] strategy({self.strategy_id}) item({item.id}) 发现非期望格式的待检测数据{unexpected_record_count}条,"
-                    f" 其中之一: {last_unexpected_record}"
+                    f"[detect] strategy({self.strategy_id}) item({item.id}) 发现非期望格式的待检测数据{len(unexpected_records)}条,"
+                    f" 其中之一: {unexpected_records[-1]}"
                 )
 
             logger.info(
@@ -114,7 +107,12 @@ class DetectProcess(BaseAbnormalPushProcessor):
 
         NewSeries.bootstrap_empty_batch(item)
 
-    def push_data(self):
+    def push_data(self, pipeline=None, anomaly_signal_list=None):
+        """
+        推送异常数据
+        :param pipeline: 外部传入的 redis pipeline，传入时只写入命令，由调用方统一执行并推送信号
+        :param anomaly_signal_list: 外部传入的异常信号列表，与 pipeline 配合使用
+        """
         current_time = time.time()
         max_latency = 0
         for data_points in self.outputs.values():
@@ -142,7 +140,9 @@ class DetectProcess(BaseAbnormalPushProcessor):
                 bk_biz_id=self.strategy.bk_biz_id,
                 strategy_name=self.strategy.name,
             ).observe(max_latency)
-        anomaly_count = self.push_abnormal_data(self.outputs, self.strategy_id)
+        anomaly_count = self.push_abnormal_data(
+            self.outputs, self.strategy_id, anomaly_signal_list=anomaly_signal_list, pipeline=pipeline
+        )
         if anomaly_count > 1000:
             # 获取 Redis 节点信息（带异常处理）
             try:
@@ -193,3 +193,88 @@ class DetectProcess(BaseAbnormalPushProcessor):
             end_at = time.time()
             logger.info(f"[detect][latency] strategy({self.strategy_id}) processing end in {end_at - start_at}")
             metrics.DETECT_PROCESS_TIME.labels(strategy_id=metrics.TOTAL_TAG).observe(end_at - start_at)
+
+
+class GroupDetectProcess:
+    """
+    策略组级别的检测执行器，用于 access-detect 合并处理
+
+    同一策略组内的 item 共享查询结果，执行器只遍历一次数据记录，将记录分发给所有保留该记录的 item；
+    同一策略只创建一个 DetectProcess 并生成一次策略快照；所有 item 的异常数据通过一个 pipeline 推送。
+    """
+
+    def __init__(self, items):
+        self.items = items
+        # strategy_id -> DetectProcess
+        self.detect_processes: dict[int, DetectProcess] = {}
+        # item_id -> 参与检测的记录
+        self.item_records: dict[int, list] = {item.id: [] for item in items}
+
+    def get_detect_process(self, item) -> DetectProcess:
+        strategy_id = item.strategy.id
+        detect_process = self.detect_processes.get(strategy_id)
+        if detect_process is None:
+            detect_process = DetectProcess(strategy_id, strategy=item.strategy)
+            # 生成策略快照（与 detect 模块保持一致），同一策略只生成一次
+            detect_process.strategy.gen_strategy_snapshot()
+            self.detect_processes[strategy_id] = detect_process
+        return detect_process
+
+    def dispatch(self, records) -> dict[int, list[DataPoint]]:
+        """
+        遍历一次数据记录，分发到各个 item
+        过滤条件与原有 push 逻辑一致：is_retains 且非 inhibitions
+        :return: item_id -> 数据点列表
+        """
+        item_data_points = {item.id: [] for item in self.items}
+        for record in records:
+            is_retains = record.is_retains
+            inhibitions = record.inhibitions
+            for item in self.items:
+                if not is_retains.get(item.id) or inhibitions.get(item.id):
+                    continue
+                try:
+                    data_point = DataPoint(record.data, item)
+                except ValueError as e:
+                    logger.warning(
+                        f"[access-detect-merge] strategy({item.strategy.id}) item({item.id}) "
+                        f"failed to create DataPoint: {e}"
+                    )
+                    continue
+                item_data_points[item.id].append(data_point)
+                self.item_records[item.id].append(record)
+        return item_data_points
+
+    def detect(self, records):
+        """
+        执行检测及二次确认
+        :return: item_id -> 数据点列表
+        """
+        item_data_points = self.dispatch(records)
+        for item in self.items:
+            detect_process = self.get_detect_process(item)
+            # pull_data 支持直接传入数据，不需要从 Redis 拉取
+            detect_process.pull_data(item, inputs=item_data_points[item.id])
+            detect_process.handle_data(item)
+            try:
+                detect_process.double_check(item)
+            except Exception:
+                logger.exception(
+                    "[access-detect-merge] strategy(%s) 二次确认时发生异常，不影响告警主流程", item.strategy.id
+                )
+        return item_data_points
+
+    def push_data(self):
+        """
+        所有策略的异常数据通过同一个 pipeline 推送，数据写入完成后再统一推送信号
+        """
+        if not self.detect_processes:
+            return
+        pipeline = key.ANOMALY_LIST_KEY.client.pipeline(transaction=False)
+        anomaly_signal_list = []
+        for detect_process in self.detect_processes.values():
+            detect_process.push_data(pipeline=pipeline, anomaly_signal_list=anomaly_signal_list)
+
+        if anomaly_signal_list:
+            pipeline.execute()
+            DetectProcess.push_anomaly_signal(anomaly_signal_list)
@@ -14,8 +14,9 @@ import functools
 import inspect
 import json
 import logging
+import threading
 import time
-from collections import Counter
+from collections import Counter, OrderedDict
 
 from django.conf import settings
 from django.template import Context, Template
@@ -85,7 +86,7 @@ class Algorithms:
                 raise InvalidDataPoint(data_point=data_point)
 
         context = self.get_context(data_point)
-        if "__debug__" not in data_point.as_dict():
+        if not data_point.is_debug:
             return eval(self.byte_code, {}, context)
         # debug only
         ret = False
@@ -294,15 +295,125 @@ class BasicAlgorithmsCollection(Algorithms):
         return context
 
 
+class HistoryPointCache:
+    """
+    进程内历史数据缓存(LRU)
+    key: (strategy_id, item_id, timestamp)
+    value: {dimensions_md5: raw_data}，与 HISTORY_DATA_KEY 对应 hash 的内容一致
+    同一策略下的多个同比环比算法实例共享，避免对同一历史时刻重复 hgetall
+    单个 value 包含策略在该时刻的全部维度，除 key 数量外，还按缓存的数据点总数限制内存占用
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # 缓存的数据点总数
+        self._points = 0
+
+    @property
+    def max_size(self):
+        return settings.DETECT_HISTORY_CACHE_MAX_SIZE
+
+    @property
+    def max_points(self):
+        return settings.DETECT_HISTORY_CACHE_MAX_POINTS
+
+    @property
+    def ttl(self):
+        return settings.DETECT_HISTORY_CACHE_TTL
+
+    def _pop(self, cache_key):
+        _, value = self._data.pop(cache_key)
+        self._points -= len(value)
+
+    def _evict(self):
+        max_size, max_points = self.max_size, self.max_points
+        while self._data and (len(self._data) > max_size or self._points > max_points):
+            _, (_, value) = self._data.popitem(last=False)
+            self._points -= len(value)
+
+    def get(self, cache_key):
+        with self._lock:
+            cached = self._data.get(cache_key)
+            if cached is None:
+                return None
+            expire_at, value = cached
+            if expire_at < time.time():
+                self._pop(cache_key)
+                return None
+            self._data.move_to_end(cache_key)
+            return value
+
+    def set(self, cache_key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            if cache_key in self._data:
+                self._pop(cache_key)
+            # 单个 value 超过数据点上限时不缓存
+            if len(value) > self.max_points:
+                return
+            self._data[cache_key] = (time.time() + self.ttl, value)
+            self._points += len(value)
+            self._evict()
+
+    def update(self, cache_key, value):
+        """
+        合并新发布的数据，仅在缓存已存在时生效(缓存中只保存完整的 hash 内容)
+        """
+        with self._lock:
+            cached = self._data.get(cache_key)
+            if cached is None:
+                return
+            expire_at, origin_value = cached
+            merged_value = {**origin_value, **value}
+            self._data[cache_key] = (expire_at, merged_value)
+            self._points += len(merged_value) - len(origin_value)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._points = 0
+
+
+history_point_cache = HistoryPointCache()
+
+
+def encode_history_point(point):
+    """
+    历史数据点编码
+    紧凑格式仅保存 [value, time]，dimensions_md5 由 hash field 保存，解码时还原 record_id
+    """
+    if settings.DETECT_HISTORY_COMPACT_ENCODING:
+        return json.dumps([point.value, point.timestamp])
+    return json.dumps(point.as_dict())
+
+
+def decode_history_point(raw_data, dimensions_md5):
+    """
+    历史数据点解码，兼容完整格式(dict)和紧凑格式(list)
+    """
+    data = json.loads(raw_data)
+    if isinstance(data, list):
+        value, timestamp = data
+        return {"value": value, "time": timestamp, "record_id": f"{dimensions_md5}.{timestamp}"}
+    return data
+
+
 class HistoryPointFetcher:
     def set_default(self, value: int):
         self._default = value
 
     def query_history_points(self, data_points):
         item = data_points[0].item
+        agg_interval = item.query_configs[0]["agg_interval"]
         # 按时间从小到大排序
         sorted_data_points = sorted(data_points, key=lambda x: x.timestamp)
         offsets = self.get_history_offsets(item)
+
+        # 计算每个 offset 对应的历史时间范围
+        history_ranges = []
         for offset in offsets:
             # offsets 支持区间（相邻offset之间差值等于interval的整数倍）批量查询
             if isinstance(offset, tuple):
@@ -314,22 +425,31 @@ class HistoryPointFetcher:
                 self._publish_history_points(item, data_points)
                 continue
 
-            records = []
             from_timestamp, until_timestamp = (
                 sorted_data_points[0].timestamp - end,
-                sorted_data_points[-1].timestamp - start + item.query_configs[0]["agg_interval"],
+                sorted_data_points[-1].timestamp - start + agg_interval,
             )
+            history_ranges.append((from_timestamp, until_timestamp))
 
-            accessed = None
-            for history_timestamp in range(from_timestamp, until_timestamp, item.query_configs[0]["agg_interval"]):
-                if accessed is None:
-                    accessed = True
-                accessed = accessed and self._check_history_points(item, history_timestamp)
+        # 一次性批量拉取所有历史时刻的数据，同时可判断历史时刻的数据是否已经查过
+        history_timestamps = set()
+        for from_timestamp, until_timestamp in history_ranges:
+            history_timestamps.update(range(from_timestamp, until_timestamp, agg_interval))
+        self._prefetch_history_points(item, sorted(history_timestamps))
 
+        history_key_maker = functools.partial(
+            key.HISTORY_DATA_KEY.get_key, strategy_id=item.strategy.id, item_id=item.id
+        )
+        for from_timestamp, until_timestamp in history_ranges:
+            accessed = all(
+                self._local_history_storage.get(history_key_maker(timestamp=history_timestamp))
+                for history_timestamp in range(from_timestamp, until_timestamp, agg_interval)
+            )
             if accessed:
                 # 历史时刻的数据都已经查过
                 continue
 
+            records = []
             item_records = item.query_record(from_timestamp, until_timestamp)
             if item.query.is_partial:
                 # 历史数据查询结果不完整（VM vmstorage 节点临时不可用），跳过本次缓存写入，等待下个周期重新触发。
@@ -352,18 +472,44 @@ class HistoryPointFetcher:
                 if point.value:
                     records.append(adapter_data_access_2_detect(point, item))
 
-            self._local_history_storage = {}
             self._publish_history_points(item, records)
 
-    def _check_history_points(self, item, history_timestamp):
+    def _prefetch_history_points(self, item, history_timestamps):
         """
-        检查历史时刻的数据是否已经拉取过，如果存在，则更新过期时间。
+        批量拉取历史时刻的数据，优先使用进程内缓存，未命中的部分通过一次 pipeline hgetall 获取
         """
-        client = key.HISTORY_DATA_KEY.client
-        history_key = key.HISTORY_DATA_KEY.get_key(
-            strategy_id=item.strategy.id, item_id=item.id, timestamp=history_timestamp
-        )
-        return client.exists(history_key)
+        if not hasattr(self, "_local_history_storage"):
+            self._local_history_storage = {}
+
+        missing_keys = []
+        for history_timestamp in history_timestamps:
+            history_key = key.HISTORY_DATA_KEY.get_key(
+                strategy_id=item.strategy.id, item_id=item.id, timestamp=history_timestamp
+            )
+            cached = history_point_cache.get((item.strategy.id, item.id, history_timestamp))
+            if cached is not None:
+                self._local_history_storage[history_key] = cached
+            else:
+                missing_keys.append((history_timestamp, history_key))
+
+        if not missing_keys:
+            return
+
+        try:
+            pipeline = key.HISTORY_DATA_KEY.client.pipeline(transaction=False)
+            for missing_key in missing_keys:
+                pipeline.hgetall(missing_key[1])
+            results = pipeline.execute()
+        except Exception as e:  # noqa
+            # 预取失败不影响检测，由 fetch_history_point 逐个回源查询
+            logger.exception("strategy(%s) item(%s) prefetch history points failed: %s", item.strategy.id, item.id, e)
+            return
+
+        for (history_timestamp, history_key), result in zip(missing_keys, results):
+            self._local_history_storage[history_key] = result
+            # 空结果表示历史数据尚未写入，不进入进程内缓存
+            if result:
+                history_point_cache.set((item.strategy.id, item.id, history_timestamp), result)
 
     def _publish_history_points(self, item, history_points):
         """
@@ -379,12 +525,24 @@ class HistoryPointFetcher:
         history_points_map = {}
         for point in history_points:
             points_with_timestamp_map = history_points_map.setdefault(point.timestamp, {})
-            points_with_timestamp_map[point.record_id.split(".")[0]] = json.dumps(point.as_dict())
+            points_with_timestamp_map[point.record_id.split(".")[0]] = encode_history_point(point)
 
+        local_history_storage = getattr(self, "_local_history_storage", None) or {}
         for timestamp, _points_with_timestamp_map in history_points_map.items():
             history_key = history_key_maker(timestamp=timestamp)
             pipeline.hmset(history_key, _points_with_timestamp_map)
             pipeline.expire(history_key, key.HISTORY_DATA_KEY.ttl)
+
+            # 同步更新本地及进程内缓存，避免发布后再次回源
+            cache_key = (item.strategy.id, item.id, timestamp)
+            if history_key in local_history_storage:
+                local_history_storage[history_key] = {
+                    **local_history_storage[history_key],
+                    **_points_with_timestamp_map,
+                }
+                history_point_cache.set(cache_key, local_history_storage[history_key])
+            else:
+                history_point_cache.update(cache_key, _points_with_timestamp_map)
         pipeline.execute()
 
     def fetch_history_point(self, item, point, history_timestamp):
@@ -399,15 +557,22 @@ class HistoryPointFetcher:
             self._local_history_storage = {}
 
         if history_key not in self._local_history_storage:
-            self._local_history_storage[history_key] = client.hgetall(history_key)
-
-        raw_data = self._local_history_storage[history_key].get(point.record_id.split(".")[0])
+            cache_key = (item.strategy.id, item.id, history_timestamp)
+            history_data = history_point_cache.get(cache_key)
+            if history_data is None:
+                history_data = client.hgetall(history_key)
+                if history_data:
+                    history_point_cache.set(cache_key, history_data)
+            self._local_history_storage[history_key] = history_data
+
+        dimensions_md5 = point.record_id.split(".")[0]
+        raw_data = self._local_history_storage[history_key].get(dimensions_md5)
         if not raw_data:
             if getattr(self, "_default", None) is not None:
                 return DataPoint({"value": self._default, "time": history_timestamp}, item)
             return
 
-        return DataPoint(json.loads(raw_data), item)
+        return DataPoint(decode_history_point(raw_data, dimensions_md5), item)
 
     def get_history_offsets(self, item):
         """
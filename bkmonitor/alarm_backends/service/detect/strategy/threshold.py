@@ -15,15 +15,30 @@ specific language governing permissions and limitations under the License.
 
 import ast
 import logging
+import operator
 
 from bk_monitor_base.strategy import THRESHOLD_ALLOWED_METHODS, ThresholdSerializer
+from django.conf import settings
 from django.utils.safestring import mark_safe
 
+from alarm_backends.service.detect import DataPoint
 from alarm_backends.service.detect.strategy import BasicAlgorithmsCollection, ExprDetectAlgorithms
+from alarm_backends.templatetags.unit import unit_convert_min
 from core.errors.alarm_backends.detect import InvalidThresholdConfig
+from core.unit import load_unit
 
 logger = logging.getLogger("detect")
 
+# 比较符与比较函数的映射，需覆盖 THRESHOLD_ALLOWED_METHODS 中的所有比较符
+COMPARE_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
 
 class AlgorithmsAST(ast.NodeTransformer):
     """
@@ -59,6 +74,40 @@ class AndThreshold(BasicAlgorithmsCollection):
             yield ExprDetectAlgorithms(*args)
 
 
+class ThresholdPredicate:
+    """
+    静态阈值批量判定器
+
+    将阈值配置编译为 或(与(比较函数, 阈值)) 的条件列表，阈值按数据单位预先换算，
+    判定时每个数据点只需一次单位换算和若干次数值比较，无需构造表达式上下文并 eval。
+    """
+
+    def __init__(self, config, unit, algorithm_unit=""):
+        """
+        :param config: Threshold 校验后的配置 [[{"method": "gte", "threshold": 1}, ...], ...]
+        :param unit: 数据点单位
+        :param algorithm_unit: 阈值单位前缀
+        """
+        self.unit = load_unit(unit)
+        self.condition_groups = [
+            [
+                (
+                    COMPARE_OPERATORS[THRESHOLD_ALLOWED_METHODS[t_config["method"]]],
+                    unit_convert_min(t_config["threshold"], unit, algorithm_unit),
+                )
+                for t_config in and_config
+            ]
+            for and_config in config
+        ]
+
+    def __call__(self, value):
+        value = self.unit.convert_to_max(value, None, decimal=settings.POINT_PRECISION)[0]
+        for conditions in self.condition_groups:
+            if all(compare(value, threshold) for compare, threshold in conditions):
+                return True
+        return False
+
+
 class Threshold(AndThreshold):
     config_serializer = ThresholdSerializer
     expr_op = "or"
@@ -66,3 +115,39 @@ class Threshold(AndThreshold):
     def gen_expr(self):
         for t_config in self.validated_config:
             yield AndThreshold(t_config, self.unit)
+
+    def detect_records(self, data_points, level):
+        if isinstance(data_points, DataPoint):
+            data_points = [data_points]
+        if settings.DETECT_THRESHOLD_BATCH_ENABLED:
+            data_points = self.filter_anomaly_candidates(data_points)
+        return super().detect_records(data_points, level)
+
+    def filter_anomaly_candidates(self, data_points):
+        """
+        批量预判定：仅保留可能命中阈值的数据点，交由逐点检测生成异常点及异常描述。
+        判定过程出错的数据点同样保留，由逐点检测按原有逻辑处理。
+        """
+        predicates = {}
+        candidates = []
+        for data_point in data_points:
+            try:
+                unit = data_point.unit
+                if unit not in predicates:
+                    predicates[unit] = self.compile_predicate(unit)
+                predicate = predicates[unit]
+                if predicate is None or data_point.is_debug or predicate(data_point.value):
+                    candidates.append(data_point)
+            except Exception:
+                candidates.append(data_point)
+        return candidates
+
+    def compile_predicate(self, unit):
+        """
+        编译指定数据单位下的批量判定器，不支持编译的配置返回 None(退化为逐点检测)
+        """
+        try:
+            return ThresholdPredicate(self.validated_config, unit, self.unit)
+        except Exception as e:
+            logger.warning(f"compile threshold predicate error: {e}, config: {self.validated_config}")
+            return None
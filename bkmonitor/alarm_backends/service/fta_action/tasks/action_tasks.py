@@ -28,6 +28,7 @@ from alarm_backends.core.cache.key import (
     TIMEOUT_ACTION_KEY_LOCK,
 )
 from alarm_backends.core.lock.service_lock import service_lock
+from alarm_backends.core.storage.es_bulk import bulk_writer
 from alarm_backends.service.fta_action import (
     ActionAlreadyFinishedError,
     BaseActionProcessor,
@@ -361,7 +362,7 @@ def sync_actions_sharding_task(action_ids):
                 error,
                 "{}{}".format(instance.id, instance.action_config.get("name", "")),
             )
-    ActionInstanceDocument.bulk_create(action_documents, action=BulkActionType.INDEX)
+    bulk_writer.write(ActionInstanceDocument, action_documents, action=BulkActionType.INDEX)
 
     # 涉及到相关的主任务也进行一次同步
     sync_updated_parent_actions(updated_parent_actions, all_alert_docs, current_sync_time)
@@ -452,7 +453,7 @@ def sync_updated_parent_actions(updated_parent_actions, alert_docs, current_sync
 
     # 批量将更新后的主任务文档同步到ES
     # 使用 INDEX 操作确保文档被正确创建或更新
-    ActionInstanceDocument.bulk_create(action_documents, action=BulkActionType.INDEX)
+    bulk_writer.write(ActionInstanceDocument, action_documents, action=BulkActionType.INDEX)
 
 
 def check_timeout_actions():
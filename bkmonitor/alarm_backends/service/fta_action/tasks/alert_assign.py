@@ -31,6 +31,20 @@ logger = logging.getLogger("fta_action.run")
 
 
 def get_backend_cmdb_attrs(alert: AlertDocument):
+    """
+    获取告警目标的CMDB属性，同一批次内相同主机的告警复用查询结果
+    """
+    event = alert.event
+    bk_host_id = getattr(event, "bk_host_id", None)
+    if bk_host_id:
+        host_key = f"host_id_{bk_host_id}"
+    else:
+        host_key = f"ip_{getattr(event, 'ip', None)}_{getattr(event, 'bk_cloud_id', None)}"
+    target_key = f"{getattr(event, 'bk_tenant_id', None)}_{getattr(event, 'bk_biz_id', None)}_{host_key}"
+    return AssignCacheManager.get_cmdb_attrs(target_key, lambda: _load_backend_cmdb_attrs(alert))
+
+
+def _load_backend_cmdb_attrs(alert: AlertDocument):
     action_context = ActionContext(action=None, alerts=[alert], use_alert_snap=True)
     return {
         "host": action_context.target.host,
@@ -76,11 +90,9 @@ class BackendAssignMatchManager(AlertAssignMatchManager):
             # 如果没有分派规则或者当前配置不需要分派的情况下，不做分派适配
             return matched_rules
         for priority_id in AssignCacheManager.get_assign_priority_by_biz_id(self.bk_biz_id):
-            groups = AssignCacheManager.get_assign_groups_by_priority(self.bk_biz_id, priority_id)
-            group_rules = []
-            for group_id in groups:
-                group_rules.extend(AssignCacheManager.get_assign_rules_by_group(self.bk_biz_id, group_id))
-            for rule in group_rules:
+            # 通过规则索引获取候选规则，仅对候选规则执行条件匹配
+            rule_index = AssignCacheManager.get_assign_rule_index(self.bk_biz_id, priority_id)
+            for rule in rule_index.get_candidates(self.dimensions, self.rule_snaps):
                 rule_match_obj = AssignRuleMatch(rule, self.rule_snaps.get(str(rule["id"])), self.alert)
                 if rule_match_obj.is_matched(dimensions=self.dimensions):
                     matched_rules.append(rule_match_obj)
@@ -126,7 +126,7 @@ class CheckProcessor(BaseAbnormalPushProcessor):
                         check_timestamp,
                         earliest_future_timestamp,
                         len(earliest_future_records_idx),
-                        data_point._raw_input,
+                        data_point.as_dict(),
                     )
                 )
 
@@ -9,7 +9,6 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-
 import logging
 
 from django.utils.translation import gettext as _
@@ -67,18 +66,19 @@ class AnomalyChecker(object):
             return True
         return False
 
-    def check(self):
+    def check(self, check_results=None):
         """
         异常点事件触发检测
+        :param dict check_results: 预取的各级别检测窗口数据 {level: [(label, score), ...]}，为空时实时查询
         :return:
         """
 
-        anomaly_level, anomaly_timestamps = self.check_anomaly()
+        anomaly_level, anomaly_timestamps = self.check_anomaly(check_results)
         anomaly_records = self.gen_anomaly_records()
         event_record = self.gen_event_record(anomaly_level, anomaly_timestamps)
 
         result_message = _(
-            "[trigger 处理结果] ({result}) record({record_id}), " "strategy({strategy_id}), item({item_id})"
+            "[trigger 处理结果] ({result}) record({record_id}), strategy({strategy_id}), item({item_id})"
         ).format(
             strategy_id=self.strategy_id,
             item_id=self.item_id,
@@ -141,11 +141,13 @@ class AnomalyChecker(object):
             records.append(anomaly_record)
         return records
 
-    def check_anomaly(self):
+    def check_anomaly(self, check_results=None):
         """
         异常检测
+        :param dict check_results: 预取的各级别检测窗口数据 {level: [(label, score), ...]}
         :return 触发告警的告警级别，如果都没触发告警，则返回 -1
         """
+        check_results = check_results or {}
         levels = sorted([int(level) for level in list(self.point["anomaly"].keys())])
         # 按照算法级别从高到低判断，如果高级别算法已经触发了，则无需判断低级别
         anomaly_level = -1
@@ -159,20 +161,20 @@ class AnomalyChecker(object):
                     )
                 )
                 continue
-            is_triggered, anomaly_timestamps = self._check_anomaly_by_level(str(level))
+            is_triggered, anomaly_timestamps = self._check_anomaly_by_level(str(level), check_results.get(str(level)))
             if is_triggered:
                 # 高级别算法满足触发条件
                 anomaly_level = level
         return anomaly_level, anomaly_timestamps
 
-    def _check_anomaly_by_level(self, level):
+    def get_trigger_config(self, level):
         """
-        检测某个级别的异常点是否满足触发条件
+        获取某个级别的触发配置
         :param str level: 告警级别
-        :return: 二元组：是否被触发，异常次数
+        :return: 触发配置，不存在时返回 None
         """
         try:
-            trigger_config = self.trigger_configs[level]
+            return self.trigger_configs[level]
         except KeyError:
             trigger_configs = self.trigger_configs.values()
             if not trigger_configs:
@@ -182,11 +184,25 @@ class AnomalyChecker(object):
                         self.strategy_id, self.item_id, level
                     )
                 )
-                return False, []
+                return None
 
             # 默认兜底，trigger 配置当前所有告警级别默认一致
-            trigger_config = list(trigger_configs)[0]
+            return list(trigger_configs)[0]
+
+    def gen_check_window_queries(self):
+        """
+        生成各级别检测窗口的查询参数，用于批量预取检测结果
+        :return: {level: (check_cache_key, min_score, max_score)}
+        """
+        if not self.trigger_configs:
+            # 无触发配置时不预取，由逐级检测时记录错误日志
+            return {}
+        return {
+            level: self._get_check_window_query(level, self.get_trigger_config(level))
+            for level in self.point["anomaly"]
+        }
 
+    def _get_check_window_query(self, level, trigger_config):
         check_cache_key = CHECK_RESULT_CACHE_KEY.get_key(
             strategy_id=self.strategy_id,
             item_id=self.item_id,
@@ -195,9 +211,24 @@ class AnomalyChecker(object):
         )
         # 在对应的打点队列中取出打点信息。时间范围为source_time前后的一个窗口偏移量
         check_window_offset = trigger_config["check_window_size"] * self.check_window_unit - 1
-        check_results = CHECK_RESULT_CACHE_KEY.client.zrangebyscore(
-            name=check_cache_key, min=self.source_time - check_window_offset, max=self.source_time, withscores=True
-        )
+        return check_cache_key, self.source_time - check_window_offset, self.source_time
+
+    def _check_anomaly_by_level(self, level, check_results=None):
+        """
+        检测某个级别的异常点是否满足触发条件
+        :param str level: 告警级别
+        :param list check_results: 预取的检测窗口数据 [(label, score), ...]，为 None 时实时查询
+        :return: 二元组：是否被触发，异常次数
+        """
+        trigger_config = self.get_trigger_config(level)
+        if trigger_config is None:
+            return False, []
+
+        if check_results is None:
+            check_cache_key, min_score, max_score = self._get_check_window_query(level, trigger_config)
+            check_results = CHECK_RESULT_CACHE_KEY.client.zrangebyscore(
+                name=check_cache_key, min=min_score, max=max_score, withscores=True
+            )
         # 统计包含异常标记的key的数量，并与trigger_count进行比较
         anomaly_timestamps = []
         for label, score in check_results:
@@ -9,12 +9,18 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-
 import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from redis.exceptions import ResponseError
 
 from alarm_backends.core.cache.key import ANOMALY_SIGNAL_KEY, SERVICE_LOCK_TRIGGER
 from alarm_backends.core.handlers import base
 from alarm_backends.core.lock.service_lock import service_lock
+from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
 from alarm_backends.service.trigger.processor import TriggerProcessor
 from core.errors.alarm_backends import LockError
 from core.prometheus import metrics
@@ -24,8 +30,13 @@ logger = logging.getLogger("trigger")
 
 class TriggerHandler(base.BaseHandler):
     DATA_FETCH_TIMEOUT = 5
+    # RPOP key count 需要 Redis 6.2 及以上版本，不支持时回退为逐个 RPOP
+    rpop_count_supported = True
 
     def handle(self):
+        if settings.TRIGGER_MICRO_BATCH_ENABLED:
+            return self.handle_batch()
+
         logger.info("[trigger][latency] start to fetch anomaly_key")
         if self.DATA_FETCH_TIMEOUT:
             anomaly_key = ANOMALY_SIGNAL_KEY.client.brpop(ANOMALY_SIGNAL_KEY.get_key(), self.DATA_FETCH_TIMEOUT)
@@ -72,3 +83,140 @@ class TriggerHandler(base.BaseHandler):
             strategy_id=metrics.TOTAL_TAG, status=metrics.StatusEnum.from_exc(exc), exception=exc
         ).inc()
         metrics.report_all()
+
+    def fetch_anomaly_keys(self):
+        """
+        拉取一批异常信号：阻塞等待第一个信号，之后在最大等待时间内尽量凑满一批
+        """
+        signal_key = ANOMALY_SIGNAL_KEY.get_key()
+        client = ANOMALY_SIGNAL_KEY.client
+        if self.DATA_FETCH_TIMEOUT:
+            anomaly_key = client.brpop(signal_key, self.DATA_FETCH_TIMEOUT)
+            anomaly_key = anomaly_key[1] if anomaly_key else None
+        else:
+            anomaly_key = client.rpop(signal_key)
+        if not anomaly_key:
+            return []
+
+        max_size = max(settings.TRIGGER_MICRO_BATCH_MAX_SIZE, 1)
+        deadline = time.time() + settings.TRIGGER_MICRO_BATCH_MAX_LATENCY
+        anomaly_keys = [anomaly_key]
+        while len(anomaly_keys) < max_size:
+            results = self.pop_anomaly_keys(client, signal_key, max_size - len(anomaly_keys))
+            if results:
+                anomaly_keys.extend(results)
+                continue
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            # 队列已空，在剩余等待时间内阻塞等待下一个信号
+            result = client.brpop(signal_key, remaining)
+            if not result:
+                break
+            anomaly_keys.append(result[1])
+        return anomaly_keys
+
+    def pop_anomaly_keys(self, client, signal_key, count):
+        """
+        非阻塞拉取最多 count 个信号
+        """
+        if self.rpop_count_supported:
+            try:
+                # RPOP key count 一次拉取剩余额度的信号
+                return client.rpop(signal_key, count) or []
+            except ResponseError as e:
+                logger.warning("[trigger][micro batch] rpop with count is not supported, fallback to rpop: %s", e)
+                # 进程内记录，后续拉取不再尝试
+                type(self).rpop_count_supported = False
+        anomaly_key = client.rpop(signal_key)
+        return [anomaly_key] if anomaly_key else []
+
+    def handle_batch(self):
+        """
+        微批处理模式：单次拉取多个异常信号，按 Redis 节点分组处理，
+        每个节点只发送一次限流 pipeline 和一个 Kafka 批次
+        """
+        anomaly_keys = self.fetch_anomaly_keys()
+        if not anomaly_keys:
+            return
+
+        node_signals = defaultdict(dict)
+        for anomaly_key in anomaly_keys:
+            try:
+                strategy_id, item_id = anomaly_key.split(".")
+                strategy_id, item_id = int(strategy_id), int(item_id)
+            except Exception as e:
+                logger.error(f"ANOMALY_SIGNAL_KEY({anomaly_key}) parse error：{e}")
+                continue
+            try:
+                cache_node = get_node_by_strategy_id(strategy_id)
+                redis_node = cache_node.node_alias or f"{cache_node.host}:{cache_node.port}"
+            except Exception:
+                redis_node = "unknown"
+            # 同一批次内的重复信号只处理一次
+            node_signals[redis_node][(strategy_id, item_id)] = anomaly_key
+
+        for redis_node, signals in node_signals.items():
+            self.process_node_batch(redis_node, signals)
+        metrics.report_all()
+
+    def process_node_batch(self, redis_node, signals):
+        """
+        处理同一 Redis 节点的一批信号
+        :param signals: {(strategy_id, item_id): anomaly_key}
+        """
+        start_time = time.time()
+        logger.info("[trigger][micro batch] redis_node(%s) start, signals(%s)", redis_node, len(signals))
+        metrics.TRIGGER_MICRO_BATCH_SIZE.labels(redis_node=redis_node).observe(len(signals))
+
+        processors = []
+        failed_count = 0
+        # 服务锁需持有至推送完成，限流计数在推送时读取及累加，提前释放会导致并发 worker 超出限流阈值
+        with ExitStack() as stack:
+            for (strategy_id, item_id), anomaly_key in signals.items():
+                try:
+                    stack.enter_context(service_lock(SERVICE_LOCK_TRIGGER, strategy_id=strategy_id, item_id=item_id))
+                except LockError:
+                    logger.info(f"[get service lock fail] strategy({strategy_id}), item({item_id}). will process later")
+                    ANOMALY_SIGNAL_KEY.client.delay("rpush", ANOMALY_SIGNAL_KEY.get_key(), anomaly_key, delay=1)
+                    continue
+
+                exc = None
+                try:
+                    processor = TriggerProcessor(strategy_id, item_id)
+                    processor.check()
+                    processors.append(processor)
+                except Exception as e:
+                    exc = e
+                    failed_count += 1
+                    logger.exception(f"[process error] strategy({strategy_id}), item({item_id}) reason：{e}")
+                    metrics.TRIGGER_PROCESS_COUNT.labels(
+                        strategy_id=metrics.TOTAL_TAG, status=metrics.StatusEnum.from_exc(exc), exception=exc
+                    ).inc()
+
+            exc = None
+            try:
+                TriggerProcessor.push_batch(processors)
+            except Exception as e:
+                exc = e
+                logger.exception("[process error] redis_node(%s) push batch reason：%s", redis_node, e)
+
+        cost = time.time() - start_time
+        metrics.TRIGGER_PROCESS_COUNT.labels(
+            strategy_id=metrics.TOTAL_TAG, status=metrics.StatusEnum.from_exc(exc), exception=exc
+        ).inc(len(processors))
+        metrics.TRIGGER_MICRO_BATCH_PROCESS_TIME.labels(redis_node=redis_node).observe(cost)
+        metrics.TRIGGER_MICRO_BATCH_SIGNAL_COUNT.labels(
+            redis_node=redis_node, status=metrics.StatusEnum.from_exc(exc)
+        ).inc(len(processors))
+        if failed_count:
+            metrics.TRIGGER_MICRO_BATCH_SIGNAL_COUNT.labels(
+                redis_node=redis_node, status=metrics.StatusEnum.FAILED
+            ).inc(failed_count)
+        logger.info(
+            "[trigger][micro batch] redis_node(%s) end in %.3fs, processed(%s), failed(%s)",
+            redis_node,
+            cost,
+            len(processors),
+            failed_count,
+        )
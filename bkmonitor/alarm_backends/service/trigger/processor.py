@@ -12,8 +12,15 @@ import json
 import logging
 import time
 
+from django.conf import settings
+
 from alarm_backends.core.alert.adapter import MonitorEventAdapter
-from alarm_backends.core.cache.key import ANOMALY_LIST_KEY, ANOMALY_SIGNAL_KEY, TRIGGER_EVENT_RATE_LIMIT_KEY
+from alarm_backends.core.cache.key import (
+    ANOMALY_LIST_KEY,
+    ANOMALY_SIGNAL_KEY,
+    CHECK_RESULT_CACHE_KEY,
+    TRIGGER_EVENT_RATE_LIMIT_KEY,
+)
 from alarm_backends.core.control.strategy import Strategy
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
 from alarm_backends.service.trigger.checker import AnomalyChecker
@@ -80,7 +87,40 @@ class TriggerProcessor:
                 f"[pull anomaly record] strategy({self.strategy_id}), item({self.item_id}) pull {len(self.anomaly_points)} record"
             )
 
-    def _filter_by_rate_limit(self, event_records):
+    def _get_rate_limit_keys(self, event_records):
+        """
+        收集本批各数据时间戳的限流计数器 key
+        :return: {source_time: redis_key}
+        """
+        ts_keys = {}
+        for record in event_records:
+            source_time = record["event_record"].get("data", {}).get("time")
+            if source_time is None:
+                continue
+            source_time = int(source_time)
+            if source_time not in ts_keys:
+                ts_keys[source_time] = TRIGGER_EVENT_RATE_LIMIT_KEY.get_key(
+                    strategy_id=self.strategy_id, item_id=self.item_id, source_time=source_time
+                )
+        return ts_keys
+
+    @staticmethod
+    def fetch_rate_limit_counts(redis_keys):
+        """
+        pipeline MGET 取各限流计数器的 Redis 已有值
+        :return: {redis_key: count}，Redis 异常时返回 None
+        """
+        pipe = TRIGGER_EVENT_RATE_LIMIT_KEY.client.pipeline(transaction=False)
+        for redis_key in redis_keys:
+            pipe.get(redis_key)
+        try:
+            redis_results = pipe.execute()
+        except Exception as e:
+            logger.warning("[trigger rate limit] redis MGET failed, fail-open. reason: %s", e)
+            return None
+        return {redis_key: int(val) if val is not None else 0 for redis_key, val in zip(redis_keys, redis_results)}
+
+    def _filter_by_rate_limit(self, event_records, redis_counts=None):
         """
         按（strategy_id, item_id, 数据时间戳）对本批 event_records 进行限流判定。
 
@@ -88,7 +128,7 @@ class TriggerProcessor:
 
         算法：
         1. 内存中按 source_time 分组，统计各时间戳的请求数。
-        2. pipeline MGET 一次取各计数器的 Redis 已有值。
+        2. pipeline MGET 一次取各计数器的 Redis 已有值（批量模式下由调用方预先取好并通过 redis_counts 传入）。
         3. 逐条判定：redis_count + 本批已通过数 >= 阈值时拒绝本条（fail-open 无时间戳）。
 
         注意：INCRBY 不在本方法内执行，由调用方在 Kafka 发送成功后统一提交，
@@ -100,40 +140,22 @@ class TriggerProcessor:
           - ts_keys         : {source_time: redis_key}
           - drop_counts     : {source_time: 丢弃数}，用于上报指标
         """
-        client = TRIGGER_EVENT_RATE_LIMIT_KEY.client
         threshold = TRIGGER_EVENT_RATE_LIMIT_THRESHOLD
 
         # step1: 收集本批各时间戳的 Redis key
-        ts_keys = {}  # source_time -> redis key
-        for record in event_records:
-            source_time = record["event_record"].get("data", {}).get("time")
-            if source_time is None:
-                continue
-            source_time = int(source_time)
-            if source_time not in ts_keys:
-                ts_keys[source_time] = TRIGGER_EVENT_RATE_LIMIT_KEY.get_key(
-                    strategy_id=self.strategy_id, item_id=self.item_id, source_time=source_time
-                )
-
+        ts_keys = self._get_rate_limit_keys(event_records)
         if not ts_keys:
             return event_records, {}, {}, {}
 
         # step2: pipeline MGET 取 Redis 已有计数
-        ordered_ts = list(ts_keys.keys())
-        pipe = client.pipeline(transaction=False)
-        for ts in ordered_ts:
-            pipe.get(ts_keys[ts])
-        try:
-            redis_results = pipe.execute()
-        except Exception as e:
-            logger.warning("[trigger rate limit] redis MGET failed, fail-open. reason: %s", e)
-            return event_records, {}, {}, {}
-
-        redis_counts = {ts: int(val) if val is not None else 0 for ts, val in zip(ordered_ts, redis_results)}
+        if redis_counts is None or any(redis_key not in redis_counts for redis_key in ts_keys.values()):
+            redis_counts = self.fetch_rate_limit_counts(list(ts_keys.values()))
+            if redis_counts is None:
+                return event_records, {}, {}, {}
 
         # step3: 内存逐条判定（不写 Redis）
         allowed_records = []
-        batch_counts = {ts: 0 for ts in ordered_ts}
+        batch_counts = {ts: 0 for ts in ts_keys}
         drop_counts = {}
 
         for record in event_records:
@@ -144,7 +166,7 @@ class TriggerProcessor:
                 allowed_records.append(record)
                 continue
             source_time = int(source_time)
-            already = redis_counts[source_time] + batch_counts[source_time]
+            already = redis_counts[ts_keys[source_time]] + batch_counts[source_time]
             if already >= threshold:
                 drop_counts[source_time] = drop_counts.get(source_time, 0) + 1
                 logger.warning(
@@ -164,30 +186,43 @@ class TriggerProcessor:
 
         return allowed_records, batch_counts, ts_keys, drop_counts
 
-    def _commit_rate_limit_counts(self, batch_counts, ts_keys):
-        """Kafka 发送成功后，将本批通过数写入 Redis 计数器（每个 ts 至多一次 INCRBY）。"""
+    def _commit_rate_limit_counts(self, batch_counts, ts_keys, pipe=None):
+        """
+        Kafka 发送成功后，将本批通过数写入 Redis 计数器（每个 ts 至多一次 INCRBY）。
+        :param pipe: 外部传入的 pipeline，传入时只写入命令，由调用方统一执行
+        """
         if not any(cnt > 0 for cnt in batch_counts.values()):
             return
-        client = TRIGGER_EVENT_RATE_LIMIT_KEY.client
-        pipe = client.pipeline(transaction=False)
+        deferred = pipe is not None
+        if not deferred:
+            pipe = TRIGGER_EVENT_RATE_LIMIT_KEY.client.pipeline(transaction=False)
         for ts, cnt in batch_counts.items():
             if cnt > 0:
                 pipe.incrby(ts_keys[ts], cnt)
                 pipe.expire(ts_keys[ts], TRIGGER_EVENT_RATE_LIMIT_KEY.ttl)
+        if deferred:
+            return
         try:
             pipe.execute()
         except Exception as e:
             logger.warning("[trigger rate limit] redis INCRBY failed. reason: %s", e)
 
-    def push_event_to_kafka(self, event_records):
+    def get_redis_node(self) -> str:
         try:
             cache_node = get_node_by_strategy_id(self.strategy_id)
-            redis_node = cache_node.node_alias or f"{cache_node.host}:{cache_node.port}"
+            return cache_node.node_alias or f"{cache_node.host}:{cache_node.port}"
         except Exception:
-            redis_node = "unknown"
+            # 异常情况下使用默认值
+            return "unknown"
 
+    def build_events(self, event_records, redis_counts=None):
+        """
+        限流判定并构建 Kafka 消息
+        :param redis_counts: 预先批量获取的限流计数 {redis_key: count}，为空时单独查询
+        :return: (events, batch_counts, ts_keys)
+        """
         # step1: 限流判定（只读 Redis，不写）
-        allowed_records, batch_counts, ts_keys, drop_counts = self._filter_by_rate_limit(event_records)
+        allowed_records, batch_counts, ts_keys, drop_counts = self._filter_by_rate_limit(event_records, redis_counts)
         total_drop = sum(drop_counts.values())
         if total_drop > 0:
             metrics.TRIGGER_EVENT_RATE_LIMIT_DROP.labels(
@@ -195,7 +230,7 @@ class TriggerProcessor:
                 strategy_id=self.strategy_id,
                 bk_biz_id=self.strategy.bk_biz_id,
                 strategy_name=self.strategy.name,
-                redis_node=redis_node,
+                redis_node=self.get_redis_node(),
             ).inc(total_drop)
 
         # step2: 构建 Kafka 消息
@@ -229,31 +264,29 @@ class TriggerProcessor:
                 bk_biz_id=self.strategy.bk_biz_id,
                 strategy_name=self.strategy.name,
             ).observe(max_latency)
+        return events, batch_counts, ts_keys
+
+    def report_overflow(self, event_count):
+        if event_count <= 1000:
+            return
+        metrics.PROCESS_OVER_FLOW.labels(
+            module="trigger",
+            strategy_id=self.strategy_id,
+            bk_biz_id=self.strategy.bk_biz_id,
+            strategy_name=self.strategy.name,
+            redis_node=self.get_redis_node(),
+        ).inc(event_count)
+
+    def push_event_to_kafka(self, event_records):
+        events, batch_counts, ts_keys = self.build_events(event_records)
 
         # step3: 发送到 Kafka；成功后再提交计数，避免失败时额度被静默消耗
         MonitorEventAdapter.push_to_kafka(events=events)
         self._commit_rate_limit_counts(batch_counts, ts_keys)
+        self.report_overflow(len(events))
 
-        if len(events) > 1000:
-            # 获取 Redis 节点信息（带异常处理）
-            try:
-                cache_node = get_node_by_strategy_id(self.strategy_id)
-                redis_node = cache_node.node_alias or f"{cache_node.host}:{cache_node.port}"
-            except Exception:
-                redis_node = "unknown"  # 异常情况下使用默认值
-
-            metrics.PROCESS_OVER_FLOW.labels(
-                module="trigger",
-                strategy_id=self.strategy_id,
-                bk_biz_id=self.strategy.bk_biz_id,
-                strategy_name=self.strategy.name,
-                redis_node=redis_node,
-            ).inc(len(events))
-
-    def push(self):
-        # 推送事件记录到输出队列
+    def finish_push(self):
         if self.event_records:
-            self.push_event_to_kafka(self.event_records)
             logger.info(
                 f"[process result collect] strategy({self.strategy_id}), item({self.item_id}) finish."
                 f"push {len(self.anomaly_records)} AnomalyRecord, {len(self.event_records)} Event"
@@ -264,12 +297,63 @@ class TriggerProcessor:
         self.anomaly_records = []
         self.event_records = []
 
-    def process(self):
+    def push(self):
+        # 推送事件记录到输出队列
+        if self.event_records:
+            self.push_event_to_kafka(self.event_records)
+        self.finish_push()
+
+    @classmethod
+    def push_batch(cls, processors):
+        """
+        批量推送多个处理器的事件（同一 Redis 节点的处理器）：
+        1. 一次 pipeline 获取所有处理器的限流计数
+        2. 所有事件合并为一个 Kafka 批次发送
+        3. 发送成功后一次 pipeline 提交所有限流计数
+        """
+        pending = [processor for processor in processors if processor.event_records]
+        if pending:
+            redis_keys = []
+            for processor in pending:
+                redis_keys.extend(processor._get_rate_limit_keys(processor.event_records).values())
+            redis_counts = cls.fetch_rate_limit_counts(redis_keys) if redis_keys else None
+
+            events = []
+            rate_limit_counts = []
+            event_counts = []
+            for processor in pending:
+                processor_events, batch_counts, ts_keys = processor.build_events(processor.event_records, redis_counts)
+                events.extend(processor_events)
+                rate_limit_counts.append((processor, batch_counts, ts_keys))
+                event_counts.append((processor, len(processor_events)))
+
+            MonitorEventAdapter.push_to_kafka(events=events)
+
+            pipe = TRIGGER_EVENT_RATE_LIMIT_KEY.client.pipeline(transaction=False)
+            for processor, batch_counts, ts_keys in rate_limit_counts:
+                processor._commit_rate_limit_counts(batch_counts, ts_keys, pipe=pipe)
+            try:
+                pipe.execute()
+            except Exception as e:
+                logger.warning("[trigger rate limit] redis INCRBY failed. reason: %s", e)
+
+            for processor, event_count in event_counts:
+                processor.report_overflow(event_count)
+
+        for processor in processors:
+            processor.finish_push()
+
+    def check(self):
+        """
+        拉取异常点并执行触发判定，结果暂存在 event_records 中
+        """
         self.pull()
 
         in_alarm_time, message = self.strategy.in_alarm_time()
         if not in_alarm_time:
             logger.info("[trigger] strategy(%s) not in alarm time: %s, skipped", self.strategy_id, message)
+        elif settings.TRIGGER_BATCH_CHECK_ENABLED:
+            self.process_points_batch(self.anomaly_points)
         else:
             for point in self.anomaly_points:
                 try:
@@ -278,14 +362,90 @@ class TriggerProcessor:
                     error_message = f"[process error] strategy({self.strategy_id}), item({self.item_id}) reason: {e} \norigin data: {point}"
                     logger.exception(error_message)
 
+    def process(self):
+        self.check()
         self.push()
 
-    def process_point(self, point):
+    def gen_checker(self, point):
         point = json.loads(point)
         strategy = self.get_strategy_snapshot(point["strategy_snapshot_key"])
-        checker = AnomalyChecker(point, strategy, self.item_id)
-        anomaly_records, event_record = checker.check()
+        return AnomalyChecker(point, strategy, self.item_id)
+
+    def process_point(self, point):
+        checker = self.gen_checker(point)
+        self.collect_check_result(*checker.check())
+
+    def process_points_batch(self, points):
+        """
+        批量检测模式：
+        1. 先为本批所有异常点生成检测器，汇总各 (dimensions_md5, level, 检测窗口) 的查询
+        2. 通过一次非事务 pipeline 批量拉取检测窗口数据（PipelineProxy 按节点分组执行）
+        3. 在内存中完成触发次数判定
+        """
+        checkers = []
+        for point in points:
+            try:
+                checkers.append((point, self.gen_checker(point)))
+            except Exception as e:
+                error_message = f"[process error] strategy({self.strategy_id}), item({self.item_id}) reason: {e} \norigin data: {point}"
+                logger.exception(error_message)
+
+        check_results_list = self.fetch_check_results([checker for _, checker in checkers])
+        for (point, checker), check_results in zip(checkers, check_results_list):
+            try:
+                self.collect_check_result(*checker.check(check_results))
+            except Exception as e:
+                error_message = f"[process error] strategy({self.strategy_id}), item({self.item_id}) reason: {e} \norigin data: {point}"
+                logger.exception(error_message)
+
+    def fetch_check_results(self, checkers):
+        """
+        批量拉取检测器所需的检测窗口数据，相同的窗口查询只发送一次
+        :param list[AnomalyChecker] checkers: 检测器列表
+        :return: 与 checkers 一一对应的 {level: [(label, score), ...]} 列表，拉取失败时为空字典(回退为实时查询)
+        """
+        checker_queries = []
+        query_indexes = {}
+        for checker in checkers:
+            try:
+                queries = checker.gen_check_window_queries()
+            except Exception as e:
+                logger.warning(
+                    "[trigger batch check] strategy(%s), item(%s) gen check window queries failed: %s",
+                    self.strategy_id,
+                    self.item_id,
+                    e,
+                )
+                queries = {}
+            for query in queries.values():
+                query_indexes.setdefault((str(query[0]), query[1], query[2]), query)
+            checker_queries.append(queries)
+
+        if not query_indexes:
+            return [{} for _ in checkers]
+
+        ordered_queries = list(query_indexes.items())
+        pipeline = CHECK_RESULT_CACHE_KEY.client.pipeline(transaction=False)
+        for _, (check_cache_key, min_score, max_score) in ordered_queries:
+            pipeline.zrangebyscore(name=check_cache_key, min=min_score, max=max_score, withscores=True)
+        try:
+            results = pipeline.execute()
+        except Exception as e:
+            logger.warning(
+                "[trigger batch check] strategy(%s), item(%s) pipeline zrangebyscore failed, fallback. reason: %s",
+                self.strategy_id,
+                self.item_id,
+                e,
+            )
+            return [{} for _ in checkers]
+
+        results_by_query = {query_id: result for (query_id, _), result in zip(ordered_queries, results)}
+        return [
+            {level: results_by_query[(str(query[0]), query[1], query[2])] for level, query in queries.items()}
+            for queries in checker_queries
+        ]
 
+    def collect_check_result(self, anomaly_records, event_record):
         # 暂存结果，最后批量保存
         if event_record:
             self.event_records.append({"anomaly_records": anomaly_records, "event_record": event_record})
@@ -0,0 +1,137 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import random
+from unittest import mock
+
+from alarm_backends.core.cache.assign import AssignCacheManager, AssignRuleIndex, get_rule_index_key
+from bkmonitor.action.alert_assign import AssignRuleMatch
+
+
+def gen_rule(rule_id, conditions):
+    return {"id": rule_id, "conditions": conditions, "user_groups": [1], "assign_group_id": 1, "actions": []}
+
+
+def gen_rules(count):
+    random.seed(count)
+    rules = []
+    for rule_id in range(count):
+        rule_type = rule_id % 6
+        if rule_type == 0:
+            conditions = [{"field": "alert.strategy_id", "value": [str(rule_id % 300)], "method": "eq"}]
+        elif rule_type == 1:
+            conditions = [
+                {"field": "bk_host_id", "value": [random.randint(1, 500) for _ in range(3)], "method": "eq"},
+                {"field": "alert.name", "value": ["cpu"], "method": "include", "condition": "and"},
+            ]
+        elif rule_type == 2:
+            conditions = [
+                {"field": "host.bk_os_type", "value": ["1"], "method": "eq"},
+                {"field": "set.bk_set_name", "value": [f"set{rule_id % 50}"], "method": "eq", "condition": "and"},
+            ]
+        elif rule_type == 3:
+            # or 条件无法建立索引
+            conditions = [
+                {"field": "alert.strategy_id", "value": [str(rule_id % 300)], "method": "eq"},
+                {"field": "ip", "value": ["127.0.0.1"], "method": "eq", "condition": "or"},
+            ]
+        elif rule_type == 4:
+            conditions = [{"field": "ip", "value": [f"127.0.0.{rule_id % 10}"], "method": "eq"}]
+        else:
+            conditions = [{"field": "alert.name", "value": [f"^disk{rule_id % 20}"], "method": "reg"}]
+        rules.append(gen_rule(rule_id, conditions))
+    return rules
+
+
+def gen_dimensions(count):
+    random.seed(count)
+    return [
+        {
+            "alert.strategy_id": str(random.randint(0, 300)),
+            "alert.name": random.choice(["cpu usage", "disk1 usage", "mem"]),
+            "bk_host_id": str(random.randint(1, 500)),
+            "ip": f"127.0.0.{random.randint(0, 10)}",
+            "host.bk_os_type": [random.choice(["1", "2"])],
+            "set.bk_set_name": [f"set{random.randint(0, 50)}", "set_common"],
+        }
+        for _ in range(count)
+    ]
+
+
+class TestAssignRuleIndex:
+    def test_rule_index_key(self):
+        rule = gen_rule(
+            1,
+            [
+                {"field": "alert.strategy_id", "value": ["1", "2"], "method": "eq", "condition": "or"},
+                {"field": "bk_host_id", "value": [3], "method": "eq", "condition": "and"},
+                {"field": "alert.name", "value": ["cpu"], "method": "include", "condition": "and"},
+            ],
+        )
+        assert get_rule_index_key(rule) == {"field": "bk_host_id", "values": ["3"]}
+
+        # 空值条件会被忽略，ip 字段取值依赖条件值格式，不建立索引
+        rule = gen_rule(2, [{"field": "alert.strategy_id", "value": [], "method": "eq"}])
+        assert get_rule_index_key(rule) is None
+        rule = gen_rule(3, [{"field": "ip", "value": ["127.0.0.1"], "method": "eq"}])
+        assert get_rule_index_key(rule) is None
+
+        rule = gen_rule(
+            4,
+            [
+                {"field": "alert.strategy_id", "value": ["1"], "method": "eq"},
+                {"field": "bk_host_id", "value": [3], "method": "eq", "condition": "or"},
+            ],
+        )
+        assert get_rule_index_key(rule) is None
+
+    def test_candidates_consistent_with_linear(self):
+        rules = gen_rules(1200)
+        rule_matches = [AssignRuleMatch(rule) for rule in rules]
+        rule_index = AssignRuleIndex(rules)
+        assert len(rule_index.unindexed) == len(rules) / 2
+
+        for dimensions in gen_dimensions(300):
+            expected = [
+                rule_match.rule_id for rule_match in rule_matches if rule_match.dimension_check.is_match(dimensions)
+            ]
+            candidates = rule_index.get_candidates(dimensions)
+            result = [rule["id"] for rule in candidates if AssignRuleMatch(rule).dimension_check.is_match(dimensions)]
+            assert result == expected
+            assert len(candidates) < len(rules)
+
+    def test_candidates_with_rule_snaps(self):
+        rules = [
+            gen_rule(1, [{"field": "alert.strategy_id", "value": ["1"], "method": "eq"}]),
+            gen_rule(2, [{"field": "alert.strategy_id", "value": ["2"], "method": "eq"}]),
+        ]
+        # 使用刷新缓存时预先计算的索引维度
+        for rule in rules:
+            rule["index_key"] = get_rule_index_key(rule)
+        rule_index = AssignRuleIndex(rules)
+
+        assert [rule["id"] for rule in rule_index.get_candidates({"alert.strategy_id": "2"})] == [2]
+        # 存在快照的规则始终作为候选
+        assert [rule["id"] for rule in rule_index.get_candidates({"alert.strategy_id": "2"}, {"1": {}})] == [1, 2]
+        assert rule_index.get_candidates({}) == []
+
+    def test_cmdb_attrs_batch_cache(self):
+        AssignCacheManager.clear()
+        loader = mock.Mock(return_value={"host": None, "sets": [], "modules": []})
+
+        for _ in range(3):
+            assert AssignCacheManager.get_cmdb_attrs("system_2_host_id_1", loader) == loader.return_value
+        AssignCacheManager.get_cmdb_attrs("system_2_host_id_2", loader)
+        assert loader.call_count == 2
+
+        # 批次结束清理缓存后重新加载
+        AssignCacheManager.clear()
+        AssignCacheManager.get_cmdb_attrs("system_2_host_id_1", loader)
+        assert loader.call_count == 3
@@ -0,0 +1,133 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+import time
+from unittest import mock
+
+import fakeredis
+import pytest
+from django.test import override_settings
+
+from alarm_backends.core.cache.cmdb.base import CMDBCacheManager
+from alarm_backends.core.cache.cmdb.host import HostManager, host_local_cache
+from alarm_backends.core.cache.cmdb.topo import TopoManager, topo_local_cache
+from constants.common import DEFAULT_TENANT_ID
+
+HOSTS = {
+    "127.0.0.1|0": {"bk_host_innerip": "127.0.0.1", "bk_cloud_id": 0, "bk_host_id": 1, "bk_biz_id": 2},
+    "1": {"bk_host_innerip": "127.0.0.1", "bk_cloud_id": 0, "bk_host_id": 1, "bk_biz_id": 2},
+    "10.0.0.1|0": {"bk_host_innerip": "10.0.0.1", "bk_cloud_id": 0, "bk_host_id": 2, "bk_biz_id": 2},
+    "2": {"bk_host_innerip": "10.0.0.1", "bk_cloud_id": 0, "bk_host_id": 2, "bk_biz_id": 2},
+}
+
+
+@pytest.fixture
+def cache():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    redis.flushall()
+    redis.hset(HostManager.get_cache_key(DEFAULT_TENANT_ID), mapping={k: json.dumps(v) for k, v in HOSTS.items()})
+    redis.expire(HostManager.get_cache_key(DEFAULT_TENANT_ID), CMDBCacheManager.CACHE_TIMEOUT)
+    with (
+        mock.patch.object(CMDBCacheManager, "cache", redis),
+        override_settings(
+            ENABLE_MULTI_TENANT_MODE=False,
+            CMDB_LOCAL_CACHE_ENABLED=True,
+            CMDB_LOCAL_CACHE_MAX_SIZE=100,
+            CMDB_LOCAL_CACHE_SYNC_INTERVAL=10,
+            CMDB_LOCAL_CACHE_MAX_AGE=600,
+        ),
+    ):
+        host_local_cache.clear()
+        topo_local_cache.clear()
+        yield redis
+        host_local_cache.clear()
+        topo_local_cache.clear()
+
+
+def expire_sync(local_cache):
+    for state in local_cache._generations.values():
+        state[1] = 0
+
+
+class TestCMDBLocalCache:
+    def test_get(self, cache):
+        with mock.patch.object(cache, "hmget", wraps=cache.hmget) as hmget:
+            host = HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True)
+            assert host.bk_host_id == 1
+            assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True) is host
+            assert HostManager.get(bk_tenant_id=DEFAULT_TENANT_ID, ip="10.0.0.1", using_mem=True).bk_host_id == 2
+
+            # 不存在的主机同样缓存
+            assert HostManager.get(bk_tenant_id=DEFAULT_TENANT_ID, ip="10.0.0.2", using_mem=True) is None
+            assert HostManager.get(bk_tenant_id=DEFAULT_TENANT_ID, ip="10.0.0.2", using_mem=True) is None
+            assert hmget.call_count == 3
+
+    def test_prefetch(self, cache):
+        with mock.patch.object(cache, "hmget", wraps=cache.hmget) as hmget:
+            HostManager.prefetch(bk_tenant_id=DEFAULT_TENANT_ID, keys=["1", "10.0.0.1|0", "3"])
+            assert hmget.call_count == 1
+
+            assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True)
+            assert HostManager.get(bk_tenant_id=DEFAULT_TENANT_ID, ip="10.0.0.1", bk_cloud_id=0, using_mem=True)
+            assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=3, using_mem=True) is None
+            assert hmget.call_count == 1
+
+    def test_generation(self, cache):
+        cache_key = HostManager.get_cache_key(DEFAULT_TENANT_ID)
+        host = HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True)
+        cache.hset(cache_key, "1", json.dumps(dict(HOSTS["1"], bk_host_name="new")))
+
+        # 未到检查时间或缓存未刷新时继续使用进程内缓存
+        assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True) is host
+        expire_sync(host_local_cache)
+        assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True) is host
+
+        # 递增缓存版本后失效
+        HostManager.bump_generation(DEFAULT_TENANT_ID)
+        expire_sync(host_local_cache)
+        assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True).bk_host_name == "new"
+
+        # 刷新任务重置过期时间后失效
+        now = time.time()
+        host = HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True)
+        cache.expire(cache_key, CMDBCacheManager.CACHE_TIMEOUT - 60)
+        host_local_cache.sync(DEFAULT_TENANT_ID, now=now + 60)
+        assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True) is host
+        cache.expire(cache_key, CMDBCacheManager.CACHE_TIMEOUT)
+        host_local_cache.sync(DEFAULT_TENANT_ID, now=now + 120)
+        assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True) is not host
+
+    def test_max_size(self, cache):
+        with override_settings(CMDB_LOCAL_CACHE_MAX_SIZE=2):
+            HostManager.prefetch(bk_tenant_id=DEFAULT_TENANT_ID, keys=["1", "2"])
+            HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True)
+            HostManager.get(bk_tenant_id=DEFAULT_TENANT_ID, ip="10.0.0.1", using_mem=True)
+            assert list(host_local_cache._items) == [(DEFAULT_TENANT_ID, "1"), (DEFAULT_TENANT_ID, "10.0.0.1|0")]
+
+    def test_topo(self, cache):
+        cache.hset(
+            TopoManager.get_cache_key(DEFAULT_TENANT_ID),
+            "module|1",
+            json.dumps({"bk_obj_id": "module", "bk_inst_id": 1, "bk_obj_name": "模块", "bk_inst_name": "m1"}),
+        )
+        nodes = TopoManager.mget(
+            bk_tenant_id=DEFAULT_TENANT_ID, topo_nodes=[("module", 1), ("module", 2)], using_mem=True
+        )
+        assert list(nodes) == [("module", 1)]
+        node = TopoManager.get(bk_tenant_id=DEFAULT_TENANT_ID, bk_obj_id="module", bk_inst_id=1, using_mem=True)
+        assert node is nodes[("module", 1)]
+        assert list(topo_local_cache._items) == [(DEFAULT_TENANT_ID, "module|2"), (DEFAULT_TENANT_ID, "module|1")]
+
+    @override_settings(CMDB_LOCAL_CACHE_ENABLED=False)
+    def test_disabled(self, cache):
+        HostManager.prefetch(bk_tenant_id=DEFAULT_TENANT_ID, keys=["1"])
+        assert HostManager.get_by_id(bk_tenant_id=DEFAULT_TENANT_ID, bk_host_id=1, using_mem=True).bk_host_id == 1
+        assert not host_local_cache._items
@@ -0,0 +1,147 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+from unittest import mock
+
+import fakeredis
+import pytest
+from django.test import override_settings
+
+from alarm_backends.core.cache.strategy import StrategyCacheManager, StrategyLocalMirror
+
+
+def gen_strategy(strategy_id, name="cpu"):
+    return {"id": strategy_id, "bk_biz_id": 2, "name": name, "items": []}
+
+
+@pytest.fixture
+def cache():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    redis.flushall()
+    with (
+        mock.patch.object(StrategyCacheManager, "cache", redis),
+        override_settings(STRATEGY_LOCAL_MIRROR_MAX_SIZE=100, STRATEGY_LOCAL_MIRROR_SYNC_INTERVAL=5),
+    ):
+        yield redis
+
+
+@pytest.fixture
+def mirror(cache):
+    return StrategyLocalMirror()
+
+
+def sync(mirror):
+    mirror.last_sync_time = 0
+    mirror.sync(StrategyCacheManager)
+
+
+class TestStrategyLocalMirror:
+    def test_publish_changed_only(self, cache):
+        StrategyCacheManager.refresh_strategy([gen_strategy(1), gen_strategy(2)], old_groups=[])
+        assert cache.hget(StrategyCacheManager.CHANGE_FEED_CACHE_KEY, "version") == "1"
+        assert cache.zrange(StrategyCacheManager.CHANGED_IDS_CACHE_KEY, 0, -1) == ["1", "2"]
+
+        # 内容未变化的策略不会写入变更记录
+        StrategyCacheManager.refresh_strategy([gen_strategy(1), gen_strategy(2, "mem")], old_groups=[])
+        assert cache.zrange(StrategyCacheManager.CHANGED_IDS_CACHE_KEY, 0, -1, withscores=True) == [
+            ("1", 1),
+            ("2", 2),
+        ]
+
+        StrategyCacheManager.refresh_strategy([gen_strategy(1), gen_strategy(2, "mem")], old_groups=[])
+        assert cache.hget(StrategyCacheManager.CHANGE_FEED_CACHE_KEY, "version") == "2"
+
+    def test_publish_concurrently(self, cache):
+        def publish(offset):
+            for index in range(20):
+                StrategyCacheManager.publish_strategy_changes([offset * 100 + index])
+
+        threads = [threading.Thread(target=publish, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # 并发发布时每次发布分配唯一的版本号，且版本号与变更记录同时写入
+        assert cache.hget(StrategyCacheManager.CHANGE_FEED_CACHE_KEY, "version") == "80"
+        scores = [
+            score for _, score in cache.zrange(StrategyCacheManager.CHANGED_IDS_CACHE_KEY, 0, -1, withscores=True)
+        ]
+        assert scores == list(range(1, 81))
+
+    def test_sync_delta(self, cache, mirror):
+        StrategyCacheManager.refresh_strategy([gen_strategy(1), gen_strategy(2), gen_strategy(3)], old_groups=[])
+        assert [strategy["name"] for strategy in mirror.get_strategies(StrategyCacheManager, [1, 2])] == ["cpu", "cpu"]
+
+        StrategyCacheManager.refresh_strategy([gen_strategy(1, "mem"), gen_strategy(3, "disk")], old_groups=[])
+        StrategyCacheManager.publish_strategy_changes([2], deleted=True)
+        cache.delete(StrategyCacheManager.CACHE_KEY_TEMPLATE.format(strategy_id=2))
+
+        # 未到同步时间时继续使用镜像中的策略
+        assert mirror.get_strategies(StrategyCacheManager, [1])[0]["name"] == "cpu"
+
+        with mock.patch.object(cache, "mget", wraps=cache.mget) as mget:
+            sync(mirror)
+            # 仅更新镜像中已有的变更策略
+            assert mget.call_args[0][0] == [
+                StrategyCacheManager.CACHE_KEY_TEMPLATE.format(strategy_id=strategy_id) for strategy_id in [1, 2]
+            ]
+        assert mirror.version == 3
+        assert [strategy["name"] for strategy in mirror.get_strategies(StrategyCacheManager, [1, 2, 3])] == [
+            "mem",
+            "disk",
+        ]
+
+    def test_readonly(self, cache, mirror):
+        StrategyCacheManager.refresh_strategy([gen_strategy(1)], old_groups=[])
+        strategy = mirror.get_strategies(StrategyCacheManager, [1], readonly=True)[0]
+        assert mirror.get_strategies(StrategyCacheManager, [1], readonly=True)[0] is strategy
+        # 非只读读取时每次返回新的对象
+        copied = mirror.get_strategies(StrategyCacheManager, [1])[0]
+        assert copied == strategy and copied is not strategy
+
+    def test_max_size(self, cache, mirror):
+        StrategyCacheManager.refresh_strategy([gen_strategy(index) for index in range(1, 11)], old_groups=[])
+        with override_settings(STRATEGY_LOCAL_MIRROR_MAX_SIZE=5):
+            assert len(mirror.get_strategies(StrategyCacheManager, list(range(1, 11)))) == 10
+            assert list(mirror._strategies) == [6, 7, 8, 9, 10]
+            mirror.get_strategies(StrategyCacheManager, [6, 1])
+            assert list(mirror._strategies) == [8, 9, 10, 6, 1]
+
+    def test_reset(self, cache, mirror):
+        StrategyCacheManager.refresh_strategy([gen_strategy(1)], old_groups=[])
+        mirror.get_strategies(StrategyCacheManager, [1])
+
+        # 变更记录被清理后，过早的镜像全部失效
+        with mock.patch.object(StrategyCacheManager, "MAX_CHANGED_IDS", 2):
+            for strategy_id in range(2, 6):
+                StrategyCacheManager.publish_strategy_changes([strategy_id])
+        assert cache.zcard(StrategyCacheManager.CHANGED_IDS_CACHE_KEY) == 2
+        assert int(cache.hget(StrategyCacheManager.CHANGE_FEED_CACHE_KEY, "reset_version")) == 3
+
+        sync(mirror)
+        assert not mirror._strategies
+        assert mirror.version == 5
+
+        # 缓存被重建，变更版本回退
+        mirror.get_strategies(StrategyCacheManager, [1])
+        cache.delete(StrategyCacheManager.CHANGE_FEED_CACHE_KEY)
+        sync(mirror)
+        assert not mirror._strategies
+        assert mirror.version == 0
+
+    @override_settings(STRATEGY_LOCAL_MIRROR_ENABLED=True)
+    def test_cache_manager(self, cache):
+        StrategyCacheManager.refresh_strategy([gen_strategy(1), gen_strategy(2)], old_groups=[])
+        with mock.patch("alarm_backends.core.cache.strategy.strategy_mirror", StrategyLocalMirror()):
+            assert StrategyCacheManager.get_strategy_by_id(1)["id"] == 1
+            assert StrategyCacheManager.get_strategy_by_id(3) is None
+            assert [strategy["id"] for strategy in StrategyCacheManager.get_strategy_by_ids([2, 3, 1])] == [2, 1]
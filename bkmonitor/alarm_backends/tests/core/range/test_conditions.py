@@ -9,7 +9,9 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import random
 
+from bkmonitor.utils.range import CONDITION_CLASS_MAP, load_field_instance
 from bkmonitor.utils.range.conditions import (
     AndCondition,
     EqualCondition,
@@ -211,3 +213,100 @@ class TestCondition(object):
         and_condition.add(condition3)
         assert not and_condition.is_match({"key": "123"})
         assert and_condition.is_match({"key": "1234235678"})
+
+
+def gen_condition_tree(seed):
+    random.seed(seed)
+    cond_values = {
+        "key": [["value", "v"], "value", [101, 102], 99.5, [r"1234\d+5678", r"123\d+5678"], ["(", "value"], []],
+        "bk_topo_node": [["set|1", {"bk_obj_id": "module", "bk_inst_id": 2}], "biz|2"],
+        "ip": [["127.0.0.1"], [{"ip": "127.0.0.1", "bk_cloud_id": 0}]],
+        "bk_target_ip": [[{"bk_target_ip": "127.0.0.1", "bk_target_cloud_id": 0}], "127.0.0.2"],
+    }
+    or_condition = OrCondition()
+    for _ in range(random.randint(0, 3)):
+        and_condition = AndCondition()
+        for _ in range(random.randint(0, 4)):
+            field_name = random.choice(list(cond_values))
+            field = load_field_instance(field_name, random.choice(cond_values[field_name]))
+            condition_class = random.choice(list(CONDITION_CLASS_MAP.values()))
+            and_condition.add(condition_class(field, random.choice([False, True])))
+        or_condition.add(and_condition)
+    return or_condition
+
+
+def gen_condition_records(seed, count):
+    random.seed(seed)
+    values = {
+        "key": ["value", "asdfvalueasdf", ["v", "value"], 102, [99, 102], 1234235678, "12345678", "", [], None, "1e3"],
+        "bk_topo_node": [["set|1", "biz|2"], ["module|2"], "set|2"],
+        "ip": ["127.0.0.1", "127.0.0.2"],
+        "bk_cloud_id": [0, 1],
+        "bk_target_ip": ["127.0.0.1", "127.0.0.2"],
+        "bk_target_cloud_id": [0, "0"],
+        "bk_obj_id": ["set"],
+        "bk_inst_id": [1],
+    }
+    return [
+        {field: random.choice(choices) for field, choices in values.items() if random.random() > 0.3}
+        for _ in range(count)
+    ]
+
+
+def safe_call(func, data):
+    try:
+        return func(data)
+    except (TypeError, ValueError) as e:
+        return type(e)
+
+
+class TestCompiledCondition:
+    def test_compile_consistent(self):
+        for seed in range(300):
+            condition = gen_condition_tree(seed)
+            matcher = condition.compile()
+            for record in gen_condition_records(seed, 50):
+                assert safe_call(matcher, record) == safe_call(condition.is_match, record), (seed, record)
+
+    def test_compile_invalid_regex(self):
+        field = DimensionField("key", ["value", "(", "asdf"])
+        for condition in [RegularCondition(field), NotRegularCondition(field)]:
+            records = [{"key": "value"}, {"key": "asdf"}, {"key": []}, {}]
+            assert condition.match_many(records) == [condition.is_match(record) for record in records]
+
+    def test_compile_snapshot(self):
+        and_condition = AndCondition()
+        assert and_condition.compile()({}) is True
+
+        and_condition.add(EqualCondition(DimensionField("key", "value")))
+        matcher = and_condition.compile()
+        and_condition.add(EqualCondition(DimensionField("key", "value1")))
+        # 编译结果为快照，不受后续修改影响
+        assert matcher({"key": "value"}) is True
+        assert and_condition.compile()({"key": "value"}) is False
+
+    def test_match_many(self):
+        """
+        多分支条件树批量匹配结果与逐条匹配一致
+        """
+        condition = OrCondition()
+        for index in range(20):
+            and_condition = AndCondition()
+            and_condition.add(RegularCondition(DimensionField("device_name", [rf"^eth{index}\d*$"])))
+            and_condition.add(EqualCondition(DimensionField("bk_target_ip", [f"10.0.0.{i}" for i in range(index, 50)])))
+            and_condition.add(IncludeCondition(DimensionField("path", ["/data", "/var"])))
+            and_condition.add(GreaterCondition(DimensionField("value", index)))
+            condition.add(and_condition)
+
+        random.seed(0)
+        records = [
+            {
+                "device_name": f"eth{random.randint(0, 30)}",
+                "bk_target_ip": f"10.0.0.{random.randint(0, 60)}",
+                "path": random.choice(["/data/1", "/home", "/var/log"]),
+                "value": random.randint(0, 40),
+            }
+            for _ in range(500)
+        ]
+
+        assert condition.match_many(records) == [condition.is_match(record) for record in records]
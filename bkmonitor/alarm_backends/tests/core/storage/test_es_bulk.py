@@ -0,0 +1,187 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+
+import pytest
+from django.test import override_settings
+from elasticsearch.exceptions import TransportError
+from elasticsearch.helpers import BulkIndexError
+
+from alarm_backends.core.storage.es_bulk import BulkWriter
+
+
+class MockDocument:
+    """
+    模拟 ES 文档，bulk_create 记录每次请求的文档，并按 throttled 配置模拟限流
+    """
+
+    requests = []
+    # 文档ID -> 剩余的限流次数
+    throttled = {}
+    # 写入失败的文档ID
+    failed = set()
+    # 整个请求被限流的次数
+    request_throttled = 0
+    lock = threading.Lock()
+
+    def __init__(self, doc_id, size=10):
+        self.id = doc_id
+        self.size = size
+
+    def to_dict(self, skip_empty=True):
+        return {"id": self.id, "content": "x" * self.size}
+
+    @classmethod
+    def reset(cls):
+        cls.requests = []
+        cls.throttled = {}
+        cls.failed = set()
+        cls.request_throttled = 0
+
+    @classmethod
+    def bulk_create(cls, documents, action="create", skip_empty=True, **kwargs):
+        with cls.lock:
+            cls.requests.append((list(documents), kwargs))
+            if cls.request_throttled:
+                cls.request_throttled -= 1
+                raise TransportError(429, "es_rejected_execution_exception")
+            errors = []
+            for document in documents:
+                if cls.throttled.get(document.id):
+                    cls.throttled[document.id] -= 1
+                    errors.append({action: {"_id": document.id, "status": 429}})
+                elif document.id in cls.failed:
+                    errors.append({action: {"_id": document.id, "status": 400}})
+        if errors:
+            raise BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+
+
+class MockLogDocument(MockDocument):
+    """
+    未指定ID的文档，写入失败时的 _id 由 ES 生成
+    """
+
+    def __init__(self, doc_id, size=10):
+        super().__init__(doc_id, size)
+        del self.id
+        self.doc_id = doc_id
+
+    def to_dict(self, skip_empty=True):
+        return {"content": "x" * self.size}
+
+    @classmethod
+    def bulk_create(cls, documents, action="create", skip_empty=True, **kwargs):
+        with cls.lock:
+            cls.requests.append((list(documents), kwargs))
+            errors = [
+                {action: {"_id": f"generated_{document.doc_id}", "status": 429}}
+                for document in documents
+                if cls.throttled.get(document.doc_id)
+            ]
+        if errors:
+            raise BulkIndexError(f"{len(errors)} document(s) failed to index.", errors)
+
+
+@pytest.fixture
+def writer():
+    MockDocument.reset()
+    bulk_writer = BulkWriter()
+    bulk_writer.INITIAL_BACKOFF = 0
+    with override_settings(
+        ES_BULK_WRITER_ENABLED=True,
+        ES_BULK_CHUNK_SIZE=100,
+        ES_BULK_MAX_CHUNK_SIZE=400,
+        ES_BULK_MAX_CHUNK_BYTES=10 * 1024 * 1024,
+        ES_BULK_MAX_WORKERS=4,
+        ES_BULK_MAX_RETRIES=3,
+    ):
+        yield bulk_writer
+
+
+class TestBulkWriter:
+    def test_split_chunks(self, writer):
+        documents = [MockDocument(index) for index in range(250)]
+        assert [len(chunk) for chunk in writer.split_chunks(documents, 100)] == [100, 100, 50]
+
+        # 按字节数限制单次请求条数
+        with override_settings(ES_BULK_MAX_CHUNK_BYTES=10 * 1024):
+            large_documents = [MockDocument(index, size=1000) for index in range(50)]
+            chunks = writer.split_chunks(large_documents, 100)
+            assert len(chunks) == 6
+            assert sum(len(chunk) for chunk in chunks) == 50
+
+    def test_write_concurrently(self, writer):
+        documents = [MockDocument(index) for index in range(1000)]
+        assert writer.write(MockDocument, documents) == 1000
+
+        assert len(MockDocument.requests) == 10
+        written = sorted(document.id for request, _ in MockDocument.requests for document in request)
+        assert written == list(range(1000))
+        # 由写入器控制请求切分及重试
+        assert all(kwargs["max_retries"] == 0 for _, kwargs in MockDocument.requests)
+        assert writer.get_state("MockDocument").pending == 0
+
+    def test_retry_throttled(self, writer):
+        MockDocument.throttled = {1: 1, 2: 2}
+        documents = [MockDocument(index) for index in range(10)]
+        assert writer.write(MockDocument, documents) == 10
+
+        # 仅被限流的文档重试，且单次请求条数减小
+        assert [[document.id for document in request] for request, _ in MockDocument.requests[1:]] == [[1, 2], [2]]
+        assert writer.get_state("MockDocument").chunk_size == writer.MIN_CHUNK_SIZE
+
+        MockDocument.reset()
+        MockDocument.request_throttled = 1
+        assert writer.write(MockDocument, documents) == 10
+        assert len(MockDocument.requests) == 2
+
+    def test_failed(self, writer):
+        MockDocument.failed = {3}
+        MockDocument.throttled = {5: 10}
+        documents = [MockDocument(index) for index in range(300)]
+        with pytest.raises(BulkIndexError) as exc_info:
+            writer.write(MockDocument, documents)
+
+        # 非限流错误不重试，限流超过重试次数后返回错误
+        assert sorted(next(iter(error.values()))["_id"] for error in exc_info.value.errors) == [3, 5]
+        assert writer.get_state("MockDocument").pending == 0
+
+    def test_throttled_without_id(self, writer):
+        MockDocument.throttled = {1: 1}
+        documents = [MockLogDocument(index) for index in range(10)]
+        with pytest.raises(BulkIndexError) as exc_info:
+            writer.write(MockLogDocument, documents)
+
+        # 无法对应到文档的限流错误不重试，作为失败返回
+        assert len(MockDocument.requests) == 1
+        assert [next(iter(error.values()))["_id"] for error in exc_info.value.errors] == ["generated_1"]
+
+    def test_disabled(self, writer, mocker):
+        bulk_create = mocker.patch.object(MockDocument, "bulk_create")
+        with override_settings(ES_BULK_WRITER_ENABLED=False):
+            assert writer.write(MockDocument, [], action="index") == 0
+        bulk_create.assert_called_once_with([], action="index", skip_empty=True)
+        assert not writer._states
+
+    def test_adjust_chunk_size(self, writer):
+        state = writer.get_state("MockDocument")
+        writer.adjust_chunk_size(state, 100, 0.1, False)
+        assert state.chunk_size == 125
+        # 未满批的请求不增大条数
+        writer.adjust_chunk_size(state, 10, 0.1, False)
+        assert state.chunk_size == 125
+        for _ in range(10):
+            writer.adjust_chunk_size(state, state.chunk_size, 0.1, False)
+        assert state.chunk_size == 400
+        writer.adjust_chunk_size(state, 400, 5, False)
+        assert state.chunk_size == 300
+        writer.adjust_chunk_size(state, 300, 0.1, True)
+        assert state.chunk_size == 150
@@ -8,9 +8,13 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
+import threading
+import time
+from types import SimpleNamespace
 from unittest import mock
 
 import pytest
+from django.test import override_settings
 
 from alarm_backends.core.storage import redis_cluster
 from alarm_backends.core.storage.redis import REDIS_SOCKET_TIMEOUT_FLOOR
@@ -90,6 +94,131 @@ class TestPipelineProxyExecute:
         assert proxy.command_stack == []
 
 
+class _SlowPipeline:
+    """模拟网络往返耗时的原生 pipeline"""
+
+    def __init__(self, name, rtt, fail=False):
+        self.name = name
+        self.rtt = rtt
+        self.fail = fail
+        self.buffer = []
+        self.reset_count = 0
+        self.thread_name = None
+
+    def get(self, key):
+        self.buffer.append(key)
+
+    def execute(self):
+        self.thread_name = threading.current_thread().name
+        time.sleep(self.rtt)
+        buf, self.buffer = self.buffer, []
+        if self.fail:
+            raise ConnectionError(f"{self.name} closed")
+        return [f"{self.name}:{k}" for k in buf]
+
+    def reset(self):
+        self.reset_count += 1
+        self.buffer = []
+
+
+def _make_slow_proxy(node_count, rtt, fail_nodes=()):
+    proxy = _make_proxy()
+    for index in range(node_count):
+        name = f"node-{index}"
+        proxy._pipeline_pool[name] = _SlowPipeline(name, rtt, fail=name in fail_nodes)
+    # 命令交错分布在各节点上
+    for command_index in range(node_count * 3):
+        name = f"node-{command_index % node_count}"
+        proxy._pipeline_pool[name].get(command_index)
+        proxy.command_stack.append(name)
+    return proxy
+
+
+class TestPipelineProxyParallelExecute:
+    @pytest.fixture(autouse=True)
+    def parallel(self):
+        with override_settings(REDIS_PIPELINE_EXECUTE_MAX_WORKERS=8):
+            yield
+
+    def test_parallel_keeps_command_order(self):
+        proxy = _make_slow_proxy(4, 0.01)
+        pipelines = list(proxy._pipeline_pool.values())
+
+        result = proxy.execute()
+
+        assert result == [f"node-{index % 4}:{index}" for index in range(12)]
+        # 各节点在线程池中执行
+        assert all(pipeline.thread_name.startswith("redis-pipeline") for pipeline in pipelines)
+        assert proxy.command_stack == []
+
+    def test_parallel_failure_waits_all_nodes(self):
+        proxy = _make_slow_proxy(3, 0.01, fail_nodes=("node-1",))
+        pipelines = list(proxy._pipeline_pool.values())
+
+        with pytest.raises(ConnectionError):
+            proxy.execute()
+
+        # 所有节点执行结束后才清理
+        assert all(pipeline.buffer == [] for pipeline in pipelines)
+        assert all(pipeline.reset_count == 1 for pipeline in pipelines)
+        assert proxy.command_stack == []
+
+    def test_idle_node_not_executed(self):
+        proxy = _make_proxy()
+        busy, idle = mock.Mock(), mock.Mock()
+        busy.execute.return_value = ["v1"]
+        proxy._pipeline_pool = {"node-a": busy, "node-b": idle}
+        proxy.command_stack = ["node-a"]
+
+        assert proxy.execute() == ["v1"]
+        idle.execute.assert_not_called()
+
+    @override_settings(REDIS_PIPELINE_EXECUTE_MAX_WORKERS=1)
+    def test_serial_when_disabled(self):
+        proxy = _make_slow_proxy(3, 0)
+        pipelines = list(proxy._pipeline_pool.values())
+
+        assert len(proxy.execute()) == 9
+        # 未开启并发时在当前线程串行执行
+        assert all(pipeline.thread_name == threading.current_thread().name for pipeline in pipelines)
+
+
+class TestStrategyRouter:
+    @pytest.fixture(autouse=True)
+    def router(self):
+        saved = (redis_cluster.DEFAULT_NODE, redis_cluster.STRATEGY_ROUTER_CACHE, redis_cluster.STRATEGY_NODE_MAP)
+        yield
+        (redis_cluster.DEFAULT_NODE, redis_cluster.STRATEGY_ROUTER_CACHE, redis_cluster.STRATEGY_NODE_MAP) = saved
+
+    def test_route_by_score(self):
+        node_a, node_b, node_c = SimpleNamespace(id="a"), SimpleNamespace(id="b"), SimpleNamespace(id="c")
+        redis_cluster.DEFAULT_NODE = node_a
+        redis_cluster.STRATEGY_ROUTER_CACHE = [
+            SimpleNamespace(strategy_score=100, node=node_a),
+            SimpleNamespace(strategy_score=200, node=node_b),
+            SimpleNamespace(strategy_score=2**20 + 1, node=node_c),
+        ]
+
+        assert redis_cluster.get_node_by_strategy_id(0) is node_a
+        assert redis_cluster.get_node_by_strategy_id(99) is node_a
+        assert redis_cluster.get_node_by_strategy_id(100) is node_b
+        assert redis_cluster.get_node_by_strategy_id(199) is node_b
+        assert redis_cluster.get_node_by_strategy_id(200) is node_c
+        assert redis_cluster.STRATEGY_NODE_MAP == {99: node_a, 100: node_b, 199: node_b, 200: node_c}
+        with pytest.raises(Exception):
+            redis_cluster.get_node_by_strategy_id(2**20 + 1)
+
+    def test_refresh_on_router_change(self):
+        node_a, node_b = SimpleNamespace(id="a"), SimpleNamespace(id="b")
+        redis_cluster.STRATEGY_ROUTER_CACHE = [SimpleNamespace(strategy_score=1000, node=node_a)]
+        assert redis_cluster.get_node_by_strategy_id(1) is node_a
+
+        # 路由表替换后，已缓存的策略路由失效
+        redis_cluster.STRATEGY_ROUTER_CACHE = [SimpleNamespace(strategy_score=1000, node=node_b)]
+        assert redis_cluster.get_node_by_strategy_id(1) is node_b
+        assert redis_cluster.STRATEGY_NODE_MAP == {1: node_b}
+
+
 class _Node:
     """最小 CacheNode 替身；execute 行为由 fail/partial 控制。"""
 
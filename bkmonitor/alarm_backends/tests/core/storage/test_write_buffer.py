@@ -0,0 +1,189 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import threading
+import time
+from unittest import mock
+
+import fakeredis
+import pytest
+from celery.signals import worker_process_shutdown
+
+from alarm_backends.core.storage import write_buffer as write_buffer_module
+from alarm_backends.core.storage.write_buffer import WriteBehindBuffer
+
+
+@pytest.fixture
+def client():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    redis.flushall()
+    return redis
+
+
+@pytest.fixture
+def buffer():
+    write_buffer = WriteBehindBuffer(flush_interval=60)
+    yield write_buffer
+    write_buffer.shutdown()
+
+
+class TestWriteBehindBuffer:
+    def test_coalesce_and_flush(self, client, buffer):
+        buffer.set(client, "checkpoint", 1, 300)
+        buffer.set(client, "checkpoint", 2, 300)
+        buffer.sadd(client, "dup", "a", "b")
+        buffer.sadd(client, "dup", "b", "c")
+        buffer.expire(client, "dup", 100)
+        buffer.expire(client, "dup", 200)
+
+        # 同一 key 的写入被合并
+        assert buffer.pending_count() == 3
+        assert client.get("checkpoint") is None
+
+        execute = mock.Mock(wraps=buffer._execute)
+        with mock.patch.object(buffer, "_execute", execute):
+            buffer.flush()
+
+        # 单个客户端仅执行一次 pipeline
+        assert execute.call_count == 1
+        assert buffer.pending_count() == 0
+        assert client.get("checkpoint") == "2"
+        assert client.smembers("dup") == {"a", "b", "c"}
+        assert 100 < client.ttl("dup") <= 200
+
+    def test_read_your_writes(self, client, buffer):
+        buffer.set(client, "checkpoint", 10)
+        buffer.sadd(client, "dup", "a")
+
+        assert buffer.get(client, "checkpoint") == 10
+        assert buffer.get(client, "missing", 0) == 0
+        assert buffer.smembers(client, "dup") == {"a"}
+        assert buffer.smembers(client, "missing") == set()
+
+        # 不同客户端的数据互相隔离
+        other = fakeredis.FakeRedis(decode_responses=True)
+        assert buffer.get(other, "checkpoint") is None
+
+    def test_flush_failed_requeue(self, client, buffer):
+        buffer.set(client, "checkpoint", 1)
+        buffer.sadd(client, "dup", "a")
+
+        with mock.patch.object(buffer, "_execute", side_effect=ConnectionError("closed")):
+            buffer.flush()
+
+        # 写入失败后数据回退到缓冲，期间的新写入优先
+        assert buffer.pending_count() == 2
+        buffer.set(client, "checkpoint", 2)
+        buffer.flush()
+        assert client.get("checkpoint") == "2"
+        assert client.smembers("dup") == {"a"}
+
+    def test_flush_failed_drop_after_max_retry(self, client, buffer):
+        buffer.set(client, "checkpoint", 1)
+        with mock.patch.object(buffer, "_execute", side_effect=ConnectionError("closed")):
+            for _ in range(buffer.max_retry + 1):
+                buffer.flush()
+        assert buffer.pending_count() == 0
+
+    def test_flush_failed_retry_per_client(self, client, buffer):
+        other = fakeredis.FakeRedis(decode_responses=True)
+        buffer.set(client, "checkpoint", 1)
+
+        def execute(redis_client, client_buffer):
+            if redis_client is client:
+                raise ConnectionError("closed")
+
+        # 其他客户端写入成功不影响失败客户端的重试次数
+        with mock.patch.object(buffer, "_execute", side_effect=execute):
+            for _ in range(buffer.max_retry):
+                buffer.set(other, "checkpoint", 1)
+                buffer.flush()
+        assert buffer.get(client, "checkpoint") == 1
+        assert buffer.pending_count() == 1
+
+    def test_write_during_flush(self, client, buffer):
+        buffer.set(client, "checkpoint", 1)
+        buffer.sadd(client, "dup", "a")
+        executing = threading.Event()
+        resume = threading.Event()
+        execute = buffer._execute
+
+        def slow_execute(redis_client, client_buffer):
+            executing.set()
+            resume.wait(5)
+            execute(redis_client, client_buffer)
+
+        with mock.patch.object(buffer, "_execute", side_effect=slow_execute):
+            flush_thread = threading.Thread(target=buffer.flush)
+            flush_thread.start()
+            assert executing.wait(5)
+
+            # 写入 redis 期间不阻塞写入方，且正在写入的数据仍可读取
+            buffer.set(client, "checkpoint", 2)
+            buffer.sadd(client, "dup", "b")
+            assert buffer.get(client, "checkpoint") == 2
+            assert buffer.smembers(client, "dup") == {"a", "b"}
+            resume.set()
+            flush_thread.join(5)
+
+        assert client.get("checkpoint") == "1"
+        buffer.flush()
+        assert client.get("checkpoint") == "2"
+        assert client.smembers("dup") == {"a", "b"}
+
+    def test_max_pending_flush(self, client):
+        write_buffer = WriteBehindBuffer(flush_interval=60, max_pending=3)
+        write_buffer.set(client, "checkpoint", 1)
+        write_buffer.sadd(client, "dup", "a")
+        assert client.get("checkpoint") is None
+
+        # 超过阈值时唤醒后台线程提前写入
+        write_buffer.expire(client, "dup", 100)
+        for _ in range(100):
+            if client.get("checkpoint"):
+                break
+            time.sleep(0.01)
+        assert client.get("checkpoint") == "1"
+        assert client.smembers("dup") == {"a"}
+        write_buffer.shutdown()
+
+    def test_timer_flush(self, client):
+        write_buffer = WriteBehindBuffer(flush_interval=0.05)
+        write_buffer.set(client, "checkpoint", 1)
+
+        for _ in range(100):
+            if client.get("checkpoint"):
+                break
+            time.sleep(0.01)
+        assert client.get("checkpoint") == "1"
+
+        # 无待写入数据时后台线程退出，再次写入时重新拉起
+        for _ in range(100):
+            if write_buffer._flush_thread is None:
+                break
+            time.sleep(0.01)
+        assert write_buffer._flush_thread is None
+        write_buffer.set(client, "checkpoint", 2)
+        assert write_buffer._flush_thread.is_alive()
+        write_buffer.shutdown()
+
+    def test_shutdown_flush(self, client):
+        write_buffer = WriteBehindBuffer(flush_interval=60)
+        write_buffer.sadd(client, "dup", "a")
+        write_buffer.shutdown()
+        assert client.smembers("dup") == {"a"}
+
+    def test_worker_process_shutdown_flush(self, client):
+        # celery 子进程回收时不会执行 atexit，通过信号写入剩余数据
+        write_buffer = WriteBehindBuffer(flush_interval=60)
+        write_buffer.set(client, "checkpoint", 1)
+        with mock.patch.object(write_buffer_module, "_buffer", write_buffer):
+            worker_process_shutdown.send(sender=None)
+        assert client.get("checkpoint") == "1"
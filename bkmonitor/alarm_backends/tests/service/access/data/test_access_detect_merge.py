@@ -307,3 +307,50 @@ class TestAccessDetectMerge:
                 assert call_args is not None
                 # pull_data(item, inputs=data_points)
                 assert "inputs" in call_args.kwargs or len(call_args.args) > 1
+
+    @mock.patch(
+        "alarm_backends.core.cache.strategy.StrategyCacheManager.get_strategy_by_id",
+        return_value=MULTI_ITEM_STRATEGY,
+    )
+    @mock.patch(
+        "alarm_backends.core.cache.strategy.StrategyCacheManager.get_strategy_group_detail",
+        return_value={"1": [1, 2]},
+    )
+    @mock.patch("alarm_backends.service.detect.process.DetectProcess.push_data")
+    @mock.patch("alarm_backends.service.detect.process.DetectProcess.double_check")
+    @mock.patch("alarm_backends.service.detect.process.DetectProcess.handle_data")
+    @mock.patch("alarm_backends.service.detect.process.DetectProcess.pull_data")
+    @mock.patch("alarm_backends.core.control.strategy.Strategy.gen_strategy_snapshot")
+    def test_detect_and_push_abnormal_multi_item(
+        self,
+        mock_gen_snapshot,
+        mock_pull_data,
+        mock_handle_data,
+        mock_double_check,
+        mock_push_data,
+        mock_strategy_group,
+        mock_strategy,
+    ):
+        """
+        测试多 item 合并检测：记录只分发一次，同一策略只生成一次快照、只推送一次异常数据
+        """
+        acc_data = AccessDataProcess("test_detect_multi_item")
+        assert len(acc_data.items) == 2
+        item1, item2 = acc_data.items
+
+        mock_records = [MockRecord(RAW_DATA), MockRecord(RAW_DATA_ZERO)]
+        # 第二条记录被 item2 抑制
+        mock_records[1].inhibitions[item2.id] = True
+        acc_data.record_list = mock_records
+
+        with mock.patch.object(settings, "ACCESS_DETECT_MERGE_ENABLED", True):
+            acc_data._detect_and_push_abnormal()
+
+        assert mock_gen_snapshot.call_count == 1
+        assert mock_push_data.call_count == 1
+        assert mock_handle_data.call_count == 2
+
+        inputs = {call.args[0].id: call.kwargs["inputs"] for call in mock_pull_data.call_args_list}
+        assert len(inputs[item1.id]) == 2
+        assert len(inputs[item2.id]) == 1
+        assert all(data_point.item is item2 for data_point in inputs[item2.id])
@@ -0,0 +1,90 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import base64
+import gzip
+import json
+
+import pytest
+
+from alarm_backends.service.access.data.codec import (
+    CODEC_COLUMNAR,
+    CODEC_JSON,
+    COMPRESSION_LZ4,
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    COMPRESSION_ZSTD,
+    decode_batch_points,
+    encode_batch_points,
+    get_available_compression,
+)
+
+
+def gen_points(series_count, point_count):
+    points = []
+    for series_index in range(series_count):
+        for point_index in range(point_count):
+            points.append(
+                {
+                    "bk_target_ip": f"10.0.{series_index // 256}.{series_index % 256}",
+                    "bk_target_cloud_id": "0",
+                    "_time_": 1700000000000 + point_index * 60000,
+                    "_result_": series_index * 1.5 + point_index if series_index % 2 else series_index,
+                    "device_name": f"eth{series_index % 4}",
+                }
+            )
+    return points
+
+
+class TestCodec:
+    def test_json_codec_compatible_with_legacy(self):
+        points = gen_points(3, 3)
+        legacy = base64.b64encode(gzip.compress(json.dumps(points).encode("utf-8")))
+
+        assert decode_batch_points(legacy) == points
+        assert decode_batch_points(legacy.decode("ascii")) == points
+        assert decode_batch_points(encode_batch_points(points, CODEC_JSON)) == points
+
+    @pytest.mark.parametrize(
+        "compression", [COMPRESSION_NONE, COMPRESSION_ZLIB, COMPRESSION_ZSTD, COMPRESSION_LZ4, "unknown"]
+    )
+    def test_columnar_roundtrip(self, compression):
+        points = gen_points(5, 10)
+        points.extend(
+            [
+                # 缺失字段、None值、布尔值、嵌套结构、大整数
+                {"_time_": 1700000000000, "_result_": None, "tags": ["a", "b"]},
+                {"_time_": 1700000060000, "_result_": True, "bk_target_ip": None},
+                {"_time_": 1700000120000, "_result_": 2**60, "extra": {"k": "v"}},
+                {},
+            ]
+        )
+
+        data = encode_batch_points(points, CODEC_COLUMNAR, compression)
+        assert data.startswith(f"bkac:1:{get_available_compression(compression)}:")
+
+        result = decode_batch_points(data)
+        assert result == json.loads(json.dumps(points))
+        # 类型需与json格式保持一致
+        for origin, decoded in zip(json.loads(json.dumps(points)), result):
+            for field, value in origin.items():
+                assert type(decoded[field]) is type(value)
+
+    def test_columnar_empty(self):
+        assert decode_batch_points(encode_batch_points([], CODEC_COLUMNAR)) == []
+
+    def test_columnar_nested_not_shared(self):
+        points = [{"_time_": 1700000000000 + index, "tags": ["a"], "extra": {"k": "v"}} for index in range(3)]
+        result = decode_batch_points(encode_batch_points(points, CODEC_COLUMNAR))
+
+        result[0]["tags"].append("b")
+        result[0]["extra"]["k"] = "changed"
+        assert [point["tags"] for point in result[1:]] == [["a"], ["a"]]
+        assert [point["extra"] for point in result[1:]] == [{"k": "v"}, {"k": "v"}]
@@ -0,0 +1,74 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import pytest
+
+from alarm_backends.service.access.data import dimension_hash
+from alarm_backends.service.access.data.dimension_hash import (
+    HASH_MD5,
+    HASH_XXH3,
+    XXH3_PREFIX,
+    DimensionHasher,
+)
+from bkmonitor.utils.common_utils import count_md5
+
+
+def gen_dimensions(count, cardinality=100):
+    return [
+        {
+            "bk_target_ip": f"10.0.{index // 250 % 250}.{index % 250}",
+            "bk_target_cloud_id": "0",
+            "device_name": f"eth{index % 4}",
+            "bk_biz_id": 2,
+            "instance": f"instance-{index % cardinality}",
+        }
+        for index in range(count)
+    ]
+
+
+class TestDimensionHasher:
+    @pytest.mark.parametrize(
+        "dimensions",
+        [
+            {},
+            {"bk_target_ip": "127.0.0.1", "bk_target_cloud_id": "0"},
+            {"bk_target_ip": "127.0.0.1", "bk_target_cloud_id": 0, "is_up": True, "value": 1.5, "empty": None},
+            {"name": "中文维度", "tags": ["b", "a"], "labels": {"env": "prod", "zone": 1}},
+            {1: "int key", 2: "str key"},
+        ],
+    )
+    def test_md5_compatible(self, dimensions):
+        hasher = DimensionHasher()
+        assert hasher.md5(dimensions) == count_md5(dimensions)
+        # 命中缓存后结果不变
+        assert hasher.md5(dict(reversed(list(dimensions.items())))) == count_md5(dimensions)
+
+    def test_hash_many(self):
+        hasher = DimensionHasher()
+        dimensions_list = gen_dimensions(1000)
+        assert hasher.hash_many(dimensions_list, HASH_MD5) == [count_md5(d) for d in dimensions_list]
+
+        hashes = hasher.hash_many(dimensions_list, HASH_XXH3)
+        assert all(h.startswith(XXH3_PREFIX) for h in hashes)
+        assert len(set(hashes)) == len({count_md5(d) for d in dimensions_list})
+        # 与键的顺序无关
+        assert hasher.hash_many([dict(reversed(list(dimensions_list[0].items())))], HASH_XXH3)[0] == hashes[0]
+
+    def test_xxh3_fallback(self, monkeypatch):
+        monkeypatch.setattr(dimension_hash, "xxhash", None)
+        dimensions = {"bk_target_ip": "127.0.0.1"}
+        assert DimensionHasher().hash_many([dimensions], HASH_XXH3) == [count_md5(dimensions)]
+
+    def test_max_cache_size(self):
+        hasher = DimensionHasher()
+        hasher.MAX_CACHE_SIZE = 10
+        dimensions_list = gen_dimensions(100, cardinality=100)
+        assert hasher.hash_many(dimensions_list) == [count_md5(d) for d in dimensions_list]
+        assert len(hasher._digests) <= 10 and len(hasher._pair_digests) <= 10
@@ -14,7 +14,10 @@ import copy
 
 import fakeredis
 import pytest
+from django.test import override_settings
 
+from alarm_backends.core.cache import key
+from alarm_backends.core.storage.write_buffer import flush_write_buffer
 from alarm_backends.service.access.data.duplicate import Duplicate
 
 from .config import STANDARD_DATA
@@ -65,3 +68,23 @@ class TestDuplicate(object):
         assert dup.is_duplicate(record_1) is True
         assert dup.is_duplicate(record_2) is True
         assert dup.is_duplicate(record) is False
+
+    @override_settings(ACCESS_WRITE_BEHIND_ENABLED=True)
+    def test_refresh_cache_write_behind(self):
+        strategy_group_key = "123456789"
+        dup = Duplicate(strategy_group_key)
+
+        raw_data_1 = copy.deepcopy(STANDARD_DATA)
+        record_1 = MockRecord(raw_data_1)
+        record_1.time += 60
+        dup.add_record(record_1)
+        dup.refresh_cache()
+
+        # 写缓冲尚未写入 redis 时，进程内读取也能命中
+        dup_key = key.ACCESS_DUPLICATE_KEY.get_key(strategy_group_key=strategy_group_key, dt_event_time=record_1.time)
+        assert dup.client.smembers(dup_key) == set()
+        assert Duplicate(strategy_group_key).is_duplicate(record_1) is True
+
+        flush_write_buffer()
+        assert dup.client.smembers(dup_key) == {str(record_1.record_id)}
+        assert Duplicate(strategy_group_key).is_duplicate(record_1) is True
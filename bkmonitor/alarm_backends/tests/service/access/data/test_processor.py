@@ -114,8 +114,16 @@ class TestAccessDataProcess:
         )
         assert len(acc_data.record_list) == 1
         assert mock_batch.delay.call_count == 1
-
-        p = AccessBatchDataProcess(strategy_group_key=strategy_group_key, sub_task_id=f"{acc_data.batch_timestamp}.2")
+        # 未开启自适应分批时不传递下发时间，兼容旧版本 worker
+        assert "dispatch_time" not in mock_batch.delay.call_args.kwargs
+
+        # 排队延迟从子任务下发时开始计算
+        dispatch_time = time.time()
+        p = AccessBatchDataProcess(
+            strategy_group_key=strategy_group_key,
+            sub_task_id=f"{acc_data.batch_timestamp}.2",
+            dispatch_time=dispatch_time,
+        )
         p.filters = []
         p.process()
         assert len(p.record_list) == 1
@@ -128,6 +136,12 @@ class TestAccessDataProcess:
             -1,
         )
         assert len(result) == 1
+        assert 0 <= json.loads(result[0])["queue_lag"] <= time.time() - dispatch_time
+
+        # 开启自适应分批时子任务携带下发时间
+        with mock.patch("django.conf.settings.ACCESS_DATA_BATCH_ADAPTIVE_ENABLED", True):
+            acc_data.send_batch_data(copy.deepcopy(query_record), 1)
+        assert mock_batch.delay.call_args.kwargs["dispatch_time"] >= acc_data.batch_timestamp
 
     @mock.patch(
         "alarm_backends.core.cache.strategy.StrategyCacheManager.get_strategy_by_id", return_value=STRATEGY_CONFIG_V3
@@ -372,3 +386,132 @@ class TestLimitRecordsByTimePointsLogType:
         # LOG 类型不触发限制，全部保留
         assert len(result_records) == 5
         assert last_time_point is None
+
+
+def gen_stream_points(series_count, time_count, start_time=1569246000):
+    points = []
+    for time_index in range(time_count):
+        for series_index in range(series_count):
+            value = series_index % 100 + 0.5
+            points.append(
+                {
+                    "bk_target_ip": f"10.0.{series_index // 256}.{series_index % 256}",
+                    "load5": value,
+                    "bk_target_cloud_id": "0",
+                    "_time_": start_time + time_index * 60,
+                    "_result_": value,
+                }
+            )
+    return points
+
+
+@mock.patch("django.conf.settings.ACCESS_DETECT_MERGE_ENABLED", False)
+@mock.patch("django.conf.settings.ACCESS_DATA_BATCH_PROCESS_THRESHOLD", 0)
+class TestAccessDataStreamProcess:
+    def setup_method(self):
+        CacheNode.refresh_from_settings()
+        key.DATA_LIST_KEY.client.flushall()
+
+    def run_process(self, strategy_group_key, stream_enabled, points, chunk_size=1000):
+        with (
+            mock.patch("django.conf.settings.ACCESS_DATA_STREAM_ENABLED", stream_enabled),
+            mock.patch("django.conf.settings.ACCESS_DATA_STREAM_CHUNK_SIZE", chunk_size),
+            mock.patch(
+                "alarm_backends.core.control.item.Item.query_record", side_effect=lambda *args: copy.deepcopy(points)
+            ),
+        ):
+            acc_data = AccessDataProcess(strategy_group_key)
+            acc_data.filters = []
+            acc_data.fullers = []
+            assert acc_data.process() is None
+        return acc_data
+
+    @staticmethod
+    def pop_pushed_data():
+        client = key.DATA_LIST_KEY.client
+        output_key = key.DATA_LIST_KEY.get_key(strategy_id=1, item_id=1)
+        data = []
+        for raw in client.lrange(output_key, 0, -1):
+            record = json.loads(raw)
+            record.pop("access_time", None)
+            data.append(record)
+        client.delete(output_key)
+        client.delete(key.DATA_SIGNAL_KEY.get_key())
+        return data
+
+    @mock.patch(
+        "alarm_backends.core.cache.strategy.StrategyCacheManager.get_strategy_by_id", return_value=STRATEGY_CONFIG_V3
+    )
+    @mock.patch(
+        "alarm_backends.core.cache.strategy.StrategyCacheManager.get_strategy_group_detail", return_value={"1": [1]}
+    )
+    def test_stream_equivalence(self, mock_strategy_group, mock_strategy):
+        points = gen_stream_points(2500, 3)
+        points.append(copy.deepcopy(RAW_DATA_NONE))
+
+        normal = self.run_process("stream_normal", False, points)
+        normal_data = self.pop_pushed_data()
+
+        stream = self.run_process("stream_stream", True, points)
+        stream_data = self.pop_pushed_data()
+
+        assert len(normal_data) == 7500
+        assert stream_data == normal_data
+        assert stream.record_list == []
+        assert stream.get_max_record_time() == normal.get_max_record_time()
+        assert stream.max_queried_data_time == normal.max_queried_data_time
+
+        # 再次处理相同数据，全部被去重
+        self.run_process("stream_stream", True, points)
+        assert self.pop_pushed_data() == []
+
+
+@mock.patch("django.conf.settings.ACCESS_DATA_BATCH_ADAPTIVE_ENABLED", True)
+@mock.patch("django.conf.settings.ACCESS_DATA_BATCH_PROCESS_SIZE", 50000)
+@mock.patch("django.conf.settings.ACCESS_DATA_BATCH_TARGET_LATENCY", 10)
+@mock.patch("django.conf.settings.ACCESS_DATA_BATCH_MIN_SIZE", 1000)
+@mock.patch("django.conf.settings.ACCESS_DATA_BATCH_MAX_SIZE", 500000)
+class TestAccessDataBatchAdaptive:
+    def setup_method(self):
+        CacheNode.refresh_from_settings()
+        key.ACCESS_BATCH_STAT_KEY.client.flushall()
+
+    @mock.patch(
+        "alarm_backends.core.cache.strategy.StrategyCacheManager.get_strategy_by_id", return_value=STRATEGY_CONFIG_V3
+    )
+    @mock.patch(
+        "alarm_backends.core.cache.strategy.StrategyCacheManager.get_strategy_group_detail", return_value={"1": [1]}
+    )
+    def test_batch_threshold(self, mock_strategy_group, mock_strategy):
+        acc_data = AccessDataProcess("batch_adaptive")
+
+        # 无历史统计时使用默认单批数据量，并按批次数均分
+        assert acc_data.get_batch_threshold(120000) == 40000
+
+        # 单点耗时 0.1ms，目标耗时 10s，单批 10 万
+        acc_data.update_batch_stat(
+            [
+                {"sub_task_id": "1.1", "result": True, "process_counts": {}},
+                {"sub_task_id": "1.2", "result": True, "point_count": 50000, "process_time": 5, "queue_lag": 1},
+                {"sub_task_id": "1.3", "result": False, "point_count": 50000, "process_time": 50, "queue_lag": 1},
+            ]
+        )
+        stat = acc_data.get_batch_stat()
+        assert stat["cost_per_point"] == pytest.approx(0.0001)
+        assert acc_data.get_batch_threshold(1000000) == 100000
+        # 避免尾部小批次：105 万拆分为 11 批
+        assert acc_data.get_batch_threshold(1050000) == 95455
+
+        # 队列积压时放大单批数据量
+        acc_data.update_batch_stat(
+            [{"sub_task_id": "2.2", "result": True, "point_count": 50000, "process_time": 5, "queue_lag": 100}]
+        )
+        assert acc_data.get_batch_stat()["queue_lag"] == pytest.approx(30.7)
+        assert acc_data.get_batch_threshold(1000000) == 250000
+
+        # 上下限
+        with mock.patch("django.conf.settings.ACCESS_DATA_BATCH_MAX_SIZE", 80000):
+            assert acc_data.get_batch_threshold(800000) == 80000
+
+        with mock.patch("django.conf.settings.ACCESS_DATA_BATCH_ADAPTIVE_ENABLED", False):
+            assert acc_data.get_batch_threshold(1000000) == 50000
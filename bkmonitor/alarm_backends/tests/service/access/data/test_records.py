@@ -43,3 +43,16 @@ class TestRecords:
         item.query.is_partial = False
         complete_record = DataRecord(item, FORMAT_RAW_DATA).clean()
         assert "is_partial" not in complete_record.data
+
+    def test_compact_record(self, mocker):
+        get_strategy_by_id = mocker.patch.object(StrategyCacheManager, "get_strategy_by_id")
+        get_strategy_by_id.return_value = copy.deepcopy(STRATEGY_CONFIG_V3)
+        item = Strategy(1).items[0]
+
+        record = DataRecord(item, FORMAT_RAW_DATA)
+        assert not hasattr(record, "__dict__")
+
+        # 调用方预先计算的 record_id 不再重复计算
+        record.record_id = "precomputed"
+        assert record.clean().data["record_id"] == "precomputed"
+        assert record.data["dimensions"] == STANDARD_DATA["dimensions"]
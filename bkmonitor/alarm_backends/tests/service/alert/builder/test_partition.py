@@ -0,0 +1,186 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+from unittest import mock
+
+import fakeredis
+import pytest
+from django.test import override_settings
+
+from alarm_backends.core.alert import Event
+from alarm_backends.service.alert.builder import partition as partition_module
+from alarm_backends.service.alert.builder.partition import (
+    AlertBuilderPartitionWorker,
+    dispatch_events,
+    get_partition,
+)
+from alarm_backends.service.alert_builder import handler as handler_module
+from alarm_backends.service.alert_builder.handler import AlertBuilderHandler
+
+NOW = 1700000000
+
+
+@pytest.fixture
+def client():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    redis.flushall()
+
+    def eval_script(script, numkeys, *args):
+        # fakeredis 未安装 lua 支持，按续约/释放/确认脚本的语义模拟
+        keys, argv = args[:numkeys], args[numkeys:]
+        if redis.get(keys[0]) != argv[0]:
+            return -1 if script == AlertBuilderPartitionWorker.ACK_SCRIPT else 0
+        if script == AlertBuilderPartitionWorker.RENEW_SCRIPT:
+            return redis.expire(keys[0], argv[1])
+        if script == AlertBuilderPartitionWorker.RELEASE_SCRIPT:
+            return redis.delete(keys[0])
+        redis.ltrim(keys[1], argv[1], -1)
+        if len(argv) > 3:
+            redis.lpush(keys[1], *argv[3:])
+            redis.expire(keys[1], argv[2])
+        return redis.llen(keys[1])
+
+    redis.eval = eval_script
+    return redis
+
+
+def make_worker(client, worker_id):
+    worker = AlertBuilderPartitionWorker(partition_count=4, worker_id=worker_id)
+    worker.client = client
+    worker.lease_client = client
+    return worker
+
+
+def make_event(dedupe_md5, event_id):
+    return Event({"id": event_id, "dedupe_md5": dedupe_md5, "create_time": NOW}, do_clean=False)
+
+
+class TestAlertBuilderPartition:
+    def test_get_partition(self):
+        # 同一告警总是路由到同一分区
+        assert get_partition("md5_1", 4) == get_partition("md5_1", 4)
+        partitions = {get_partition(f"md5_{index}", 4) for index in range(100)}
+        assert partitions == {0, 1, 2, 3}
+
+    def test_dispatch_fetch_ack(self, client):
+        worker = make_worker(client, "worker-1")
+        events = [make_event(f"md5_{index % 10}", str(index)) for index in range(50)]
+        dropped_event = make_event("md5_0", "dropped")
+        dropped_event.drop()
+
+        with mock.patch.object(partition_module.ALERT_BUILDER_PARTITION_KEY, "client", client):
+            assert dispatch_events(events + [dropped_event], partition_count=4) == []
+
+        fetched = []
+        for partition in range(4):
+            assert worker.claim(partition)
+            partition_events, count = worker.fetch(partition)
+            assert count == len(partition_events)
+            if not count:
+                continue
+            assert {get_partition(event.dedupe_md5, 4) for event in partition_events} == {partition}
+            # 需要重试的事件放回队首，其余事件确认后移除
+            assert worker.ack(partition, count, partition_events[:2]) == 2
+            assert [event.id for event in worker.fetch(partition)[0]] == [event.id for event in partition_events[:2]]
+            assert worker.ack(partition, 2) == 0
+            fetched.extend(partition_events)
+
+        assert sorted(int(event.id) for event in fetched) == list(range(50))
+        # 同一告警的事件在分区内保持写入顺序
+        md5_0_ids = [int(event.id) for event in fetched if event.dedupe_md5 == "md5_0"]
+        assert md5_0_ids == sorted(md5_0_ids)
+
+    def test_rebalance(self, client):
+        worker_1 = make_worker(client, "worker-1")
+        worker_2 = make_worker(client, "worker-2")
+
+        assert worker_1.rebalance(NOW) == [0, 1, 2, 3]
+        # 新消费者加入时，已有分区均被占用
+        assert worker_2.rebalance(NOW) == []
+        # 未到重新分配的时间
+        assert worker_1.rebalance(NOW + 1) == [0, 1, 2, 3]
+
+        # 原消费者按配额释放分区后，新消费者接管
+        assert len(worker_1.rebalance(NOW + 10)) == 2
+        worker_2_partitions = worker_2.rebalance(NOW + 10)
+        assert len(worker_2_partitions) == 2
+        assert set(worker_1.partitions) & set(worker_2_partitions) == set()
+
+        # 消费者退出后释放租约，其余消费者接管全部分区
+        worker_2.release_all()
+        assert client.hdel(partition_module.ALERT_BUILDER_PARTITION_WORKER_KEY.get_key(), "worker-2") == 1
+        assert worker_1.rebalance(NOW + 20) == [0, 1, 2, 3]
+
+    def test_renew_only_own_lease(self, client):
+        worker_1 = make_worker(client, "worker-1")
+        worker_2 = make_worker(client, "worker-2")
+        assert worker_1.claim(0)
+        assert not worker_2.claim(0)
+        assert not worker_2.renew(0)
+
+        # 租约过期后被其他消费者抢占，原消费者不能续约或释放
+        client.delete(worker_1.get_owner_key(0))
+        assert worker_2.claim(0)
+        assert not worker_1.renew(0)
+        worker_1.release(0)
+        assert client.get(worker_1.get_owner_key(0)) == "worker-2"
+
+    def test_ack_lost_lease(self, client):
+        worker_1 = make_worker(client, "worker-1")
+        worker_2 = make_worker(client, "worker-2")
+        worker_1.partitions = [0, 1]
+        assert worker_1.claim(0)
+        client.rpush(worker_1.get_partition_key(0), *[json.dumps({"id": str(index)}) for index in range(5)])
+        _, count = worker_1.fetch(0)
+
+        # 租约过期后被其他消费者抢占，原消费者不能移除消息
+        client.delete(worker_1.get_owner_key(0))
+        assert worker_2.claim(0)
+        assert worker_1.ack(0, count) is None
+        assert client.llen(worker_1.get_partition_key(0)) == 5
+        assert worker_1.partitions == [1]
+
+        assert worker_2.ack(0, count) == 0
+
+    def test_dead_letter(self, client):
+        worker = make_worker(client, "worker-1")
+        worker.RETRY_BACKOFF = 0
+        worker.partitions = [0]
+        assert worker.claim(0)
+        client.rpush(worker.get_partition_key(0), *[json.dumps({"id": str(index)}) for index in range(3)])
+
+        with (
+            override_settings(ALERT_BUILDER_PARTITION_MAX_RETRIES=3),
+            mock.patch.object(handler_module, "PartitionedAlertBuilder") as builder_cls,
+        ):
+            builder_cls.return_value.dedupe_events_to_alerts.side_effect = Exception("bad batch")
+            # 未超过重试次数时不确认消息
+            for _ in range(2):
+                assert AlertBuilderHandler.process_partition(worker, 0) == 0
+                assert client.llen(worker.get_partition_key(0)) == 3
+
+            # 超过重试次数后移入死信队列，分区继续处理后续事件
+            assert AlertBuilderHandler.process_partition(worker, 0) == 0
+            assert client.llen(worker.get_partition_key(0)) == 0
+            dead_letter_key = partition_module.ALERT_BUILDER_PARTITION_DEAD_LETTER_KEY.get_key()
+            assert [json.loads(value)["id"] for value in client.lrange(dead_letter_key, 0, -1)] == ["0", "1", "2"]
+            assert worker.failures == {}
+
+    def test_retry_backoff(self, client):
+        worker = make_worker(client, "worker-1")
+        assert worker.can_process(0, NOW)
+        assert worker.record_failure(0, NOW) == 1
+        assert not worker.can_process(0, NOW)
+        assert worker.can_process(0, NOW + worker.RETRY_BACKOFF)
+        assert worker.record_failure(0, NOW) == 2
+        assert not worker.can_process(0, NOW + worker.RETRY_BACKOFF)
+        worker.reset_failure(0)
+        assert worker.can_process(0, NOW)
@@ -0,0 +1,122 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+from unittest import mock
+
+import fakeredis
+import pytest
+from django.test import override_settings
+
+from alarm_backends.service.alert.manager import tasks
+from alarm_backends.service.alert.manager.scheduler import AlertCheckScheduler
+
+NOW = 1700000000
+
+
+@pytest.fixture
+def client():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    redis.flushall()
+    return redis
+
+
+@pytest.fixture
+def scheduler(client):
+    alert_scheduler = AlertCheckScheduler(shard_count=4)
+    alert_scheduler.client = client
+    return alert_scheduler
+
+
+def gen_alerts_with_interval():
+    return {
+        15: [{"id": "1", "strategy_id": 1}],
+        30: [{"id": "2", "strategy_id": 2}],
+        60: [{"id": "3", "strategy_id": None}],
+    }
+
+
+class TestAlertCheckScheduler:
+    def test_schedule(self, scheduler, client):
+        # 与 countdown 方式一致：15s 周期一分钟 4 次，30s 周期 2 次，60s 周期 1 次
+        assert scheduler.schedule(gen_alerts_with_interval(), now=NOW) == 7
+        # 重复调度时相同检测点合并
+        assert scheduler.schedule(gen_alerts_with_interval(), now=NOW) == 7
+        assert sum(client.zcard(scheduler.get_wheel_key(shard)) for shard in range(4)) == 7
+
+        client.flushall()
+        # 非立即检测时跳过当前时刻的检测点
+        assert scheduler.schedule(gen_alerts_with_interval(), run_immediately=False, now=NOW) == 4
+        key = scheduler.get_wheel_key(scheduler.get_shard("1"))
+        assert client.zrangebyscore(key, "-inf", "+inf", withscores=True)[0] == ("1|1|15|1700000015", NOW + 15)
+
+    def test_poll(self, scheduler, client):
+        scheduler.schedule(gen_alerts_with_interval(), now=NOW)
+
+        alert_keys, has_more = scheduler.poll(NOW)
+        assert sorted(str(alert_key) for alert_key in alert_keys) == ["1|1", "2|2", "3|0"]
+        assert not has_more
+        # 已取出的检测点不会被重复取出
+        assert scheduler.poll(NOW) == ([], False)
+
+        # 积压的多个检测点只检测一次
+        alert_keys, _ = scheduler.poll(NOW + 30)
+        assert sorted(str(alert_key) for alert_key in alert_keys) == ["1|1", "2|2"]
+        assert all(isinstance(alert_key.strategy_id, int) for alert_key in alert_keys)
+
+        alert_keys, _ = scheduler.poll(NOW + 60)
+        assert [str(alert_key) for alert_key in alert_keys] == ["1|1"]
+        assert sum(client.zcard(scheduler.get_wheel_key(shard)) for shard in range(4)) == 0
+
+    def test_drain_concurrently(self, scheduler, client):
+        alerts = {60: [{"id": str(alert_id), "strategy_id": 1} for alert_id in range(100)]}
+        scheduler.schedule(alerts, now=NOW)
+
+        other = AlertCheckScheduler(shard_count=4)
+        other.client = client
+        members = client.zrangebyscore(scheduler.get_wheel_key(0), "-inf", NOW)
+        # 模拟另一个进程在 zrangebyscore 之后先取出了部分检测点
+        for member in members[:10]:
+            client.zrem(scheduler.get_wheel_key(0), member)
+
+        checks, _ = scheduler.drain(0, NOW)
+        assert len(checks) == len(members) - 10
+        assert other.drain(0, NOW) == ([], False)
+
+    def test_drain_has_more(self, scheduler):
+        scheduler.DRAIN_SIZE = 10
+        scheduler.schedule({60: [{"id": str(alert_id), "strategy_id": 1} for alert_id in range(100)]}, now=NOW)
+
+        total = 0
+        while True:
+            alert_keys, has_more = scheduler.poll(NOW)
+            total += len(alert_keys)
+            if not has_more:
+                break
+        assert total == 100
+
+    @override_settings(ALERT_CHECK_SCHEDULER_ENABLED=True, ALERT_CHECK_WHEEL_SHARD_COUNT=4)
+    def test_send_check_task(self):
+        alerts = [{"id": "1", "strategy_id": 1}, {"id": "2", "strategy_id": 2}]
+        with (
+            mock.patch.object(tasks, "fetch_agg_interval", return_value={1: 10, 2: 60}) as fetch_agg_interval,
+            mock.patch.object(tasks.handle_alerts, "apply_async") as apply_async,
+            mock.patch.object(AlertCheckScheduler, "schedule") as schedule,
+        ):
+            tasks._agg_interval_cache.clear()
+            tasks.send_check_task(alerts, run_immediately=False)
+            tasks.send_check_task(alerts, run_immediately=False)
+
+            # 不再创建 countdown 延时任务，策略聚合周期在进程内缓存
+            apply_async.assert_not_called()
+            assert schedule.call_count == 2
+            assert schedule.call_args[0][0] == {15: [alerts[0]], 30: [], 60: [alerts[1]]}
+            assert schedule.call_args[1] == {"run_immediately": False}
+            fetch_agg_interval.assert_called_once()
+            tasks._agg_interval_cache.clear()
@@ -0,0 +1,198 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import random
+from unittest import mock
+
+from alarm_backends.service.converge.shield.shield_index import ShieldIndex, ShieldIndexManager
+from bkmonitor.utils.range import load_field_instance
+from bkmonitor.utils.range.conditions import (
+    AndCondition,
+    EqualCondition,
+    OrCondition,
+    RegularCondition,
+)
+
+
+class MockShieldObj:
+    """
+    仅包含维度条件的屏蔽配置，条件结构与 ShieldObj 解析结果一致
+    """
+
+    def __init__(self, shield_id, dimension_config, dimension_conditions=None):
+        self.id = shield_id
+        self.config = {"id": shield_id}
+        self.dimension_check = AndCondition()
+        if dimension_conditions:
+            and_condition = AndCondition()
+            for condition in dimension_conditions:
+                field = load_field_instance(condition["key"], condition["value"])
+                and_condition.add(RegularCondition(field))
+            or_condition = OrCondition()
+            or_condition.add(and_condition)
+            self.dimension_check.add(or_condition)
+        for key, value in dimension_config.items():
+            self.dimension_check.add(EqualCondition(load_field_instance(key, value)))
+
+    def is_match(self, dimension):
+        return self.dimension_check.is_match(dimension)
+
+
+def gen_shield_objs(count):
+    random.seed(count)
+    shield_objs = []
+    for shield_id in range(count):
+        shield_type = shield_id % 5
+        if shield_type == 0:
+            dimension_config = {"strategy_id": [shield_id % 2000, shield_id % 2000 + 1]}
+        elif shield_type == 1:
+            dimension_config = {"bk_host_id": [random.randint(1, 20000) for _ in range(3)]}
+        elif shield_type == 2:
+            dimension_config = {"service_instance_id": [random.randint(1, 20000)]}
+        elif shield_type == 3:
+            dimension_config = {"bk_topo_node": [{"bk_obj_id": "module", "bk_inst_id": random.randint(1, 2000)}]}
+        else:
+            dimension_config = {"strategy_id": [shield_id % 2000], "bk_host_id": [random.randint(1, 20000)]}
+        dimension_conditions = None
+        if shield_id % 100 == 0:
+            # 少量无法索引的纯维度条件屏蔽
+            dimension_config = {}
+            dimension_conditions = [{"key": "device_name", "value": [f"eth{shield_id % 7}$"]}]
+        shield_objs.append(MockShieldObj(shield_id, dimension_config, dimension_conditions))
+    return shield_objs
+
+
+def gen_dimensions(count):
+    random.seed(count)
+    return [
+        {
+            "strategy_id": random.randint(1, 2000),
+            "bk_host_id": random.randint(1, 20000),
+            "service_instance_id": random.choice(["", random.randint(1, 20000)]),
+            "bk_topo_node": [f"module|{random.randint(1, 2000)}", "biz|2"],
+            "device_name": f"eth{random.randint(0, 7)}",
+        }
+        for _ in range(count)
+    ]
+
+
+class TestShieldIndex:
+    def test_index_key(self):
+        shield_index = ShieldIndex(
+            [
+                MockShieldObj(1, {"strategy_id": [1, 2], "bk_host_id": [3]}),
+                MockShieldObj(2, {"ip": ["127.0.0.1"]}),
+                MockShieldObj(3, {"strategy_id": [1]}, [{"key": "device_name", "value": ["eth0"]}]),
+                MockShieldObj(4, {}, [{"key": "device_name", "value": ["eth0"]}]),
+            ]
+        )
+
+        assert shield_index.index["bk_host_id"] == {"3": [0]}
+        assert shield_index.index["strategy_id"] == {"1": [2]}
+        assert shield_index.unindexed == [1, 3]
+
+        candidates = shield_index.get_candidates({"strategy_id": 1, "bk_host_id": 4})
+        assert [shield_obj.id for shield_obj in candidates] == [2, 3, 4]
+        candidates = shield_index.get_candidates({"strategy_id": 2, "bk_host_id": 3})
+        assert [shield_obj.id for shield_obj in candidates] == [1, 2, 4]
+
+    def test_match_consistent_with_linear(self):
+        shield_objs = gen_shield_objs(2000)
+        shield_index = ShieldIndex(shield_objs)
+
+        for dimension in gen_dimensions(500):
+            expected = [shield_obj for shield_obj in shield_objs if shield_obj.is_match(dimension)]
+            result = [
+                shield_obj for shield_obj in shield_index.get_candidates(dimension) if shield_obj.is_match(dimension)
+            ]
+            assert result == expected
+
+    def test_manager_rebuild_on_version_change(self):
+        versions = iter(["v1", "v1", "v2", "", ""])
+        configs = [{"id": 1}, {"id": 2}]
+
+        with (
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.ShieldCacheManager.get_shield_version",
+                side_effect=lambda bk_biz_id: next(versions),
+            ),
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.ShieldCacheManager.get_shields_by_biz_id",
+                return_value=configs,
+            ) as get_shields,
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.AlertShieldObj",
+                side_effect=lambda config: MockShieldObj(config["id"], {}),
+            ),
+        ):
+            ShieldIndexManager.clear()
+            first = ShieldIndexManager.get(2)
+            assert ShieldIndexManager.get(2) is first
+            assert get_shields.call_count == 1
+
+            # 版本号变化时重建
+            second = ShieldIndexManager.get(2)
+            assert second is not first
+            assert second.version == "v2"
+
+            # 无版本号时不使用缓存
+            assert ShieldIndexManager.get(2) is not ShieldIndexManager.get(2)
+            assert get_shields.call_count == 4
+            ShieldIndexManager.clear()
+
+    def test_manager_skip_failed_config(self):
+        def create_shield_obj(config):
+            if config["id"] == 2:
+                raise ValueError("invalid shield config")
+            return MockShieldObj(config["id"], {})
+
+        with (
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.ShieldCacheManager.get_shield_version",
+                return_value="v1",
+            ),
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.ShieldCacheManager.get_shields_by_biz_id",
+                return_value=[{"id": 1}, {"id": 2}, {"id": 3}],
+            ),
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.AlertShieldObj", side_effect=create_shield_obj
+            ),
+        ):
+            ShieldIndexManager.clear()
+            # 仅跳过编译失败的配置，其余配置正常生效
+            assert [shield_obj.id for shield_obj in ShieldIndexManager.get(2).shield_objs] == [1, 3]
+            ShieldIndexManager.clear()
+
+    def test_manager_keep_last_index_on_failure(self):
+        versions = iter(["v1", "v2"])
+
+        with (
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.ShieldCacheManager.get_shield_version",
+                side_effect=lambda bk_biz_id: next(versions),
+            ),
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.ShieldCacheManager.get_shields_by_biz_id",
+                side_effect=[[{"id": 1}], Exception("redis error")],
+            ) as get_shields,
+            mock.patch(
+                "alarm_backends.service.converge.shield.shield_index.AlertShieldObj",
+                side_effect=lambda config: MockShieldObj(config["id"], {}),
+            ),
+        ):
+            ShieldIndexManager.clear()
+            first = ShieldIndexManager.get(2)
+
+            # 重建失败时沿用上一次的索引，退避时间内不再重建
+            assert ShieldIndexManager.get(2) is first
+            assert ShieldIndexManager.get(2) is first
+            assert get_shields.call_count == 2
+            ShieldIndexManager.clear()
@@ -0,0 +1,86 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+
+import pytest
+
+from alarm_backends.service.detect import DataPoint
+
+
+def gen_records(count):
+    return [
+        json.dumps(
+            {
+                "record_id": f"{index:032x}.1569246480",
+                "value": index * 1.5,
+                "values": {"_result_": index * 1.5, "_time_": 1569246480},
+                "dimensions": {
+                    "bk_target_ip": f"10.0.{index // 256}.{index % 256}",
+                    "bk_target_cloud_id": "0",
+                    "device_name": "eth0",
+                },
+                "time": 1569246480,
+                "dimension_fields": ["bk_target_ip", "bk_target_cloud_id", "device_name"],
+                "access_time": 1700000000.123,
+            }
+        )
+        for index in range(count)
+    ]
+
+
+class TestDataPoint:
+    def test_load_records(self):
+        records = gen_records(3)
+        records[1] = json.dumps({"record_id": "a.1", "value": 1, "time": 1, "__debug__": True, "is_partial": True})
+        data_points, unexpected_records = DataPoint.load_records(records, None)
+
+        assert not unexpected_records
+        assert [point.as_dict() for point in data_points] == [json.loads(record) for record in records]
+        assert data_points[1].is_partial is True
+        assert data_points[1].timestamp == 1
+        assert data_points[1].is_debug
+        assert not data_points[0].is_debug
+        assert not hasattr(data_points[1], "__debug__")
+        assert not hasattr(data_points[0], "is_partial")
+
+    def test_compact(self):
+        data_points, _ = DataPoint.load_records(gen_records(3) + [json.dumps({"value": 1, "custom_field": 1})], None)
+
+        # 不保留实例 __dict__ 及原始数据
+        assert not hasattr(data_points[0], "__dict__")
+        with pytest.raises(AttributeError):
+            data_points[0].custom_field = 1
+
+        # 同批数据点共享维度字段及维度名
+        assert data_points[0].dimension_fields is data_points[1].dimension_fields
+        first_key, second_key = (next(iter(point.dimensions)) for point in data_points[:2])
+        assert first_key is second_key
+        assert data_points[0].as_dict()["dimension_fields"] == ["bk_target_ip", "bk_target_cloud_id", "device_name"]
+
+        # 非标准字段仍可读取
+        assert data_points[3].custom_field == 1
+        assert data_points[3].as_dict() == {"value": 1, "custom_field": 1}
+        with pytest.raises(AttributeError):
+            data_points[3].record_id
+
+        # 修改字段后 as_dict 返回最新值
+        data_points[0].value = 1025
+        assert data_points[0].as_dict()["value"] == 1025
+
+    def test_load_records_with_unexpected(self):
+        records = gen_records(3)
+        records.insert(1, "invalid")
+        records.append("")
+        data_points, unexpected_records = DataPoint.load_records(records, None)
+
+        assert [point.record_id for point in data_points] == [json.loads(r)["record_id"] for r in gen_records(3)]
+        assert unexpected_records == ["invalid", ""]
+        assert DataPoint.load_records([], None) == ([], [])
@@ -0,0 +1,217 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+
+from alarm_backends.core.cache import key
+from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
+from alarm_backends.service.detect import DataPoint
+from alarm_backends.service.detect.strategy import (
+    HistoryPointCache,
+    decode_history_point,
+    history_point_cache,
+)
+from alarm_backends.service.detect.strategy.advanced_ring_ratio import AdvancedRingRatio
+from alarm_backends.service.detect.strategy.simple_ring_ratio import SimpleRingRatio
+from alarm_backends.tests.service.detect.mocked_data import (
+    Item,
+    Strategy,
+    item_config,
+    mock_unify_query,
+    mocked_data_source,
+)
+from bkmonitor.models import CacheNode
+
+pytestmark = pytest.mark.django_db
+
+RECORD_ID = "389518839de471c0baec4b6fb26c2538"
+HISTORY_RECORDS = [
+    {"mocked": "mocked", "mocked_metric": 99, "_time_": 1569246420, "minute1": 1569246420, "_result_": 99},
+    {"mocked": "mocked", "mocked_metric": 1, "_time_": 1569246360, "minute1": 1569246360, "_result_": 1},
+    {"mocked": "mocked", "mocked_metric": 101, "_time_": 1569246300, "minute1": 1569246300, "_result_": 101},
+]
+
+
+def make_item(strategy_id):
+    item = Item(
+        1,
+        Strategy(strategy_id, "os"),
+        "%",
+        [mocked_data_source],
+        ["system.cpu_summary"],
+        item_config["query_configs"],
+        mock_unify_query,
+    )
+    item.query_record = mock.MagicMock(return_value=HISTORY_RECORDS)
+    return item
+
+
+def make_datapoint(item, value=500, timestamp=1569246480):
+    return DataPoint(
+        {
+            "record_id": f"{RECORD_ID}.{timestamp}",
+            "value": value,
+            "values": {"timestamp": timestamp, "mocked_metric": value},
+            "dimensions": {"mocked": "mocked"},
+            "time": timestamp,
+        },
+        item,
+    )
+
+
+def clear_history_keys(item, timestamps):
+    client = key.HISTORY_DATA_KEY.client
+    for timestamp in timestamps:
+        history_key = key.HISTORY_DATA_KEY.get_key(strategy_id=item.strategy.id, item_id=item.id, timestamp=timestamp)
+        client.delete(history_key)
+
+
+class TestHistoryPointFetcher:
+    def setup_method(self):
+        get_node_by_strategy_id(0)
+        CacheNode.refresh_from_settings()
+
+    @override_settings(DETECT_HISTORY_CACHE_MAX_SIZE=1000, DETECT_HISTORY_CACHE_TTL=60)
+    def test_shared_cache_between_detectors(self):
+        item = make_item(90401)
+        clear_history_keys(item, [1569246300, 1569246360, 1569246420])
+        data_point = make_datapoint(item)
+        algorithms_config = {"floor": 100, "ceil": 100, "ceil_interval": 3, "floor_interval": 3, "fetch_type": "last"}
+
+        detector = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        detector.query_history_points([data_point])
+        assert item.query_record.call_count == 1
+        assert [p.value for p in detector.history_point_fetcher(data_point, cycles=3)] == [99, 1, 101]
+
+        # redis 中的数据被清理后，同一策略的其他检测器仍可从进程内缓存获取历史数据
+        clear_history_keys(item, [1569246300, 1569246360, 1569246420])
+        other_detector = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        other_detector.query_history_points([data_point])
+        assert item.query_record.call_count == 1
+        assert [p.value for p in other_detector.history_point_fetcher(data_point, cycles=3)] == [99, 1, 101]
+
+        # 进程内缓存失效后回源查询
+        history_point_cache.clear()
+        other_detector = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        other_detector.query_history_points([data_point])
+        assert item.query_record.call_count == 2
+
+    def test_prefetch_in_one_pipeline(self):
+        item = make_item(90402)
+        data_point = make_datapoint(item)
+        algorithms_config = {"floor": 100, "ceil": 100, "ceil_interval": 3, "floor_interval": 3, "fetch_type": "last"}
+        detector = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        detector.query_history_points([data_point])
+        history_point_cache.clear()
+
+        client = key.HISTORY_DATA_KEY.client
+        detector = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        with mock.patch.object(client, "hgetall", wraps=client.hgetall) as hgetall:
+            detector.query_history_points([data_point])
+            assert [p.value for p in detector.history_point_fetcher(data_point, cycles=3)] == [99, 1, 101]
+        # 历史数据均通过 pipeline 预取，不再逐个 hgetall
+        hgetall.assert_not_called()
+
+    def test_prefetch_failed(self):
+        item = make_item(90404)
+        data_point = make_datapoint(item)
+        algorithms_config = {"floor": 100, "ceil": 100, "ceil_interval": 3, "floor_interval": 3, "fetch_type": "last"}
+        AdvancedRingRatio(config=algorithms_config, unit="percent").query_history_points([data_point])
+
+        # 预取失败时不影响检测，逐个回源查询历史数据
+        detector = AdvancedRingRatio(config=algorithms_config, unit="percent")
+        with mock.patch(
+            "alarm_backends.core.storage.redis_cluster.PipelineProxy.execute", side_effect=Exception("error")
+        ):
+            detector._prefetch_history_points(item, [1569246300, 1569246360, 1569246420])
+        assert [p.value for p in detector.history_point_fetcher(data_point, cycles=3)] == [99, 1, 101]
+
+    def test_compact_encoding(self):
+        item = make_item(90403)
+        data_point = make_datapoint(item, value=50, timestamp=1569246420)
+        detector = SimpleRingRatio(config={"floor": 50, "ceil": 100})
+
+        with override_settings(DETECT_HISTORY_COMPACT_ENCODING=True):
+            detector._publish_history_points(item, [data_point])
+
+        history_key = key.HISTORY_DATA_KEY.get_key(strategy_id=item.strategy.id, item_id=item.id, timestamp=1569246420)
+        raw_data = key.HISTORY_DATA_KEY.client.hget(history_key, RECORD_ID)
+        assert json.loads(raw_data) == [50, 1569246420]
+
+        history_point_cache.clear()
+        current_point = make_datapoint(item, value=100, timestamp=1569246480)
+        history_point = SimpleRingRatio(config={"floor": 50, "ceil": 100}).history_point_fetcher(current_point)
+        assert history_point.value == 50
+        assert history_point.timestamp == 1569246420
+        assert history_point.record_id == f"{RECORD_ID}.1569246420"
+
+    def test_decode_history_point(self):
+        legacy = json.dumps({"value": 1, "time": 100, "record_id": "md5.100", "dimensions": {"ip": "127.0.0.1"}})
+        assert decode_history_point(legacy, "md5") == json.loads(legacy)
+        assert decode_history_point(json.dumps([1.5, 100]), "md5") == {
+            "value": 1.5,
+            "time": 100,
+            "record_id": "md5.100",
+        }
+
+
+class TestHistoryPointCache:
+    @override_settings(DETECT_HISTORY_CACHE_MAX_SIZE=2, DETECT_HISTORY_CACHE_TTL=60)
+    def test_lru(self):
+        cache = HistoryPointCache()
+        cache.set((1, 1, 60), {"a": "1"})
+        cache.set((1, 1, 120), {"b": "2"})
+        assert cache.get((1, 1, 60)) == {"a": "1"}
+
+        # 超出容量时淘汰最久未访问的数据
+        cache.set((1, 1, 180), {"c": "3"})
+        assert cache.get((1, 1, 120)) is None
+        assert cache.get((1, 1, 60)) == {"a": "1"}
+
+        # 仅合并已存在的缓存
+        cache.update((1, 1, 60), {"d": "4"})
+        cache.update((1, 1, 240), {"e": "5"})
+        assert cache.get((1, 1, 60)) == {"a": "1", "d": "4"}
+        assert cache.get((1, 1, 240)) is None
+
+    @override_settings(DETECT_HISTORY_CACHE_MAX_SIZE=10, DETECT_HISTORY_CACHE_MAX_POINTS=4, DETECT_HISTORY_CACHE_TTL=60)
+    def test_max_points(self):
+        cache = HistoryPointCache()
+        cache.set((1, 1, 60), {"a": "1", "b": "2"})
+        cache.set((1, 1, 120), {"c": "3"})
+
+        # 超出数据点上限时淘汰最久未访问的数据
+        cache.update((1, 1, 120), {"d": "4", "e": "5"})
+        assert cache.get((1, 1, 60)) is None
+        assert cache.get((1, 1, 120)) == {"c": "3", "d": "4", "e": "5"}
+        assert cache._points == 3
+
+        # 超过数据点上限的单个 value 不缓存，并清除旧值
+        cache.set((1, 1, 120), {str(index): str(index) for index in range(5)})
+        assert cache.get((1, 1, 120)) is None
+        assert cache._points == 0
+
+    @override_settings(DETECT_HISTORY_CACHE_MAX_SIZE=10, DETECT_HISTORY_CACHE_TTL=60)
+    def test_ttl(self):
+        cache = HistoryPointCache()
+        with mock.patch("alarm_backends.service.detect.strategy.time.time", return_value=1000):
+            cache.set((1, 1, 60), {"a": "1"})
+        with mock.patch("alarm_backends.service.detect.strategy.time.time", return_value=1061):
+            assert cache.get((1, 1, 60)) is None
+
+    @override_settings(DETECT_HISTORY_CACHE_MAX_SIZE=0)
+    def test_disabled(self):
+        cache = HistoryPointCache()
+        cache.set((1, 1, 60), {"a": "1"})
+        assert cache.get((1, 1, 60)) is None
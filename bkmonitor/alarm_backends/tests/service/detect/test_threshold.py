@@ -8,10 +8,14 @@ Unless required by applicable law or agreed to in writing, software distributed
 an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
+import random
+from unittest import mock
+
 import pytest
+from django.conf import settings
 
 from alarm_backends.service.detect import DataPoint
-from alarm_backends.service.detect.strategy.threshold import Threshold
+from alarm_backends.service.detect.strategy.threshold import Threshold, ThresholdPredicate
 from alarm_backends.tests.service.detect.mocked_data import (
     Item,
     Strategy,
@@ -19,6 +23,7 @@ from alarm_backends.tests.service.detect.mocked_data import (
     datapoint50,
     datapoint99,
     item_config,
+    mock_datapoint_with_value,
     mock_unify_query,
     mocked_data_source,
 )
@@ -136,10 +141,55 @@ class TestThreshold(object):
 
         assert len(detect_engine.detect(datapoint)) == 0
 
-        datapoint._raw_input["value"] = 1025
         datapoint.value = 1025
         anomaly_records = detect_engine.detect(datapoint)
         assert len(anomaly_records) == 1
 
         anomaly_records = detect_engine.detect_records([datapoint], 1)
         assert anomaly_records[0].anomaly_message == "avg(测试指标) >= 1.0KiB, 当前值1.000977KiB"
+
+    def test_threshold_predicate(self):
+        algorithms_config = [
+            [{"threshold": 6, "method": "gt"}, {"threshold": 99, "method": "lte"}, {"threshold": 50, "method": "neq"}],
+            [{"threshold": 6, "method": "eq"}],
+        ]
+        predicate = ThresholdPredicate(algorithms_config, "%")
+        assert predicate(99)
+        assert not predicate(50)
+        assert predicate(6)
+        assert not predicate(100)
+
+        predicate = ThresholdPredicate([[{"threshold": 1, "method": "gte"}]], "bytes", "Ki")
+        assert not predicate(1023)
+        assert predicate(1025)
+
+    def test_detect_records_batch(self):
+        algorithms_config = [
+            [{"threshold": 6, "method": "gt"}, {"threshold": 99, "method": "lte"}, {"threshold": 50, "method": "neq"}],
+            [{"threshold": 6, "method": "eq"}],
+        ]
+        detect_engine = Threshold(config=algorithms_config)
+        data_points = [mock_datapoint_with_value(value) for value in [0, 6, 6.5, 50, 99, 100, None, "abc"]]
+
+        with mock.patch.object(settings, "DETECT_THRESHOLD_BATCH_ENABLED", False):
+            expected = detect_engine.detect_records(data_points, 1)
+        with mock.patch.object(settings, "DETECT_THRESHOLD_BATCH_ENABLED", True):
+            result = detect_engine.detect_records(data_points, 1)
+
+        assert [ap.data_point.value for ap in result] == [6, 6.5, 99]
+        assert [(ap.data_point.value, ap.anomaly_message) for ap in result] == [
+            (ap.data_point.value, ap.anomaly_message) for ap in expected
+        ]
+
+    def test_detect_records_batch_random(self):
+        algorithms_config = [[{"threshold": 90, "method": "gte"}], [{"threshold": 1, "method": "lt"}]]
+        detect_engine = Threshold(config=algorithms_config)
+        rand = random.Random(0)
+        data_points = [mock_datapoint_with_value(rand.uniform(0, 100)) for _ in range(2000)]
+
+        with mock.patch.object(settings, "DETECT_THRESHOLD_BATCH_ENABLED", False):
+            expected = detect_engine.detect_records(data_points, 1)
+        with mock.patch.object(settings, "DETECT_THRESHOLD_BATCH_ENABLED", True):
+            result = detect_engine.detect_records(data_points, 1)
+
+        assert [ap.data_point.value for ap in result] == [ap.data_point.value for ap in expected]
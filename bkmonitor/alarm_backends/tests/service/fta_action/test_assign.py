@@ -31,7 +31,7 @@ from constants.alert import EventStatus
 
 pytestmark = pytest.mark.django_db
 
-from alarm_backends.core.cache.assign import AssignCacheManager
+from alarm_backends.core.cache.assign import AssignCacheManager, get_rule_index_key
 from alarm_backends.service.fta_action.tasks.alert_assign import (
     AlertAssigneeManager,
     AssignRuleMatch,
@@ -492,6 +492,7 @@ class TestAlertAssignRule:
         AssignCacheManager.refresh()
         rule = AlertAssignRule.objects.filter(id=setup.id).values()[0]
         rule["group_name"] = "test cache"
+        rule["index_key"] = get_rule_index_key(rule)
         assert biz_mock.call_count == 1
         assert AssignCacheManager.get_assign_priority_by_biz_id(2), [1]
         assert AssignCacheManager.get_assign_groups_by_priority(2, 1) == {setup.assign_group_id}
@@ -8,6 +8,7 @@ Unless required by applicable law or agreed to in writing, software distributed
 an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
 specific language governing permissions and limitations under the License.
 """
+
 import copy
 
 import arrow
@@ -195,7 +196,6 @@ CHECK_RESULT_SETS = {
 
 
 class TestChecker(TestCase):
-
     databases = {"monitor_api", "default"}
 
     @classmethod
@@ -473,3 +473,30 @@ class TestChecker(TestCase):
         anomaly_records, event_record = checker.check()
         self.assertEqual(len(anomaly_records), 3)
         self.assertEqual(event_record["trigger"]["level"], "2")
+
+    def test_gen_check_window_queries(self):
+        checker = AnomalyChecker(POINT, STRATEGY, 1)
+        queries = checker.gen_check_window_queries()
+        self.assertSetEqual(set(queries.keys()), {"1", "2", "3"})
+        check_cache_key, min_score, max_score = queries["1"]
+        self.assertEqual(str(check_cache_key), str(self.gen_check_result_key("1")))
+        self.assertEqual(min_score, 1569246480 - 5 * 60 + 1)
+        self.assertEqual(max_score, 1569246480)
+
+    def test_check_anomaly_with_prefetched_results(self):
+        for anomaly_count in [0, 1, 2, 3]:
+            self.clear_check_result()
+            self.insert_check_result(anomaly_count)
+            checker = AnomalyChecker(POINT, STRATEGY, 1)
+            prefetched = {
+                level: CHECK_RESULT_CACHE_KEY.client.zrangebyscore(
+                    name=key, min=min_score, max=max_score, withscores=True
+                )
+                for level, (key, min_score, max_score) in checker.gen_check_window_queries().items()
+            }
+            self.clear_check_result()
+            # 预取数据后不再依赖 redis，结果需与实时查询一致
+            self.insert_check_result(anomaly_count)
+            expected = checker.check_anomaly()
+            self.clear_check_result()
+            self.assertEqual(checker.check_anomaly(prefetched), expected)
@@ -9,13 +9,15 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-
 import pytest
+from django.conf import settings
 from mock import MagicMock
+from redis.exceptions import ResponseError
 
 from alarm_backends.core.cache.key import ANOMALY_SIGNAL_KEY, SERVICE_LOCK_TRIGGER
 from alarm_backends.core.lock.service_lock import service_lock
 from alarm_backends.service.trigger.handler import TriggerHandler
+from core.errors.alarm_backends import LockError
 
 pytestmark = pytest.mark.django_db
 
@@ -27,6 +29,27 @@ def processor(mocker):
     return m
 
 
+@pytest.fixture()
+def processor_class(mocker):
+    processors = []
+
+    def create_processor(strategy_id, item_id):
+        m = MagicMock(strategy_id=strategy_id, item_id=item_id)
+        processors.append(m)
+        return m
+
+    m = mocker.patch("alarm_backends.service.trigger.handler.TriggerProcessor", side_effect=create_processor)
+    m.processors = processors
+    return m
+
+
+@pytest.fixture()
+def micro_batch(mocker):
+    mocker.patch.object(settings, "TRIGGER_MICRO_BATCH_ENABLED", True, create=True)
+    mocker.patch.object(settings, "TRIGGER_MICRO_BATCH_MAX_SIZE", 10, create=True)
+    mocker.patch.object(settings, "TRIGGER_MICRO_BATCH_MAX_LATENCY", 0, create=True)
+
+
 @pytest.fixture()
 def sleep(mocker):
     return mocker.patch("time.sleep", return_value=None)
@@ -86,3 +109,87 @@ class TestHandler(object):
             handler.handle()
             assert processor.process.call_count == 0
             assert ANOMALY_SIGNAL_KEY.client.llen(ANOMALY_SIGNAL_KEY.get_key()) == 1
+
+    def test_micro_batch(self, processor_class, micro_batch):
+        for anomaly_key in ["1.2", "1.3", "1.2", "x.y", "2.1"]:
+            ANOMALY_SIGNAL_KEY.client.lpush(ANOMALY_SIGNAL_KEY.get_key(), anomaly_key)
+
+        handler = TriggerHandler()
+        handler.handle()
+
+        # 重复信号只处理一次，非法信号被丢弃
+        assert sorted((p.strategy_id, p.item_id) for p in processor_class.processors) == [(1, 2), (1, 3), (2, 1)]
+        for processor in processor_class.processors:
+            assert processor.check.call_count == 1
+        pushed = [p for call in processor_class.push_batch.call_args_list for p in call.args[0]]
+        assert len(pushed) == 3
+        assert ANOMALY_SIGNAL_KEY.client.llen(ANOMALY_SIGNAL_KEY.get_key()) == 0
+
+    def test_micro_batch_max_size(self, processor_class, micro_batch):
+        for item_id in range(15):
+            ANOMALY_SIGNAL_KEY.client.lpush(ANOMALY_SIGNAL_KEY.get_key(), f"1.{item_id}")
+
+        handler = TriggerHandler()
+        handler.handle()
+
+        assert len(processor_class.processors) == 10
+        assert ANOMALY_SIGNAL_KEY.client.llen(ANOMALY_SIGNAL_KEY.get_key()) == 5
+
+    def test_micro_batch_lock(self, processor_class, micro_batch, sleep):
+        with service_lock(SERVICE_LOCK_TRIGGER, strategy_id=1, item_id=2):
+            ANOMALY_SIGNAL_KEY.client.lpush(ANOMALY_SIGNAL_KEY.get_key(), "1.2")
+            ANOMALY_SIGNAL_KEY.client.lpush(ANOMALY_SIGNAL_KEY.get_key(), "1.3")
+            handler = TriggerHandler()
+            handler.handle()
+
+        assert [(p.strategy_id, p.item_id) for p in processor_class.processors] == [(1, 3)]
+        assert ANOMALY_SIGNAL_KEY.client.llen(ANOMALY_SIGNAL_KEY.get_key()) == 1
+
+    def test_micro_batch_hold_lock_until_pushed(self, processor_class, micro_batch):
+        def push_batch(processors):
+            # 推送完成前服务锁仍被持有
+            with pytest.raises(LockError):
+                with service_lock(SERVICE_LOCK_TRIGGER, strategy_id=1, item_id=2):
+                    pass
+
+        processor_class.push_batch.side_effect = push_batch
+        ANOMALY_SIGNAL_KEY.client.lpush(ANOMALY_SIGNAL_KEY.get_key(), "1.2")
+
+        handler = TriggerHandler()
+        handler.handle()
+
+        assert processor_class.push_batch.call_count == 1
+        assert processor_class.processors[0].check.call_count == 1
+        # 推送完成后释放服务锁
+        with service_lock(SERVICE_LOCK_TRIGGER, strategy_id=1, item_id=2):
+            pass
+
+    def test_micro_batch_wait(self, processor_class, micro_batch, mocker):
+        mocker.patch.object(settings, "TRIGGER_MICRO_BATCH_MAX_LATENCY", 0.5, create=True)
+        brpop = mocker.patch.object(
+            ANOMALY_SIGNAL_KEY.client, "brpop", side_effect=[("key", "1.2"), ("key", "1.3"), None]
+        )
+
+        assert TriggerHandler().fetch_anomaly_keys() == ["1.2", "1.3"]
+        # 队列为空时阻塞等待剩余时间，而不是轮询
+        assert brpop.call_count == 3
+        assert 0 < brpop.call_args.args[1] <= 0.5
+
+    def test_micro_batch_rpop_count_unsupported(self, processor_class, micro_batch, mocker):
+        for item_id in range(3):
+            ANOMALY_SIGNAL_KEY.client.lpush(ANOMALY_SIGNAL_KEY.get_key(), f"1.{item_id}")
+        rpop = ANOMALY_SIGNAL_KEY.client.rpop
+
+        def rpop_without_count(name, count=None):
+            if count is not None:
+                raise ResponseError("wrong number of arguments for 'rpop' command")
+            return rpop(name)
+
+        mocker.patch.object(ANOMALY_SIGNAL_KEY.client, "rpop", side_effect=rpop_without_count)
+        mocker.patch.object(TriggerHandler, "DATA_FETCH_TIMEOUT", 0)
+        mocker.patch.object(TriggerHandler, "rpop_count_supported", True)
+
+        # Redis 6.2 以下版本回退为逐个 RPOP
+        handler = TriggerHandler()
+        assert handler.fetch_anomaly_keys() == ["1.0", "1.1", "1.2"]
+        assert TriggerHandler.rpop_count_supported is False
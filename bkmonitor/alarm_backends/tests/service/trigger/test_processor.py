@@ -9,26 +9,29 @@ an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express o
 specific language governing permissions and limitations under the License.
 """
 
-
+import copy
 import json
 from datetime import datetime
 from uuid import uuid4
 
 import mock
+from django.conf import settings
 from django.test import TestCase
 from six.moves import range
 
 from alarm_backends.core.cache.key import (
     ANOMALY_LIST_KEY,
     ANOMALY_SIGNAL_KEY,
+    CHECK_RESULT_CACHE_KEY,
     TRIGGER_EVENT_LIST_KEY,
+    TRIGGER_EVENT_RATE_LIMIT_KEY,
 )
 from alarm_backends.core.storage.redis_cluster import get_node_by_strategy_id
 from alarm_backends.service.trigger.processor import TriggerProcessor
 from bkmonitor.models import AnomalyRecord, CacheNode, time_tools
 from core.errors.alarm_backends import StrategyNotFound
 
-from .test_checker import STRATEGY
+from .test_checker import CHECK_RESULT_SETS, STRATEGY
 
 POINT = {
     "data": {
@@ -211,3 +214,116 @@ class TestProcessor(TestCase):
         ) as fake_push_to_kafka:
             processor.process()
             print(fake_push_to_kafka.call_args)
+
+    def test_push_batch(self):
+        processors = []
+        for item_id in [1, 2, 3]:
+            processor = TriggerProcessor(1, item_id)
+            processor.process_point(json.dumps(POINT))
+            processors.append(processor)
+        # 无事件的处理器也需要重置状态
+        processors.append(TriggerProcessor(1, 4))
+
+        with mock.patch(
+            "alarm_backends.service.trigger.processor.MonitorEventAdapter.push_to_kafka"
+        ) as fake_push_to_kafka:
+            TriggerProcessor.push_batch(processors)
+
+        # 所有处理器的事件合并为一个 Kafka 批次
+        fake_push_to_kafka.assert_called_once()
+        self.assertEqual(len(fake_push_to_kafka.call_args.kwargs["events"]), 3)
+        for processor in processors:
+            self.assertEqual(processor.event_records, [])
+
+        # 限流计数按 (strategy_id, item_id, 数据时间戳) 提交
+        for item_id in [1, 2, 3]:
+            rate_limit_key = TRIGGER_EVENT_RATE_LIMIT_KEY.get_key(
+                strategy_id=1, item_id=item_id, source_time=1569246480
+            )
+            self.assertEqual(TRIGGER_EVENT_RATE_LIMIT_KEY.client.get(rate_limit_key), "1")
+            TRIGGER_EVENT_RATE_LIMIT_KEY.client.delete(rate_limit_key)
+
+
+class TestProcessorBatchCheck(TestCase):
+    """
+    批量检测模式：结果需与逐点检测一致，且检测窗口数据只通过一次 pipeline 获取
+    """
+
+    POINT_COUNT = 200
+
+    @classmethod
+    def setUpClass(cls):
+        cls.Strategy = mock.patch("alarm_backends.service.trigger.processor.Strategy")
+        mock_strategy = cls.Strategy.start()
+        mock_strategy.get_strategy_snapshot_by_key.side_effect = lambda key, _: STRATEGY if key == "xxx" else None
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.Strategy.stop()
+
+    def setUp(self):
+        get_node_by_strategy_id(0)
+        CacheNode.refresh_from_settings()
+        CHECK_RESULT_CACHE_KEY.client.flushall()
+        self.points = []
+        for i in range(self.POINT_COUNT):
+            point = copy.deepcopy(POINT)
+            point["data"]["dimensions"] = {"ip": f"10.0.0.{i}"}
+            point["data"]["record_id"] = f"{i:032x}.1569246480"
+            self.points.append(json.dumps(point))
+            for level in ["1", "2", "3"]:
+                check_cache_key = CHECK_RESULT_CACHE_KEY.get_key(
+                    strategy_id=1, item_id=1, dimensions_md5=f"{i:032x}", level=level
+                )
+                for label, score in CHECK_RESULT_SETS[i % 4]:
+                    CHECK_RESULT_CACHE_KEY.client.zadd(check_cache_key, {label: score})
+
+    def tearDown(self):
+        CHECK_RESULT_CACHE_KEY.client.flushall()
+
+    @staticmethod
+    def summary(processor):
+        return [
+            (record["event_record"]["data"]["record_id"], record["event_record"]["trigger"])
+            for record in processor.event_records
+        ]
+
+    def test_process_points_batch(self):
+        processor = TriggerProcessor(1, 1)
+        for point in self.points:
+            processor.process_point(point)
+
+        batch_processor = TriggerProcessor(1, 1)
+        with mock.patch.object(
+            CHECK_RESULT_CACHE_KEY.client, "zrangebyscore", wraps=CHECK_RESULT_CACHE_KEY.client.zrangebyscore
+        ) as zrangebyscore:
+            batch_processor.process_points_batch(self.points)
+            zrangebyscore.assert_not_called()
+
+        self.assertEqual(self.summary(batch_processor), self.summary(processor))
+        self.assertEqual(len(batch_processor.anomaly_records), len(processor.anomaly_records))
+
+    def test_process_points_batch_pipeline_error(self):
+        batch_processor = TriggerProcessor(1, 1)
+        processor = TriggerProcessor(1, 1)
+        for point in self.points:
+            processor.process_point(point)
+
+        # pipeline 失败时回退为逐点实时查询
+        with mock.patch(
+            "alarm_backends.core.storage.redis_cluster.PipelineProxy.execute", side_effect=Exception("error")
+        ):
+            batch_processor.process_points_batch(self.points)
+        self.assertEqual(self.summary(batch_processor), self.summary(processor))
+
+    def test_process_with_batch_check(self):
+        processor = TriggerProcessor(1, 1)
+        processor.strategy.in_alarm_time.return_value = (True, None)
+        with (
+            mock.patch.object(settings, "TRIGGER_BATCH_CHECK_ENABLED", True),
+            mock.patch.object(processor, "pull"),
+            mock.patch.object(processor, "push"),
+        ):
+            processor.anomaly_points = self.points
+            processor.process()
+        self.assertEqual(len(processor.event_records), self.POINT_COUNT * 3 // 4)
@@ -0,0 +1,140 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import json
+
+import pytest
+
+from bkmonitor.data_source.unify_query.query import UnifyQuery
+from bkmonitor.data_source.unify_query.series import column_to_milliseconds, to_milliseconds
+
+PARAMS = {"query_list": [{"reference_name": "a"}]}
+START_TIME = 1657848000
+
+
+def gen_response(series_count, point_count, time_unit=1):
+    """
+    生成统一查询返回数据，格式与 query_data 接口返回一致
+    """
+    return {
+        "series": [
+            {
+                "name": "_result0",
+                "metric_name": "",
+                "columns": ["_time", "_value"],
+                "types": ["float", "float"],
+                "group_keys": ["bk_target_ip", "bk_target_cloud_id", "device_name_table0"],
+                "group_values": [f"10.0.0.{index % 250}", "0", f"eth{index // 250}"],
+                "values": [[(START_TIME + i * 60) * time_unit, float(index + i)] for i in range(point_count)],
+            }
+            for index in range(series_count)
+        ]
+    }
+
+
+def process_by_rows(params, data, end_time=None):
+    """
+    逐行转换，用于对比结果
+    """
+    records = []
+    for row in data.get("series") or []:
+        dimensions = UnifyQuery.extract_unify_query_series_dimensions(row)
+        for value in row["values"]:
+            record = {**dimensions}
+            for column, column_type, v in zip(row["columns"], row["types"], value):
+                if column_type == "time":
+                    v = to_milliseconds(v)
+                column = {"_time": "_time_", "_result": "_result_", "_value": "_result_"}.get(column, column)
+                record[column] = v
+            if "_result_" not in record:
+                record["_result_"] = record[params["query_list"][0]["reference_name"]]
+            if not params.get("instant") and end_time and record.get("_time_") == end_time:
+                continue
+            records.append(record)
+    return records
+
+
+class TestUnifyQuerySeries:
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (START_TIME, START_TIME * 1000),
+            (START_TIME * 1000 + 123, START_TIME * 1000),
+            (START_TIME * 1000000 + 123456, START_TIME * 1000),
+            (START_TIME + 0.5, START_TIME * 1000),
+            (START_TIME * 1000 + 999.0, START_TIME * 1000),
+        ],
+    )
+    def test_to_milliseconds(self, value, expected):
+        assert to_milliseconds(value) == expected
+        assert list(column_to_milliseconds((value, value))) == [expected, expected]
+
+    def test_process_unify_query_data(self):
+        data = gen_response(3, 5)
+        for series in data["series"]:
+            series["types"][0] = "time"
+        end_time = (START_TIME + 4 * 60) * 1000
+
+        records = UnifyQuery.process_unify_query_data(PARAMS, data, end_time=end_time)
+        assert records == process_by_rows(PARAMS, data, end_time=end_time)
+        assert len(records) == 12
+        assert records[0] == {
+            "bk_target_ip": "10.0.0.0",
+            "bk_target_cloud_id": "0",
+            "device_name": "eth0",
+            "_time_": START_TIME * 1000,
+            "_result_": 0.0,
+        }
+
+        # 瞬时查询不剔除结束时间的数据点
+        assert len(UnifyQuery.process_unify_query_data(dict(PARAMS, instant=True), data, end_time=end_time)) == 15
+
+    def test_multi_metric(self):
+        data = {
+            "series": [
+                {
+                    "columns": ["_time", "a", "b"],
+                    "types": ["time", "float", "float"],
+                    "group_keys": ["bk_target_ip"],
+                    "group_values": ["127.0.0.1"],
+                    "values": [[START_TIME, 1, 2], [START_TIME + 60, 3]],
+                },
+                {"columns": ["_time", "a"], "types": ["time", "float"], "group_keys": [], "values": []},
+            ]
+        }
+        data["series"][0]["values"][1].append(4)
+        series_list = UnifyQuery.process_unify_query_series(PARAMS, data)
+        assert series_list[0].values == (1, 3)
+        assert list(series_list[0].times) == [START_TIME * 1000, (START_TIME + 60) * 1000]
+        assert len(series_list[1]) == 0
+
+        # 列数不一致的 series 逐行解码，缺少的列不出现在记录中
+        data["series"][0]["values"][1].pop()
+        assert UnifyQuery.process_unify_query_data(PARAMS, data) == process_by_rows(PARAMS, data)
+        assert UnifyQuery.process_unify_query_data(PARAMS, data) == [
+            {"bk_target_ip": "127.0.0.1", "_time_": START_TIME * 1000, "a": 1, "b": 2, "_result_": 1},
+            {"bk_target_ip": "127.0.0.1", "_time_": (START_TIME + 60) * 1000, "a": 3, "_result_": 3},
+        ]
+        series_list = UnifyQuery.process_unify_query_series(PARAMS, data)
+        assert [list(series.values) for series in series_list[:2]] == [[1], [3]]
+
+    def test_process_many_series(self):
+        """
+        多个 series 的列式解码结果与逐行转换一致
+        """
+        data = json.loads(json.dumps(gen_response(20, 60, time_unit=1000)))
+        for series in data["series"]:
+            series["types"][0] = "time"
+        end_time = (START_TIME + 59 * 60) * 1000
+
+        expected = process_by_rows(PARAMS, data, end_time=end_time)
+        series_list = UnifyQuery.process_unify_query_series(PARAMS, data, end_time=end_time)
+        assert sum(len(series) for series in series_list) == len(expected)
+        assert UnifyQuery.process_unify_query_data(PARAMS, data, end_time=end_time) == expected
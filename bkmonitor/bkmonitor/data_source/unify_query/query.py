@@ -15,7 +15,6 @@ import time
 from itertools import chain
 from typing import Any
 
-import arrow
 from django.conf import settings
 from django.utils import timezone
 from django.utils.functional import cached_property
@@ -28,6 +27,14 @@ from bkmonitor.data_source.unify_query.functions import (
     CpAggMethods,
     add_expression_functions,
 )
+from bkmonitor.data_source.unify_query.series import (
+    COLUMN_ALIASES,
+    RESULT_COLUMN,
+    TIME_COLUMN,
+    UnifyQuerySeries,
+    column_to_milliseconds,
+    to_milliseconds,
+)
 from bkmonitor.utils.tenant import bk_biz_id_to_bk_tenant_id
 from bkmonitor.utils.thread_backend import ThreadPool
 from bkmonitor.utils.time_tools import time_interval_align
@@ -171,34 +178,72 @@ class UnifyQuery:
             ]
         """
         records = []
+        for series in cls.process_unify_query_series(params, data, end_time=end_time):
+            records.extend(series.iter_records())
+        return records
 
-        rows = data.get("series") or []
-        for row in rows:
+    @classmethod
+    def process_unify_query_series(cls, params: dict, data: dict, end_time: int = None) -> list[UnifyQuerySeries]:
+        """
+        按列解码统一查询返回的 series，每个 series 转换为共享的维度及按列存放的数据，
+        不需要逐条记录的调用方可以直接使用列式数据，参数及数据处理与 process_unify_query_data 一致。
+        数据点的列数与 columns 不一致时，该 series 逐行解码为单个数据点的 series，缺少的列不出现在记录中，多余的列忽略
+        """
+        result = []
+        for row in data.get("series") or []:
             dimensions = cls.extract_unify_query_series_dimensions(row)
+            columns = row["columns"][: len(row["types"])]
+            values = row["values"]
+            if any(len(value) != len(columns) for value in values):
+                result.extend(cls.process_ragged_series(params, row, dimensions, end_time=end_time))
+                continue
+
+            column_data = []
+            normalized_columns = []
+            for column, column_type, column_values in zip(
+                columns, row["types"], zip(*values) if values else [()] * len(columns)
+            ):
+                if column_type == "time":
+                    column_values = column_to_milliseconds(column_values)
+                normalized_columns.append(COLUMN_ALIASES.get(column, column))
+                column_data.append(column_values)
+
+            # 单指标情况下避免缺少_result_字段
+            result_column = None
+            if values and RESULT_COLUMN not in normalized_columns and RESULT_COLUMN not in dimensions:
+                result_column = params["query_list"][0]["reference_name"]
+
+            series = UnifyQuerySeries(dimensions, normalized_columns, column_data, result_column)
+            # 如果时间戳等于结束时间，不返回
+            if not params.get("instant") and end_time:
+                series.exclude_time(end_time)
+            result.append(series)
+        return result
 
-            for value in row["values"]:
-                record = {**dimensions}
-                for column, column_type, v in zip(row["columns"], row["types"], value):
-                    if column_type == "time":
-                        v = arrow.get(v).timestamp * 1000
-
-                    if column == "_time":
-                        column = "_time_"
-                    elif column in ["_result", "_value"]:
-                        column = "_result_"
-
-                    record[column] = v
-
-                # 单指标情况下避免缺少_result_字段
-                if "_result_" not in record:
-                    record["_result_"] = record[params["query_list"][0]["reference_name"]]
-
-                # 如果是最后一条数据，且时间戳等于结束时间，不返回
-                if not params.get("instant") and end_time and record.get("_time_") == end_time:
-                    continue
-
-                records.append(record)
-        return records
+    @classmethod
+    def process_ragged_series(
+        cls, params: dict, row: dict, dimensions: dict[str, Any], end_time: int = None
+    ) -> list[UnifyQuerySeries]:
+        """
+        逐行解码数据点列数不一致的 series，记录与逐行转换的结果一致
+        """
+        records = []
+        for value in row["values"]:
+            record = {**dimensions}
+            for column, column_type, v in zip(row["columns"], row["types"], value):
+                if column_type == "time":
+                    v = to_milliseconds(v)
+                record[COLUMN_ALIASES.get(column, column)] = v
+
+            # 单指标情况下避免缺少_result_字段
+            if RESULT_COLUMN not in record:
+                record[RESULT_COLUMN] = record[params["query_list"][0]["reference_name"]]
+
+            # 如果时间戳等于结束时间，不返回
+            if not params.get("instant") and end_time and record.get(TIME_COLUMN) == end_time:
+                continue
+            records.append(record)
+        return UnifyQuerySeries.from_records(records)
 
     @classmethod
     def extract_unify_query_series_dimensions(cls, row: dict[str, Any]) -> dict[str, Any]:
@@ -282,13 +327,19 @@ class UnifyQuery:
             series_stat[key] = stat
         return series_stat
 
-    def process_data_by_datasource(self, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    def is_process_by_datasource(self) -> bool:
+        """
+        查询结果是否需要数据源逐条记录处理
+        """
         first_ds: DataSource = self.data_sources[0]
-        if (first_ds.data_source_label, first_ds.data_type_label) in [
+        return (first_ds.data_source_label, first_ds.data_type_label) in [
             (DataSourceLabel.CUSTOM, DataTypeLabel.EVENT),
             (DataSourceLabel.BK_MONITOR_COLLECTOR, DataTypeLabel.LOG),
-        ]:
-            records = first_ds.process_unify_query_data(records)
+        ]
+
+    def process_data_by_datasource(self, records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        if self.is_process_by_datasource():
+            records = self.data_sources[0].process_unify_query_data(records)
         return records
 
     def process_log_by_datasource(self, records: list[dict[str, Any]]):
@@ -463,7 +514,8 @@ class UnifyQuery:
         time_alignment: bool = True,
         instant: bool = None,
         not_time_align: bool = False,
-    ) -> tuple[list[dict], bool, dict]:
+        as_series: bool = False,
+    ) -> tuple[list[dict] | list[UnifyQuerySeries], bool, dict]:
         """
         使用统一查询模块进行查询
 
@@ -476,6 +528,7 @@ class UnifyQuery:
         :param time_alignment: 是否时间对齐
         :param instant: 是否瞬时查询
         :param not_time_align: 是否关闭时间对齐
+        :param as_series: 是否按 series 返回（同 process_unify_query_series 返回）
         :return: (records, is_partial, series_stat) 三元组
                  - records: 处理后的记录列表（同 process_unify_query_data 返回）
                  - is_partial: 是否仅返回了部分数据
@@ -515,8 +568,13 @@ class UnifyQuery:
             data = api.unify_query.query_data(**params)
             is_partial = data.get("is_partial", False)
             series_stat = self.process_unify_query_series_stat(params, data)
+            if as_series and not self.is_process_by_datasource():
+                return self.process_unify_query_series(params, data, end_time=end_time), is_partial, series_stat
+
             records: list[dict[str, Any]] = self.process_unify_query_data(params, data, end_time=end_time)
             records = self.process_data_by_datasource(records)
+        if as_series:
+            return UnifyQuerySeries.from_records(records), is_partial, series_stat
         return records, is_partial, series_stat
 
     def _query_reference_using_unify_query(
@@ -666,8 +724,9 @@ class UnifyQuery:
         not_time_align: bool = False,
         *args,
         with_series_stat: bool = False,
+        as_series: bool = False,
         **kwargs,
-    ) -> tuple[list[dict], dict]:
+    ) -> tuple[list[dict] | list[UnifyQuerySeries], dict]:
         """
         内部统一查询入口：根据配置选择统一查询模块或原始数据源拉取时序数据，
         返回处理后的记录列表与（可选的）序列统计信息。
@@ -681,6 +740,7 @@ class UnifyQuery:
         :param not_time_align: 是否关闭时间对齐
         :param args: 透传位置参数
         :param with_series_stat: 是否返回序列统计（avg/max/min/count 等）
+        :param as_series: 是否按 series 返回，原始数据源查询的记录逐条转换为 series
         :param kwargs: 透传关键字参数（如 instant、time_alignment）
         :return: (records, series_stat) 二元组
                  - records: 处理后的记录列表（同 process_unify_query_data 返回）
@@ -736,6 +796,7 @@ class UnifyQuery:
                         time_alignment=time_alignment,
                         instant=kwargs.get("instant"),
                         not_time_align=not_time_align,
+                        as_series=as_series,
                     )
                     self.is_partial = is_partial
             except Exception as e:
@@ -753,6 +814,8 @@ class UnifyQuery:
                         with_series_stat=with_series_stat,
                         **kwargs,
                     )
+                if as_series:
+                    data = UnifyQuerySeries.from_records(data)
             except Exception as e:
                 exc = e
 
@@ -815,6 +878,36 @@ class UnifyQuery:
         )
         return {"series": data, "series_stat": series_stat}
 
+    def query_series_with_stat(
+        self,
+        start_time: int = None,
+        end_time: int = None,
+        limit: int | None = settings.SQL_MAX_LIMIT,
+        slimit: int | None = settings.SQL_MAX_LIMIT,
+        offset: int | None = None,
+        down_sample_range: str | None = "",
+        not_time_align: bool = False,
+        *args,
+        **kwargs,
+    ) -> dict[str, Any]:
+        """
+        同 query_data_with_stat，查询结果按 series 列式返回，不展开为逐条记录
+        """
+        data, series_stat = self._query_data_internal(
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+            slimit=slimit,
+            offset=offset,
+            down_sample_range=down_sample_range,
+            not_time_align=not_time_align,
+            with_series_stat=True,
+            as_series=True,
+            *args,
+            **kwargs,
+        )
+        return {"series": data, "series_stat": series_stat}
+
     def query_reference(
         self,
         start_time: int = None,
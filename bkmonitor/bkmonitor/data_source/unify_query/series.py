@@ -0,0 +1,153 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+统一查询 series 列式解码
+
+统一查询按 series 返回数据，每个 series 包含一组维度及按行排列的数据点。逐行转换为记录时，每个数据点都需要复制维度字典、
+按列名及类型逐个处理单元格，时间列还需要经过 arrow 解析，数据点较多时开销明显。
+列式解码将 series 转换为共享的维度字典及按列存放的数据：
+- 行列转置由 zip 完成，时间列按整数运算转换为毫秒，不再逐个调用 arrow
+- 只有需要记录(字典)的调用方才通过 iter_records 逐条生成
+"""
+
+from array import array
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+import arrow
+
+# 与 arrow 一致，超过秒级最大值的时间戳按毫秒/微秒处理
+MAX_TIMESTAMP = 253402318799
+MAX_TIMESTAMP_MS = MAX_TIMESTAMP * 1000
+MAX_TIMESTAMP_US = MAX_TIMESTAMP * 1000000
+
+TIME_COLUMN = "_time_"
+RESULT_COLUMN = "_result_"
+COLUMN_ALIASES = {"_time": TIME_COLUMN, "_result": RESULT_COLUMN, "_value": RESULT_COLUMN}
+
+
+def to_milliseconds(value) -> int:
+    """
+    将时间转换为毫秒时间戳(精度为秒)，结果与 arrow.get(value).timestamp * 1000 一致
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        if value <= MAX_TIMESTAMP:
+            return value * 1000
+        if value < MAX_TIMESTAMP_MS:
+            return value // 1000 * 1000
+        if value < MAX_TIMESTAMP_US:
+            return value // 1000000 * 1000
+    elif isinstance(value, float) and 0 <= value < MAX_TIMESTAMP_US:
+        if value > MAX_TIMESTAMP:
+            value = value / 1000 if value < MAX_TIMESTAMP_MS else value / 1000000
+        return int(value) * 1000
+    return arrow.get(value).timestamp * 1000
+
+
+def column_to_milliseconds(column: tuple) -> array:
+    """
+    时间列批量转换为毫秒时间戳，整数秒/毫秒时间戳按整列计算
+    """
+    if column and all(type(value) is int for value in column):
+        low, high = min(column), max(column)
+        if 0 <= low and high <= MAX_TIMESTAMP:
+            return array("q", [value * 1000 for value in column])
+        if MAX_TIMESTAMP < low and high < MAX_TIMESTAMP_MS:
+            return array("q", [value - value % 1000 for value in column])
+    return array("q", [to_milliseconds(value) for value in column])
+
+
+class UnifyQuerySeries:
+    """
+    列式存储的 series
+    :param dimensions: 维度，series 内所有数据点共享，不能修改
+    :param columns: 归一化后的列名(_time -> _time_, _result/_value -> _result_)
+    :param data: 按列存放的数据，时间类型的列为毫秒时间戳数组
+    :param result_column: 记录中缺少 _result_ 时，作为 _result_ 的列名
+    """
+
+    __slots__ = ("dimensions", "columns", "data", "result_column")
+
+    def __init__(self, dimensions: dict[str, Any], columns: list[str], data: list, result_column: str | None = None):
+        self.dimensions = dimensions
+        self.columns = columns
+        self.data = data
+        self.result_column = result_column
+
+    def __len__(self) -> int:
+        return len(self.data[0]) if self.data else 0
+
+    def get_column(self, column: str) -> Sequence | None:
+        """
+        获取列数据，同名列以最后一列为准(与记录中的覆盖顺序一致)
+        """
+        for name, values in zip(reversed(self.columns), reversed(self.data)):
+            if name == column:
+                return values
+        return None
+
+    def get_field(self, field: str) -> Sequence | None:
+        """
+        按记录的取值方式获取字段数据：列优先，其次为维度(每个数据点取值相同)
+        """
+        if field == RESULT_COLUMN and self.result_column:
+            field = self.result_column
+        values = self.get_column(field)
+        if values is None and field in self.dimensions:
+            values = [self.dimensions[field]] * len(self)
+        return values
+
+    @classmethod
+    def from_records(cls, records: list[dict[str, Any]]) -> list["UnifyQuerySeries"]:
+        """
+        逐条记录转换为单个数据点的 series，用于无法列式解码的查询结果(如原始数据源查询)
+        """
+        return [cls({}, list(record), [(value,) for value in record.values()]) for record in records]
+
+    @property
+    def times(self) -> Sequence[int] | None:
+        return self.get_column(TIME_COLUMN)
+
+    @property
+    def values(self) -> Sequence | None:
+        values = self.get_column(RESULT_COLUMN)
+        if values is None and self.result_column:
+            values = self.get_column(self.result_column)
+        return values
+
+    def exclude_time(self, timestamp: int):
+        """
+        剔除指定时间的数据点
+        """
+        times = self.times
+        if times is None or timestamp not in times:
+            return
+        keep = [time != timestamp for time in times]
+        self.data = [
+            type(values)(values.typecode, (v for v, k in zip(values, keep) if k))
+            if isinstance(values, array)
+            else [v for v, k in zip(values, keep) if k]
+            for values in self.data
+        ]
+
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """
+        逐条生成记录，每条记录为独立的字典
+        """
+        dimensions = self.dimensions
+        columns = self.columns
+        result_column = self.result_column
+        for row in zip(*self.data):
+            record = {**dimensions}
+            record.update(zip(columns, row))
+            if result_column:
+                record[RESULT_COLUMN] = record[result_column]
+            yield record
@@ -317,6 +317,39 @@ ADVANCED_OPTIONS = OrderedDict(
         ("ACCESS_LATENCY_INTERVAL_FACTOR", slz.IntegerField(label="access数据源延迟上报周期因子", default=1)),
         ("ACCESS_LATENCY_THRESHOLD_CONSTANT", slz.IntegerField(label="access数据源延迟上报常量阈值", default=180)),
         ("ACCESS_DETECT_MERGE_STRATEGY_IDS", slz.ListField(label="access合并detect策略列表", default=[])),
+        ("TRIGGER_BATCH_CHECK_ENABLED", slz.BooleanField(label="trigger批量检测开关", default=False)),
+        ("TRIGGER_MICRO_BATCH_ENABLED", slz.BooleanField(label="trigger微批处理开关", default=False)),
+        ("TRIGGER_MICRO_BATCH_MAX_SIZE", slz.IntegerField(label="trigger微批单次最大信号数", default=100)),
+        ("TRIGGER_MICRO_BATCH_MAX_LATENCY", slz.FloatField(label="trigger微批最大等待时间(秒)", default=0.5)),
+        ("DETECT_THRESHOLD_BATCH_ENABLED", slz.BooleanField(label="静态阈值批量预判定开关", default=False)),
+        (
+            "DETECT_HISTORY_CACHE_MAX_SIZE",
+            slz.IntegerField(label="同比环比历史数据进程内缓存最大数量(0为关闭)", default=0),
+        ),
+        (
+            "DETECT_HISTORY_CACHE_MAX_POINTS",
+            slz.IntegerField(label="同比环比历史数据进程内缓存最大数据点数", default=200000),
+        ),
+        ("DETECT_HISTORY_CACHE_TTL", slz.IntegerField(label="同比环比历史数据进程内缓存过期时间(秒)", default=60)),
+        ("DETECT_HISTORY_COMPACT_ENCODING", slz.BooleanField(label="同比环比历史数据紧凑编码开关", default=False)),
+        ("ALERT_CHECK_SCHEDULER_ENABLED", slz.BooleanField(label="告警检测时间轮调度开关", default=False)),
+        ("ALERT_BUILDER_PARTITION_ENABLED", slz.BooleanField(label="告警生成分区模式开关", default=False)),
+        ("ALERT_BUILDER_PARTITION_MAX_RETRIES", slz.IntegerField(label="告警生成分区批次最大重试次数", default=5)),
+        ("ES_BULK_WRITER_ENABLED", slz.BooleanField(label="告警ES批量写入器开关", default=False)),
+        ("ES_BULK_CHUNK_SIZE", slz.IntegerField(label="告警ES批量写入初始单次请求条数", default=500)),
+        ("ES_BULK_MAX_CHUNK_SIZE", slz.IntegerField(label="告警ES批量写入最大单次请求条数", default=2000)),
+        (
+            "ES_BULK_MAX_CHUNK_BYTES",
+            slz.IntegerField(label="告警ES批量写入单次请求最大字节数", default=10 * 1024 * 1024),
+        ),
+        ("ES_BULK_MAX_WORKERS", slz.IntegerField(label="告警ES批量写入并发请求数(小于等于1为串行)", default=4)),
+        ("ES_BULK_MAX_RETRIES", slz.IntegerField(label="告警ES批量写入限流最大重试次数", default=3)),
+        ("STRATEGY_LOCAL_MIRROR_ENABLED", slz.BooleanField(label="进程内策略镜像开关", default=False)),
+        ("CMDB_LOCAL_CACHE_ENABLED", slz.BooleanField(label="进程内CMDB主机拓扑缓存开关", default=False)),
+        ("GRAPH_UNIFY_QUERY_SERIES_ENABLED", slz.BooleanField(label="图表统一查询列式处理开关", default=False)),
+        ("PANEL_RESULT_CACHE_ENABLED", slz.BooleanField(label="图表查询结果缓存开关", default=False)),
+        ("METRIC_SEARCH_INDEX_ENABLED", slz.BooleanField(label="指标选择器搜索索引开关", default=False)),
+        ("METRIC_CACHE_STREAMING_REBUILD_ENABLED", slz.BooleanField(label="指标缓存流式重建开关", default=False)),
         ("KAFKA_AUTO_COMMIT", slz.BooleanField(label="kafka是否自动提交", default=True)),
         ("MAX_BUILD_EVENT_NUMBER", slz.IntegerField(label="单次告警生成任务处理的event数量", default=0)),
         ("HOST_DYNAMIC_FIELDS", slz.ListField(label="主机动态属性", default=[])),
@@ -437,6 +470,42 @@ ADVANCED_OPTIONS = OrderedDict(
             slz.IntegerField(label="access数据批量处理触发阈值(0为不触发)", default=0),
         ),
         ("ACCESS_DATA_BATCH_PROCESS_SIZE", slz.IntegerField(label="access数据批量处理单次处理量", default=50000)),
+        ("ACCESS_DATA_BATCH_ADAPTIVE_ENABLED", slz.BooleanField(label="access数据批量处理自适应开关", default=False)),
+        (
+            "ACCESS_DATA_BATCH_TARGET_LATENCY",
+            slz.IntegerField(label="access数据批量处理子任务目标耗时(秒)", default=30),
+        ),
+        ("ACCESS_DATA_BATCH_MIN_SIZE", slz.IntegerField(label="access数据批量处理单批最小数据量", default=10000)),
+        ("ACCESS_DATA_BATCH_MAX_SIZE", slz.IntegerField(label="access数据批量处理单批最大数据量", default=500000)),
+        (
+            "ACCESS_DATA_BATCH_MIN_TAIL_RATIO",
+            slz.FloatField(label="access数据批量处理尾部批次最小比例", default=0.2),
+        ),
+        (
+            "ACCESS_BATCH_DATA_CODEC",
+            slz.ChoiceField(label="access分批子任务数据编码格式", choices=["json", "columnar"], default="json"),
+        ),
+        (
+            "ACCESS_BATCH_DATA_COMPRESSION",
+            slz.ChoiceField(
+                label="access分批子任务列式数据压缩算法", choices=["none", "zlib", "zstd", "lz4"], default="zlib"
+            ),
+        ),
+        ("ACCESS_DATA_STREAM_ENABLED", slz.BooleanField(label="access数据流式处理开关", default=False)),
+        ("ACCESS_DATA_STREAM_CHUNK_SIZE", slz.IntegerField(label="access数据流式处理分块大小", default=10000)),
+        ("ACCESS_WRITE_BEHIND_ENABLED", slz.BooleanField(label="access检测点及去重缓存写缓冲开关", default=False)),
+        (
+            "ACCESS_WRITE_BEHIND_FLUSH_INTERVAL",
+            slz.FloatField(label="access写缓冲定时写入间隔(秒)", default=1),
+        ),
+        (
+            "ACCESS_WRITE_BEHIND_MAX_PENDING",
+            slz.IntegerField(label="access写缓冲提前写入的待写入key数量", default=10000),
+        ),
+        (
+            "REDIS_PIPELINE_EXECUTE_MAX_WORKERS",
+            slz.IntegerField(label="redis pipeline跨节点并发执行线程数(小于等于1时串行)", default=1),
+        ),
         ("BASE64_ENCODE_TRIGGER_CHARS", slz.ListField(label="需要base64编码的特殊字符", default=[])),
         ("AIDEV_KNOWLEDGE_BASE_IDS", slz.ListField(label="aidev的知识库ID", default=[])),
         ("AIDEV_AGENT_AI_GENERATING_KEYWORD", slz.CharField(label="AIAgent内容生成关键字", default="生成中")),
@@ -189,10 +189,11 @@ class BaseDocument(Document):
         actions = []
         for doc in documents:
             actions.append(doc.prepare_action(action, skip_empty=skip_empty))
+        max_retries = kwargs.pop("max_retries", cls.ES_BULK_MAX_RETRIES)
         params = dict(actions=actions, request_timeout=cls.ES_REQUEST_TIMEOUT, **kwargs)
         if parallel:
             return cls().parallel_bulk(**params)
-        return cls().bulk(max_retries=cls.ES_BULK_MAX_RETRIES, **params)
+        return cls().bulk(max_retries=max_retries, **params)
 
     @classmethod
     def get_lifecycle_manager(cls):
@@ -249,8 +249,11 @@ class MetricListCache(models.Model):
         """使用 result_table 拼接的可读名"""
         return ".".join(x for x in [self.result_table_id, self.metric_field] if x)
 
-    def get_human_readable_name(self) -> str:
-        """获取可读的指标名"""
+    def get_human_readable_name(self, time_series_dbs: dict[str, bool] | None = None) -> str:
+        """
+        获取可读的指标名
+        :param time_series_dbs: 批量处理时复用的 db 是否存在自定义时序分组的查询结果
+        """
 
         # 系统内置指标 & 容器指标
         if self.is_already_readable:
@@ -269,7 +272,11 @@ class MetricListCache(models.Model):
         # 自定义指标上报的内置指标都是同一个dataID上报的数据，因此不会出现重名的指标
         # 所以 measurement 可以被删减掉
         db = self.result_table_id.split(".")[0]
-        if TimeSeriesGroup.objects.filter(table_id__startswith=db).exists():
+        if time_series_dbs is None:
+            time_series_dbs = {}
+        if db not in time_series_dbs:
+            time_series_dbs[db] = TimeSeriesGroup.objects.filter(table_id__startswith=db).exists()
+        if time_series_dbs[db]:
             return f"{db}.{self.metric_field}"
 
         return self.result_table_readable_name
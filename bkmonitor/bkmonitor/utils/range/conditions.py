@@ -11,11 +11,27 @@ specific language governing permissions and limitations under the License.
 import re
 import sre_constants
 
+from bkmonitor.utils.range.fields import DimensionField
+
 
 class Condition:
     def is_match(self, data):
         raise NotImplementedError("You should implement this.")
 
+    def compile(self):
+        """
+        编译为 data -> bool 的匹配函数，结果与 is_match 一致
+        编译结果为当前条件树的快照，之后对条件树的修改不会生效
+        """
+        return self.is_match
+
+    def match_many(self, records) -> list[bool]:
+        """
+        批量匹配，条件只编译一次
+        """
+        matcher = self.compile()
+        return [matcher(record) for record in records]
+
 
 class SimpleCondition(Condition):
     """eq / gt / lt / reg ..."""
@@ -34,6 +50,33 @@ class SimpleCondition(Condition):
     def _is_match(self, data_field):
         raise NotImplementedError("You should inherit me and implement this.")
 
+    def compile(self):
+        value_compiler = _VALUE_MATCH_COMPILERS.get(type(self))
+        value_match = value_compiler(self) if value_compiler else None
+        if value_match is None:
+            # 未知子类或条件值无法预处理时，退化为原有逻辑
+            return self.is_match
+
+        default = self.default_value_if_not_exists
+        if type(self.cond_field) is DimensionField:
+            name = self.cond_field.name
+
+            def match(data):
+                if name not in data:
+                    return default
+                return value_match(data[name])
+
+        else:
+            get_value = self.cond_field.get_value_from_data
+
+            def match(data):
+                is_exists, value = get_value(data)
+                if not is_exists:
+                    return default
+                return value_match(value)
+
+        return match
+
     def get_field(self, data):
         is_exists, data_value = self.cond_field.get_value_from_data(data)
         if is_exists:
@@ -56,6 +99,22 @@ class CompositeCondition(Condition):
     def remove(self, condition):
         self.conditions.remove(condition)
 
+    def compile_children(self):
+        """
+        编译子条件，按匹配开销从低到高排列，便于短路
+        可能抛出异常的条件(如数值比较)作为分隔，条件不会跨越其重排，保证异常行为与 is_match 一致
+        """
+        ordered, segment = [], []
+        for condition in self.conditions:
+            if _is_raise_free(condition):
+                segment.append(condition)
+                continue
+            ordered.extend(sorted(segment, key=_get_condition_cost))
+            ordered.append(condition)
+            segment = []
+        ordered.extend(sorted(segment, key=_get_condition_cost))
+        return tuple(condition.compile() for condition in ordered)
+
 
 class OrCondition(CompositeCondition):
     def is_match(self, data):
@@ -67,6 +126,21 @@ class OrCondition(CompositeCondition):
                 return True
         return False
 
+    def compile(self):
+        if not self.conditions:
+            return _always_true
+        matchers = self.compile_children()
+        if len(matchers) == 1:
+            return matchers[0]
+
+        def match(data):
+            for matcher in matchers:
+                if matcher(data):
+                    return True
+            return False
+
+        return match
+
 
 class AndCondition(CompositeCondition):
     def is_match(self, data):
@@ -78,6 +152,21 @@ class AndCondition(CompositeCondition):
                 return False
         return True
 
+    def compile(self):
+        if not self.conditions:
+            return _always_true
+        matchers = self.compile_children()
+        if len(matchers) == 1:
+            return matchers[0]
+
+        def match(data):
+            for matcher in matchers:
+                if not matcher(data):
+                    return False
+            return True
+
+        return match
+
 
 class EqualCondition(SimpleCondition):
     def _is_match(self, data_field):
@@ -162,3 +251,161 @@ class IsSuperSetCondition(SimpleCondition):
         data_value = data_field.to_str_list()
         cond_value = self.cond_field.to_str_list()
         return set(data_value).issuperset(set(cond_value))
+
+
+def _always_true(data):
+    return True
+
+
+def _plain_str_list(value):
+    """
+    与 DimensionField.to_str_list 一致，避免每次匹配创建字段对象
+    """
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value]
+    return [str(value).strip()]
+
+
+def _get_str_list_getter(cond_field):
+    if type(cond_field) is DimensionField:
+        return _plain_str_list
+    field_class, name = cond_field.__class__, cond_field.name
+    return lambda value: field_class(name, value).to_str_list()
+
+
+def _get_float_list_getter(cond_field):
+    field_class, name = cond_field.__class__, cond_field.name
+    return lambda value: field_class(name, value).to_float_list()
+
+
+def _compile_equal(condition, negate=False):
+    cond_values = frozenset(condition.cond_field.to_str_list())
+    to_str_list = _get_str_list_getter(condition.cond_field)
+    if negate:
+        return lambda value: cond_values.isdisjoint(to_str_list(value))
+    return lambda value: not cond_values.isdisjoint(to_str_list(value))
+
+
+def _compile_include(condition, negate=False):
+    cond_values = tuple(condition.cond_field.to_str_list())
+    to_str_list = _get_str_list_getter(condition.cond_field)
+
+    def match(value):
+        for data_value in to_str_list(value):
+            for cond_value in cond_values:
+                if cond_value in data_value:
+                    return not negate
+        return negate
+
+    return match
+
+
+def _compile_greater(condition, negate=False):
+    try:
+        cond_value = max(condition.cond_field.to_float_list())
+    except (TypeError, ValueError):
+        return None
+    to_float_list = _get_float_list_getter(condition.cond_field)
+    if negate:
+        return lambda value: not min(to_float_list(value)) > cond_value
+    return lambda value: min(to_float_list(value)) > cond_value
+
+
+def _compile_lesser(condition, negate=False):
+    try:
+        cond_value = min(condition.cond_field.to_float_list())
+    except (TypeError, ValueError):
+        return None
+    to_float_list = _get_float_list_getter(condition.cond_field)
+    if negate:
+        return lambda value: not max(to_float_list(value)) < cond_value
+    return lambda value: max(to_float_list(value)) < cond_value
+
+
+def _compile_regular(condition, negate=False):
+    patterns = []
+    for cond_value in condition.cond_field.to_str_list():
+        try:
+            patterns.append(re.compile(rf"{cond_value}"))
+        except sre_constants.error:
+            # 与 RegularCondition 一致：遇到非法正则后，后续正则不再参与匹配
+            break
+    patterns = tuple(patterns)
+    to_str_list = _get_str_list_getter(condition.cond_field)
+
+    def match(value):
+        data_value = to_str_list(value)
+        if not data_value:
+            return negate
+        data_value = data_value[0]
+        for pattern in patterns:
+            if pattern.search(data_value) is not None:
+                return not negate
+        return negate
+
+    return match
+
+
+def _compile_superset(condition):
+    cond_values = frozenset(condition.cond_field.to_str_list())
+    to_str_list = _get_str_list_getter(condition.cond_field)
+    return lambda value: cond_values.issubset(to_str_list(value))
+
+
+# 条件类 -> 值匹配函数编译方法，仅对精确类型生效，子类按原有 is_match 执行
+_VALUE_MATCH_COMPILERS = {
+    EqualCondition: _compile_equal,
+    NotEqualCondition: lambda condition: _compile_equal(condition, negate=True),
+    IncludeCondition: _compile_include,
+    ExcludeCondition: lambda condition: _compile_include(condition, negate=True),
+    GreaterCondition: _compile_greater,
+    LesserOrEqualCondition: lambda condition: _compile_greater(condition, negate=True),
+    LesserCondition: _compile_lesser,
+    GreaterOrEqualCondition: lambda condition: _compile_lesser(condition, negate=True),
+    RegularCondition: _compile_regular,
+    NotRegularCondition: lambda condition: _compile_regular(condition, negate=True),
+    IsSuperSetCondition: _compile_superset,
+}
+
+# 条件匹配开销估算，用于组合条件的短路排序
+_CONDITION_COSTS = {
+    EqualCondition: 1,
+    NotEqualCondition: 1,
+    IsSuperSetCondition: 1,
+    IncludeCondition: 2,
+    ExcludeCondition: 2,
+    GreaterCondition: 3,
+    LesserOrEqualCondition: 3,
+    LesserCondition: 3,
+    GreaterOrEqualCondition: 3,
+    RegularCondition: 4,
+    NotRegularCondition: 4,
+}
+_DEFAULT_CONDITION_COST = 5
+
+
+def _get_condition_cost(condition) -> int:
+    if isinstance(condition, CompositeCondition):
+        return sum(_get_condition_cost(child) for child in condition.conditions) or 1
+    cost = _CONDITION_COSTS.get(type(condition), _DEFAULT_CONDITION_COST)
+    if isinstance(condition, SimpleCondition) and type(condition.cond_field) is not DimensionField:
+        cost += 1
+    return cost
+
+
+# 匹配过程不会抛出异常的条件类型
+_RAISE_FREE_CONDITIONS = (
+    EqualCondition,
+    NotEqualCondition,
+    IsSuperSetCondition,
+    IncludeCondition,
+    ExcludeCondition,
+    RegularCondition,
+    NotRegularCondition,
+)
+
+
+def _is_raise_free(condition) -> bool:
+    if isinstance(condition, CompositeCondition):
+        return all(_is_raise_free(child) for child in condition.conditions)
+    return type(condition) in _RAISE_FREE_CONDITIONS
@@ -771,6 +771,30 @@ OPERATION_STATISTICS_METRIC_PUSH_JOB = "Operation"
 ENABLE_METADATA_DOWNSAMPLE_BY_BKDATA = False
 # 是否启用 unify-query 查询计算平台降精度数据
 ENABLE_UNIFY_QUERY_DOWNSAMPLE_BY_BKDATA = False
+# 图表统一查询按 series 列式处理(不展开为逐条记录)
+GRAPH_UNIFY_QUERY_SERIES_ENABLED = False
+# 图表查询结果缓存(进程内)，刷新时只查询缓存之后的时间范围
+PANEL_RESULT_CACHE_ENABLED = False
+# 图表查询结果缓存内存预算(字节)
+PANEL_RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# 数据稳定延迟(秒)，早于 当前时间 - 延迟 的数据点才会被缓存
+PANEL_RESULT_CACHE_DELAY = 120
+# 图表查询结果缓存过期时间(秒)，过期后重新查询完整的时间范围
+PANEL_RESULT_CACHE_TTL = 600
+# 指标选择器进程内搜索索引
+METRIC_SEARCH_INDEX_ENABLED = False
+# 搜索索引的指标总数上限，超过上限的业务回退到数据库查询
+METRIC_SEARCH_INDEX_MAX_SIZE = 500000
+# 搜索索引版本检查间隔(秒)
+METRIC_SEARCH_INDEX_SYNC_INTERVAL = 30
+# 搜索索引最长同步间隔(秒)，超过后即使版本未变化也对比一次指标
+METRIC_SEARCH_INDEX_MAX_AGE = 600
+# 指标缓存流式重建，按表并发获取指标并批量写入
+METRIC_CACHE_STREAMING_REBUILD_ENABLED = False
+# 指标缓存重建获取指标的并发数，仅对表之间无状态依赖的数据源生效
+METRIC_CACHE_REBUILD_WORKERS = 4
+# 指标缓存重建每批写入的指标数
+METRIC_CACHE_REBUILD_BATCH_SIZE = 1000
 
 WECOM_ROBOT_BIZ_WHITE_LIST = []
 WECOM_ROBOT_ACCOUNT = {}
@@ -781,6 +805,18 @@ WECOM_APP_ACCOUNT = {}
 
 FTA_ES_SLICE_SIZE = 50
 FTA_ES_RETENTION = 365
+# 告警/事件/处理记录 ES 批量写入配置
+# 是否通过批量写入器写入，关闭时直接调用 Document.bulk_create
+ES_BULK_WRITER_ENABLED = False
+# 单次请求的初始条数及最大条数，写入器根据请求耗时及限流情况在[50, 最大条数]之间自动调整
+ES_BULK_CHUNK_SIZE = 500
+ES_BULK_MAX_CHUNK_SIZE = 2000
+# 单次请求的最大字节数
+ES_BULK_MAX_CHUNK_BYTES = 10 * 1024 * 1024
+# 进程内并发写入的请求数，小于等于 1 时串行写入
+ES_BULK_MAX_WORKERS = 4
+# 被限流(429)时的最大重试次数
+ES_BULK_MAX_RETRIES = 3
 
 # 短信通知最大长度设置
 SMS_CONTENT_LENGTH = 0
@@ -806,6 +842,64 @@ ACCESS_LATENCY_THRESHOLD_CONSTANT = 180
 # 仅对列表中的策略启用合并处理，为空时对所有静态阈值策略生效
 ACCESS_DETECT_MERGE_STRATEGY_IDS = []
 
+# trigger 批量检测开关
+# 开启后单次拉取的异常点的检测窗口数据通过 pipeline 一次性获取，再在内存中完成触发判定
+TRIGGER_BATCH_CHECK_ENABLED = False
+
+# trigger 微批处理开关
+# 开启后单次拉取多个异常信号，按 Redis 节点分组，每个节点每批次只发送一次限流 pipeline 和一个 Kafka 批次
+TRIGGER_MICRO_BATCH_ENABLED = False
+# 微批模式单次最多处理的信号数
+TRIGGER_MICRO_BATCH_MAX_SIZE = 100
+# 微批模式凑批的最大等待时间(秒)
+TRIGGER_MICRO_BATCH_MAX_LATENCY = 0.5
+
+# 静态阈值批量预判定开关
+# 开启后静态阈值先对整批数据做数值预判定，仅对命中的数据点执行表达式检测并生成异常点
+DETECT_THRESHOLD_BATCH_ENABLED = False
+# 同比环比历史数据进程内缓存(LRU)的最大 key 数量，0 为关闭
+# 缓存期间其他进程写入的历史数据不可见，开启后需保证缓存过期时间小于历史数据的写入间隔
+DETECT_HISTORY_CACHE_MAX_SIZE = 0
+# 同比环比历史数据进程内缓存的最大数据点数，每个 key 缓存策略在该时刻全部维度的数据点
+DETECT_HISTORY_CACHE_MAX_POINTS = 200000
+# 同比环比历史数据进程内缓存的过期时间(秒)
+DETECT_HISTORY_CACHE_TTL = 60
+# 同比环比历史数据紧凑编码开关，开启后仅写入 [value, time]，需确保所有 detect 进程已升级
+DETECT_HISTORY_COMPACT_ENCODING = False
+
+# 告警检测调度开关
+# 开启后告警周期检测计划写入 redis 时间轮，由 alert_check 服务到期后批量下发检测任务，不再使用 celery countdown 延时任务
+ALERT_CHECK_SCHEDULER_ENABLED = False
+# 告警检测时间轮分片数，调整前需确保时间轮中无待执行的检测计划
+ALERT_CHECK_WHEEL_SHARD_COUNT = 16
+
+# 告警生成分区模式开关
+# 开启后事件按 dedupe_md5 路由到固定分区，由 alert_builder 服务按分区独占消费生成告警，加锁失败的事件回退到分区队列重试
+ALERT_BUILDER_PARTITION_ENABLED = False
+# 告警生成分区数，调整前需确保分区队列已消费完毕
+ALERT_BUILDER_PARTITION_COUNT = 16
+# 告警生成分区批次连续处理失败的最大次数，超过后移入死信队列
+ALERT_BUILDER_PARTITION_MAX_RETRIES = 5
+
+# 进程内策略镜像开关，开启后策略详情在进程内缓存，并通过策略变更记录增量同步
+STRATEGY_LOCAL_MIRROR_ENABLED = False
+# 进程内策略镜像最多缓存的策略数
+STRATEGY_LOCAL_MIRROR_MAX_SIZE = 20000
+# 进程内策略镜像同步策略变更的间隔(秒)
+STRATEGY_LOCAL_MIRROR_SYNC_INTERVAL = 5
+
+# 进程内 CMDB 主机/拓扑缓存开关，开启后主机及拓扑节点在进程内缓存，CMDB 缓存刷新后失效
+CMDB_LOCAL_CACHE_ENABLED = False
+# 进程内 CMDB 缓存最多缓存的对象数(每种缓存类型)
+CMDB_LOCAL_CACHE_MAX_SIZE = 100000
+# 进程内 CMDB 缓存检查缓存刷新的间隔(秒)
+CMDB_LOCAL_CACHE_SYNC_INTERVAL = 10
+# 进程内 CMDB 缓存的最长有效时间(秒)，用于兜底未重置过期时间的增量更新
+CMDB_LOCAL_CACHE_MAX_AGE = 600
+
+# redis pipeline 跨节点并发执行的线程数，小于等于1时各节点串行执行(默认)
+REDIS_PIPELINE_EXECUTE_MAX_WORKERS = 1
+
 # kafka是否自动提交配置
 KAFKA_AUTO_COMMIT = True
 
@@ -1750,6 +1844,32 @@ SYNC_BKBASE_META_SUPPORTED_STORAGE_TYPES = ["mysql", "tspider", "hdfs"]
 # access数据批量处理
 ACCESS_DATA_BATCH_PROCESS_SIZE = 50000
 ACCESS_DATA_BATCH_PROCESS_THRESHOLD = 0
+# access分批处理自适应单批数据量开关，开启后根据历史子任务耗时及队列延迟计算单批数据量
+# 开启后子任务会携带下发时间参数，需在所有 worker 升级后再开启
+ACCESS_DATA_BATCH_ADAPTIVE_ENABLED = False
+# 自适应模式下单个子任务的目标处理耗时(秒)
+ACCESS_DATA_BATCH_TARGET_LATENCY = 30
+# 自适应模式下单批数据量的上下限
+ACCESS_DATA_BATCH_MIN_SIZE = 10000
+ACCESS_DATA_BATCH_MAX_SIZE = 500000
+# 尾部剩余数据量小于单批数据量的该比例时，合并到上一批次，避免产生过小的子任务
+ACCESS_DATA_BATCH_MIN_TAIL_RATIO = 0.2
+# access分批子任务数据编码格式(json/columnar)，切换为columnar前需确保所有worker已升级
+ACCESS_BATCH_DATA_CODEC = "json"
+# columnar格式的压缩算法(none/zlib/zstd/lz4)，依赖未安装时回退为zlib
+ACCESS_BATCH_DATA_COMPRESSION = "zlib"
+# access降噪维度的哈希算法(md5/xxh3)，xxh3 计算更快，切换后一个降噪窗口内的维度可能被重复计数
+ACCESS_NOISE_DIMENSION_HASH = "md5"
+# access数据流式处理开关，开启后数据按分块完成去重、过滤、维度补充及推送，降低大数据量时的内存峰值
+ACCESS_DATA_STREAM_ENABLED = False
+# access数据流式处理的分块大小
+ACCESS_DATA_STREAM_CHUNK_SIZE = 10000
+# access checkpoint及去重缓存写缓冲开关，开启后进程内合并多个任务的写入，定时或超过阈值时按节点批量写入redis
+ACCESS_WRITE_BEHIND_ENABLED = False
+# 写缓冲定时写入间隔(秒)
+ACCESS_WRITE_BEHIND_FLUSH_INTERVAL = 1
+# 写缓冲待写入key数量超过该值时提前写入
+ACCESS_WRITE_BEHIND_MAX_PENDING = 10000
 
 # metadata请求es超时配置, 单位为秒，默认10秒
 # 格式: {default: 10, 集群域名: 20}
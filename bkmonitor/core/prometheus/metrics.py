@@ -145,6 +145,48 @@ DATASOURCE_QUERY_COUNT = Counter(
     labelnames=("data_source_label", "data_type_label", "role", "result_table", "api", "status", "exception"),
 )
 
+PANEL_RESULT_CACHE_REQUEST_COUNT = Counter(
+    name="bkmonitor_panel_result_cache_request_count",
+    documentation="图表查询结果缓存请求次数",
+    labelnames=("status",),
+)
+
+PANEL_RESULT_CACHE_POINT_COUNT = Counter(
+    name="bkmonitor_panel_result_cache_point_count",
+    documentation="图表查询结果数据点数量(按来源)",
+    labelnames=("source",),
+)
+
+PANEL_RESULT_CACHE_EVICT_COUNT = Counter(
+    name="bkmonitor_panel_result_cache_evict_count",
+    documentation="图表查询结果缓存淘汰次数",
+)
+
+METRIC_SEARCH_INDEX_REQUEST_COUNT = Counter(
+    name="bkmonitor_metric_search_index_request_count",
+    documentation="指标选择器搜索索引请求次数",
+    labelnames=("status",),
+)
+
+METRIC_SEARCH_INDEX_SYNC_COUNT = Counter(
+    name="bkmonitor_metric_search_index_sync_count",
+    documentation="指标选择器搜索索引同步次数",
+    labelnames=("type",),
+)
+
+METRIC_CACHE_REBUILD_TIME = Histogram(
+    name="bkmonitor_metric_cache_rebuild_time",
+    documentation="指标缓存重建耗时",
+    labelnames=("manager",),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600, INF),
+)
+
+METRIC_CACHE_REBUILD_ROW_COUNT = Counter(
+    name="bkmonitor_metric_cache_rebuild_row_count",
+    documentation="指标缓存重建变更指标数",
+    labelnames=("manager", "action"),
+)
+
 # access
 ACCESS_DATA_PROCESS_TIME = Histogram(
     name="bkmonitor_access_data_process_time",
@@ -164,6 +206,20 @@ ACCESS_DATA_PROCESS_PULL_DATA_COUNT = Counter(
     labelnames=("strategy_group_key",),
 )
 
+ACCESS_DATA_BATCH_SIZE = Histogram(
+    name="bkmonitor_access_data_batch_size",
+    documentation="access(data) 分批处理时的单批数据量",
+    labelnames=("strategy_group_key",),
+    buckets=(1000, 5000, 10000, 20000, 50000, 100000, 200000, 500000, 1000000, INF),
+)
+
+ACCESS_DATA_BATCH_QUEUE_LAG = Histogram(
+    name="bkmonitor_access_data_batch_queue_lag",
+    documentation="access(data) 分批子任务从下发到开始执行的排队延迟",
+    labelnames=("strategy_group_key",),
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, INF),
+)
+
 ACCESS_EVENT_PROCESS_TIME = Histogram(
     name="bkmonitor_access_event_process_time",
     documentation="access(event) 模块处理耗时",
@@ -259,6 +315,25 @@ TRIGGER_PROCESS_PUSH_DATA_COUNT = Counter(
     labelnames=("strategy_id",),
 )
 
+TRIGGER_MICRO_BATCH_SIZE = Histogram(
+    name="bkmonitor_trigger_micro_batch_size",
+    documentation="trigger 模块微批模式下单个 Redis 节点单次处理的信号数",
+    labelnames=("redis_node",),
+    buckets=(1, 5, 10, 20, 50, 100, 200, 500, 1000, INF),
+)
+
+TRIGGER_MICRO_BATCH_PROCESS_TIME = Histogram(
+    name="bkmonitor_trigger_micro_batch_process_time",
+    documentation="trigger 模块微批模式下单个 Redis 节点单次处理耗时",
+    labelnames=("redis_node",),
+)
+
+TRIGGER_MICRO_BATCH_SIGNAL_COUNT = Counter(
+    name="bkmonitor_trigger_micro_batch_signal_count",
+    documentation="trigger 模块微批模式下处理的信号数",
+    labelnames=("redis_node", "status"),
+)
+
 # nodata
 NODATA_PROCESS_TIME = Histogram(
     name="bkmonitor_nodata_process_time",
@@ -309,6 +384,19 @@ ALERT_MANAGE_DEFERRED_COUNT = Counter(
     labelnames=("exception",),
 )
 
+ALERT_CHECK_SCHEDULE_COUNT = Counter(
+    name="bkmonitor_alert_check_schedule_count",
+    documentation="alert(manager) 模块写入检测时间轮的检测点数",
+    labelnames=("check_interval",),
+)
+
+ALERT_CHECK_LAG = Histogram(
+    name="bkmonitor_alert_check_lag",
+    documentation="alert(manager) 模块检测点实际下发时间与计划检测时间的延迟",
+    labelnames=("check_interval",),
+    buckets=(0.5, 1, 2, 5, 10, 15, 30, 60, 120, INF),
+)
+
 ALERT_PROCESS_PULL_EVENT_COUNT = Counter(
     name="bkmonitor_alert_process_pull_event_count",
     documentation="alert(builder) 模块事件拉取条数",
@@ -403,6 +491,80 @@ ACCESS_TO_ALERT_PROCESS_LATENCY = Histogram(
     buckets=(1, 2, 3, 5, 10, 15, 20, 30, 60, 180, 300, INF),
 )
 
+ALERT_BUILDER_PARTITION_EVENT_COUNT = Counter(
+    name="bkmonitor_alert_builder_partition_event_count",
+    documentation="alert(builder) 模块分区模式下路由到各分区的事件数",
+    labelnames=("partition",),
+)
+
+ALERT_BUILDER_PARTITION_BACKLOG = Gauge(
+    name="bkmonitor_alert_builder_partition_backlog",
+    documentation="alert(builder) 模块分区模式下各分区待处理的事件数",
+    labelnames=("partition",),
+)
+
+ALERT_BUILDER_PARTITION_DEAD_LETTER_COUNT = Counter(
+    name="bkmonitor_alert_builder_partition_dead_letter_count",
+    documentation="alert(builder) 模块分区模式下多次处理失败移入死信队列的事件数",
+    labelnames=("partition",),
+)
+
+ALERT_BUILDER_EVENT_TO_ALERT_LATENCY = Histogram(
+    name="bkmonitor_alert_builder_event_to_alert_latency",
+    documentation="alert(builder) 模块事件从接收到更新告警的整体延迟",
+    labelnames=("partition",),
+    buckets=(0.5, 1, 2, 3, 5, 10, 15, 20, 30, 60, 180, 300, INF),
+)
+
+STRATEGY_MIRROR_REQUEST_COUNT = Counter(
+    name="bkmonitor_strategy_mirror_request_count",
+    documentation="进程内策略镜像读取的策略数",
+    labelnames=("status",),
+)
+
+STRATEGY_MIRROR_SYNC_COUNT = Counter(
+    name="bkmonitor_strategy_mirror_sync_count",
+    documentation="进程内策略镜像同步策略变更的次数",
+    labelnames=("status",),
+)
+
+CMDB_LOCAL_CACHE_REQUEST_COUNT = Counter(
+    name="bkmonitor_cmdb_local_cache_request_count",
+    documentation="进程内 CMDB 缓存读取的对象数",
+    labelnames=("cache_type", "status"),
+)
+
+CMDB_LOCAL_CACHE_RESET_COUNT = Counter(
+    name="bkmonitor_cmdb_local_cache_reset_count",
+    documentation="进程内 CMDB 缓存因缓存刷新而失效的次数",
+    labelnames=("cache_type",),
+)
+
+ES_BULK_PENDING_COUNT = Gauge(
+    name="bkmonitor_es_bulk_pending_count",
+    documentation="ES 批量写入器待写入的文档数",
+    labelnames=("document",),
+)
+
+ES_BULK_DOCUMENT_COUNT = Counter(
+    name="bkmonitor_es_bulk_document_count",
+    documentation="ES 批量写入器写入的文档数",
+    labelnames=("document", "status"),
+)
+
+ES_BULK_REQUEST_LATENCY = Histogram(
+    name="bkmonitor_es_bulk_request_latency",
+    documentation="ES 批量写入器单次请求耗时",
+    labelnames=("document",),
+    buckets=(0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30, INF),
+)
+
+ES_BULK_CHUNK_SIZE = Gauge(
+    name="bkmonitor_es_bulk_chunk_size",
+    documentation="ES 批量写入器当前单次请求条数",
+    labelnames=("document",),
+)
+
 ALERT_MANAGE_PUSH_DATA_COUNT = Counter(
     name="bkmonitor_alert_manage_push_data_count",
     documentation="alert(manager) 模块数据推送条数",
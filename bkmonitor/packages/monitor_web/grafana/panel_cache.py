@@ -0,0 +1,341 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+图表查询结果缓存
+
+图表自动刷新时(如最近24小时、每30秒刷新一次)每次都会查询完整的时间范围，但只有最新的几个周期的数据有变化。
+缓存以查询配置为 key，按 series 保存已稳定(早于 当前时间 - 稳定延迟)的数据点，刷新时只查询缓存之后的时间范围，
+与缓存中仍在查询范围内的数据合并后返回：
+- 只缓存按周期对齐的范围查询，数据点时间与查询周期对齐，缓存的数据可以按时间切分
+- 查询结果不完整(is_partial)时不更新缓存
+- series 统计(avg/max/min/count/sum)按合并后的数据重新计算，包含其他统计或数据点没有时间列时不缓存
+- 进程内缓存，超出内存预算后淘汰最近最少使用的查询；缓存过期后重新查询完整的时间范围，以纠正迟到的数据
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+from django.conf import settings
+
+from bkmonitor.data_source.unify_query.series import UnifyQuerySeries
+from bkmonitor.utils.common_utils import count_md5
+from bkmonitor.utils.time_tools import time_interval_align
+from core.prometheus import metrics
+
+# 查询配置中影响查询结果的字段
+QUERY_CONFIG_FIELDS = (
+    "data_source_label",
+    "data_type_label",
+    "table",
+    "data_label",
+    "index_set_id",
+    "metrics",
+    "where",
+    "group_by",
+    "interval",
+    "filter_dict",
+    "functions",
+    "query_string",
+    "promql",
+    "time_field",
+)
+
+# 支持按数据点重新计算的 series 统计
+STAT_FIELDS = {"avg", "max", "min", "count", "sum"}
+
+# 单个数据(单元格)的估算内存占用(字节)
+CELL_SIZE = 24
+# 单个 series 的估算内存占用(字节)
+SERIES_SIZE = 512
+
+# (开始时间, 结束时间) -> (series 列表, series 统计, 是否部分结果)，时间单位为毫秒
+QueryFunc = Callable[[int, int], tuple[list[UnifyQuerySeries], dict, bool]]
+
+
+class PanelCacheEntry:
+    """
+    缓存的查询结果，保存时间范围 [start, end) 内的数据点
+    :param series_list: 按时间切分后的 series
+    :param stat_fields: series 统计的 key 及统计字段
+    """
+
+    __slots__ = ("start", "end", "series_list", "stat_fields", "expire_time", "size")
+
+    def __init__(self, start: int, end: int, series_list: list[UnifyQuerySeries], stat_fields: dict, expire_time):
+        self.start = start
+        self.end = end
+        self.series_list = series_list
+        self.stat_fields = stat_fields
+        self.expire_time = expire_time
+        self.size = sum(SERIES_SIZE + len(series) * len(series.columns) * CELL_SIZE for series in series_list)
+
+
+def slice_series(series: UnifyQuerySeries, start: int, end: int) -> UnifyQuerySeries:
+    """
+    截取时间范围 [start, end) 内的数据点
+    """
+    times = series.times
+    indexes = [index for index, timestamp in enumerate(times) if start <= timestamp < end]
+    if len(indexes) == len(times):
+        data = [list(values) for values in series.data]
+    else:
+        data = [[values[index] for index in indexes] for values in series.data]
+    return UnifyQuerySeries(series.dimensions, series.columns, data, series.result_column)
+
+
+def merge_series(*series_lists: list[UnifyQuerySeries]) -> list[UnifyQuerySeries]:
+    """
+    合并维度及列相同的 series，按参数顺序拼接数据点
+    """
+    merged = OrderedDict()
+    for series_list in series_lists:
+        for series in series_list:
+            key = (tuple(sorted(series.dimensions.items())), tuple(series.columns), series.result_column)
+            if key not in merged:
+                merged[key] = UnifyQuerySeries(
+                    series.dimensions, series.columns, [list(values) for values in series.data], series.result_column
+                )
+                continue
+            for values, new_values in zip(merged[key].data, series.data):
+                values.extend(new_values)
+    return list(merged.values())
+
+
+def calculate_stat(values: list, fields) -> dict:
+    """
+    按数据点计算 series 统计
+    """
+    values = [value for value in values if isinstance(value, int | float)]
+    stat = {"count": len(values)}
+    if values:
+        stat.update(sum=sum(values), max=max(values), min=min(values))
+        stat["avg"] = stat["sum"] / len(values)
+    return {field: stat.get(field) for field in fields}
+
+
+class PanelResultCache:
+    """
+    进程内图表查询结果缓存
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[str, PanelCacheEntry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @staticmethod
+    def is_cacheable(params: dict) -> bool:
+        """
+        是否可以使用缓存：开启缓存、按周期对齐的范围查询
+        """
+        return bool(
+            settings.PANEL_RESULT_CACHE_ENABLED
+            and params.get("type", "range") == "range"
+            and params.get("time_alignment", True)
+            and not params.get("not_time_align")
+        )
+
+    @staticmethod
+    def get_step(params: dict) -> int:
+        """
+        查询步长(秒)，与统一查询的步长计算一致
+        """
+        step = 0
+        for query_config in params["query_configs"]:
+            interval = query_config.get("interval")
+            if isinstance(interval, int) and interval > 0:
+                step = min(interval, step) if step else interval
+        return step or 60
+
+    @staticmethod
+    def get_cache_key(params: dict) -> str:
+        """
+        按查询配置生成缓存 key
+        """
+        config = {
+            "bk_biz_id": params["bk_biz_id"],
+            "expression": params.get("expression", ""),
+            "functions": params.get("functions", []),
+            "down_sample_range": params.get("down_sample_range", ""),
+            "limit": params.get("limit"),
+            "slimit": params.get("slimit"),
+            "query_configs": [
+                {field: query_config.get(field) for field in QUERY_CONFIG_FIELDS}
+                for query_config in params["query_configs"]
+            ],
+        }
+        return count_md5(config)
+
+    @staticmethod
+    def get_stat_fields(series_stat: dict) -> dict | None:
+        """
+        获取 series 统计的字段，存在无法重新计算的统计时返回 None
+        """
+        stat_fields = {}
+        for key, stat in series_stat.items():
+            if not isinstance(stat, dict) or not set(stat) <= STAT_FIELDS:
+                return None
+            stat_fields[key] = tuple(stat)
+        return stat_fields
+
+    def get(self, key: str, now: float) -> PanelCacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expire_time <= now:
+                self._size -= self._entries.pop(key).size
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: PanelCacheEntry):
+        max_size = settings.PANEL_RESULT_CACHE_MAX_BYTES
+        if entry.size > max_size:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key).size
+            self._entries[key] = entry
+            self._size += entry.size
+
+            # 超出内存预算，淘汰最近最少使用的查询
+            evict_count = 0
+            while self._size > max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+                evict_count += 1
+        if evict_count:
+            metrics.PANEL_RESULT_CACHE_EVICT_COUNT.inc(evict_count)
+
+    def query(self, params: dict, query_func: QueryFunc) -> tuple[list[UnifyQuerySeries], dict]:
+        """
+        查询数据，优先使用缓存中的数据，只查询缓存之后的时间范围
+        :param params: 图表查询参数，时间单位为秒
+        :param query_func: 按时间范围(毫秒)查询数据
+        """
+        now = time.time()
+        step = self.get_step(params)
+        start_time = time_interval_align(params["start_time"], step) * 1000
+        end_time = params["end_time"] * 1000
+        key = self.get_cache_key(params)
+
+        # 缓存之后的数据需要查询，查询范围不超过对齐后的结束时间，以保证与完整查询的边界处理一致
+        entry = self.get(key, now)
+        tail_start_time = None
+        if entry and entry.start <= start_time < entry.end:
+            tail_start_time = min(entry.end, time_interval_align(params["end_time"], step) * 1000)
+            if tail_start_time <= start_time:
+                tail_start_time = None
+
+        if tail_start_time is None:
+            series_list, series_stat, is_partial = query_func(params["start_time"] * 1000, end_time)
+            stat_fields = self.get_stat_fields(series_stat)
+            metrics.PANEL_RESULT_CACHE_REQUEST_COUNT.labels(status="miss").inc()
+            metrics.PANEL_RESULT_CACHE_POINT_COUNT.labels(source="query").inc(sum(map(len, series_list)))
+            if stat_fields is None:
+                return series_list, series_stat
+
+            # 统计按数据点计算，与命中缓存时的结果保持一致
+            series_stat = self.calculate_series_stat(series_list, stat_fields)
+            if not is_partial:
+                self.update(key, now, step, start_time, end_time, series_list, stat_fields)
+            return series_list, series_stat
+
+        if tail_start_time < end_time:
+            tail_series_list, tail_series_stat, is_partial = query_func(tail_start_time, end_time)
+        else:
+            tail_series_list, tail_series_stat, is_partial = [], {}, False
+        tail_stat_fields = self.get_stat_fields(tail_series_stat)
+        if tail_stat_fields is None or any(series.times is None for series in tail_series_list):
+            # 无法与缓存合并，删除缓存后重新查询
+            with self._lock:
+                if key in self._entries:
+                    self._size -= self._entries.pop(key).size
+            return self.query(params, query_func)
+
+        cached_series_list = [slice_series(series, start_time, tail_start_time) for series in entry.series_list]
+        tail_series_list = [slice_series(series, tail_start_time, end_time) for series in tail_series_list]
+        # 数据点按时间倒序返回时，较新的数据在前
+        descending = any(len(series) > 1 and series.times[0] > series.times[-1] for series in tail_series_list)
+        if descending:
+            series_list = merge_series(tail_series_list, cached_series_list)
+        else:
+            series_list = merge_series(cached_series_list, tail_series_list)
+
+        stat_fields = {**entry.stat_fields, **tail_stat_fields}
+        series_stat = self.calculate_series_stat(series_list, stat_fields)
+
+        metrics.PANEL_RESULT_CACHE_REQUEST_COUNT.labels(status="hit").inc()
+        metrics.PANEL_RESULT_CACHE_POINT_COUNT.labels(source="cache").inc(sum(map(len, cached_series_list)))
+        metrics.PANEL_RESULT_CACHE_POINT_COUNT.labels(source="query").inc(sum(map(len, tail_series_list)))
+        if not is_partial:
+            self.update(key, now, step, start_time, end_time, series_list, stat_fields, entry.expire_time)
+        return series_list, series_stat
+
+    def update(
+        self,
+        key: str,
+        now: float,
+        step: int,
+        start_time: int,
+        end_time: int,
+        series_list: list[UnifyQuerySeries],
+        stat_fields: dict,
+        expire_time: float | None = None,
+    ):
+        """
+        缓存已稳定的数据点
+        """
+        if any(series.times is None for series in series_list):
+            return
+
+        stable_time = time_interval_align(int(now) - settings.PANEL_RESULT_CACHE_DELAY, step) * 1000
+        cache_end_time = min(stable_time, time_interval_align(end_time // 1000, step) * 1000)
+        if cache_end_time <= start_time:
+            return
+
+        entry = PanelCacheEntry(
+            start=start_time,
+            end=cache_end_time,
+            series_list=[slice_series(series, start_time, cache_end_time) for series in series_list],
+            stat_fields=stat_fields,
+            expire_time=expire_time or now + settings.PANEL_RESULT_CACHE_TTL,
+        )
+        self.set(key, entry)
+
+    @staticmethod
+    def calculate_series_stat(series_list: list[UnifyQuerySeries], stat_fields: dict) -> dict:
+        """
+        按合并后的数据点重新计算 series 统计
+        """
+        dimension_series = {}
+        for series in series_list:
+            dimension_series.setdefault(tuple(sorted(series.dimensions.items())), []).append(series)
+
+        series_stat = {}
+        for (dimensions, metric_field), fields in stat_fields.items():
+            values = []
+            for series in dimension_series.get(dimensions, []):
+                values.extend(series.get_field(metric_field) or [])
+            series_stat[(dimensions, metric_field)] = calculate_stat(values, fields)
+        return series_stat
+
+
+panel_result_cache = PanelResultCache()
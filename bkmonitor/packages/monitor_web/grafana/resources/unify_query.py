@@ -37,6 +37,7 @@ from bkmonitor.data_source import (
     load_data_source,
 )
 from bkmonitor.data_source.unify_query.query import UnifyQuery
+from bkmonitor.data_source.unify_query.series import UnifyQuerySeries
 from bkmonitor.models import BCSCluster, MetricListCache
 from bkmonitor.share.api_auth_resource import ApiAuthResource
 from bkmonitor.utils.range import load_agg_condition_instance
@@ -58,6 +59,7 @@ from core.drf_resource import Resource, api, resource
 from core.errors.api import BKAPIError
 from core.prometheus.base import OPERATION_REGISTRY
 from core.prometheus.metrics import safe_push_to_gateway
+from monitor_web.grafana.panel_cache import panel_result_cache
 from monitor_web.grafana.utils import get_cookies_filter, remove_all_conditions
 from monitor_web.statistics.v2.query import unify_query_count
 from monitor_web.strategies.constant import CORE_FILE_SIGNAL_LIST
@@ -66,13 +68,38 @@ from monitor_web.strategies.metric_cache.process_dimensions import get_process_e
 logger = logging.getLogger(__name__)
 
 
+def get_row_points(row: dict) -> tuple[list, list]:
+    """
+    获取图表数据的时间列及值列，兼容 datapoints([[值, 时间], ...])及按列存放(times/values)两种格式
+    """
+    if "times" in row:
+        return row["times"], row["values"]
+    datapoints = row.get("datapoints") or []
+    return [point[1] for point in datapoints], [point[0] for point in datapoints]
+
+
+def set_row_points(row: dict, times: list, values: list):
+    """
+    按图表数据原有的格式写入数据点
+    """
+    if "times" in row:
+        row["times"], row["values"] = times, values
+    else:
+        row["datapoints"] = [[value, timestamp] for value, timestamp in zip(values, times)]
+
+
 class TimeCompareProcessor:
     """
     时间对比
     """
 
     @classmethod
-    def process_origin_data(cls, params: dict, data: list, series_stat: dict | None = None) -> list:
+    def process_origin_data(
+        cls, params: dict, data: list, series_stat: dict | None = None, as_series: bool = False
+    ) -> list:
+        """
+        查询时间对比数据，as_series 为 True 时按 series 查询，时间对比标记写入 series 维度
+        """
         time_compare = params["function"].get("time_compare", [])
 
         # 兼容单个和多个时间对比
@@ -116,18 +143,26 @@ class TimeCompareProcessor:
                 not_time_align=params.get("not_time_align", False),
             )
 
-            if series_stat is not None:
+            if as_series:
+                compare_result = query.query_series_with_stat(**query_kwargs)
+                extra_data = compare_result["series"]
+            elif series_stat is not None:
                 compare_result = query.query_data_with_stat(**query_kwargs)
                 extra_data = compare_result["series"]
+            else:
+                extra_data = query.query_data(**query_kwargs)
+
+            if series_stat is not None:
                 for (dims, metric_field), stat in compare_result["series_stat"].items():
                     new_dims = tuple(sorted(list(dims) + [("__time_compare", str(offset_text))]))
                     series_stat[(new_dims, metric_field)] = stat
-            else:
-                extra_data = query.query_data(**query_kwargs)
 
             # 标记时间对比数据
             for record in extra_data:
-                record["__time_compare"] = str(offset_text)
+                if as_series:
+                    record.dimensions = {**record.dimensions, "__time_compare": str(offset_text)}
+                else:
+                    record["__time_compare"] = str(offset_text)
 
             data.extend(extra_data)
         return data
@@ -173,8 +208,8 @@ class TimeCompareProcessor:
 
                 # 调整时间对比数据时间
                 record["time_offset"] = str(offset_text)
-                for point in record["datapoints"]:
-                    point[1] -= time_offset * 1000
+                times, values = get_row_points(record)
+                set_row_points(record, [timestamp - time_offset * 1000 for timestamp in times], values)
 
         for record in data:
             if not record["dimensions"].get("__time_compare"):
@@ -240,34 +275,40 @@ class AddNullDataProcessor:
                 if end_time < params["end_time"] * 1000:
                     end_time += interval
 
+        null_as_zero = params.get("null_as_zero")
         for row in data:
-            time_to_value = defaultdict(lambda: None)
-            for point in row["datapoints"]:
-                time_to_value[point[1]] = point[0]
+            time_to_value = dict(zip(*get_row_points(row)))
 
-            row["datapoints"] = []
+            times, values = [], []
             last_datapoint_timestamp = None
             for timestamp in range(start_time, end_time, interval):
-                if time_to_value[timestamp] is None:
-                    if params.get("null_as_zero"):
+                value = time_to_value.get(timestamp)
+                if value is None:
+                    if null_as_zero:
                         # 补 0 代替补 Null
-                        row["datapoints"].append([0, timestamp])
+                        times.append(timestamp)
+                        values.append(0)
                         last_datapoint_timestamp = timestamp
                         continue
 
                     # 如果当前点没有值且和开始时间相同，则补充空点
                     if timestamp == start_time:
-                        row["datapoints"].append([None, timestamp])
+                        times.append(timestamp)
+                        values.append(None)
                 else:
                     # 如果当前点和上一个点的时间差大于阈值，则补充空点
                     if last_datapoint_timestamp and timestamp - last_datapoint_timestamp >= null_threshold:
-                        row["datapoints"].append([None, timestamp - interval])
-                    row["datapoints"].append([time_to_value[timestamp], timestamp])
+                        times.append(timestamp - interval)
+                        values.append(None)
+                    times.append(timestamp)
+                    values.append(value)
                     last_datapoint_timestamp = timestamp
 
             # 如果最后一个点和结束时间不同，则补充空点
-            if row["datapoints"] and row["datapoints"][-1][1] != end_time - interval:
-                row["datapoints"].append([None, end_time - interval])
+            if times and times[-1] != end_time - interval:
+                times.append(end_time - interval)
+                values.append(None)
+            set_row_points(row, times, values)
         return data
 
 
@@ -431,34 +472,30 @@ class HeatMapProcessor:
         end_time = time_interval_align(params["end_time"], interval // 1000) * 1000
 
         # 将数据转换为以时间戳为key的字典
-        for row in data:
-            datapoints = row.pop("datapoints", [])
-            row["time_to_value"] = {point[1]: point[0] for point in datapoints}
-            row["datapoints"] = []
+        time_to_values = [dict(zip(*get_row_points(row))) for row in data]
+        points = [([], []) for _ in data]
 
         # 在heatmap模式下，前端会以第一个维度的时间列表为准，因此所有的维度都需要补充完整的时间范围，否则会导致数据错位
         # 按照完整的时间范围进行数据生成，确保每个周期都有数据
         for timestamp in range(start_time, end_time, interval):
-            for index, row in enumerate(data):
+            for index, time_to_value in enumerate(time_to_values):
+                times, values = points[index]
                 # 如果当前维度没有数据，则补充空值
-                if timestamp not in row["time_to_value"]:
-                    row["datapoints"].append([None, timestamp])
+                if timestamp not in time_to_value:
+                    times.append(timestamp)
+                    values.append(None)
 
                 # 如果当前维度有数据，则进行差值计算
-                if data[index]["time_to_value"].get(timestamp) is not None:
-                    if index == 0:
-                        # 第一条数据，直接取值
-                        row["datapoints"].append([row["time_to_value"][timestamp], timestamp])
-                    else:
+                value = time_to_value.get(timestamp)
+                if value is not None:
+                    if index != 0:
                         # 非第一条数据，取当前值减去上一条数据的值
-                        previous_value = data[index - 1]["time_to_value"].get(timestamp) or 0
-                        row["datapoints"].append([row["time_to_value"][timestamp] - previous_value, timestamp])
-                else:
-                    row["datapoints"].append([None, timestamp])
+                        value -= time_to_values[index - 1].get(timestamp) or 0
+                times.append(timestamp)
+                values.append(value)
 
-        # 删除time_to_value
-        for row in data:
-            del row["time_to_value"]
+        for row, (times, values) in zip(data, points):
+            set_row_points(row, times, values)
 
         return data
 
@@ -491,14 +528,29 @@ class QueryTypeProcessor:
         # 取最后一个值，并将时间设置为end_time
         new_data = []
         for record in data:
-            for datapoint in reversed(record["datapoints"]):
-                if datapoint[0] is not None and datapoint[1] > params["start_time"] * 1000:
-                    record["datapoints"] = [[datapoint[0], params["end_time"] * 1000]]
+            times, values = get_row_points(record)
+            for timestamp, value in zip(reversed(times), reversed(values)):
+                if value is not None and timestamp > params["start_time"] * 1000:
+                    set_row_points(record, [params["end_time"] * 1000], [value])
                     new_data.append(record)
                     break
         return new_data
 
 
+class DatapointsProcessor:
+    @classmethod
+    def process_formatted_data(cls, params: dict, data: list) -> list:
+        """
+        按列存放的数据点转换为 datapoints
+        """
+        for row in data:
+            if "times" in row:
+                row["datapoints"] = [
+                    [value, timestamp] for value, timestamp in zip(row.pop("values"), row.pop("times"))
+                ]
+        return data
+
+
 class UnifyQueryRawResource(ApiAuthResource):
     """
     统一查询接口 (原始数据)
@@ -828,7 +880,7 @@ class UnifyQueryRawResource(ApiAuthResource):
 
     def _query_time_series_data(
         self, query: UnifyQuery, params: dict[str, Any], time_alignment: bool, query_method_name: str | None = None
-    ) -> tuple[list[dict], dict]:
+    ) -> tuple[list[dict] | list[UnifyQuerySeries], dict]:
         query_kwargs = dict(
             start_time=params["start_time"] * 1000,
             end_time=params["end_time"] * 1000,
@@ -842,6 +894,21 @@ class UnifyQueryRawResource(ApiAuthResource):
         if query_method_name == "query_reference":
             result = query.query_reference(**query_kwargs)
             return result, {}
+        elif (
+            panel_result_cache.is_cacheable(params) and query.use_unify_query() and not query.is_process_by_datasource()
+        ):
+            # 图表刷新时只查询缓存之后的时间范围，只缓存统一查询按 series 返回的数据
+            def query_func(start_time: int, end_time: int):
+                result = query.query_series_with_stat(**dict(query_kwargs, start_time=start_time, end_time=end_time))
+                return result["series"], result["series_stat"], query.is_partial
+
+            series_list, series_stat = panel_result_cache.query(params, query_func)
+            if query_method_name == "query_series_with_stat":
+                return series_list, series_stat
+            return [record for series in series_list for record in series.iter_records()], series_stat
+        elif query_method_name == "query_series_with_stat":
+            result = query.query_series_with_stat(**query_kwargs)
+            return result["series"], result["series_stat"]
         else:
             result = query.query_data_with_stat(**query_kwargs)
             return result["series"], result["series_stat"]
@@ -891,6 +958,10 @@ class UnifyQueryRawResource(ApiAuthResource):
         if not self.get_target_instance(params):
             return {"series": [], "metrics": metrics, "series_stat": {}}
 
+        # 数据后过滤需要逐条记录判断
+        if query_method_name == "query_series_with_stat" and params.get("post_query_filter_dict"):
+            query_method_name = "query_data_with_stat"
+
         # 维度top/bottom排序
         params = RankProcessor.process_params(params)
         params = QueryTypeProcessor.process_params(params)
@@ -940,7 +1011,9 @@ class UnifyQueryRawResource(ApiAuthResource):
             points = [point for point in points if condition_filter.is_match(point)]
 
         # 数据预处理（传入 series_stat 以便时间对比查询也收集 stat）
-        points = TimeCompareProcessor.process_origin_data(params, points, series_stat)
+        points = TimeCompareProcessor.process_origin_data(
+            params, points, series_stat, as_series=query_method_name == "query_series_with_stat"
+        )
         metrics = metrics if params["with_metric"] else []
         return {
             "series": points,
@@ -1004,6 +1077,7 @@ class GraphUnifyQueryResource(UnifyQueryRawResource):
             "minute60": 1581350400000,
             "time": 1581350400000
         }]
+        也可以是 UnifyQuerySeries 列表，此时返回的数据点按列存放在 times/values 中，由 DatapointsProcessor 转换
         :type data: list
         :return:
         :rtype: list
@@ -1036,75 +1110,119 @@ class GraphUnifyQueryResource(UnifyQueryRawResource):
                     (DataSourceLabel.BK_FTA, DataTypeLabel.EVENT),
                 )
 
-        for record in data:
-            dimensions = tuple(
-                sorted(
-                    (key, value)
-                    for key, value in record.items()
-                    if key in dimension_fields
-                    or key == "__time_compare"
-                    or (data_source_label == DataSourceLabel.PROMETHEUS and key not in ["_result_", "_time_"])
-                )
-            )
+        # 需要展示的指标及每条记录的取值次数，key 为 (指标字段, 展示名称)，按指标字段取值
+        metric_counts = defaultdict(int)
+        metric_counts[("_result_", expression)] += 1
+        for query_config in params["query_configs"]:
+            for metric in query_config["metrics"]:
+                # 只展示需要展示的指标
+                if not metric.get("display"):
+                    continue
 
-            if record.get("_result_") is not None:
-                if isinstance(record["_result_"], int | float):
-                    record["_result_"] = round(record["_result_"], settings.POINT_PRECISION)
+                if metric.get("alias"):
+                    alias = metric["alias"]
+                    display_dimension = f"{metric['field']}({alias})"
+                else:
+                    alias = metric["field"]
+                    display_dimension = alias
+                metric_counts[(alias, display_dimension)] += 1
+
+        def is_dimension(key: str) -> bool:
+            return (
+                key in dimension_fields
+                or key == "__time_compare"
+                or (data_source_label == DataSourceLabel.PROMETHEUS and key not in ["_result_", "_time_"])
+            )
 
-                # 查询结果取值
-                formatted_data[dimensions].setdefault(("_result_", expression), []).append(
-                    [record.get("_result_"), record["_time_"]]
-                )
+        for row in data:
+            records = [row]
+            if isinstance(row, UnifyQuerySeries):
+                # 维度不随数据点变化时按列处理，否则展开为记录逐条处理
+                if row.times is not None and not any(is_dimension(column) for column in row.columns):
+                    dimensions = tuple(
+                        sorted((key, value) for key, value in row.dimensions.items() if is_dimension(key))
+                    )
+                    self.add_series_points(formatted_data[dimensions], row, metric_counts)
+                    if not formatted_data[dimensions]:
+                        del formatted_data[dimensions]
+                    continue
+                records = row.iter_records()
 
-            # 其他指标取值
-            for query_config in params["query_configs"]:
-                for metric in query_config["metrics"]:
-                    # 只展示需要展示的指标
-                    if not metric.get("display"):
+            for record in records:
+                dimensions = tuple(sorted((key, value) for key, value in record.items() if is_dimension(key)))
+                for metric_tuple, count in metric_counts.items():
+                    value = record.get(metric_tuple[0])
+                    if value is None:
                         continue
-
-                    if metric.get("alias"):
-                        alias = metric["alias"]
-                        display_dimension = f"{metric['field']}({alias})"
-                    else:
-                        alias = metric["field"]
-                        display_dimension = alias
-
-                    alias = metric.get("alias") or metric["field"]
-                    if record.get(alias) is not None:
-                        value = record[alias]
-                        if isinstance(value, int | float):
-                            value = round(value, settings.POINT_PRECISION)
-                        formatted_data[dimensions].setdefault((alias, display_dimension), []).append(
-                            [value, record["_time_"]]
-                        )
+                    if isinstance(value, int | float):
+                        value = round(value, settings.POINT_PRECISION)
+                    times, values = formatted_data[dimensions].setdefault(metric_tuple, ([], []))
+                    times.extend([record["_time_"]] * count)
+                    values.extend([value] * count)
 
         # 构造图表数据结构
+        as_columns = bool(data) and isinstance(data[0], UnifyQuerySeries)
         result = []
         for dimensions, metric_to_data_point in formatted_data.items():
             dimension_string = ", ".join(f"{dimension[0]}={dimension[1]}" for dimension in dimensions)
-            for metric_tuple, value in metric_to_data_point.items():
+            for metric_tuple, (times, values) in metric_to_data_point.items():
                 target = metric_tuple[1]
                 if dimension_string:
                     target += f"{{{dimension_string}}}"
                 if not target:
                     target = "value"
 
+                datapoints = None
+                if not as_columns:
+                    datapoints = [[value, timestamp] for value, timestamp in zip(values, times)]
                 item = {
                     "dimensions": {dimension[0]: dimension[1] for dimension in dimensions},
                     "target": target,
                     "metric_field": metric_tuple[0],
-                    "datapoints": value,
+                    "datapoints": datapoints,
                     "alias": metric_tuple[0],
                     "stat": series_stat.get((dimensions, metric_tuple[0]), {}),
                     "type": "bar" if is_bar else "line",
                 }
                 if stack:
                     item["stack"] = stack
+                if as_columns:
+                    item["times"], item["values"] = times, values
                 result.append(item)
 
         return result
 
+    @classmethod
+    def add_series_points(cls, metric_to_data_point: dict, series: UnifyQuerySeries, metric_counts: dict):
+        """
+        按列取出 series 中各指标的非空数据点，结果与逐条记录处理一致：
+        指标按首个非空数据点出现的先后顺序加入，同一数据点的值重复 count 次
+        """
+        times = series.times
+        metric_points = []
+        for order, (metric_tuple, count) in enumerate(metric_counts.items()):
+            field_values = series.get_field(metric_tuple[0])
+            if field_values is None:
+                continue
+            indexes = [index for index, value in enumerate(field_values) if value is not None]
+            if indexes:
+                metric_points.append((indexes[0], order, metric_tuple, count, indexes, field_values))
+
+        metric_points.sort(key=lambda x: x[:2])
+        for _, _, metric_tuple, count, indexes, field_values in metric_points:
+            metric_times = [times[index] for index in indexes]
+            metric_values = [
+                round(value, settings.POINT_PRECISION) if isinstance(value, int | float) else value
+                for value in (field_values[index] for index in indexes)
+            ]
+            if count > 1:
+                metric_times = [timestamp for timestamp in metric_times for _ in range(count)]
+                metric_values = [value for value in metric_values for _ in range(count)]
+
+            times_, values_ = metric_to_data_point.setdefault(metric_tuple, ([], []))
+            times_.extend(metric_times)
+            values_.extend(metric_values)
+
     @classmethod
     def translate_dimensions(cls, params: dict, data: list):
         """
@@ -1196,6 +1314,9 @@ class GraphUnifyQueryResource(UnifyQueryRawResource):
             self.fill_custom_metric_method(config)
 
         query_method_name = params["query_method"]
+        # 按 series 列式处理，不展开为逐条记录
+        if query_method_name == "query_data_with_stat" and settings.GRAPH_UNIFY_QUERY_SERIES_ENABLED:
+            query_method_name = "query_series_with_stat"
         raw_query_result = self._perform_query(params, query_method_name=query_method_name)
         points = raw_query_result["series"]
         if not points:
@@ -1213,6 +1334,7 @@ class GraphUnifyQueryResource(UnifyQueryRawResource):
         series = AddNullDataProcessor.process_formatted_data(params, series)
         series = HeatMapProcessor.process_formatted_data(params, series)
         series = QueryTypeProcessor.process_formatted_data(params, series)
+        series = DatapointsProcessor.process_formatted_data(params, series)
         series = self.translate_dimensions(params, series)
 
         # 补充单位信息
@@ -0,0 +1,270 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+
+指标缓存流式重建
+
+BaseMetricCacheManager._run 的全量刷新主要耗时在：
+- 指标池以 only() 加载，计算可读名时访问未加载的字段，每个已有指标都会触发额外的数据库查询，
+  可读名还会按指标逐个查询自定义时序分组
+- 逐个表串行获取指标，部分数据源获取指标时需要调用接口
+- count_md5 对指标的每个键值递归计算 md5，新增指标按 50 条一批写入
+
+流式重建：
+- 指标池只加载比较及计算可读名需要的字段(元组)，自定义时序分组的查询结果在单次重建内复用
+- 表之间没有状态依赖的 manager(parallel_tables=True)按表分发到线程池获取指标，结果按表的顺序合并，
+  重复指标的处理与串行一致
+- 指标摘要为规范化 JSON(字典按键排序、列表按元素排序)的单次 md5，带 "v2:" 前缀；数据库中仍为旧摘要的指标先按旧算法比较，
+  内容未变化时只更新摘要字段
+- 新增及更新的指标累积到 METRIC_CACHE_REBUILD_BATCH_SIZE 条后在事务内批量写入，不在内存中保留全部差异
+"""
+
+import json
+import logging
+import time
+from collections.abc import Iterator
+from datetime import datetime
+
+from django.conf import settings
+from django.db import router, transaction
+
+from bkmonitor.models.metric_list_cache import MetricListCache
+from bkmonitor.utils.common_utils import _count_md5, count_md5
+from bkmonitor.utils.thread_backend import ThreadPool
+from constants.strategy import DimensionFieldType
+from core.prometheus import metrics
+
+logger = logging.getLogger(__name__)
+
+HASH_PREFIX = "v2:"
+
+# 指标池加载的字段，包含计算可读名需要的字段
+POOL_FIELDS = (
+    "id",
+    "metric_md5",
+    "bk_biz_id",
+    "result_table_id",
+    "metric_field",
+    "related_id",
+    "data_label",
+    "plugin_type",
+)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def canonicalize(value):
+    """
+    规范化指标内容，与 count_md5 一致，列表按元素排序
+    部分数据源的维度等列表由字符串集合生成，顺序受进程的 hash 随机化影响
+    """
+    if isinstance(value, dict):
+        return {str(k): canonicalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return sorted((canonicalize(v) for v in value), key=_dumps)
+    return value
+
+
+def hash_metric(metric: dict) -> str:
+    """
+    指标摘要，指标规范化后序列化为 JSON，计算一次 md5
+    """
+    return HASH_PREFIX + _count_md5(_dumps(canonicalize(metric)))
+
+
+def get_metric_key(metric: dict) -> str:
+    return "{}.{}.{}.{}".format(
+        metric["bk_biz_id"],
+        metric.get("result_table_id", ""),
+        metric["metric_field"],
+        metric.get("related_id", ""),
+    )
+
+
+class MetricCacheRebuilder:
+    """
+    指标缓存流式重建，与 BaseMetricCacheManager._run 的增量更新结果一致
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.batch_size = settings.METRIC_CACHE_REBUILD_BATCH_SIZE
+        self.fields = [
+            field.name for field in MetricListCache._meta.get_fields(include_parents=False) if not field.auto_created
+        ]
+        self.time_series_dbs: dict[str, bool] = {}
+        self.to_be_create: list[MetricListCache] = []
+        self.to_be_update: list[MetricListCache] = []
+        self.to_be_update_md5: list[MetricListCache] = []
+        self.counts = {"create": 0, "update": 0, "update_md5": 0, "delete": 0, "unchanged": 0}
+
+    @property
+    def manager_name(self) -> str:
+        return self.manager.__class__.__name__
+
+    def load_pool(self) -> tuple[dict[str, tuple], list[int]]:
+        """
+        加载指标池，返回 指标唯一标识 -> 指标字段元组 及重复的指标ID
+        """
+        metric_pool = self.manager.get_metric_pool()
+        if self.manager.bk_biz_id is not None:
+            metric_pool = metric_pool.filter(bk_biz_id=self.manager.bk_biz_id)
+
+        pool = {}
+        duplicate_ids = []
+        for row in metric_pool.values_list(*POOL_FIELDS).iterator():
+            metric_id = f"{row[2]}.{row[3]}.{row[4]}.{row[5]}"
+            if metric_id in pool:
+                duplicate_ids.append(row[0])
+            else:
+                pool[metric_id] = row
+        return pool, duplicate_ids
+
+    def fetch_table_metrics(self, table) -> list[dict]:
+        """
+        获取单个表的指标并补全字段，可在线程池中执行
+        """
+        manager = self.manager
+        result = []
+        for metric in manager.get_metrics_by_table(table):
+            manager.truncate_metric_fields(metric)
+
+            if metric.get("result_table_id", "") in ["bkunifylogbeat_task.base", "bkunifylogbeat_common.base"]:
+                continue
+
+            # 补全维度字段
+            for dimension in metric.get("dimensions", []):
+                if "is_dimension" not in dimension:
+                    dimension["is_dimension"] = True
+                if "type" not in dimension:
+                    dimension["type"] = DimensionFieldType.String
+
+            # 更新metric使用频率
+            metric["use_frequency"] = manager.metric_use_frequency.get(
+                f"{metric.get('data_source_label', '')}.{metric.get('result_table_id', '')}.{metric['metric_field']}",
+                0,
+            )
+            result.append(metric)
+        return result
+
+    def iter_metrics(self) -> Iterator[dict]:
+        """
+        按表的顺序返回指标，支持并发的 manager 按表分发到线程池
+        """
+        workers = settings.METRIC_CACHE_REBUILD_WORKERS
+        if not self.manager.parallel_tables or workers <= 1:
+            for table in self.manager.get_tables():
+                yield from self.fetch_table_metrics(table)
+            return
+
+        tables = list(self.manager.get_tables())
+        pool = ThreadPool(min(workers, max(len(tables), 1)))
+        try:
+            for table_metrics in pool.imap(self.fetch_table_metrics, tables):
+                yield from table_metrics
+        finally:
+            pool.close()
+            pool.join()
+
+    def flush(self, force: bool = False):
+        """
+        批量写入新增及更新的指标
+        """
+        using = router.db_for_write(MetricListCache)
+        for objs, fields in [
+            (self.to_be_create, None),
+            (self.to_be_update, self.fields),
+            (self.to_be_update_md5, ["metric_md5"]),
+        ]:
+            if not objs or (len(objs) < self.batch_size and not force):
+                continue
+            with transaction.atomic(using=using):
+                if fields is None:
+                    MetricListCache.objects.bulk_create(objs, batch_size=self.batch_size)
+                else:
+                    MetricListCache.objects.bulk_update(objs, fields, batch_size=self.batch_size)
+            objs.clear()
+
+    def diff(self, pool: dict[str, tuple], metric: dict):
+        """
+        对比单个指标，加入新增或更新列表
+        """
+        bk_tenant_id = self.manager.bk_tenant_id
+        row = pool.pop(get_metric_key(metric), None)
+
+        # 处理新增指标
+        if row is None:
+            instance = MetricListCache(bk_tenant_id=bk_tenant_id, **metric)
+            metric["readable_name"] = instance.get_human_readable_name(self.time_series_dbs)
+            self.manager.truncate_metric_fields(metric)
+            instance.readable_name = metric["readable_name"]
+            instance.metric_md5 = hash_metric(metric)
+            self.to_be_create.append(instance)
+            self.counts["create"] += 1
+            return
+
+        # readable_name 可能会因用户修改data_label而变更，与原有逻辑一致，按数据库中的指标计算
+        metric_instance = MetricListCache(bk_tenant_id=bk_tenant_id, **dict(zip(POOL_FIELDS, row)))
+        metric["readable_name"] = metric_instance.get_human_readable_name(self.time_series_dbs)
+        self.manager.truncate_metric_fields(metric)
+
+        old_md5 = metric_instance.metric_md5
+        metric_md5 = hash_metric(metric)
+        if old_md5 == metric_md5:
+            self.counts["unchanged"] += 1
+            return
+
+        # 旧算法的摘要，内容未变化时只更新摘要
+        if old_md5 and not old_md5.startswith(HASH_PREFIX) and old_md5 == count_md5(metric):
+            self.to_be_update_md5.append(MetricListCache(id=row[0], metric_md5=metric_md5))
+            self.counts["update_md5"] += 1
+            return
+
+        metric.update(metric_md5=metric_md5, id=row[0], last_update=datetime.now())
+        self.to_be_update.append(MetricListCache(bk_tenant_id=bk_tenant_id, **metric))
+        self.counts["update"] += 1
+
+    def run(self):
+        start_time = time.time()
+        logger.info(f"[start] rebuild metric {self.manager_name}({self.manager.bk_biz_id})")
+
+        self.manager.refresh_metric_use_frequency()
+        pool, to_be_delete = self.load_pool()
+
+        processed_metric_ids: set[str] = set()
+        for metric in self.iter_metrics():
+            # 重复指标，不处理
+            metric_id = get_metric_key(metric)
+            if metric_id in processed_metric_ids:
+                continue
+            processed_metric_ids.add(metric_id)
+
+            self.diff(pool, metric)
+            self.flush()
+        self.flush(force=True)
+
+        # clean (手动添加的自定义指标标记md5为0，不做删除处理）
+        to_be_delete.extend(row[0] for row in pool.values() if row[1] != "0")
+        for index in range(0, len(to_be_delete), self.batch_size):
+            MetricListCache.objects.filter(id__in=to_be_delete[index : index + self.batch_size]).delete()
+        self.counts["delete"] = len(to_be_delete)
+
+        cost = time.time() - start_time
+        metrics.METRIC_CACHE_REBUILD_TIME.labels(manager=self.manager_name).observe(cost)
+        for action, count in self.counts.items():
+            metrics.METRIC_CACHE_REBUILD_ROW_COUNT.labels(manager=self.manager_name, action=action).inc(count)
+        metrics.report_all()
+
+        logger.info(
+            f"[end] rebuild metric {self.manager_name}({self.manager.bk_biz_id}) "
+            + ", ".join(f"{action} {count}" for action, count in self.counts.items())
+            + f", timestamp: {int(start_time)}, cost {cost}s"
+        )
+        return self.counts
@@ -84,6 +84,8 @@ from monitor_web.strategies.metric_cache.built_in_metrics import (
     SYSTEM_HOST_METRICS,
     UPTIMECHECK_METRICS,
 )
+from monitor_web.strategies.metric_cache.rebuild import MetricCacheRebuilder
+from monitor_web.strategies.metric_search_index import MetricSearchIndexManager
 from monitor_web.tasks import run_metric_manager_async
 
 FILTER_DIMENSION_LIST = ["time", "bk_supplier_id", "bk_cmdb_level", "timestamp"]
@@ -213,6 +215,8 @@ class BaseMetricCacheManager:
     """
 
     data_sources = (("", ""),)
+    # 表之间没有状态依赖，流式重建时可以按表并发获取指标
+    parallel_tables = False
 
     def __init__(self, bk_tenant_id: str, bk_biz_id: int | None = None):
         self.bk_biz_id = bk_biz_id
@@ -290,6 +294,13 @@ class BaseMetricCacheManager:
         """
         对比数据库已有数据， 实现指标缓存的增量更新
         """
+        if settings.METRIC_CACHE_STREAMING_REBUILD_ENABLED:
+            counts = MetricCacheRebuilder(self).run()
+            # 通知各进程同步指标搜索索引
+            if counts["create"] or counts["update"] or counts["update_md5"] or counts["delete"]:
+                MetricSearchIndexManager.bump_generation(self.bk_tenant_id)
+            return
+
         start_time = time.time()
         logger.info(f"[start] update metric {self.__class__.__name__}({self.bk_biz_id})")
 
@@ -405,6 +416,10 @@ class BaseMetricCacheManager:
             logger.info("Going to delete metric caches %s", list(metric_hash_dict.keys()))
             MetricListCache.objects.filter(id__in=to_be_delete).delete()
 
+        # 通知各进程同步指标搜索索引
+        if to_be_create or to_be_update or to_be_delete:
+            MetricSearchIndexManager.bump_generation(self.bk_tenant_id)
+
         logger.info(
             f"[end] update metric {self.__class__.__name__}({self.bk_biz_id}) "
             f"create {len(to_be_create)} metric,update {len(to_be_update)} metric, delete {len(to_be_delete)} metric."
@@ -486,6 +501,7 @@ class CustomMetricCacheManager(BaseMetricCacheManager):
     """
 
     data_sources = ((DataSourceLabel.CUSTOM, DataTypeLabel.TIME_SERIES),)
+    parallel_tables = True
 
     def get_tables(self):
         custom_ts_result = api.metadata.query_time_series_group(
@@ -767,6 +783,7 @@ class BkdataMetricCacheManager(BaseMetricCacheManager):
     """
 
     data_sources = ((DataSourceLabel.BK_DATA, DataTypeLabel.TIME_SERIES),)
+    parallel_tables = True
     # 需要补充单位的指标
     unit_metric_mapping = {"bk_apm_avg_duration": "ns", "bk_apm_max_duration": "ns", "bk_apm_sum_duration": "ns"}
 
@@ -870,6 +887,7 @@ class BkLogSearchCacheManager(BaseMetricCacheManager):
         (DataSourceLabel.BK_LOG_SEARCH, DataTypeLabel.TIME_SERIES),
         (DataSourceLabel.BK_LOG_SEARCH, DataTypeLabel.LOG),
     )
+    parallel_tables = True
 
     def __init__(self, bk_tenant_id: str, bk_biz_id: int | None = None):
         super().__init__(bk_tenant_id=bk_tenant_id, bk_biz_id=bk_biz_id)
@@ -1022,6 +1040,7 @@ class CustomEventCacheManager(BaseMetricCacheManager):
     """
 
     data_sources = ((DataSourceLabel.CUSTOM, DataTypeLabel.EVENT),)
+    parallel_tables = True
 
     SYSTEM_EVENTS = [
         {
@@ -1358,6 +1377,7 @@ class BkMonitorLogCacheManager(BaseMetricCacheManager):
     """
 
     data_sources = ((DataSourceLabel.BK_MONITOR_COLLECTOR, DataTypeLabel.LOG),)
+    parallel_tables = True
 
     def get_tables(self):
         custom_event_result = api.metadata.query_event_group.request.refresh(bk_tenant_id=self.bk_tenant_id)
@@ -1438,6 +1458,7 @@ class BaseAlarmMetricCacheManager(BaseMetricCacheManager):
     """
 
     data_sources = ((DataSourceLabel.BK_MONITOR_COLLECTOR, DataTypeLabel.EVENT),)
+    parallel_tables = True
 
     def add_gse_process_event_metrics(self, result_table_label):
         """
@@ -1571,6 +1592,8 @@ class BkmonitorMetricCacheManager(BaseMetricCacheManager):
     """
 
     data_sources = ((DataSourceLabel.BK_MONITOR_COLLECTOR, DataTypeLabel.TIME_SERIES),)
+    # get_tables 遍历时记录自定义时序库(ts_db_name)，获取指标时依赖该状态，不能并发
+    parallel_tables = False
 
     def __init__(self, bk_tenant_id: str, bk_biz_id: int | None = None):
         super().__init__(bk_tenant_id=bk_tenant_id, bk_biz_id=bk_biz_id)
@@ -2402,6 +2425,7 @@ class BkMonitorAlertCacheManager(BaseMetricCacheManager):
     """
 
     data_sources = ((DataSourceLabel.BK_MONITOR_COLLECTOR, DataTypeLabel.ALERT),)
+    parallel_tables = True
 
     @staticmethod
     def is_composite(configs):
@@ -2524,6 +2548,7 @@ class BkFtaAlertCacheManager(BaseMetricCacheManager):
         (DataSourceLabel.BK_FTA, DataTypeLabel.EVENT),
         (DataSourceLabel.BK_FTA, DataTypeLabel.ALERT),
     )
+    parallel_tables = True
 
     def search_alerts(self):
         search = AlertDocument.search(all_indices=True).exclude("exists", field="strategy_id")
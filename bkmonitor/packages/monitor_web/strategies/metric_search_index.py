@@ -0,0 +1,300 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+"""
+指标选择器进程内搜索索引
+
+指标选择器每次输入都会按多个字段的 icontains 条件查询指标缓存表，指标数量较多时需要全表扫描。
+搜索索引按 (租户, 业务) 在进程内保存指标的筛选字段，并建立三元组(trigram)倒排索引：
+- 模糊搜索先按查询词的三元组求交集得到候选指标，再逐个校验子串，查询词不足三个字符时遍历全部指标
+- 指标缓存刷新任务(BaseMetricCacheManager._run)有变更时递增租户的索引版本，各进程检查到版本变化后，
+  按 metric_md5 对比只重新加载变化的指标；超过 METRIC_SEARCH_INDEX_MAX_AGE 秒未同步时同样对比一次，
+  兜底不经过刷新任务的写入(如手动添加的自定义指标)
+- 更新及删除的指标只标记失效，失效指标过多时重建倒排索引
+- 指标数量超过 METRIC_SEARCH_INDEX_MAX_SIZE 的业务不建立索引，由调用方回退到数据库查询
+"""
+
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import caches
+
+from bkmonitor.models.metric_list_cache import MetricListCache
+from core.prometheus import metrics
+
+logger = logging.getLogger(__name__)
+
+# 模糊搜索的字段，与 GetMetricListV2Resource.filter_by_conditions 一致
+SEARCH_FIELDS = ("data_label", "result_table_id", "metric_field", "metric_field_name")
+
+# 索引保存的指标字段
+RECORD_FIELDS = (
+    "id",
+    "bk_biz_id",
+    "use_frequency",
+    "is_duplicate",
+    "data_source_label",
+    "data_type_label",
+    "result_table_label",
+    "result_table_id",
+    "result_table_name",
+    "related_id",
+    "related_name",
+    "data_label",
+    "metric_field",
+    "metric_field_name",
+)
+
+# 字段分隔符，查询词不会包含该字符，因此拼接后的子串匹配等价于逐个字段匹配
+FIELD_SEPARATOR = "\x00"
+NGRAM_SIZE = 3
+
+LOAD_BATCH_SIZE = 2000
+
+
+def get_ngrams(text: str) -> set[str]:
+    """
+    文本的三元组，跨字段的三元组不会被查询，不加入索引
+    """
+    return {
+        text[i : i + NGRAM_SIZE]
+        for i in range(len(text) - NGRAM_SIZE + 1)
+        if FIELD_SEPARATOR not in text[i : i + NGRAM_SIZE]
+    }
+
+
+def get_cache():
+    return caches["redis"] if "redis" in settings.CACHES else caches["default"]
+
+
+class MetricSearchRecord:
+    """
+    索引中的指标，只保存筛选、统计及排序需要的字段
+    """
+
+    __slots__ = RECORD_FIELDS + ("version", "search_text")
+
+    def __init__(self, values: dict):
+        for field in RECORD_FIELDS:
+            setattr(self, field, values[field])
+        self.version = (values["metric_md5"], values["last_update"])
+        self.search_text = FIELD_SEPARATOR.join(str(values[field] or "").lower() for field in SEARCH_FIELDS)
+
+
+class MetricSearchIndex:
+    """
+    单个业务的指标搜索索引
+    """
+
+    def __init__(self, bk_tenant_id: str, bk_biz_id: int):
+        self.bk_tenant_id = bk_tenant_id
+        self.bk_biz_id = bk_biz_id
+        self.lock = threading.RLock()
+        # 位置 -> 指标，失效的指标为 None
+        self.records: list[MetricSearchRecord | None] = []
+        # 指标ID -> 位置
+        self.positions: dict[int, int] = {}
+        # 三元组 -> 位置列表
+        self.postings: dict[str, array] = {}
+        self.generation = None
+        self.checked_time = 0
+        self.synced_time = 0
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def get_queryset(self):
+        # 指标缓存表的默认 manager 会按当前请求的业务排除重名指标，索引需要完整的数据
+        return MetricListCache._base_manager.filter(bk_tenant_id=self.bk_tenant_id, bk_biz_id=self.bk_biz_id)
+
+    def add(self, record: MetricSearchRecord):
+        position = len(self.records)
+        self.records.append(record)
+        self.positions[record.id] = position
+        for ngram in get_ngrams(record.search_text):
+            postings = self.postings.get(ngram)
+            if postings is None:
+                postings = self.postings[ngram] = array("I")
+            postings.append(position)
+
+    def remove(self, metric_id: int):
+        position = self.positions.pop(metric_id, None)
+        if position is not None:
+            self.records[position] = None
+
+    def rebuild(self):
+        """
+        清理失效指标，重建倒排索引
+        """
+        records = [record for record in self.records if record is not None]
+        self.records = []
+        self.positions = {}
+        self.postings = {}
+        for record in records:
+            self.add(record)
+
+    def load(self, metric_ids: Iterable[int] | None = None):
+        """
+        加载指标，未指定指标ID时加载业务下的全部指标
+        """
+        if metric_ids is None:
+            for values in self.get_queryset().values(*RECORD_FIELDS, "metric_md5", "last_update").iterator():
+                self.add(MetricSearchRecord(values))
+            return
+
+        metric_ids = list(metric_ids)
+        for index in range(0, len(metric_ids), LOAD_BATCH_SIZE):
+            queryset = self.get_queryset().filter(id__in=metric_ids[index : index + LOAD_BATCH_SIZE])
+            for values in queryset.values(*RECORD_FIELDS, "metric_md5", "last_update"):
+                self.remove(values["id"])
+                self.add(MetricSearchRecord(values))
+
+    def sync(self):
+        """
+        按 metric_md5 及更新时间对比数据库中的指标，只重新加载变化的指标
+        """
+        versions = {
+            metric_id: (metric_md5, last_update)
+            for metric_id, metric_md5, last_update in self.get_queryset().values_list("id", "metric_md5", "last_update")
+        }
+        for metric_id in [metric_id for metric_id in self.positions if metric_id not in versions]:
+            self.remove(metric_id)
+
+        changed_ids = [
+            metric_id
+            for metric_id, version in versions.items()
+            if metric_id not in self.positions or self.records[self.positions[metric_id]].version != version
+        ]
+        self.load(changed_ids)
+
+        if len(self.records) > 2 * len(self.positions):
+            self.rebuild()
+        return len(changed_ids)
+
+    def search(self, query: str) -> list[MetricSearchRecord]:
+        """
+        模糊搜索，任一搜索字段包含查询词(不区分大小写)即匹配
+        """
+        query = query.lower()
+        with self.lock:
+            if len(query) < NGRAM_SIZE:
+                return [record for record in self.records if record is not None and query in record.search_text]
+
+            candidates = None
+            for ngram in sorted(get_ngrams(query), key=lambda x: len(self.postings.get(x, ()))):
+                postings = self.postings.get(ngram)
+                if not postings:
+                    return []
+                candidates = set(postings) if candidates is None else candidates.intersection(postings)
+                if not candidates:
+                    return []
+
+            records = [self.records[position] for position in sorted(candidates)]
+        return [record for record in records if record is not None and query in record.search_text]
+
+    def all(self) -> list[MetricSearchRecord]:
+        with self.lock:
+            return [record for record in self.records if record is not None]
+
+
+class MetricSearchIndexManager:
+    """
+    进程内指标搜索索引，按 (租户, 业务) 保存，总指标数超过上限时淘汰最近最少使用的业务
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: OrderedDict[tuple[str, int], MetricSearchIndex] = OrderedDict()
+        # 指标数量超过上限的业务 -> 检查时间
+        self._oversized: dict[tuple[str, int], float] = {}
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+            self._oversized.clear()
+
+    @staticmethod
+    def get_generation_key(bk_tenant_id: str) -> str:
+        return f"monitor_web.metric_search_index.generation.{bk_tenant_id}"
+
+    @classmethod
+    def bump_generation(cls, bk_tenant_id: str):
+        """
+        指标缓存变更后更新租户的索引版本，通知各进程同步索引
+        """
+        try:
+            get_cache().set(cls.get_generation_key(bk_tenant_id), time.time(), timeout=None)
+        except Exception as e:
+            logger.warning("bump metric search index generation failed: %s", e)
+
+    @classmethod
+    def get_generation(cls, bk_tenant_id: str):
+        try:
+            return get_cache().get(cls.get_generation_key(bk_tenant_id))
+        except Exception as e:
+            logger.warning("get metric search index generation failed: %s", e)
+            return None
+
+    def get_index(self, bk_tenant_id: str, bk_biz_id: int, now: float | None = None) -> MetricSearchIndex | None:
+        """
+        获取业务的搜索索引，按需加载及同步，指标数量超过上限时返回 None
+        """
+        now = now or time.time()
+        key = (bk_tenant_id, bk_biz_id)
+        max_size = settings.METRIC_SEARCH_INDEX_MAX_SIZE
+
+        with self._lock:
+            if now - self._oversized.get(key, 0) < settings.METRIC_SEARCH_INDEX_MAX_AGE:
+                return None
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = MetricSearchIndex(bk_tenant_id, bk_biz_id)
+            self._indexes.move_to_end(key)
+
+        with index.lock:
+            if not index.synced_time:
+                if index.get_queryset().count() > max_size:
+                    with self._lock:
+                        self._indexes.pop(key, None)
+                        self._oversized[key] = now
+                    return None
+                index.generation = self.get_generation(bk_tenant_id)
+                index.load()
+                index.checked_time = index.synced_time = now
+                metrics.METRIC_SEARCH_INDEX_SYNC_COUNT.labels(type="full").inc()
+            elif now - index.checked_time >= settings.METRIC_SEARCH_INDEX_SYNC_INTERVAL:
+                index.checked_time = now
+                generation = self.get_generation(bk_tenant_id)
+                if generation != index.generation or now - index.synced_time >= settings.METRIC_SEARCH_INDEX_MAX_AGE:
+                    index.generation = generation
+                    index.synced_time = now
+                    index.sync()
+                    metrics.METRIC_SEARCH_INDEX_SYNC_COUNT.labels(type="incremental").inc()
+
+        self.evict(max_size)
+        return index if len(index) <= max_size else None
+
+    def evict(self, max_size: int):
+        """
+        总指标数超过上限时，淘汰最近最少使用的业务
+        """
+        with self._lock:
+            total = sum(len(index) for index in self._indexes.values())
+            while total > max_size and len(self._indexes) > 1:
+                _, index = self._indexes.popitem(last=False)
+                total -= len(index)
+
+
+metric_search_index = MetricSearchIndexManager()
@@ -4,7 +4,7 @@ import operator
 import re
 import time
 from collections import defaultdict
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from functools import reduce
@@ -75,6 +75,7 @@ from core.drf_resource.base import Resource
 from core.drf_resource.contrib.cache import CacheResource
 from core.errors.bkmonitor.data_source import CmdbLevelValidateError
 from core.errors.strategy import StrategyNameExist
+from core.prometheus import metrics as prom_metrics
 from monitor.models import ApplicationConfig
 from monitor_web.models import (
     CollectorPluginMeta,
@@ -88,6 +89,7 @@ from monitor_web.strategies.constant import (
     GLOBAL_TRIGGER_CONFIG,
 )
 from monitor_web.strategies.metric_cache.process_dimensions import get_process_extra_dimensions
+from monitor_web.strategies.metric_search_index import MetricSearchRecord, metric_search_index
 from monitor_web.strategies.serializers import handle_target
 from monitor_web.tasks import update_metric_list_by_biz
 from common.decorators import db_safe_wrapper
@@ -1692,7 +1694,13 @@ class GetMetricListV2Resource(Resource):
             (source_count["data_source_label"], source_count["data_type_label"]): source_count["count"]
             for source_count in metrics.values("data_source_label", "data_type_label").annotate(count=Count("id"))
         }
+        return cls.build_data_source_list(source_counts)
 
+    @classmethod
+    def build_data_source_list(cls, source_counts: dict[tuple[str, str], int]) -> list[dict]:
+        """
+        按数据来源及类型的指标数量生成数据源列表
+        """
         return [
             {
                 "count": source_counts.get((category["data_source_label"], category["data_type_label"]), 0),
@@ -1728,7 +1736,13 @@ class GetMetricListV2Resource(Resource):
             .annotate(count=Count("metric_field"))
             .order_by("related_id", "result_table_id")[:50]
         )
+        return cls.build_tag_list(result_tables)
 
+    @classmethod
+    def build_tag_list(cls, result_tables: Iterable[dict]) -> list[dict]:
+        """
+        按结果表生成可选分类
+        """
         category_tags = defaultdict(dict)
         for result_table in result_tables:
             data_source = (result_table["data_source_label"], result_table["data_type_label"])
@@ -1758,7 +1772,13 @@ class GetMetricListV2Resource(Resource):
         """
         # 按监控对象统计数量
         scenarios = metrics.values("result_table_label").annotate(count=Count("result_table_label"))
+        return cls.build_scenario_list(scenarios)
 
+    @classmethod
+    def build_scenario_list(cls, scenarios: Iterable[dict]) -> list[dict]:
+        """
+        按监控对象的指标数量生成监控场景列表
+        """
         scenario_list = []
         try:
             labels = resource.commons.get_label()
@@ -1983,7 +2003,244 @@ class GetMetricListV2Resource(Resource):
                     d["name"] = trans_dict.get(d["id"][len("tags.") :], d["name"])
         return metric_list
 
+    @classmethod
+    def search_records(cls, records: list[MetricSearchRecord], queries: list[str]) -> list[MetricSearchRecord]:
+        """
+        指标选择器精确搜索(指标ID、promql格式)，与 filter_by_conditions 的 exact_query 一致
+        """
+        # (结果表ID, db标识, 指标名) 条件，字段为 None 时不限制
+        exact_query: list[tuple[str | None, str | None, str]] = []
+        for query in queries:
+            query = query.strip()
+
+            # promql格式的查询
+            if ":" in query:
+                fields = query.split(":")
+                if fields[0] in ["custom", "bkmonitor"]:
+                    fields = fields[1:]
+                fields = [field.strip() for field in fields if field.strip()]
+
+                if len(fields) == 3:
+                    exact_query.append((f"{fields[0]}.{fields[1]}", None, fields[2]))
+                elif len(fields) == 2:
+                    exact_query.append((None, fields[0], fields[1]))
+                continue
+
+            # metric_id格式的查询
+            fields = query.split(".")
+            if len(fields) == 2:
+                exact_query.extend([(None, fields[0], fields[1]), (fields[0], None, fields[1])])
+            elif len(fields) >= 3:
+                exact_query.append((".".join(fields[:2]), None, ".".join(fields[2:])))
+
+        if not exact_query:
+            return []
+
+        # 与数据库的默认排序规则一致，不区分大小写
+        exact_query = [
+            (table_id and table_id.lower(), data_label and data_label.lower(), metric_field.lower())
+            for table_id, data_label, metric_field in exact_query
+        ]
+        return [
+            record
+            for record in records
+            if any(
+                (table_id is None or record.result_table_id.lower() == table_id)
+                and (data_label is None or record.data_label.lower() == data_label)
+                and metric_field in record.metric_field.lower()
+                for table_id, data_label, metric_field in exact_query
+            )
+        ]
+
+    @classmethod
+    def get_index_records(cls, bk_tenant_id: str, params: dict) -> list[MetricSearchRecord] | None:
+        """
+        从进程内搜索索引获取指标，只支持模糊搜索条件，不支持时返回 None
+        """
+        if not settings.METRIC_SEARCH_INDEX_ENABLED or get_source_app() == SourceApp.FTA:
+            return None
+
+        queries = []
+        for condition in params.get("conditions", []):
+            if "key" not in condition or "value" not in condition:
+                continue
+            if condition["key"] != "query":
+                return None
+            value = condition["value"]
+            queries.extend(value if isinstance(value, list) else [value])
+
+        indexes = {}
+        for bk_biz_id in {0, params["bk_biz_id"]}:
+            index = metric_search_index.get_index(bk_tenant_id, bk_biz_id)
+            if index is None:
+                return None
+            indexes[bk_biz_id] = index
+
+        records = {}
+        for index in indexes.values():
+            if not queries:
+                records.update((record.id, record) for record in index.all())
+                continue
+            for query in queries:
+                records.update((record.id, record) for record in index.search(query))
+            records.update((record.id, record) for record in cls.search_records(index.all(), queries))
+        records = list(records.values())
+
+        if not params["bk_biz_id"]:
+            return records
+
+        # 与 MetricListCache 默认 manager 一致，排除业务下重名的0业务内置指标
+        # 重名指标需从业务全部指标中获取，业务指标未命中搜索条件时0业务指标同样需要排除
+        duplicate_metrics = {
+            record.metric_field
+            for record in indexes[params["bk_biz_id"]].all()
+            if record.is_duplicate == 1 and record.result_table_id == ""
+        }
+        if duplicate_metrics:
+            records = [
+                record
+                for record in records
+                if not (
+                    record.bk_biz_id == 0 and record.result_table_id == "" and record.metric_field in duplicate_metrics
+                )
+            ]
+        return records
+
+    @classmethod
+    def filter_records(cls, records: list[MetricSearchRecord], params: dict, filter_type: str):
+        """
+        按数据类型、标签、场景或数据源过滤索引中的指标，与对应的数据库过滤逻辑一致
+        """
+        if filter_type == "data_type":
+            if not params["data_type_label"]:
+                return records
+            if params["data_type_label"] != "grafana":
+                return [record for record in records if record.data_type_label == params["data_type_label"]]
+            return [
+                record
+                for record in records
+                if (record.data_source_label, record.data_type_label) in cls.GrafanaDataSource
+            ]
+
+        if filter_type == "tag":
+            tag = params["tag"]
+            if tag == "__COMMON_USED__":
+                return [record for record in records if record.use_frequency != 0]
+            elif tag.startswith("system."):
+                return [record for record in records if record.result_table_id == tag]
+            elif tag:
+                return [record for record in records if record.related_id == tag]
+            return records
+
+        if filter_type == "scenario":
+            if params["result_table_label"]:
+                return [record for record in records if record.result_table_label in params["result_table_label"]]
+            return records
+
+        if filter_type == "data_source":
+            if params.get("data_source_label"):
+                records = [record for record in records if record.data_source_label in params["data_source_label"]]
+            if params["data_source"]:
+                data_sources = {tuple(data_source) for data_source in params["data_source"]}
+                records = [
+                    record for record in records if (record.data_source_label, record.data_type_label) in data_sources
+                ]
+            return sorted(records, key=lambda record: (-record.use_frequency, record.id))
+
+        raise ValueError(f"unknown filter type: {filter_type}")
+
+    def perform_request_by_index(self, params: dict, records: list[MetricSearchRecord]) -> dict:
+        """
+        基于进程内搜索索引完成过滤、统计及分页，只查询当前页的指标详情
+        """
+        records = self.filter_records(records, params, "data_type")
+
+        # 按标签过滤，按场景和数据源统计
+        tag_records = self.filter_records(records, params, "tag")
+        scenario_counts = defaultdict(int)
+        for record in tag_records:
+            scenario_counts[record.result_table_label] += 1
+        scenario_list = self.build_scenario_list(
+            {"result_table_label": label, "count": count} for label, count in scenario_counts.items()
+        )
+
+        if not params["data_type_label"] and params["data_source"]:
+            data_sources = {tuple(data_source) for data_source in params["data_source"]}
+            tag_records = [
+                record for record in tag_records if (record.data_source_label, record.data_type_label) in data_sources
+            ]
+        source_counts = defaultdict(int)
+        for record in tag_records:
+            source_counts[(record.data_source_label, record.data_type_label)] += 1
+        data_source_list = self.build_data_source_list(source_counts)
+
+        records = self.filter_records(records, params, "scenario")
+        records = self.filter_records(records, params, "data_source")
+
+        # 按标签统计并过滤标签
+        result_tables = defaultdict(int)
+        for record in records:
+            if (
+                record.data_source_label == DataSourceLabel.BK_MONITOR_COLLECTOR
+                and record.data_type_label in [DataTypeLabel.EVENT, DataTypeLabel.LOG]
+            ) or record.data_source_label in [DataSourceLabel.BK_DATA, DataSourceLabel.BK_LOG_SEARCH]:
+                continue
+            result_table = (
+                record.result_table_id,
+                record.result_table_name,
+                record.data_source_label,
+                record.data_type_label,
+                record.related_id,
+                record.related_name,
+            )
+            result_tables[result_table] += 1
+        tag_list = self.build_tag_list(
+            {
+                "result_table_id": result_table[0],
+                "result_table_name": result_table[1],
+                "data_source_label": result_table[2],
+                "data_type_label": result_table[3],
+                "related_id": result_table[4],
+                "related_name": result_table[5],
+                "count": count,
+            }
+            for result_table, count in sorted(result_tables.items(), key=lambda item: (item[0][4], item[0][0]))[:50]
+        )
+        records = self.filter_records(records, params, "tag")
+
+        # 分页过滤
+        count = len(records)
+        page = params.get("page")
+        page_size = params.get("page_size")
+        if page is not None and page_size:
+            page = max(page, 1)
+            records = records[(page - 1) * page_size : page * page_size]
+
+        # 只查询当前页的指标详情，按索引中的顺序排列
+        metric_ids = [record.id for record in records]
+        metrics = {metric.id: metric for metric in MetricListCache.objects.filter(id__in=metric_ids)}
+        metrics = [metrics[metric_id] for metric_id in metric_ids if metric_id in metrics]
+
+        metric_list = self.get_metric_list(params["bk_biz_id"], metrics)
+        metric_list = self.translate_monitor_dimensions(metric_list, params)
+
+        return {
+            "metric_list": metric_list,
+            "tag_list": tag_list,
+            "data_source_list": data_source_list,
+            "scenario_list": scenario_list,
+            "count": count,
+        }
+
     def perform_request(self, params):
+        # 指标搜索索引命中时，不再扫描指标选择器缓存表
+        records = self.get_index_records(get_request_tenant_id(), params)
+        if records is not None:
+            prom_metrics.METRIC_SEARCH_INDEX_REQUEST_COUNT.labels(status="hit").inc()
+            return self.perform_request_by_index(params, records)
+        if settings.METRIC_SEARCH_INDEX_ENABLED:
+            prom_metrics.METRIC_SEARCH_INDEX_REQUEST_COUNT.labels(status="fallback").inc()
+
         # 从指标选择器缓存表根据业务查询指标
         metrics = MetricListCache.objects.filter(
             bk_tenant_id=get_request_tenant_id(), bk_biz_id__in=[0, params["bk_biz_id"]]
@@ -0,0 +1,227 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import copy
+
+import pytest
+from django.test import override_settings
+
+from bkmonitor.data_source.unify_query.query import UnifyQuery
+from constants.data_source import DataSourceLabel, DataTypeLabel
+from monitor_web.grafana.resources.unify_query import GraphUnifyQueryResource
+
+START_TIME = 1774526400
+INTERVAL = 60
+QUERY_PARAMS = {"query_list": [{"reference_name": "a"}]}
+
+
+def build_params(**kwargs):
+    params = {
+        "bk_biz_id": 2,
+        "query_configs": [
+            {
+                "data_source_label": DataSourceLabel.BK_MONITOR_COLLECTOR,
+                "data_type_label": DataTypeLabel.TIME_SERIES,
+                "metrics": [{"field": "usage", "method": "AVG", "alias": "a", "display": False}],
+                "functions": [],
+                "group_by": ["bk_target_ip", "device_name"],
+                "filter_dict": {},
+                "interval": INTERVAL,
+            }
+        ],
+        "expression": "a",
+        "stack": "",
+        "function": {},
+        "functions": [],
+        "start_time": START_TIME,
+        "end_time": START_TIME + 30 * INTERVAL,
+        "limit": 1000,
+        "slimit": 1000,
+        "down_sample_range": "",
+        "format": "time_series",
+        "type": "range",
+        "time_alignment": True,
+        "null_as_zero": False,
+        "query_method": "query_data_with_stat",
+        "unit": "",
+        "with_metric": True,
+        "not_time_align": False,
+    }
+    params.update(kwargs)
+    return params
+
+
+def gen_response(series_count, point_count, columns=("_time", "_value"), group_keys=("bk_target_ip", "device_name")):
+    """
+    生成统一查询返回数据，部分数据点缺失或为空
+    """
+    series = []
+    for index in range(series_count):
+        values = []
+        for i in range(point_count):
+            # 制造缺失及空值的数据点
+            if (index + i) % 7 == 3:
+                continue
+            row = [(START_TIME + i * INTERVAL) * 1000]
+            for column_index in range(1, len(columns)):
+                value = None if (index + i + column_index) % 11 == 5 else index + i / 3 + column_index
+                row.append(value)
+            values.append(row)
+        series.append(
+            {
+                "columns": list(columns),
+                "types": ["time"] + ["float"] * (len(columns) - 1),
+                "group_keys": [f"{key}_table0" for key in group_keys],
+                "group_values": [f"{key}-{index % 3 if key == 'le' else index}" for key in group_keys],
+                "values": values,
+            }
+        )
+    return {"series": series}
+
+
+def perform_request(mocker, params, data, as_series, time_compare_data=None, series_stat=None):
+    if as_series:
+        points = UnifyQuery.process_unify_query_series(QUERY_PARAMS, data)
+        for series in UnifyQuery.process_unify_query_series(QUERY_PARAMS, time_compare_data or {}):
+            series.dimensions = {**series.dimensions, "__time_compare": "1d"}
+            points.append(series)
+    else:
+        points = UnifyQuery.process_unify_query_data(QUERY_PARAMS, data)
+        for record in UnifyQuery.process_unify_query_data(QUERY_PARAMS, time_compare_data or {}):
+            record["__time_compare"] = "1d"
+            points.append(record)
+
+    perform_query = mocker.patch.object(
+        GraphUnifyQueryResource,
+        "_perform_query",
+        return_value={"series": points, "metrics": [], "series_stat": series_stat or {}},
+    )
+    with override_settings(GRAPH_UNIFY_QUERY_SERIES_ENABLED=as_series):
+        result = GraphUnifyQueryResource().perform_request(copy.deepcopy(params))
+    assert perform_query.call_args[1]["query_method_name"] == (
+        "query_series_with_stat" if as_series else "query_data_with_stat"
+    )
+    return result
+
+
+class TestGraphUnifyQuerySeries:
+    def test_golden(self, mocker):
+        data = {
+            "series": [
+                {
+                    "columns": ["_time", "_value"],
+                    "types": ["time", "float"],
+                    "group_keys": ["bk_target_ip"],
+                    "group_values": ["127.0.0.1"],
+                    "values": [
+                        [START_TIME * 1000, 1.123456789],
+                        [(START_TIME + 120) * 1000, None],
+                        [(START_TIME + 180) * 1000, 3],
+                    ],
+                }
+            ]
+        }
+        params = build_params(end_time=START_TIME + 5 * INTERVAL)
+        series_stat = {((("bk_target_ip", "127.0.0.1"),), "_result_"): {"count": 2}}
+        for as_series in [False, True]:
+            result = perform_request(mocker, params, data, as_series, series_stat=series_stat)
+            assert result["series"] == [
+                {
+                    "dimensions": {"bk_target_ip": "127.0.0.1"},
+                    "target": "AVG(usage){bk_target_ip=127.0.0.1}",
+                    "metric_field": "_result_",
+                    "datapoints": [
+                        [1.123457, START_TIME * 1000],
+                        [None, (START_TIME + 120) * 1000],
+                        [3, (START_TIME + 180) * 1000],
+                        [None, (START_TIME + 240) * 1000],
+                    ],
+                    "alias": "_result_",
+                    "stat": {"count": 2},
+                    "type": "line",
+                    "dimensions_translation": {},
+                    "unit": "",
+                }
+            ]
+
+    @pytest.mark.parametrize(
+        "params, response",
+        [
+            (build_params(), gen_response(20, 30)),
+            (build_params(null_as_zero=True), gen_response(20, 30)),
+            (build_params(type="instant"), gen_response(20, 30)),
+            (build_params(format="heatmap"), gen_response(10, 30, group_keys=("le",))),
+            (build_params(stack="all", time_alignment=False), gen_response(20, 30)),
+            (
+                build_params(
+                    expression="a + b",
+                    query_configs=[
+                        {
+                            "data_source_label": DataSourceLabel.BK_MONITOR_COLLECTOR,
+                            "data_type_label": DataTypeLabel.TIME_SERIES,
+                            "metrics": [
+                                {"field": "usage", "method": "AVG", "alias": "a", "display": True},
+                                {"field": "idle", "method": "AVG", "alias": "b", "display": True},
+                                {"field": "idle", "method": "AVG", "alias": "b", "display": True},
+                            ],
+                            "functions": [],
+                            "group_by": ["bk_target_ip", "device_name"],
+                            "filter_dict": {},
+                            "interval": INTERVAL,
+                        }
+                    ],
+                ),
+                gen_response(20, 30, columns=("_time", "_result", "a", "b")),
+            ),
+            (
+                build_params(
+                    query_configs=[
+                        {
+                            "data_source_label": DataSourceLabel.PROMETHEUS,
+                            "data_type_label": DataTypeLabel.TIME_SERIES,
+                            "metrics": [],
+                            "functions": [],
+                            "group_by": [],
+                            "filter_dict": {},
+                            "interval": INTERVAL,
+                        }
+                    ],
+                ),
+                gen_response(20, 30, columns=("_time", "_value", "instance")),
+            ),
+        ],
+    )
+    def test_same_as_records(self, mocker, params, response):
+        expected = perform_request(mocker, params, response, as_series=False)
+        assert expected["series"]
+        assert perform_request(mocker, params, response, as_series=True) == expected
+
+    def test_time_compare_and_rank(self, mocker):
+        params = build_params(function={"time_compare": ["1d"]})
+        params["query_configs"][0]["filter_dict"]["rank"] = [
+            {"bk_target_ip": "bk_target_ip-3", "device_name": "device_name-3"},
+            {"bk_target_ip": "bk_target_ip-1", "device_name": "device_name-1"},
+        ]
+        response = gen_response(5, 30)
+        time_compare_data = gen_response(5, 30)
+        for series in time_compare_data["series"]:
+            for value in series["values"]:
+                value[0] += 86400 * 1000
+
+        expected = perform_request(mocker, params, response, False, time_compare_data=time_compare_data)
+        # 未在排序维度中的数据排在前面
+        assert [row["dimensions"]["bk_target_ip"] for row in expected["series"]][-4:] == [
+            "bk_target_ip-3",
+            "bk_target_ip-3",
+            "bk_target_ip-1",
+            "bk_target_ip-1",
+        ]
+        assert {row["time_offset"] for row in expected["series"]} == {"current", "1d"}
+        assert perform_request(mocker, params, response, True, time_compare_data=time_compare_data) == expected
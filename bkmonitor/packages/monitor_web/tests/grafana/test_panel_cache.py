@@ -0,0 +1,182 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import pytest
+from django.test import override_settings
+
+from bkmonitor.data_source.unify_query.series import UnifyQuerySeries
+from monitor_web.grafana import panel_cache
+from monitor_web.grafana.panel_cache import PanelResultCache
+
+START_TIME = 1774526400
+INTERVAL = 60
+
+
+def build_params(start_time=START_TIME, end_time=START_TIME + 60 * INTERVAL, **kwargs):
+    params = {
+        "bk_biz_id": 2,
+        "query_configs": [
+            {
+                "data_source_label": "bk_monitor",
+                "data_type_label": "time_series",
+                "table": "system.cpu_summary",
+                "metrics": [{"field": "usage", "method": "AVG", "alias": "a"}],
+                "where": [],
+                "group_by": ["bk_target_ip"],
+                "filter_dict": {},
+                "functions": [],
+                "interval": INTERVAL,
+            }
+        ],
+        "expression": "a",
+        "functions": [],
+        "start_time": start_time,
+        "end_time": end_time,
+        "limit": 1000,
+        "slimit": 1000,
+        "down_sample_range": "",
+        "type": "range",
+        "time_alignment": True,
+        "not_time_align": False,
+    }
+    params.update(kwargs)
+    return params
+
+
+class FakeQuery:
+    """
+    模拟统一查询：每个 series 按周期返回 [start, end) 内的数据点，结束时间的数据点被剔除
+    """
+
+    def __init__(self, series_count=3, stat_fields=("avg", "max", "min", "count"), is_partial=False):
+        self.series_count = series_count
+        self.stat_fields = stat_fields
+        self.is_partial = is_partial
+        self.calls = []
+
+    def __call__(self, start_time, end_time):
+        self.calls.append((start_time, end_time))
+        start_time = start_time // (INTERVAL * 1000) * INTERVAL * 1000
+        times = list(range(start_time, end_time, INTERVAL * 1000))
+        series_list = []
+        series_stat = {}
+        for index in range(self.series_count):
+            points = [(t // 1000 - START_TIME) // INTERVAL for t in times]
+            values = [None if point % 7 == 3 else index + point % 97 for point in points]
+            dimensions = {"bk_target_ip": f"127.0.0.{index}"}
+            series_list.append(UnifyQuerySeries(dimensions, ["_time_", "_result_"], [times, values]))
+            series_stat[(tuple(dimensions.items()), "_result_")] = {field: 0 for field in self.stat_fields}
+        return series_list, series_stat, self.is_partial
+
+
+def to_records(series_list):
+    return [record for series in series_list for record in series.iter_records()]
+
+
+@pytest.fixture
+def cache(mocker):
+    mocker.patch.object(panel_cache.time, "time", return_value=START_TIME + 600 * INTERVAL)
+    with override_settings(
+        PANEL_RESULT_CACHE_ENABLED=True,
+        PANEL_RESULT_CACHE_MAX_BYTES=64 * 1024 * 1024,
+        PANEL_RESULT_CACHE_DELAY=120,
+        PANEL_RESULT_CACHE_TTL=600,
+    ):
+        yield PanelResultCache()
+
+
+class TestPanelResultCache:
+    def test_is_cacheable(self, cache):
+        assert cache.is_cacheable(build_params())
+        assert not cache.is_cacheable(build_params(type="instant"))
+        assert not cache.is_cacheable(build_params(time_alignment=False))
+        assert not cache.is_cacheable(build_params(not_time_align=True))
+        with override_settings(PANEL_RESULT_CACHE_ENABLED=False):
+            assert not cache.is_cacheable(build_params())
+
+    def test_cache_key(self, cache):
+        params = build_params()
+        key = cache.get_cache_key(params)
+        assert cache.get_cache_key(build_params(start_time=START_TIME + 600)) == key
+        params["query_configs"][0]["filter_dict"]["bk_target_ip"] = ["127.0.0.1"]
+        assert cache.get_cache_key(params) != key
+
+    def test_incremental_refresh(self, cache):
+        query = FakeQuery()
+        cache.query(build_params(), query)
+        assert query.calls == [(START_TIME * 1000, (START_TIME + 60 * INTERVAL) * 1000)]
+
+        # 时间范围后移，只查询缓存之后的数据
+        for offset in [5, 30]:
+            query.calls.clear()
+            params = build_params(START_TIME + offset * INTERVAL, START_TIME + (offset + 60) * INTERVAL)
+            series_list, series_stat = cache.query(params, query)
+            assert len(query.calls) == 1
+            assert query.calls[0][0] > params["start_time"] * 1000
+
+            expected_series_list, _, _ = FakeQuery()(params["start_time"] * 1000, params["end_time"] * 1000)
+            assert to_records(series_list) == to_records(expected_series_list)
+            assert series_stat == cache.calculate_series_stat(
+                expected_series_list, {key: ("avg", "max", "min", "count") for key in series_stat}
+            )
+
+        # 时间范围超出缓存，重新查询完整的时间范围
+        query.calls.clear()
+        cache.query(build_params(START_TIME + 100 * INTERVAL, START_TIME + 160 * INTERVAL), query)
+        assert query.calls == [((START_TIME + 100 * INTERVAL) * 1000, (START_TIME + 160 * INTERVAL) * 1000)]
+
+    def test_unstable_data_not_cached(self, cache, mocker):
+        end_time = START_TIME + 60 * INTERVAL
+        mocker.patch.object(panel_cache.time, "time", return_value=end_time + 30)
+        query = FakeQuery()
+        cache.query(build_params(end_time=end_time), query)
+
+        # 稳定延迟内的数据需要重新查询
+        query.calls.clear()
+        series_list, _ = cache.query(build_params(end_time=end_time), query)
+        assert query.calls == [((end_time - 2 * INTERVAL) * 1000, end_time * 1000)]
+        assert to_records(series_list) == to_records(FakeQuery()(START_TIME * 1000, end_time * 1000)[0])
+
+    def test_series_stat(self, cache):
+        series_stat = cache.query(build_params(end_time=START_TIME + 5 * INTERVAL), FakeQuery())[1]
+        # 空值不参与统计
+        assert series_stat[((("bk_target_ip", "127.0.0.1"),), "_result_")] == {
+            "avg": (1 + 2 + 3 + 5) / 4,
+            "max": 5,
+            "min": 1,
+            "count": 4,
+        }
+
+    @pytest.mark.parametrize(
+        "query",
+        [FakeQuery(is_partial=True), FakeQuery(stat_fields=("avg", "percentile"))],
+    )
+    def test_not_cached(self, cache, query):
+        series_stat = cache.query(build_params(), query)[1]
+        cache.query(build_params(), query)
+        assert len(query.calls) == 2
+        if not query.is_partial:
+            # 无法重新计算的统计保持原样
+            assert set(next(iter(series_stat.values()))) == {"avg", "percentile"}
+
+    def test_evict(self, cache):
+        query = FakeQuery(series_count=10)
+        cache.query(build_params(), query)
+        size = cache._size
+        with override_settings(PANEL_RESULT_CACHE_MAX_BYTES=size * 2):
+            cache.query(build_params(bk_biz_id=3), query)
+            cache.query(build_params(bk_biz_id=4), query)
+        assert len(cache._entries) == 2
+        assert cache._size == size * 2
+
+        # 最早的查询已被淘汰
+        query.calls.clear()
+        cache.query(build_params(), query)
+        assert query.calls == [(START_TIME * 1000, (START_TIME + 60 * INTERVAL) * 1000)]
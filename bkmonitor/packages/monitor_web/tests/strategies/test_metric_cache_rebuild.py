@@ -0,0 +1,187 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import copy
+
+import pytest
+from django.test import override_settings
+
+from bkmonitor.models.metric_list_cache import MetricListCache
+from bkmonitor.utils.common_utils import count_md5
+from constants.common import DEFAULT_TENANT_ID
+from constants.data_source import DataSourceLabel, DataTypeLabel
+from constants.strategy import DimensionFieldType
+from monitor_web.strategies.metric_cache.rebuild import HASH_PREFIX, MetricCacheRebuilder, hash_metric
+from monitor_web.strategies.metric_list_cache import BaseMetricCacheManager
+
+COMPARE_FIELDS = (
+    "bk_biz_id",
+    "result_table_id",
+    "metric_field",
+    "metric_field_name",
+    "related_id",
+    "data_label",
+    "readable_name",
+    "dimensions",
+    "use_frequency",
+)
+
+
+def build_tables(table_count=5, metric_count=4):
+    tables = []
+    for table_index in range(table_count):
+        metrics = []
+        for metric_index in range(metric_count):
+            metrics.append(
+                {
+                    "bk_biz_id": 2,
+                    "data_source_label": DataSourceLabel.CUSTOM,
+                    "data_type_label": DataTypeLabel.TIME_SERIES,
+                    "result_table_label": "other_rt",
+                    "data_target": "none_target",
+                    "result_table_id": f"custom_db_{table_index}.group",
+                    "result_table_name": f"Table {table_index}",
+                    "data_label": f"label_{table_index}" if table_index % 2 else "",
+                    "metric_field": f"metric_{metric_index}",
+                    "metric_field_name": f"指标{metric_index}",
+                    "related_id": str(table_index),
+                    "dimensions": [
+                        {"id": "instance", "name": "instance", "is_dimension": True, "type": DimensionFieldType.String}
+                    ],
+                    "default_dimensions": [],
+                    "default_condition": [],
+                }
+            )
+        tables.append({"id": table_index, "metrics": metrics})
+    # 重复指标以第一次出现的为准
+    tables[-1]["metrics"].append(dict(tables[0]["metrics"][0], metric_field_name="重复指标"))
+    return tables
+
+
+class FakeMetricCacheManager(BaseMetricCacheManager):
+    data_sources = ((DataSourceLabel.CUSTOM, DataTypeLabel.TIME_SERIES),)
+    parallel_tables = True
+
+    def __init__(self, tables):
+        super().__init__(bk_tenant_id=DEFAULT_TENANT_ID, bk_biz_id=2)
+        self.tables = tables
+
+    def get_tables(self):
+        yield from self.tables
+
+    def get_metrics_by_table(self, table):
+        yield from copy.deepcopy(table["metrics"])
+
+
+def dump_metrics():
+    return sorted(
+        tuple(str(getattr(metric, field)) for field in COMPARE_FIELDS) for metric in MetricListCache.objects.all()
+    )
+
+
+@pytest.fixture
+def metric_pool():
+    MetricListCache.objects.all().delete()
+    # 手动添加的自定义指标不做删除处理
+    MetricListCache.objects.create(
+        bk_tenant_id=DEFAULT_TENANT_ID,
+        bk_biz_id=2,
+        data_source_label=DataSourceLabel.CUSTOM,
+        data_type_label=DataTypeLabel.TIME_SERIES,
+        result_table_id="manual.group",
+        metric_field="manual",
+        metric_md5="0",
+    )
+    yield
+    MetricListCache.objects.all().delete()
+
+
+@pytest.mark.django_db(databases="__all__")
+class TestMetricCacheRebuilder:
+    def rebuild(self, tables, **kwargs):
+        with override_settings(METRIC_CACHE_REBUILD_BATCH_SIZE=3, **kwargs):
+            return MetricCacheRebuilder(FakeMetricCacheManager(tables)).run()
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_same_as_legacy(self, metric_pool, workers):
+        tables = build_tables()
+        with override_settings(METRIC_CACHE_STREAMING_REBUILD_ENABLED=False):
+            FakeMetricCacheManager(tables)._run()
+        expected = dump_metrics()
+
+        MetricListCache.objects.exclude(metric_md5="0").delete()
+        counts = self.rebuild(tables, METRIC_CACHE_REBUILD_WORKERS=workers)
+        assert counts["create"] == 20
+        assert dump_metrics() == expected
+        assert all(
+            metric_md5.startswith(HASH_PREFIX)
+            for metric_md5 in MetricListCache.objects.exclude(metric_md5="0").values_list("metric_md5", flat=True)
+        )
+
+        # 指标未变化时不写入
+        counts = self.rebuild(tables, METRIC_CACHE_REBUILD_WORKERS=workers)
+        assert counts == {"create": 0, "update": 0, "update_md5": 0, "delete": 0, "unchanged": 20}
+
+    def test_legacy_md5(self, metric_pool):
+        tables = build_tables()
+        with override_settings(METRIC_CACHE_STREAMING_REBUILD_ENABLED=False):
+            FakeMetricCacheManager(tables)._run()
+        last_update = dict(MetricListCache.objects.values_list("id", "last_update"))
+
+        # 旧摘要的指标内容未变化时只更新摘要
+        counts = self.rebuild(tables)
+        assert counts["update_md5"] == 20
+        assert counts["update"] == 0
+        assert dict(MetricListCache.objects.values_list("id", "last_update")) == last_update
+
+    def test_changed_and_deleted(self, metric_pool):
+        tables = build_tables()
+        self.rebuild(tables)
+
+        tables[1]["metrics"][0]["metric_field_name"] = "changed"
+        tables[2]["metrics"].pop()
+        counts = self.rebuild(tables)
+        assert counts == {"create": 0, "update": 1, "update_md5": 0, "delete": 1, "unchanged": 18}
+
+        metric = MetricListCache.objects.get(result_table_id="custom_db_1.group", metric_field="metric_0")
+        assert metric.metric_field_name == "changed"
+        assert metric.metric_md5 == hash_metric(
+            {**tables[1]["metrics"][0], "readable_name": metric.readable_name, "use_frequency": 0}
+        )
+        assert not MetricListCache.objects.filter(result_table_id="custom_db_2.group", metric_field="metric_3")
+        assert MetricListCache.objects.filter(metric_md5="0").exists()
+
+    def test_duplicate_pool_metrics(self, metric_pool):
+        tables = build_tables()
+        self.rebuild(tables)
+
+        duplicate = MetricListCache.objects.get(result_table_id="custom_db_0.group", metric_field="metric_0")
+        duplicate.pk = None
+        duplicate.metric_md5 = count_md5({})
+        duplicate.save()
+
+        counts = self.rebuild(tables)
+        assert counts["delete"] == 1
+        assert MetricListCache.objects.filter(result_table_id="custom_db_0.group", metric_field="metric_0").count() == 1
+
+    def test_hash_list_order(self):
+        tables = build_tables(table_count=1, metric_count=1)
+        metric = tables[0]["metrics"][0]
+        metric["dimensions"] = [
+            {"id": name, "name": name, "is_dimension": True, "type": DimensionFieldType.String}
+            for name in ["instance", "device", "job"]
+        ]
+        reordered = dict(metric, dimensions=list(reversed(metric["dimensions"])), default_dimensions=["b", "a"])
+        metric["default_dimensions"] = ["a", "b"]
+
+        # 由集合生成的列表顺序不固定，摘要需与 count_md5 一样不受列表顺序影响
+        assert hash_metric(reordered) == hash_metric(metric)
+        assert count_md5(reordered) == count_md5(metric)
+        assert hash_metric(dict(metric, default_dimensions=["a"])) != hash_metric(metric)
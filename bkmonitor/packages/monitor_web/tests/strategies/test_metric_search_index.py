@@ -0,0 +1,163 @@
+"""
+Tencent is pleased to support the open source community by making 蓝鲸智云 - 监控平台 (BlueKing - Monitor) available.
+Copyright (C) 2017-2025 Tencent. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except in compliance with the License.
+You may obtain a copy of the License at http://opensource.org/licenses/MIT
+Unless required by applicable law or agreed to in writing, software distributed under the License is distributed on
+an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the License for the
+specific language governing permissions and limitations under the License.
+"""
+
+import time
+
+import pytest
+from django.test import override_settings
+
+from bkmonitor.models.metric_list_cache import MetricListCache
+from constants.common import DEFAULT_TENANT_ID
+from monitor_web.strategies.metric_search_index import MetricSearchIndexManager
+from monitor_web.strategies.resources import v2
+from monitor_web.strategies.resources.v2 import GetMetricListV2Resource
+
+DATA_SOURCES = [
+    ("bk_monitor", "time_series", "os"),
+    ("custom", "time_series", "application_check"),
+    ("bk_monitor", "event", "os"),
+    ("bk_log_search", "log", "service_module"),
+    ("bk_data", "time_series", "other_rt"),
+]
+
+
+def create_metrics(bk_biz_id, count):
+    metrics = []
+    for index in range(count):
+        data_source_label, data_type_label, result_table_label = DATA_SOURCES[index % len(DATA_SOURCES)]
+        metrics.append(
+            MetricListCache(
+                bk_tenant_id=DEFAULT_TENANT_ID,
+                bk_biz_id=bk_biz_id,
+                data_source_label=data_source_label,
+                data_type_label=data_type_label,
+                result_table_label=result_table_label,
+                result_table_id=f"system.table_{index % 7}",
+                result_table_name=f"Table {index % 7}",
+                data_label=f"label_{index % 3}",
+                metric_field=f"Metric_{bk_biz_id}_{index}",
+                metric_field_name=f"指标{index}",
+                related_id=f"related_{index % 7}_{data_source_label}",
+                related_name=f"Related {index % 7}",
+                use_frequency=index % 4,
+                metric_md5=str(index),
+                dimensions=[],
+                default_dimensions=[],
+                default_condition=[],
+            )
+        )
+    MetricListCache.objects.bulk_create(metrics)
+
+
+def perform_request(params):
+    return GetMetricListV2Resource().request(bk_biz_id=2, **params)
+
+
+@pytest.fixture
+def metric_search_index(mocker):
+    mocker.patch.object(v2, "get_request_tenant_id", return_value=DEFAULT_TENANT_ID)
+    mocker.patch.object(v2, "get_source_app", return_value="monitor")
+    mocker.patch.object(v2, "get_process_extra_dimensions", return_value={})
+    mocker.patch.object(v2, "is_ipv6_biz", return_value=False)
+    mocker.patch.object(GetMetricListV2Resource, "get_metric_remarks", return_value=[])
+    mocker.patch.object(
+        GetMetricListV2Resource,
+        "build_scenario_list",
+        side_effect=lambda scenarios: sorted((s["result_table_label"], s["count"]) for s in scenarios),
+    )
+
+    MetricListCache.objects.all().delete()
+    create_metrics(0, 50)
+    create_metrics(2, 100)
+
+    v2.metric_search_index.clear()
+    yield v2.metric_search_index
+    v2.metric_search_index.clear()
+
+
+@pytest.mark.django_db(databases="__all__")
+class TestMetricSearchIndex:
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"conditions": [{"key": "query", "value": "metric_2_1"}]},
+            {"conditions": [{"key": "query", "value": ["TABLE_3", "指标4"]}]},
+            {"conditions": [{"key": "query", "value": "me"}]},
+            {"conditions": [{"key": "query", "value": "label_1.metric_0"}]},
+            {"conditions": [{"key": "query", "value": "bkmonitor:system:table_2:metric"}]},
+            {"data_type_label": "time_series", "tag": "related_3_custom", "page": 2, "page_size": 5},
+            {"data_type_label": "grafana", "result_table_label": ["os"], "tag": "__COMMON_USED__"},
+            {"data_source": [["bk_monitor", "event"], ["custom", "time_series"]], "page": 1, "page_size": 10},
+            {"data_source_label": ["bk_monitor"], "tag": "system.table_1"},
+        ],
+    )
+    def test_same_as_db(self, metric_search_index, params):
+        with override_settings(METRIC_SEARCH_INDEX_ENABLED=False):
+            expected = perform_request(params)
+        with override_settings(METRIC_SEARCH_INDEX_ENABLED=True):
+            assert perform_request(params) == expected
+        assert len(metric_search_index._indexes) == 2
+
+    def test_unsupported_conditions(self, metric_search_index):
+        params = {"bk_biz_id": 2, "conditions": [{"key": "metric_id", "value": "bk_monitor.system.table_1.metric"}]}
+        with override_settings(METRIC_SEARCH_INDEX_ENABLED=True):
+            assert GetMetricListV2Resource.get_index_records(DEFAULT_TENANT_ID, params) is None
+
+    def test_duplicate_metrics(self, metric_search_index):
+        for bk_biz_id, metric_field_name in [(0, "共享指标"), (2, "业务指标")]:
+            MetricListCache.objects.create(
+                bk_tenant_id=DEFAULT_TENANT_ID,
+                bk_biz_id=bk_biz_id,
+                data_source_label="bk_monitor",
+                data_type_label="time_series",
+                result_table_id="",
+                metric_field="container_cpu_usage",
+                metric_field_name=metric_field_name,
+                is_duplicate=int(bk_biz_id == 2),
+                metric_md5="duplicate",
+            )
+
+        # 业务下的重名指标未命中搜索条件时，0业务的同名指标同样需要排除
+        with override_settings(METRIC_SEARCH_INDEX_ENABLED=True):
+            for query, expected in [("共享", []), ("container_cpu", [2]), ("", [2])]:
+                params = {"bk_biz_id": 2, "conditions": [{"key": "query", "value": query}] if query else []}
+                records = GetMetricListV2Resource.get_index_records(DEFAULT_TENANT_ID, params)
+                assert [
+                    record.bk_biz_id for record in records if record.metric_field == "container_cpu_usage"
+                ] == expected
+
+    def test_incremental_sync(self, metric_search_index):
+        index = metric_search_index.get_index(DEFAULT_TENANT_ID, 2)
+        assert len(index) == 100
+        assert [record.metric_field for record in index.search("metric_2_10")] == ["Metric_2_10"]
+
+        # 修改、删除及新增指标后更新索引版本
+        MetricListCache.objects.filter(metric_field="Metric_2_10").update(metric_field="renamed", metric_md5="changed")
+        MetricListCache.objects.filter(metric_field="Metric_2_11").delete()
+        create_metrics(3, 1)
+        MetricListCache.objects.filter(bk_biz_id=3).update(bk_biz_id=2)
+        MetricSearchIndexManager.bump_generation(DEFAULT_TENANT_ID)
+
+        # 未到检查间隔时不同步
+        assert metric_search_index.get_index(DEFAULT_TENANT_ID, 2) is index
+        assert index.search("renamed") == []
+
+        index = metric_search_index.get_index(DEFAULT_TENANT_ID, 2, now=time.time() + 3600)
+        assert len(index) == 100
+        assert index.search("metric_2_10") == []
+        assert [record.metric_field for record in index.search("RENAMED")] == ["renamed"]
+        assert index.search("metric_2_11") == []
+        assert [record.metric_field for record in index.search("metric_3_0")] == ["Metric_3_0"]
+
+    def test_oversized(self, metric_search_index):
+        with override_settings(METRIC_SEARCH_INDEX_MAX_SIZE=60):
+            assert metric_search_index.get_index(DEFAULT_TENANT_ID, 0) is not None
+            assert metric_search_index.get_index(DEFAULT_TENANT_ID, 2) is None